@@ -98,13 +98,13 @@ class Model_D(ModelBase):
                             ('Ely', StreamDirection.stream_out_of_component),
                             ('Storage_H2', StreamDirection.stream_out_of_component),
                             ('Storage_H2', StreamDirection.stream_into_component),
-                            ('Pipline', StreamDirection.stream_into_component),
+                            ('Pipeline', StreamDirection.stream_into_component),
                             ('Grid_H2', StreamDirection.stream_bidirectional),
                             ])
 
         self.add_branch(branch_name='H2_Consumer', branch_type=StreamMass.HYDROGEN,
                         port_connections=[
-                            ('Pipline', StreamDirection.stream_out_of_component),
+                            ('Pipeline', StreamDirection.stream_out_of_component),
                             ('Consumer_H2', StreamDirection.stream_into_component),
                             ])
 
@@ -3,6 +3,32 @@ from typing import ClassVar
 from base_python.source.model_base.Dataclasses.EconomicalDataclasses import check_percentage_rate
 import logging
 import datetime
+from enum import Enum, auto
+
+
+class SolverEngine(Enum):
+    STEPWISE = auto()  # every timestep is solved by the branch solver
+    STEP_DEDUPLICATION = auto()  # timesteps with identical profile values are solved once, see StepDeduplication
+
+
+class PropertyBackend(Enum):
+    REFPROP = auto()  # REFPROP AbstractState, exact properties at every call
+    TABULATED = auto()  # precomputed pressure-temperature tables, see helper/TabulatedFluid.py
+
+
+class CacheEviction(Enum):
+    LRU = auto()  # the least recently used entry is removed if the cache is full
+    FIFO = auto()  # the oldest entry is removed if the cache is full
+
+
+class SegmentSolver(Enum):
+    FIXED_POINT = auto()  # nested fixed point loops over outlet pressure and temperature, reference mode
+    NEWTON = auto()  # coupled Newton iteration with secant (Broyden) updates of the jacobian
+
+
+class GasStorageModel(Enum):
+    VAN_DER_WAALS = auto()  # van der Waals equation with the critical point of the gas, reference mode
+    REAL_GAS = auto()  # compressibility factor of the property backend at storage temperature
 
 class GenericSettings():
     def to_dataframe(self):
@@ -29,6 +55,7 @@ class BasicTechnicalSettings(GenericSettings):
     time_resolution: int
     absolute_model_error: float = 1e-12
     timeout_max: int = 3
+    solver_engine: SolverEngine = SolverEngine.STEPWISE
 
 
 @dataclass
@@ -0,0 +1,174 @@
+import os
+import json
+import logging
+import numpy as np
+
+
+class CompressorMap:
+    """Precomputed performance map of a compressor over inlet pressure, outlet pressure and inlet temperature.
+
+    Note:
+        Compression and cooling power of the compressor are proportional to the mass flow, so the map stores the
+        powers of a mass flow of 1 kg/time_resolution and scales them with the actual mass flow. The map is evaluated
+        by trilinear interpolation, states outside of the grid are clipped to the border of the grid, which is logged
+        once per component. A map is only valid for the composition, the stages, the efficiencies, the cooling
+        temperature and the time resolution it was built for (see is_valid_for).
+    """
+    QUANTITIES = ('compression_power', 'cooling_power', 'temperature_out')
+
+    def __init__(self, mass_fraction: dict, time_resolution: int, pressures_in: np.ndarray,
+                 pressures_out: np.ndarray, temperatures_in: np.ndarray, tables: dict, number_stages: int = None,
+                 compression_efficiencies: dict = None, cooling_temperature: float = None):
+        """
+        Args:
+            mass_fraction (dict):           Mass fractions of the fluid the map was built for
+            time_resolution (int):          Time resolution of the compressor the map was built for in minutes
+            pressures_in (np.ndarray):      Ascending inlet pressure grid in Pa
+            pressures_out (np.ndarray):     Ascending outlet pressure grid in Pa
+            temperatures_in (np.ndarray):   Ascending inlet temperature grid in K
+            tables (dict):                  Quantities as keys and arrays of shape (pressures_in, pressures_out,
+                                            temperatures_in) as values
+            number_stages (int):            Number of compression stages the map was built for
+            compression_efficiencies (dict): Efficiencies of the compressor the map was built for
+            cooling_temperature (float):    Cooling temperature of the compressor the map was built for in K
+        """
+        self.mass_fraction = dict(mass_fraction)
+        self.time_resolution = time_resolution
+        self.pressures_in = np.asarray(pressures_in, dtype=float)
+        self.pressures_out = np.asarray(pressures_out, dtype=float)
+        self.temperatures_in = np.asarray(temperatures_in, dtype=float)
+        self.tables = {name: np.asarray(table, dtype=float) for name, table in tables.items()}
+        self.number_stages = number_stages
+        self.compression_efficiencies = None if compression_efficiencies is None else dict(compression_efficiencies)
+        self.cooling_temperature = cooling_temperature
+        self.clipping_logged = set()  # components whose clipped states have been logged
+
+    @classmethod
+    def build(cls, compressor, pressure_in_range: tuple, pressure_out_range: tuple, temperature_range: tuple,
+              number_points: tuple = (40, 60, 20)):
+        """
+        Builds the map with the array API of the compressor, all grid points are calculated in one call
+
+        Args:
+            compressor (Compressor):        Compressor with set mass fraction and time resolution
+            pressure_in_range (tuple):      Minimum and maximum inlet pressure in Pa
+            pressure_out_range (tuple):     Minimum and maximum outlet pressure in Pa
+            temperature_range (tuple):      Minimum and maximum inlet temperature in K
+            number_points (tuple):          Number of grid points of inlet pressure, outlet pressure and temperature
+
+        Returns:
+            CompressorMap: Map of the compressor
+        """
+        pressures_in = np.linspace(*pressure_in_range, number_points[0])
+        pressures_out = np.linspace(*pressure_out_range, number_points[1])
+        temperatures_in = np.linspace(*temperature_range, number_points[2])
+        pressure_in, pressure_out, temperature_in = np.meshgrid(pressures_in, pressures_out, temperatures_in,
+                                                                indexing='ij')
+        compression_power, cooling_power, temperature_out = compressor.calculate_compression_power_array(
+            mass_flow=np.ones(pressure_in.shape), temperature_in=temperature_in, pressure_in=pressure_in,
+            pressure_out=pressure_out)
+        tables = {'compression_power': compression_power,
+                  'cooling_power': cooling_power,
+                  'temperature_out': temperature_out}
+        return cls(compressor.mass_fraction, compressor.time_resolution, pressures_in, pressures_out,
+                   temperatures_in, tables, number_stages=compressor.number_stages,
+                   compression_efficiencies=compressor.compression_efficiencies,
+                   cooling_temperature=compressor.cooling_temperature)
+
+    @classmethod
+    def load(cls, file_path: str, mass_fraction: dict):
+        """
+        Args:
+            file_path (str):        Path of the .npz file
+            mass_fraction (dict):   Mass fractions of the fluid the map was built for
+
+        Returns:
+            CompressorMap: Map of the file
+        """
+        with np.load(file_path) as data:
+            settings = json.loads(str(data['settings'])) if 'settings' in data.files else {}
+            return cls(mass_fraction, int(data['time_resolution']), data['pressures_in'], data['pressures_out'],
+                       data['temperatures_in'], {name: data[name] for name in cls.QUANTITIES}, **settings)
+
+    def save(self, file_path: str):
+        """
+        Args:
+            file_path (str): Path of the .npz file
+
+        """
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        settings = {'number_stages': self.number_stages, 'compression_efficiencies': self.compression_efficiencies,
+                    'cooling_temperature': self.cooling_temperature}
+        np.savez_compressed(file_path, time_resolution=self.time_resolution, pressures_in=self.pressures_in,
+                            pressures_out=self.pressures_out, temperatures_in=self.temperatures_in,
+                            settings=np.array(json.dumps(settings)), **self.tables)
+
+    def is_valid_for(self, mass_fraction: dict, time_resolution: int, number_stages: int,
+                     compression_efficiencies: dict, cooling_temperature: float) -> bool:
+        """
+        Args:
+            mass_fraction (dict):           Actual mass fractions of the compressed fluid
+            time_resolution (int):          Actual time resolution of the compressor in minutes
+            number_stages (int):            Actual number of compression stages
+            compression_efficiencies (dict): Actual efficiencies of the compressor
+            cooling_temperature (float):    Actual cooling temperature of the compressor in K
+
+        Returns:
+            bool: True if the map was built for the given composition, time resolution, stages, efficiencies and
+                  cooling temperature
+        """
+        return self.time_resolution == time_resolution and self.number_stages == number_stages and \
+            self.cooling_temperature == cooling_temperature and \
+            self.compression_efficiencies == compression_efficiencies and \
+            self.mass_fraction.keys() == mass_fraction.keys() and \
+            np.allclose(list(self.mass_fraction.values()), [mass_fraction[key] for key in self.mass_fraction])
+
+    def evaluate(self, mass_flow, temperature_in, pressure_in, pressure_out, component_id: str = None) -> tuple:
+        """
+        Interpolates compression power, cooling power and outlet temperature for scalars or arrays of states
+
+        Args:
+            mass_flow (float, np.ndarray):      Mass flow in kg/time_resolution
+            temperature_in (float, np.ndarray): Inlet temperature in K
+            pressure_in (float, np.ndarray):    Inlet pressure in Pa
+            pressure_out (float, np.ndarray):   Outlet pressure in Pa
+            component_id (str):                 ID of the evaluating component, clipped states are logged once per
+                                                component
+
+        Returns:
+            tuple: Compression power in kW, cooling power in kW and outlet temperature in K
+        """
+        x, i, clipped_pressure_in = _locate(self.pressures_in, pressure_in)
+        y, j, clipped_pressure_out = _locate(self.pressures_out, pressure_out)
+        z, k, clipped_temperature_in = _locate(self.temperatures_in, temperature_in)
+        if (clipped_pressure_in or clipped_pressure_out or clipped_temperature_in) and \
+                component_id not in self.clipping_logged:
+            self.clipping_logged.add(component_id)
+            logging.warning(f'States of compressor {component_id} are outside of the compression map (inlet pressure '
+                            f'{self.pressures_in[0]}-{self.pressures_in[-1]} Pa, outlet pressure '
+                            f'{self.pressures_out[0]}-{self.pressures_out[-1]} Pa, inlet temperature '
+                            f'{self.temperatures_in[0]}-{self.temperatures_in[-1]} K) and are clipped to its border')
+        results = []
+        for name in self.QUANTITIES:
+            table = self.tables[name]
+            value = ((1 - x) * (1 - y) * (1 - z) * table[i, j, k] + x * (1 - y) * (1 - z) * table[i + 1, j, k] +
+                     (1 - x) * y * (1 - z) * table[i, j + 1, k] + (1 - x) * (1 - y) * z * table[i, j, k + 1] +
+                     x * y * (1 - z) * table[i + 1, j + 1, k] + x * (1 - y) * z * table[i + 1, j, k + 1] +
+                     (1 - x) * y * z * table[i, j + 1, k + 1] + x * y * z * table[i + 1, j + 1, k + 1])
+            if name != 'temperature_out':
+                value = value * mass_flow
+            results.append(float(value) if np.ndim(value) == 0 else value)
+        return tuple(results)
+
+
+def _locate(grid: np.ndarray, values) -> tuple:
+    """
+    Returns:
+        tuple: Relative position within the grid cell and index of the lower grid point of every value and True if a
+               value was outside of the grid and has been clipped
+    """
+    values = np.asarray(values, dtype=float)
+    clipped = bool(np.any(values < grid[0]) or np.any(values > grid[-1]))
+    values = np.clip(values, grid[0], grid[-1])
+    index = np.clip(np.searchsorted(grid, values, side='right') - 1, 0, grid.size - 2)
+    return (values - grid[index]) / (grid[index + 1] - grid[index]), index, clipped
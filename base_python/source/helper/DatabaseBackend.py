@@ -0,0 +1,335 @@
+import re
+import queue
+import sqlite3
+import logging
+import itertools
+import threading
+import mysql.connector
+
+
+class DatabaseBackend:
+    """Pool of connections to one database, which are shared by all models of a process.
+
+    Note:
+        Models acquire a DatabaseHandle from the pool instead of opening their own connection and give it back after
+        loading the database, so a sweep with thousands of models opens at most POOL_SIZE connections. All statements
+        are parameterized, table and column names are checked against IDENTIFIER since they cannot be passed as
+        parameters. Rows are fetched in batches of FETCH_SIZE.
+    """
+    POOL_SIZE = 4
+    FETCH_SIZE = 500
+    ACQUIRE_TIMEOUT = 60  # [s] time a model waits for a free connection if all connections are in use
+    PLACEHOLDER = '?'
+    IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+    def __init__(self, database_name: str, pool_size: int = POOL_SIZE):
+        """
+        Args:
+            database_name (str): Name of the database, used for messages
+            pool_size (int): Maximum number of open connections
+        """
+        self.database_name = database_name
+        self.pool_size = pool_size
+        self._idle_connections = queue.LifoQueue()
+        self._connection_count = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """
+        Returns:
+            Connection: New connection to the database
+        """
+        raise NotImplementedError
+
+    def _create_cursor(self, connection):
+        return connection.cursor()
+
+    def _check_connection(self, connection):
+        """
+        Checks an idle connection of the pool before it is handed out, e.g. server connections which timed out while
+        they were idle
+
+        Args:
+            connection (Connection): Idle connection of the pool
+
+        Returns:
+            Connection: Usable connection
+        """
+        return connection
+
+    def acquire(self):
+        """
+        Takes an idle connection of the pool or opens a new one, if the pool is not full yet
+
+        Returns:
+            DatabaseHandle: Handle of the connection, which has to be released after use
+        """
+        try:
+            connection = self._check_idle_connection(self._idle_connections.get_nowait())
+        except queue.Empty:
+            with self._lock:
+                create_connection = self._connection_count < self.pool_size
+                if create_connection:
+                    self._connection_count += 1
+            if create_connection:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._connection_count -= 1
+                    raise
+            else:
+                try:
+                    connection = self._idle_connections.get(timeout=self.ACQUIRE_TIMEOUT)
+                except queue.Empty:
+                    raise ConnectionError(f'No free connection to database "{self.database_name}" within '
+                                          f'{self.ACQUIRE_TIMEOUT} s')
+                connection = self._check_idle_connection(connection)
+        return DatabaseHandle(self, connection)
+
+    def _check_idle_connection(self, connection):
+        """
+        Returns:
+            Connection: Checked idle connection, the slot of the pool is freed if the connection can not be used anymore
+        """
+        try:
+            return self._check_connection(connection)
+        except Exception:
+            with self._lock:
+                self._connection_count -= 1
+            raise
+
+    def release(self, connection):
+        """
+        Gives the connection back to the pool
+
+        Args:
+            connection (Connection): Connection of a released handle
+
+        """
+        self._idle_connections.put(connection)
+
+    def close(self):
+        """
+        Closes all idle connections of the pool
+
+        """
+        while True:
+            try:
+                connection = self._idle_connections.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+            with self._lock:
+                self._connection_count -= 1
+
+    def check_identifier(self, name: str) -> str:
+        if not self.IDENTIFIER.match(name):
+            raise ValueError(f'"{name}" is no valid table or column name of database "{self.database_name}"')
+        return name
+
+
+class SQLiteBackend(DatabaseBackend):
+    """Pool of connections to a local sqlite file. sqlite keeps the prepared statements of every connection in its
+    statement cache, so repeated selects of the pooled connections are not parsed again."""
+
+    def __init__(self, database_path: str, database_name: str = None, pool_size: int = DatabaseBackend.POOL_SIZE):
+        """
+        Args:
+            database_path (str): Path of the sqlite file
+            database_name (str): Name of the database, used for messages
+            pool_size (int): Maximum number of open connections
+        """
+        super().__init__(database_name or database_path, pool_size)
+        self.database_path = database_path
+
+    def _connect(self):
+        try:
+            """Connections are handed between the threads of a model pool, but only used by one thread at a time"""
+            return sqlite3.connect(self.database_path, check_same_thread=False)
+        except sqlite3.OperationalError:
+            raise ConnectionError(f'No Connection to local Database "{self.database_name}" possible. Check if '
+                                  f'name or location (data\\{self.database_name}.sqlite) is correct.')
+
+
+class MySQLBackend(DatabaseBackend):
+    """Pool of connections to a MySQL server. The cursors are created as prepared cursors, so the server parses
+    every statement only once per connection."""
+    PLACEHOLDER = '%s'
+
+    def __init__(self, config: dict, pool_size: int = DatabaseBackend.POOL_SIZE):
+        """
+        Args:
+            config (dict): Connection parameters of mysql.connector (host, user, password, database)
+            pool_size (int): Maximum number of open connections
+        """
+        super().__init__(config['database'], pool_size)
+        self.config = dict(config)
+
+    def _connect(self):
+        try:
+            return mysql.connector.connect(**self.config)
+        except mysql.connector.Error:
+            raise ConnectionError(f'No Connection to Database "{self.database_name}" possible. Check if VPN is enabled '
+                                  f'or if the name is correct.')
+
+    def _create_cursor(self, connection):
+        return connection.cursor(prepared=True)
+
+    def _check_connection(self, connection):
+        """Reconnects pooled connections which were closed by the server, e.g. after wait_timeout"""
+        try:
+            connection.ping(reconnect=True, attempts=1)
+        except mysql.connector.Error:
+            raise ConnectionError(f'Connection to Database "{self.database_name}" was lost and could not be '
+                                  f'restored. Check if VPN is enabled.')
+        return connection
+
+
+class InMemoryBackend(SQLiteBackend):
+    """In-process stand-in of a database, e.g. to test components or to run models without database file. The given
+    tables are written to a shared in-memory sqlite database, which lives as long as the backend."""
+    _database_numbers = itertools.count()
+
+    def __init__(self, tables: dict, database_name: str = 'in_memory', pool_size: int = DatabaseBackend.POOL_SIZE):
+        """
+        Args:
+            tables (dict): Table names as keys and tuples of the column names and the rows as values
+            database_name (str): Name of the database, used for messages
+            pool_size (int): Maximum number of open connections
+        """
+        super().__init__(f'file:{database_name}_{next(self._database_numbers)}?mode=memory&cache=shared',
+                         database_name, pool_size)
+        self._keeper = self._connect()
+        for table, (field_names, rows) in tables.items():
+            self.check_identifier(table)
+            columns = [self.check_identifier(name) for name in field_names]
+            self._keeper.execute(f'CREATE TABLE {table} ({", ".join(columns)})')
+            self._keeper.executemany(f'INSERT INTO {table} VALUES ({", ".join([self.PLACEHOLDER] * len(columns))})',
+                                     rows)
+        self._keeper.commit()
+
+    def _connect(self):
+        return sqlite3.connect(self.database_path, uri=True, check_same_thread=False)
+
+    def close(self):
+        super().close()
+        self._keeper.close()
+
+
+class DatabaseHandle:
+    """Connection of the pool which is used by one model at a time"""
+
+    def __init__(self, backend: DatabaseBackend, connection):
+        """
+        Args:
+            backend (DatabaseBackend): Backend the connection belongs to
+            connection (Connection): Pooled connection
+        """
+        self.backend = backend
+        self.connection = connection
+
+    def select(self, table: str, conditions: dict = None, columns: tuple = ('*',)) -> tuple:
+        """
+        Selects the rows of the table which match all conditions
+
+        Args:
+            table (str): Name of the table
+            conditions (dict): Column names as keys and the required values as values
+            columns (tuple): Names of the selected columns
+
+        Returns:
+            tuple: Column names and rows
+        """
+        if self.connection is None:
+            raise ConnectionError(f'Handle of database "{self.backend.database_name}" has already been released')
+        conditions = conditions or {}
+        query = ("SELECT " + ", ".join(column if column == '*' else self.backend.check_identifier(column)
+                                       for column in columns) +
+                 " FROM " + self.backend.check_identifier(table))
+        if conditions:
+            query += " WHERE " + ' AND '.join(f'{self.backend.check_identifier(column)}={self.backend.PLACEHOLDER}'
+                                              for column in conditions)
+
+        cursor = self.backend._create_cursor(self.connection)
+        try:
+            cursor.execute(query, tuple(conditions.values()))
+            field_names = [i[0] for i in cursor.description]
+            result = []
+            while True:
+                rows = cursor.fetchmany(self.backend.FETCH_SIZE)
+                if not rows:
+                    break
+                result.extend(rows)
+        finally:
+            cursor.close()
+        return field_names, result
+
+    def release(self):
+        """
+        Gives the connection back to the pool, the handle can not be used afterwards
+
+        """
+        if self.connection is not None:
+            self.backend.release(self.connection)
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+"""Backends of all databases which have been used in this process, shared by all models"""
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_database_backend(database_key: tuple, create_backend=None) -> DatabaseBackend:
+    """
+    Returns the shared backend of the database
+
+    Args:
+        database_key (tuple): Location and name of the database, e.g. ('local', 'dbi_mat')
+        create_backend (callable): Function without arguments, which creates the backend if the database has not been
+                                   used in this process yet
+
+    Returns:
+        DatabaseBackend: Shared backend or None if there is none and no function to create it is given
+    """
+    with _backends_lock:
+        backend = _backends.get(database_key)
+        if backend is None and create_backend is not None:
+            backend = create_backend()
+            _backends[database_key] = backend
+            logging.info(f'Connection pool of database {database_key[1]} created')
+        return backend
+
+
+def set_database_backend(database_key: tuple, backend: DatabaseBackend):
+    """
+    Sets the backend of the database for all further models of this process, e.g. an InMemoryBackend as stand-in
+
+    Args:
+        database_key (tuple): Location and name of the database, e.g. ('local', 'dbi_mat')
+        backend (DatabaseBackend): Backend of the database
+
+    """
+    with _backends_lock:
+        previous_backend = _backends.get(database_key)
+        _backends[database_key] = backend
+    if previous_backend is not None and previous_backend is not backend:
+        previous_backend.close()
+
+
+def close_database_backends():
+    """
+    Closes the idle connections of all backends and removes them
+
+    """
+    with _backends_lock:
+        backends = list(_backends.values())
+        _backends.clear()
+    for backend in backends:
+        backend.close()
@@ -0,0 +1,263 @@
+import os
+import json
+import pickle
+import hashlib
+import logging
+import threading
+
+
+class DatabaseSnapshot:
+    """In-memory copy of the component tables of the database, which are read once with a single SELECT per table.
+
+    Note:
+        The rows of every table are indexed by (CLASS, TECHNOLOGY), so a component gets its rows by one dictionary
+        lookup instead of a query. JSON encoded columns (loads and efficiencies) are decoded once when the snapshot is
+        created. Rows and decoded series are stored as tuples, so the snapshot is read-only and can be shared by all
+        models of a process, e.g. the points of a parameter sweep.
+        The snapshot also holds the validated efficiencies, which are created by the first component of a class,
+        technology and size bucket and are shared by all further components of the process (see
+        GenericUnit._set_efficiencies_from_database).
+        A snapshot of a local database can be saved as binary cache next to the sqlite file together with the parsed
+        stream types. The cache contains the SHA-256 hash of the sqlite file and is only used as long as the hash
+        matches, the hash is only recalculated if size or modification time of the file have changed.
+    """
+    TABLES = ('TECHNOLOGY', 'INVESTMENT', 'EFFICIENCY')
+    JSON_COLUMNS = {'EFFICIENCY': ('LOAD', 'EFFICIENCY')}
+    CACHE_VERSION = 2  # has to be increased if the content of the snapshot changes
+    CACHE_SUFFIX = '.cache'
+
+    def __init__(self, field_names: dict, rows: dict, stream_types: dict = None):
+        """
+        Args:
+            field_names (dict): Table names as keys and tuples of the column names as values
+            rows (dict): Table names as keys and dictionaries with (CLASS, TECHNOLOGY) as keys and tuples of rows as
+                         values
+            stream_types (dict): Parsed stream types of the database (see ModelSettings.stream_types), None if the
+                                 stream types are not part of the snapshot
+        """
+        self.field_names = field_names
+        self.rows = rows
+        self.stream_types = stream_types
+        self.file_signature = None  # size and modification time of the sqlite file of the snapshot
+        self.file_hash = None  # SHA-256 hash of the sqlite file of the snapshot
+        self.efficiency_curves = {}  # (CLASS, TECHNOLOGY, size bucket) as keys and tuples of Efficiency as values
+
+    def __getstate__(self) -> dict:
+        """The efficiencies contain interpolation functions and are created again after loading the cache"""
+        state = self.__dict__.copy()
+        state['efficiency_curves'] = {}
+        return state
+
+    @classmethod
+    def from_database(cls, database_handle: object, tables: tuple = TABLES, stream_types: dict = None):
+        """
+        Reads the tables of the database into a snapshot
+
+        Args:
+            database_handle (DatabaseHandle): Pooled handle of the database
+            tables (tuple): Names of the tables, which contain the columns CLASS and TECHNOLOGY
+            stream_types (dict): Parsed stream types of the database
+
+        Returns:
+            DatabaseSnapshot: Snapshot of the tables
+        """
+        field_names = {}
+        rows = {}
+        for table in tables:
+            names, result = database_handle.select(table)
+            names = tuple(names)
+            class_index = names.index('CLASS')
+            technology_index = names.index('TECHNOLOGY')
+            json_indices = [names.index(column) for column in cls.JSON_COLUMNS.get(table, ()) if column in names]
+
+            table_rows = {}
+            for single_result in result:
+                single_result = list(single_result)
+                for index in json_indices:
+                    single_result[index] = cls._decode_series(single_result[index])
+                key = (str(single_result[class_index]).upper(), str(single_result[technology_index]))
+                table_rows.setdefault(key, []).append(tuple(single_result))
+            field_names[table] = names
+            rows[table] = {key: tuple(value) for key, value in table_rows.items()}
+        return cls(field_names, rows, stream_types)
+
+    @classmethod
+    def get_cache_path(cls, database_path: str) -> str:
+        return database_path + cls.CACHE_SUFFIX
+
+    def save(self, database_path: str):
+        """
+        Saves the snapshot as binary cache of the sqlite file. The file is written to a temporary file first, so
+        models of other processes never read an incomplete cache.
+
+        Args:
+            database_path (str): Path of the sqlite file of the snapshot
+
+        """
+        self.file_signature = get_file_signature(database_path)
+        self.file_hash = get_file_hash(database_path)
+        cache_path = self.get_cache_path(database_path)
+        temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as file:
+            pickle.dump((self.CACHE_VERSION, self), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+
+    @classmethod
+    def load(cls, database_path: str):
+        """
+        Loads the binary cache of the sqlite file
+
+        Args:
+            database_path (str): Path of the sqlite file
+
+        Returns:
+            DatabaseSnapshot: Snapshot of the cache or None if there is no cache or the cache does not belong to the
+                              actual content of the sqlite file
+        """
+        cache_path = cls.get_cache_path(database_path)
+        if not os.path.isfile(cache_path):
+            return None
+        try:
+            with open(cache_path, 'rb') as file:
+                version, snapshot = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError) as error:
+            logging.warning(f'Cache {cache_path} of the database could not be read: {error}')
+            return None
+        if version != cls.CACHE_VERSION or not snapshot.is_valid_for(database_path):
+            return None
+        return snapshot
+
+    def is_valid_for(self, database_path: str) -> bool:
+        """
+        Args:
+            database_path (str): Path of the sqlite file
+
+        Returns:
+            bool: True if the snapshot belongs to the actual content of the sqlite file
+        """
+        signature = get_file_signature(database_path)
+        if signature == self.file_signature:
+            return True
+        if self.file_hash is not None and get_file_hash(database_path) == self.file_hash:
+            self.file_signature = signature
+            return True
+        return False
+
+    @staticmethod
+    def _decode_series(value):
+        """
+        Returns:
+            tuple: Decoded JSON series or the original value if it is no valid JSON list
+        """
+        try:
+            series = json.loads(value)
+        except (TypeError, ValueError):
+            return value
+        return tuple(series) if isinstance(series, list) else value
+
+    def select(self, table: str, class_name: str, technology: str) -> tuple:
+        """
+        Args:
+            table (str): Name of the table
+            class_name (str): Name of the component class in upper case
+            technology (str): Name of the technology
+
+        Returns:
+            tuple: Column names and rows of the class and technology, the rows are empty if there is no entry
+        """
+        if table not in self.rows:
+            raise KeyError(f'Table {table} is not part of the database snapshot')
+        return list(self.field_names[table]), list(self.rows[table].get((class_name, technology), ()))
+
+
+def get_file_signature(path: str) -> tuple:
+    """
+    Returns:
+        tuple: Size and modification time of the file in ns
+    """
+    status = os.stat(path)
+    return status.st_size, status.st_mtime_ns
+
+
+def get_file_hash(path: str) -> str:
+    """
+    Returns:
+        str: SHA-256 hash of the content of the file
+    """
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+"""Snapshots of all databases which have been loaded in this process, shared by all models"""
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_database_snapshot(database_key: tuple, database_handle: object) -> DatabaseSnapshot:
+    """
+    Returns the shared snapshot of the database, it is read with the given handle if the database has not been loaded
+    in this process yet
+
+    Args:
+        database_key (tuple): Location and name of the database, e.g. ('local', 'dbi_mat')
+        database_handle (DatabaseHandle): Pooled handle of the database
+
+    Returns:
+        DatabaseSnapshot: Shared snapshot of the database
+    """
+    with _snapshots_lock:
+        snapshot = _snapshots.get(database_key)
+        if snapshot is None:
+            snapshot = DatabaseSnapshot.from_database(database_handle)
+            _snapshots[database_key] = snapshot
+            logging.info(f'Database snapshot of {database_key[1]} created')
+        return snapshot
+
+
+def get_cached_database_snapshot(database_key: tuple, database_path: str) -> DatabaseSnapshot:
+    """
+    Returns the shared snapshot of a local database if it belongs to the actual content of the sqlite file. If it has
+    not been loaded in this process yet, it is loaded from the binary cache of the sqlite file.
+
+    Args:
+        database_key (tuple): Location and name of the database, e.g. ('local', 'dbi_mat')
+        database_path (str): Path of the sqlite file
+
+    Returns:
+        DatabaseSnapshot: Shared snapshot of the database or None if the cache has to be rebuilt
+    """
+    with _snapshots_lock:
+        snapshot = _snapshots.get(database_key)
+        if snapshot is not None and snapshot.is_valid_for(database_path):
+            return snapshot
+        snapshot = DatabaseSnapshot.load(database_path)
+        if snapshot is None:
+            _snapshots.pop(database_key, None)
+        else:
+            _snapshots[database_key] = snapshot
+        return snapshot
+
+
+def set_database_snapshot(database_key: tuple, snapshot: DatabaseSnapshot):
+    """
+    Shares the snapshot with all further models of this process
+
+    Args:
+        database_key (tuple): Location and name of the database, e.g. ('local', 'dbi_mat')
+        snapshot (DatabaseSnapshot): Snapshot of the database
+
+    """
+    with _snapshots_lock:
+        _snapshots[database_key] = snapshot
+
+
+def clear_database_snapshots():
+    """
+    Removes all shared snapshots, e.g. after the database has been changed
+
+    """
+    with _snapshots_lock:
+        _snapshots.clear()
@@ -0,0 +1,132 @@
+import logging
+import threading
+from collections import OrderedDict
+from CoolProp import AbstractState
+import CoolProp.CoolProp as CoolProp
+
+
+class FluidStatePool:
+    """Pool of REFPROP AbstractStates which are shared by all ports and components with the same fluid composition.
+
+    Note:
+        Constructing an AbstractState is expensive and every state holds native memory, so ports and components borrow
+        their states from the pool instead of owning them. The compositions of the keys are quantized by the mass
+        fraction tolerance of the property service, so compositions which only differ by rounding errors share one
+        state, and every thread keeps at most max_size states, the least recently used state is removed from the pool
+        first. The states are handed out per thread, so models which are run on threads never share a state object.
+        This does not make REFPROP itself thread-safe: the REFPROP library keeps a global fluid setup, so calculations
+        with REFPROP states must not run in parallel on threads, e.g. parallel sweeps have to use processes.
+
+        There are two kinds of states:
+            working states (no temperature and pressure given): every borrower has to set the state by update() before
+            reading state dependent properties, which is done by the property service.
+            fixed states (temperature and pressure given, e.g. norm conditions): the state is set once by the pool
+            and must not be updated by the borrowers.
+    """
+
+    def __init__(self, backend: str = 'REFPROP', max_size: int = 1000, mass_fraction_tolerance: float = 1e-9):
+        """
+        Args:
+            backend (str): CoolProp backend of the states
+            max_size (int): Maximum number of states per thread
+            mass_fraction_tolerance (float): Mass fractions within this tolerance share one state, equal to the
+                                             tolerance of the property service
+        """
+        self.backend = backend
+        self.max_size = max_size
+        self.mass_fraction_tolerance = mass_fraction_tolerance
+        self._local = threading.local()
+
+    def _get_states(self) -> dict:
+        """
+
+        Returns:
+            dict: States of the current thread
+        """
+        states = getattr(self._local, 'states', None)
+        if states is None:
+            states = OrderedDict()
+            self._local.states = states
+        return states
+
+    def get_state(self, mass_fraction: dict, temperature: float = None, pressure: float = None):
+        """
+        Borrows the state of a fluid composition from the pool. The state is created if it is not in the pool yet
+
+        Args:
+            mass_fraction (dict): Dictionary of the molecule types as keys and their mass_fractions as values
+            temperature (float): Temperature of a fixed state in K
+            pressure (float): Pressure of a fixed state in Pa
+
+        Returns:
+            AbstractState: State of the fluid composition
+        """
+        if not mass_fraction:
+            logging.warning('No mass fraction given for Fluid')
+        components_string = '&'.join(species.name for species in mass_fraction.keys())
+        fraction_key = tuple(round(fraction / self.mass_fraction_tolerance) for fraction in mass_fraction.values())
+        if temperature is None or pressure is None:
+            temperature = pressure = None
+        key = (components_string, fraction_key, temperature, pressure)
+
+        states = self._get_states()
+        state = states.get(key)
+        if state is None:
+            state = AbstractState(self.backend, components_string)
+            """The state gets the quantized composition, so it does not depend on the borrower which created it"""
+            state.set_mass_fractions([fraction * self.mass_fraction_tolerance for fraction in fraction_key])
+            if temperature is not None:
+                state.update(CoolProp.PT_INPUTS, pressure, temperature)
+            self._add_state(states, key, state)
+        else:
+            states.move_to_end(key)
+        return state
+
+    def get_state_by_string(self, fluid_string: str):
+        """
+        Borrows the working state of a REFPROP fluid string, e.g. "HYDROGEN" or "METHANE&ETHANE", from the pool
+
+        Args:
+            fluid_string (str): REFPROP fluid as string
+
+        Returns:
+            AbstractState: State of the fluid
+        """
+        key = (fluid_string, None, None, None)
+        states = self._get_states()
+        state = states.get(key)
+        if state is None:
+            state = AbstractState(self.backend, fluid_string)
+            self._add_state(states, key, state)
+        else:
+            states.move_to_end(key)
+        return state
+
+    def _add_state(self, states: OrderedDict, key: tuple, state):
+        """
+        Adds the state to the states of the current thread and removes the least recently used state if the pool is
+        full. Removed states stay valid for the ports which still reference them.
+
+        """
+        states[key] = state
+        if len(states) > self.max_size:
+            states.popitem(last=False)
+
+    def get_number_of_states(self) -> int:
+        """
+
+        Returns:
+            int: Number of states of the current thread
+        """
+        return len(self._get_states())
+
+    def clear(self):
+        """
+        Releases all states of the current thread. States which are still referenced by ports stay valid.
+
+        """
+        self._get_states().clear()
+
+
+"""Pool of REFPROP states which is shared by all ports and components"""
+fluid_state_pool = FluidStatePool()
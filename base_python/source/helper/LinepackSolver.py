@@ -0,0 +1,168 @@
+import logging
+import numpy as np
+from scipy.linalg import solve_banded
+
+
+class LinepackSolver:
+    """Transient model of a pipeline which acts as storage (linepack).
+
+    Note:
+        The pipeline is divided into cells. The unknowns are the pressures of the cells and the massflows between
+        neighbouring cells, the massflows at the inlet and outlet of the pipeline are given. Every timestep is solved
+        implicitly (backward Euler), so hourly timesteps stay stable for long pipelines:
+            cell i:     V_i * (rho_i - rho_i_old) / dt = m_(i-1/2) - m_(i+1/2)
+            face i+1/2: p_i - p_(i+1) = R_i * m_(i+1/2) + rho * g * (z_(i+1) - z_i)
+        The friction resistance R_i is linearised at the last iterate (Picard iteration) with the friction correlation of
+        the pipeline and the density change is written as secant compressibility times pressure change, so the mass
+        balance holds exactly at convergence. If the unknowns are ordered p_0, m_1/2, p_1, m_3/2, ... the linear
+        system of every iteration is tridiagonal and solved as banded system.
+        The temperature is constant (isothermal at the inlet temperature).
+    """
+    MAX_ITERATIONS = 20
+    MIN_FLOW = 1e-6  # [kg/s] massflows below this value are treated as this value in the friction correlation
+    MIN_PRESSURE = 1e3  # [Pa] lower limit of the cell pressures if the linepack is depleted
+    GRAVITY = 9.81
+
+    def __init__(self, pipeline, lengths, altitudes, pressure_tolerance_in_Pa: float = 2.0):
+        """
+        Args:
+            pipeline (Pipeline_Segment or Pipeline): Pipeline which provides the geometry, the fluid properties and the
+                                                     friction correlation
+            lengths (np.ndarray): Length of every cell in [m]
+            altitudes (np.ndarray): Altitude of the centre of every cell in [m ü. NN.]
+            pressure_tolerance_in_Pa (float): Accepted change of the cell pressures between two iterations in [Pa]
+        """
+        self.pipeline = pipeline
+        self.lengths = np.asarray(lengths, dtype=float)
+        self.altitudes = np.asarray(altitudes, dtype=float)
+        self.volumes = self.lengths * pipeline.area  # [m³]
+        self.face_lengths = 0.5 * (self.lengths[:-1] + self.lengths[1:])  # distance of the cell centres [m]
+        self.altitude_differences = np.diff(self.altitudes)  # [m]
+        self.pressure_tolerance = pressure_tolerance_in_Pa
+
+        self.temperature = None  # [°C]
+        self.runcount = None
+        self.old_pressures = None
+        self.old_densities = None
+        self.pressures = None  # [Pa] pressures of the cells
+        self.flows = None  # [kg/s] massflows between the cells
+        self.linepack = 0  # [kg]
+        self.iterations = 0  # number of iterations of the last timestep
+
+    def initialize(self, pressure: float, temperature: float):
+        """
+        Sets a uniform pressure without flow as state before the first timestep
+
+        Args:
+            pressure (float): Pressure of all cells in [Pa]
+            temperature (float): Temperature of the gas in [°C]
+
+        """
+        self.temperature = temperature
+        self.pressures = np.full(self.lengths.size, float(pressure))
+        self.flows = np.zeros(self.lengths.size - 1)
+        self.old_pressures = self.pressures.copy()
+        self.old_densities = self._calc_densities(self.old_pressures)
+        self.linepack = float(self.volumes @ self.old_densities)
+        self.runcount = 0
+
+    def solve_timestep(self, runcount: int, inlet_flow: float, outlet_flow: float, time_step: float) -> float:
+        """
+        Solves a timestep starting from the state of the previous timestep. The timestep can be solved several times,
+        e.g. if the branch solver calls the pipeline more than once per timestep, the state of the previous timestep is
+        only replaced if the runcount changes.
+
+        Args:
+            runcount (int): Actual timestep
+            inlet_flow (float): Massflow into the pipeline in [kg/s]
+            outlet_flow (float): Massflow out of the pipeline in [kg/s]
+            time_step (float): Duration of the timestep in [s]
+
+        Returns:
+            float: Linepack at the end of the timestep in [kg]
+        """
+        if runcount != self.runcount:
+            self.runcount = runcount
+            self.old_pressures = self.pressures.copy()
+            self.old_densities = self._calc_densities(self.old_pressures)
+
+        pressures = self.pressures.copy()
+        flows = self.flows.copy()
+        for self.iterations in range(1, self.MAX_ITERATIONS + 1):
+            densities = self._calc_densities(pressures)
+            new_pressures, flows = self._solve_linear_system(pressures, densities, flows, inlet_flow, outlet_flow,
+                                                             time_step)
+            if np.any(new_pressures < self.MIN_PRESSURE):
+                logging.critical(f'Linepack of pipeline {self.pipeline.component_id} is depleted in timestep '
+                                 f'{runcount}!')
+                new_pressures = np.maximum(new_pressures, self.MIN_PRESSURE)
+            change = np.abs(new_pressures - pressures).max()
+            pressures = new_pressures
+            if change < self.pressure_tolerance:
+                break
+        else:
+            logging.warning(f'Linepack of pipeline {self.pipeline.component_id} did not converge in timestep '
+                            f'{runcount}!')
+
+        self.pressures = pressures
+        self.flows = flows
+        self.linepack = float(self.volumes @ self._calc_densities(pressures))
+        return self.linepack
+
+    def _calc_densities(self, pressures: np.ndarray) -> np.ndarray:
+        return np.array([1 / self.pipeline._REFPROP_calc_specific_volume(temperature=self.temperature,
+                                                                          pressure=pressure)
+                         for pressure in pressures])
+
+    def _calc_resistances(self, pressures: np.ndarray, densities: np.ndarray, flows: np.ndarray) -> np.ndarray:
+        """
+        Linearised friction resistance of every face, R = lambda * L * |m| / (2 * D * rho * A²)
+
+        Returns:
+            np.ndarray: Resistances in [Pa*s/kg]
+        """
+        absolute_flows = np.maximum(np.abs(flows), self.MIN_FLOW)
+        viscosities = np.array([self.pipeline._REFPROP_calc_viscosity(mean_pressure=mean_pressure,
+                                                                       mean_temperature=self.temperature)
+                                for mean_pressure in 0.5 * (pressures[:-1] + pressures[1:])])
+        reynolds_numbers = self.pipeline._calc_reynolds_number(m_dot=absolute_flows, viscosity=viscosities)
+        flc, friction_loss_coefficients = self.pipeline._calc_friction_loss_coefficient(
+            reynolds_number=reynolds_numbers)
+        face_densities = 0.5 * (densities[:-1] + densities[1:])
+        return friction_loss_coefficients * self.face_lengths * absolute_flows / (
+                2 * self.pipeline.inner_diameter * face_densities * self.pipeline.area ** 2)
+
+    def _solve_linear_system(self, pressures, densities, flows, inlet_flow, outlet_flow, time_step) -> tuple:
+        """
+        Assembles and solves the tridiagonal system of one iteration. Rows and columns are ordered
+        p_0, m_1/2, p_1, m_3/2, ..., p_(N-1).
+
+        Returns:
+            tuple: Pressures of the cells [Pa] and massflows between the cells [kg/s]
+        """
+        pressure_change = pressures - self.old_pressures
+        changed = np.abs(pressure_change) > self.pressure_tolerance
+        """Secant compressibility d(rho)/dp, at unchanged pressure the ideal gas value rho/p"""
+        compressibilities = np.where(changed, (densities - self.old_densities) / np.where(changed, pressure_change, 1),
+                                     densities / pressures)
+        capacities = self.volumes * compressibilities / time_step  # [kg/(s*Pa)]
+        resistances = self._calc_resistances(pressures, densities, flows)
+        hydrostatic = 0.5 * (densities[:-1] + densities[1:]) * self.GRAVITY * self.altitude_differences
+
+        size = 2 * self.lengths.size - 1
+        banded_matrix = np.zeros((3, size))  # upper diagonal, diagonal, lower diagonal
+        banded_matrix[1, 0::2] = capacities
+        banded_matrix[1, 1::2] = -resistances
+        banded_matrix[0, 1::2] = 1  # outflow of cell i through face i+1/2
+        banded_matrix[0, 2::2] = -1  # pressure of cell i+1 in the momentum equation of face i+1/2
+        banded_matrix[2, 1::2] = -1  # inflow of cell i+1 through face i+1/2
+        banded_matrix[2, 0:-1:2] = 1  # pressure of cell i in the momentum equation of face i+1/2
+
+        right_hand_side = np.zeros(size)
+        right_hand_side[0::2] = capacities * self.old_pressures
+        right_hand_side[0] += inlet_flow
+        right_hand_side[-1] -= outlet_flow
+        right_hand_side[1::2] = hydrostatic
+
+        solution = solve_banded((1, 1), banded_matrix, right_hand_side)
+        return solution[0::2], solution[1::2]
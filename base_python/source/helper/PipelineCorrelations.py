@@ -0,0 +1,371 @@
+import os
+import logging
+import numpy as np
+
+"""
+Friction and heat transfer correlations of pipelines, which are shared by Pipeline, Pipeline_Segment and the solvers
+which calculate many segments at once (PipelineNetwork, LinepackSolver). All functions accept floats or NumPy arrays
+and return floats for float inputs and arrays for array inputs.
+"""
+
+LAMINAR_BOUNDARY = 2320
+TRANSITION_BOUNDARY = 10 ** 5
+TURBULENT_BOUNDARY = 10 ** 6
+SMOOTH_BOUNDARY = 65  # Re * k / d below this value: hydraulically smooth pipe
+ROUGH_BOUNDARY = 1300  # Re * k / d above this value: hydraulically rough pipe
+ITERATION_TOLERANCE = 0.0001
+MAX_ITERATIONS = 100
+# Regimes of the friction loss coefficient (see get_friction_regimes)
+LAMINAR, BLASIUS, NIKURADSE, PRANDTL, TRANSITION, ROUGH = range(6)
+
+
+def _to_output(value: np.ndarray, scalar: bool):
+    return float(value) if scalar else value
+
+
+def calc_friction_loss_coefficient(reynolds_number, roughness_in_mm, inner_diameter) -> tuple:
+    """Calculates the friction factor based on the reynolds number and the roughness of the pipeline. Depending on the
+    roughness of the inner surface the pipe is "hydraulically smooth", "hydraulically rough" or "transitioning between
+    hydraulically smooth and hydraulically rough", for every classification a different empirical formula is used.
+    The implicit formulas (Prandtl for smooth turbulent flow, Colebrook for the transition) are solved by a fixed point
+    iteration over all elements at once.
+
+    Args:
+        reynolds_number (float or np.ndarray): Reynolds number of the flow [-]
+        roughness_in_mm (float or np.ndarray): Roughness of the inner surface of the pipeline in [mm]
+        inner_diameter (float or np.ndarray): Inner diameter of the pipeline in [m]
+
+    Returns:
+        tuple: flc = 1/(friction loss coefficient)² [-] and the friction loss coefficient [-]
+    """
+    scalar = np.ndim(reynolds_number) == 0 and np.ndim(roughness_in_mm) == 0 and np.ndim(inner_diameter) == 0
+    reynolds_number, roughness_in_mm, inner_diameter = np.broadcast_arrays(
+        np.asarray(reynolds_number, dtype=float), np.asarray(roughness_in_mm, dtype=float),
+        np.asarray(inner_diameter, dtype=float))
+    relative_roughness = roughness_in_mm / (1000 * inner_diameter)
+
+    regimes = get_friction_regimes(reynolds_number, relative_roughness)
+    laminar = regimes == LAMINAR
+    blasius = regimes == BLASIUS
+    nikuradse = regimes == NIKURADSE
+    prandtl = regimes == PRANDTL
+    transition = regimes == TRANSITION
+    rough = regimes == ROUGH
+
+    friction_loss_coefficient = np.empty(reynolds_number.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        friction_loss_coefficient[laminar] = 64 / reynolds_number[laminar]
+        friction_loss_coefficient[blasius] = 0.3164 * reynolds_number[blasius] ** -0.25
+        friction_loss_coefficient[nikuradse] = 0.0032 + 0.221 * reynolds_number[nikuradse] ** -0.237
+        friction_loss_coefficient[rough] = (1 / (-2 * np.log10(relative_roughness[rough] / 3.7065))) ** 2
+
+    """Turbulent flow in hydraulically smooth pipes (Prandtl)"""
+    friction_loss_coefficient[prandtl] = _solve_fixed_point(
+        lambda flc: (1 / (2 * np.log10(reynolds_number[prandtl] * np.sqrt(flc)) - 0.8)) ** 2,
+        np.full(np.count_nonzero(prandtl), 10.0))
+    """Transition between hydraulically smooth and rough pipes (Colebrook)"""
+    friction_loss_coefficient[transition] = _solve_fixed_point(
+        lambda flc: (1 / (-2 * np.log10(2.5226 / (reynolds_number[transition] * np.sqrt(flc))
+                                        + relative_roughness[transition] / 3.7065))) ** 2,
+        np.ones(np.count_nonzero(transition)))
+
+    flc = (friction_loss_coefficient ** 2) ** -1
+    return _to_output(flc, scalar), _to_output(friction_loss_coefficient, scalar)
+
+
+def get_friction_regimes(reynolds_number: np.ndarray, relative_roughness: np.ndarray) -> np.ndarray:
+    """
+    Classifies the flow into the regimes of calc_friction_loss_coefficient, every regime uses its own correlation and
+    the friction loss coefficient jumps at the boundaries between the regimes
+
+    Args:
+        reynolds_number (np.ndarray): Reynolds number of the flow [-]
+        relative_roughness (np.ndarray): Roughness divided by the inner diameter k/d [-]
+
+    Returns:
+        np.ndarray: Regime of every element (LAMINAR, BLASIUS, NIKURADSE, PRANDTL, TRANSITION or ROUGH)
+    """
+    roughness_reynolds = reynolds_number * relative_roughness
+    smooth = roughness_reynolds < SMOOTH_BOUNDARY
+    return np.select([smooth & (reynolds_number <= LAMINAR_BOUNDARY),
+                      smooth & (reynolds_number <= TRANSITION_BOUNDARY),
+                      smooth & (reynolds_number <= TURBULENT_BOUNDARY),
+                      smooth,
+                      roughness_reynolds > ROUGH_BOUNDARY],
+                     [LAMINAR, BLASIUS, NIKURADSE, PRANDTL, ROUGH], default=TRANSITION)
+
+
+def _solve_fixed_point(function, initial_value: np.ndarray) -> np.ndarray:
+    """
+    Fixed point iteration of an implicit friction formula for all elements at once, until all elements converged
+
+    Args:
+        function: Right hand side of the formula, which gets the actual iterate of all elements
+        initial_value (np.ndarray): Initial value of all elements
+
+    Returns:
+        np.ndarray: Friction loss coefficients
+    """
+    value = initial_value
+    if not value.size:
+        return value
+    active = np.ones(value.size, dtype=bool)
+    for _ in range(MAX_ITERATIONS):
+        new_value = function(value)
+        active = np.abs(new_value - value) > ITERATION_TOLERANCE
+        value = new_value
+        if not active.any():
+            break
+    else:
+        logging.warning(f'Friction loss coefficient did not converge for {np.count_nonzero(active)} elements')
+    return value
+
+
+def calc_KE(flc):
+    """Calculates the K_E value which is a dimensionless factor to correct the average flow speed of a fluid within a
+    pipeline based on its profile.
+
+    Args:
+        flc (float or np.ndarray): flc = 1/(friction_loss_coefficient)² [-]
+
+    Returns:
+        float or np.ndarray: K_E [-]
+    """
+    return 0.25 * ((((1 / flc) + 2) ** 3) * (((1 / flc) + 1) ** 3)) / (((3 / flc) + 1) * ((3 / flc) + 2))
+
+
+def calc_kinetic_energy_correction(reynolds_number, flc):
+    """Correction of the kinetic energy of the flow for its velocity profile. A laminar flow has a parabolic profile
+    with K_E = 2, for turbulent flow K_E depends on the friction.
+
+    Args:
+        reynolds_number (float or np.ndarray): Reynolds number of the flow [-]
+        flc (float or np.ndarray): flc = 1/(friction_loss_coefficient²) [-]
+
+    Returns:
+        float or np.ndarray: K_E [-]
+    """
+    scalar = np.ndim(reynolds_number) == 0 and np.ndim(flc) == 0
+    KE = calc_KE(np.asarray(flc, dtype=float))
+    return _to_output(np.where(np.asarray(reynolds_number) <= LAMINAR_BOUNDARY, 2, KE), scalar)
+
+
+def calc_nusselt_number(reynolds_number, prandtl_number, segment_length, inner_diameter):
+    """Calculates the nusselt number based on the length of the pipeline segment, reynolds number and prandtl number
+
+    Args:
+        reynolds_number (float or np.ndarray): Reynolds number of the flow [-]
+        prandtl_number (float or np.ndarray): Prandtl number of the fluid [-]
+        segment_length (float or np.ndarray): Length of the pipeline segment in [m]
+        inner_diameter (float or np.ndarray): Inner diameter of the pipeline in [m]
+
+    Returns:
+        float or np.ndarray: Nusselt number [-]
+    """
+    scalar = all(np.ndim(value) == 0 for value in (reynolds_number, prandtl_number, segment_length, inner_diameter))
+    reynolds_number, prandtl_number, segment_length, inner_diameter = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (reynolds_number, prandtl_number, segment_length,
+                                                        inner_diameter)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _beta = reynolds_number * prandtl_number * segment_length * inner_diameter
+        """Laminar flow at constant wall temperature, developing or fully developed"""
+        _nu = 49.371 + (1.615 * _beta ** (1 / 3) - 0.7) ** 3
+        laminar = np.where(inner_diameter * 100 <= segment_length,
+                           (_nu + (2 / (1 + 22 * prandtl_number)) * _beta ** 3) ** (1 / 3),
+                           _nu ** (1 / 3))
+        """Turbulent flow (Gnielinski), independent of constant wall temperature or constant heat flux density"""
+        _zeta = (1.82 * np.log10(reynolds_number) - 1.62) ** -2
+        numerator = (_zeta / 8) * (reynolds_number - 1000) * prandtl_number
+        denumerator = 1 + 12.7 * (_zeta / 8) ** 0.5 * (prandtl_number ** (2 / 3) - 1)
+        term = (1 + (inner_diameter / segment_length) ** (2 / 3))
+        turbulent = term * (numerator / denumerator)
+    return _to_output(np.where(reynolds_number <= LAMINAR_BOUNDARY, laminar, turbulent), scalar)
+
+
+def calc_heat_transfer_coefficient(nusselt_number, thermal_conductivity, inner_diameter):
+    """Calculates the heat transfer coefficient of the fluid within a pipeline
+
+    Args:
+        nusselt_number (float or np.ndarray): Nusselt number of the flow [-]
+        thermal_conductivity (float or np.ndarray): Thermal conductivity of the fluid [W/(m*K)]
+        inner_diameter (float or np.ndarray): Inner diameter of the pipeline in [m]
+
+    Returns:
+        float or np.ndarray: Heat transfer coefficient alpha [W/(m²*K)]
+    """
+    return nusselt_number * thermal_conductivity / inner_diameter
+
+
+def calc_specific_heat_flux_buried(length, nusselt_number, fluid_conductivity, inner_diameter, outer_diameter,
+                                   insulation_diameter, imaginary_diameter, lambda_pipeline, lambda_insulation,
+                                   lambda_soil):
+    """Heat flux per Kelvin between the fluid and the environment of a buried or above ground pipeline
+
+    Args:
+        length (float or np.ndarray): Length of the pipeline segment [m]
+        nusselt_number (float or np.ndarray): Nusselt number of the flow [-]
+        fluid_conductivity (float or np.ndarray): Conductivity of the fluid [W/(m*K)]
+        inner_diameter (float): Inner diameter of the pipeline [m]
+        outer_diameter (float): Outer diameter of the pipeline [m]
+        insulation_diameter (float): Outer diameter of the insulation [m], equal to outer_diameter without insulation
+        imaginary_diameter (float): Diameter of the surrounding soil [m], equal to insulation_diameter above ground
+        lambda_pipeline (float or np.ndarray): Heat conductivity of the pipeline material [W/(m*K)]
+        lambda_insulation (float or np.ndarray): Heat conductivity of the insulation [W/(m*K)]
+        lambda_soil (float or np.ndarray): Heat conductivity of the soil [W/(m*K)]
+
+    Returns:
+        float or np.ndarray: Specific heat flux [W/K]
+    """
+    numerator = length * np.pi
+    ht_fluid2inner_surface = 1 / calc_heat_transfer_coefficient(nusselt_number, fluid_conductivity, inner_diameter)
+    hc_pipeline = (1 / 2 * lambda_pipeline) * np.log10(outer_diameter / inner_diameter)
+    if insulation_diameter != outer_diameter:  # Pipeline has an insulation
+        hc_insulation = (1 / 2 * lambda_insulation) * np.log10(insulation_diameter / outer_diameter)
+    else:  # Non-insulated Pipeline
+        hc_insulation = 0
+    if imaginary_diameter != insulation_diameter:  # Pipeline is buried
+        hc_soil = (1 / 2 * lambda_soil) * np.log10(imaginary_diameter / insulation_diameter)
+    else:  # Pipeline is above the ground
+        hc_soil = 0
+    denominator = ht_fluid2inner_surface + 0.6 * hc_pipeline + hc_insulation + hc_soil
+    return numerator / denominator
+
+
+class FrictionFactorTable:
+    """Precomputed friction loss coefficients over the reynolds number and the relative roughness.
+
+    Note:
+        The table is evaluated by bilinear interpolation in log10(Re) and log10(k/d), which replaces the fixed point
+        iteration of calc_friction_loss_coefficient by a few array operations. The correlations are smooth within
+        their regime, but the friction loss coefficient jumps at the boundaries between the regimes (laminar/turbulent
+        at Re = 2320, the limits of the hydraulically smooth and rough pipe at Re * k/d = 65 and 1300 and the limits
+        of the smooth correlations at Re = 1e5 and 1e6). An interpolation across such a jump would smooth it, so
+        values in grid cells whose corners belong to different regimes are calculated with the exact correlation.
+        Values outside of the grid are clipped to the grid.
+    """
+
+    def __init__(self, log_reynolds_numbers: np.ndarray, log_relative_roughnesses: np.ndarray,
+                 friction_loss_coefficients: np.ndarray):
+        """
+        Args:
+            log_reynolds_numbers (np.ndarray): log10 of the reynolds numbers of the grid
+            log_relative_roughnesses (np.ndarray): log10 of the relative roughnesses k/d of the grid
+            friction_loss_coefficients (np.ndarray): Friction loss coefficients, shape (reynolds, roughness)
+        """
+        self.log_reynolds_numbers = log_reynolds_numbers
+        self.log_relative_roughnesses = log_relative_roughnesses
+        self.friction_loss_coefficients = friction_loss_coefficients
+        reynolds_numbers, relative_roughnesses = np.meshgrid(10 ** log_reynolds_numbers,
+                                                             10 ** log_relative_roughnesses, indexing='ij')
+        self.regimes = get_friction_regimes(reynolds_numbers, relative_roughnesses)
+
+    @classmethod
+    def build(cls, reynolds_range: tuple = (1e2, 1e9), relative_roughness_range: tuple = (1e-8, 1e-1),
+              points_per_decade: int = 50):
+        """
+        Calculates the table with calc_friction_loss_coefficient
+
+        Args:
+            reynolds_range (tuple): Minimum and maximum reynolds number
+            relative_roughness_range (tuple): Minimum and maximum relative roughness k/d
+            points_per_decade (int): Number of grid points per decade of both axes
+
+        Returns:
+            FrictionFactorTable: The calculated table
+        """
+        log_reynolds_numbers = _log_grid(reynolds_range, points_per_decade)
+        log_relative_roughnesses = _log_grid(relative_roughness_range, points_per_decade)
+        reynolds_numbers, relative_roughnesses = np.meshgrid(10 ** log_reynolds_numbers,
+                                                             10 ** log_relative_roughnesses, indexing='ij')
+        """The roughness is passed in mm with an inner diameter of 1 m, so k/d equals the relative roughness"""
+        flc, friction_loss_coefficients = calc_friction_loss_coefficient(reynolds_numbers,
+                                                                         relative_roughnesses * 1000, 1.0)
+        return cls(log_reynolds_numbers, log_relative_roughnesses, friction_loss_coefficients)
+
+    @classmethod
+    def load(cls, file_path: str):
+        """
+        Args:
+            file_path (str): Path of the .npz file
+
+        Returns:
+            FrictionFactorTable: The loaded table
+        """
+        with np.load(file_path) as data:
+            return cls(data['log_reynolds_numbers'], data['log_relative_roughnesses'],
+                       data['friction_loss_coefficients'])
+
+    def save(self, file_path: str):
+        """
+        Args:
+            file_path (str): Path of the .npz file
+
+        """
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        np.savez_compressed(file_path, log_reynolds_numbers=self.log_reynolds_numbers,
+                            log_relative_roughnesses=self.log_relative_roughnesses,
+                            friction_loss_coefficients=self.friction_loss_coefficients)
+
+    def evaluate(self, reynolds_number, relative_roughness) -> tuple:
+        """
+        Args:
+            reynolds_number (float or np.ndarray): Reynolds number of the flow [-]
+            relative_roughness (float or np.ndarray): Roughness divided by the inner diameter k/d [-]
+
+        Returns:
+            tuple: flc = 1/(friction loss coefficient)² [-] and the friction loss coefficient [-]
+        """
+        scalar = np.ndim(reynolds_number) == 0 and np.ndim(relative_roughness) == 0
+        log_reynolds_numbers, log_relative_roughnesses = np.broadcast_arrays(
+            np.clip(np.log10(np.asarray(reynolds_number, dtype=float)), self.log_reynolds_numbers[0],
+                    self.log_reynolds_numbers[-1]),
+            np.clip(np.log10(np.asarray(relative_roughness, dtype=float)), self.log_relative_roughnesses[0],
+                    self.log_relative_roughnesses[-1]))
+        x, i = _locate(self.log_reynolds_numbers, log_reynolds_numbers)
+        y, j = _locate(self.log_relative_roughnesses, log_relative_roughnesses)
+        table = self.friction_loss_coefficients
+        friction_loss_coefficient = np.array((1 - x) * (1 - y) * table[i, j] + x * (1 - y) * table[i + 1, j]
+                                             + (1 - x) * y * table[i, j + 1] + x * y * table[i + 1, j + 1],
+                                             dtype=float)
+
+        """The regimes are convex in log10(Re) and log10(k/d), so a cell lies within one regime if all its corners do"""
+        regimes = self.regimes
+        across_boundary = (regimes[i, j] != regimes[i + 1, j]) | (regimes[i, j] != regimes[i, j + 1]) | \
+                          (regimes[i, j] != regimes[i + 1, j + 1])
+        if np.any(across_boundary):
+            friction_loss_coefficient[across_boundary] = calc_friction_loss_coefficient(
+                10 ** log_reynolds_numbers[across_boundary], 10 ** log_relative_roughnesses[across_boundary] * 1000,
+                1.0)[1]
+        flc = (friction_loss_coefficient ** 2) ** -1
+        return _to_output(flc, scalar), _to_output(friction_loss_coefficient, scalar)
+
+
+def _log_grid(value_range: tuple, points_per_decade: int) -> np.ndarray:
+    log_minimum, log_maximum = np.log10(value_range[0]), np.log10(value_range[1])
+    return np.linspace(log_minimum, log_maximum, int(round((log_maximum - log_minimum) * points_per_decade)) + 1)
+
+
+def _locate(grid: np.ndarray, values: np.ndarray) -> tuple:
+    """
+    Returns:
+        tuple: Relative position within the grid cell and index of the lower grid point of every value
+    """
+    values = np.clip(values, grid[0], grid[-1])
+    index = np.clip(np.searchsorted(grid, values, side='right') - 1, 0, grid.size - 2)
+    return (values - grid[index]) / (grid[index + 1] - grid[index]), index
+
+
+"""Friction factor table which is shared by all pipelines, built at the first use"""
+_friction_factor_table = None
+
+
+def get_friction_factor_table() -> FrictionFactorTable:
+    """
+
+    Returns:
+        FrictionFactorTable: Shared friction factor table
+    """
+    global _friction_factor_table
+    if _friction_factor_table is None:
+        _friction_factor_table = FrictionFactorTable.build()
+    return _friction_factor_table
@@ -0,0 +1,169 @@
+import logging
+import threading
+from collections import OrderedDict
+import CoolProp.CoolProp as CoolProp
+
+
+class PropertyService:
+    """Central service for thermodynamic properties of REFPROP/CoolProp fluids at given pressure and temperature.
+
+    Note:
+        The flash calculation of AbstractState.update(PT_INPUTS, ...) is the most expensive part of the calculation of
+        mass streams and it is often called with identical inputs within and across timesteps. The service caches the
+        properties in a bounded LRU cache. The keys consist of the property backend (type of the fluid, e.g.
+        AbstractState or TabulatedFluid), the fluid composition, pressure and temperature, which are quantized by the
+        given tolerances. The properties are always evaluated at the quantized state including the quantized
+        composition, so the result does not depend on the order of the calls.
+
+    Example:
+        density = property_service.get_property(fluid, pressure=5e6, temperature=293.15, property_name='rhomass')
+    """
+
+    def __init__(self, max_size: int = 100000, pressure_tolerance: float = 1.0, temperature_tolerance: float = 1e-3,
+                 mass_fraction_tolerance: float = 1e-9):
+        """
+        Args:
+            max_size (int):                     Maximum number of cached properties
+            pressure_tolerance (float):         Pressures within this tolerance share one cache entry in Pa
+            temperature_tolerance (float):      Temperatures within this tolerance share one cache entry in K
+            mass_fraction_tolerance (float):    Mass fractions within this tolerance share one cache entry
+        """
+        self.max_size = max_size
+        self.pressure_tolerance = pressure_tolerance
+        self.temperature_tolerance = temperature_tolerance
+        self.mass_fraction_tolerance = mass_fraction_tolerance
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_tolerances(self, pressure_tolerance: float = None, temperature_tolerance: float = None,
+                       mass_fraction_tolerance: float = None):
+        """
+        Sets the tolerances of the cache keys. The cache is cleared, since the old keys do not match the new
+        tolerances.
+
+        Args:
+            pressure_tolerance (float):         Tolerance of the pressure in Pa
+            temperature_tolerance (float):      Tolerance of the temperature in K
+            mass_fraction_tolerance (float):    Tolerance of the mass fractions
+
+        """
+        if pressure_tolerance is not None:
+            self.pressure_tolerance = pressure_tolerance
+        if temperature_tolerance is not None:
+            self.temperature_tolerance = temperature_tolerance
+        if mass_fraction_tolerance is not None:
+            self.mass_fraction_tolerance = mass_fraction_tolerance
+        self.clear()
+
+    def set_max_size(self, max_size: int):
+        """
+
+        Args:
+            max_size (int): Maximum number of cached properties
+
+        """
+        with self._lock:
+            self.max_size = max_size
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        """
+        Clears the cache and resets the hit and miss counters
+
+        """
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_statistics(self) -> dict:
+        """
+
+        Returns:
+            dict: Hits, misses, hit rate and size of the cache
+        """
+        calls = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / calls if calls else 0,
+                'size': len(self._cache)}
+
+    def get_property(self, fluid, pressure: float, temperature: float, property_name: str,
+                     mass_fraction: dict = None) -> float:
+        """
+        Returns a property of the fluid at the given pressure and temperature
+
+        Args:
+            fluid (AbstractState):  Fluid which is used to calculate the property if it is not cached
+            pressure (float):       Pressure in Pa
+            temperature (float):    Temperature in K
+            property_name (str):    Name of the property method of the AbstractState, e.g. "rhomass", "cpmass",
+                                    "cvmass", "viscosity", "conductivity" or "compressibility_factor"
+            mass_fraction (dict):   Mass fractions of the fluid. If None, the actual composition of the fluid is used
+
+        Returns:
+            float: Value of the property
+        """
+        if mass_fraction:
+            fluid_names = tuple(species.name for species in mass_fraction.keys())
+            fractions = list(mass_fraction.values())
+        else:
+            fluid_names = tuple(fluid.fluid_names())
+            fractions = list(fluid.get_mass_fractions())
+
+        pressure_key = self._quantize(pressure, self.pressure_tolerance)
+        temperature_key = self._quantize(temperature, self.temperature_tolerance)
+        fraction_key = tuple(self._quantize(fraction, self.mass_fraction_tolerance) for fraction in fractions)
+        key = (type(fluid).__name__, fluid_names, fraction_key, pressure_key, temperature_key, property_name)
+
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        """Evaluate the property at the quantized state and composition, so every entry of the cache is independent of
+        the order of the calls"""
+        if mass_fraction or len(fractions) > 1:
+            fluid.set_mass_fractions([self._dequantize(fraction_key_part, fraction, self.mass_fraction_tolerance)
+                                      for fraction_key_part, fraction in zip(fraction_key, fractions)])
+        fluid.update(CoolProp.PT_INPUTS, self._dequantize(pressure_key, pressure, self.pressure_tolerance),
+                     self._dequantize(temperature_key, temperature, self.temperature_tolerance))
+        value = getattr(fluid, property_name)()
+
+        with self._lock:
+            self._cache[key] = value
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _quantize(value: float, tolerance: float):
+        if tolerance:
+            return round(value / tolerance)
+        return value
+
+    @staticmethod
+    def _dequantize(key, value: float, tolerance: float) -> float:
+        if tolerance:
+            return key * tolerance
+        return value
+
+
+"""Property service which is shared by all ports and components"""
+property_service = PropertyService()
+
+
+def log_statistics():
+    """
+    Logs the hit and miss counters of the shared property service
+
+    """
+    statistics = property_service.get_statistics()
+    logging.info(f'Property service: {statistics["hits"]} hits, {statistics["misses"]} misses '
+                 f'(hit rate {statistics["hit_rate"]:.1%}), {statistics["size"]} cached properties')
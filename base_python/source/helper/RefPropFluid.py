@@ -4,29 +4,33 @@ from ctREFPROP.ctREFPROP import REFPROPFunctionLibrary
 import CoolProp.CoolProp as CoolProp
 from CoolProp import AbstractState
 from base_python.source.basic import Database
+from base_python.source.basic.Settings import PropertyBackend
+from base_python.source.helper.FluidStatePool import fluid_state_pool
 import logging
 from functools import lru_cache
 
 
-def create_fluid(mass_fraction, temperature=None, pressure=None):
+def create_fluid(mass_fraction, temperature=None, pressure=None, backend: PropertyBackend = PropertyBackend.REFPROP):
     """
     Creates the Refprop fluid using the saved properties in the stream
 
+    Args:
+        mass_fraction (dict): Dictionary of the molecule types as keys and their mass_fractions as values
+        temperature (float): Temperature of the fluid in K
+        pressure (float): Pressure of the fluid in Pa
+        backend (PropertyBackend): REFPROP AbstractState or tabulated properties of the composition
+
     """
-    components_string = ""
-    components = [component.name for component in mass_fraction.keys()]
-    fractions = []
-    if mass_fraction is not {}:
-        components_string = '&'.join(components)
-        fractions = list(mass_fraction.values())
-    else:
-        logging.warning('No mass fraction given for Fluid')
-    my_abstract_state = AbstractState("REFPROP", components_string)
-    my_abstract_state.set_mass_fractions(
-        fractions)  # note: mass fractions can be set after creation with: my_abstract_state.set_mass_fractions(fractions)
-    if temperature != None and pressure != None:
-        update_fluid(my_abstract_state, temperature, pressure, mass_fraction)
-    return my_abstract_state
+    if backend == PropertyBackend.TABULATED:
+        from base_python.source.helper.TabulatedFluid import get_tabulated_fluid
+        my_tabulated_fluid = get_tabulated_fluid(mass_fraction)
+        if temperature != None and pressure != None:
+            update_fluid(my_tabulated_fluid, temperature, pressure, mass_fraction)
+        return my_tabulated_fluid
+
+    """The state is borrowed from the shared pool. If temperature and pressure are given, it is a fixed state which must
+    not be updated afterwards"""
+    return fluid_state_pool.get_state(mass_fraction, temperature=temperature, pressure=pressure)
 
 
 def update_fluid(fluid, temperature=None, pressure=None, mass_fraction=None):
@@ -0,0 +1,202 @@
+import os
+import json
+import logging
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from base_python.source.basic.Settings import CacheEviction
+
+
+class ResultCache:
+    """Bounded cache of the results of a steady state calculation, e.g. the outlet pressure and temperature of a
+    pipeline for given inlet pressure, inlet temperature and massflow.
+
+    Note:
+        The inputs are quantized by the given tolerances, so inputs within the tolerances share one entry and the
+        lookup is a single dictionary access. If the cache is full, the least recently used (LRU) or the oldest (FIFO)
+        entry is removed. Inputs which are not part of the key (e.g. the mass fraction of the fluid) are given as
+        metadata, the entries are removed whenever the metadata changes, see set_metadata.
+    """
+
+    def __init__(self, tolerances: tuple, max_size: int = 10000, eviction: CacheEviction = CacheEviction.LRU):
+        """
+        Args:
+            tolerances (tuple): Tolerance of every input, inputs within the tolerance share one entry. A tolerance of 0
+                                means exact equality
+            max_size (int): Maximum number of entries
+            eviction (CacheEviction): Rule which entry is removed if the cache is full
+        """
+        self.tolerances = tuple(tolerances)
+        self.max_size = max_size
+        self.eviction = eviction
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.metadata = None  # inputs which are not part of the key, see set_metadata
+        self._entries = OrderedDict()
+
+    def _get_key(self, inputs: tuple) -> tuple:
+        return tuple(round(value / tolerance) if tolerance else value
+                     for value, tolerance in zip(inputs, self.tolerances))
+
+    def get(self, *inputs):
+        """
+        Args:
+            *inputs (float): Inputs of the calculation in the order of the tolerances
+
+        Returns:
+            tuple: Cached result or None if the inputs have not been calculated yet
+        """
+        key = self._get_key(inputs)
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        if self.eviction == CacheEviction.LRU:
+            self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, inputs: tuple, result: tuple):
+        """
+        Args:
+            inputs (tuple): Inputs of the calculation in the order of the tolerances
+            result (tuple): Result of the calculation
+
+        """
+        self._entries[self._get_key(inputs)] = tuple(result)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set_metadata(self, metadata: dict):
+        """
+        Sets the inputs of the calculation which are not part of the key, e.g. the mass fraction of the fluid. If they
+        differ from the metadata of the cached entries, the entries are removed, since they were calculated for other
+        inputs.
+
+        Args:
+            metadata (dict): Inputs of the calculation which are not part of the key
+
+        """
+        if metadata != self.metadata:
+            self._entries.clear()
+            self.metadata = metadata
+
+    def set_configuration(self, tolerances: tuple = None, max_size: int = None, eviction: CacheEviction = None):
+        """
+        Changes the configuration of the cache. The cache is cleared if the tolerances change, since the old keys do
+        not match the new tolerances.
+
+        Args:
+            tolerances (tuple): Tolerance of every input
+            max_size (int): Maximum number of entries
+            eviction (CacheEviction): Rule which entry is removed if the cache is full
+
+        """
+        if tolerances is not None and tuple(tolerances) != self.tolerances:
+            self.tolerances = tuple(tolerances)
+            self.clear()
+        if max_size is not None:
+            self.max_size = max_size
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        if eviction is not None:
+            self.eviction = eviction
+
+    def clear(self):
+        """
+        Removes all entries and resets the statistics
+
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_statistics(self) -> dict:
+        """
+
+        Returns:
+            dict: Hits, misses, hit rate, evictions and size of the cache
+        """
+        calls = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / calls if calls else 0,
+                'evictions': self.evictions,
+                'size': len(self._entries)}
+
+    def save(self, file_path: str, metadata: dict = None):
+        """
+        Saves the entries of the cache as .npz file, so they can be reused by later runs
+
+        Args:
+            file_path (str): Path of the .npz file
+            metadata (dict): Inputs of the calculation which are not part of the key, e.g. the mass fraction of the
+                             fluid, they are checked by load
+
+        """
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        keys = np.array(list(self._entries.keys()), dtype=float).reshape(len(self._entries), len(self.tolerances))
+        results = np.array(list(self._entries.values()), dtype=float).reshape(len(self._entries), -1)
+        np.savez_compressed(file_path, keys=keys, results=results, tolerances=np.array(self.tolerances, dtype=float),
+                            metadata=np.array(get_metadata_string(metadata)))
+
+    def load(self, file_path: str, metadata: dict = None) -> bool:
+        """
+        Loads the entries of a cache which has been saved before. The entries are only loaded if the file was saved
+        with the same tolerances and the same metadata.
+
+        Args:
+            file_path (str): Path of the .npz file
+            metadata (dict): Inputs of the calculation which are not part of the key, see save
+
+        Returns:
+            bool: True if the entries have been loaded
+        """
+        if not os.path.isfile(file_path):
+            return False
+        with np.load(file_path) as data:
+            if not np.array_equal(data['tolerances'], np.array(self.tolerances, dtype=float)):
+                logging.warning(f'Result cache {file_path} was saved with tolerances {data["tolerances"]} instead of '
+                                f'{self.tolerances} and is not loaded')
+                return False
+            saved_metadata = str(data['metadata']) if 'metadata' in data.files else get_metadata_string(None)
+            if saved_metadata != get_metadata_string(metadata):
+                logging.warning(f'Result cache {file_path} was saved with {saved_metadata} instead of '
+                                f'{get_metadata_string(metadata)} and is not loaded')
+                return False
+            self.set_metadata(metadata)
+            for key, result in zip(data['keys'], data['results']):
+                self._entries[tuple(int(value) if tolerance else value
+                                    for value, tolerance in zip(key.tolist(), self.tolerances))] = tuple(result.tolist())
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+
+
+def get_geometry_hash(*parameters) -> str:
+    """
+    Creates a short hash of the parameters which define a calculation, e.g. the geometry of a pipeline, which is used
+    as file name of a persisted result cache
+
+    Args:
+        *parameters: Parameters of the calculation
+
+    Returns:
+        str: Hash of the parameters
+    """
+    return hashlib.sha1(repr(parameters).encode()).hexdigest()[:16]
+
+
+def get_metadata_string(metadata: dict) -> str:
+    """
+    Args:
+        metadata (dict): Inputs of the calculation which are not part of the key of a result cache
+
+    Returns:
+        str: Canonical JSON representation of the metadata, which is saved with the result cache
+    """
+    return json.dumps(metadata or {}, sort_keys=True, default=str)
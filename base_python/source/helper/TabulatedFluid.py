@@ -0,0 +1,334 @@
+import os
+import time
+import logging
+import numpy as np
+from base_python.source.helper import RefPropFluid
+from base_python.source.helper.misc import find_data_directory
+from base_python.source.basic import Database
+from base_python.source.basic.Quantities import PhysicalQuantity
+
+
+class TabulatedFluid:
+    """Tabulated real gas properties of a fluid on a pressure-temperature grid, which can be used in place of a REFPROP
+    AbstractState (RefPropFluid.create_fluid).
+
+    Note:
+        The tables are built once from REFPROP, stored on disk as .npz file and evaluated by vectorized bilinear
+        interpolation. States outside of the grid are clipped to the border of the grid, which is logged once per
+        component and property. The class provides the methods
+        of the AbstractState which are used by the components, so it can be passed to the property service as well.
+    """
+    PROPERTIES = ('rhomass', 'compressibility_factor', 'cpmass', 'isentropic_exponent', 'viscosity', 'conductivity')
+
+    def __init__(self, mass_fraction: dict, pressures: np.ndarray, temperatures: np.ndarray, tables: dict,
+                 constants: dict):
+        """
+        Args:
+            mass_fraction (dict):       Dictionary of the molecule types as keys and their mass_fractions as values
+            pressures (np.ndarray):     Ascending pressure grid in Pa
+            temperatures (np.ndarray):  Ascending temperature grid in K
+            tables (dict):              Property names as keys and arrays of shape (pressures, temperatures) as values
+            constants (dict):           State independent properties: molar_mass, gas_constant, T_critical, p_critical
+        """
+        self.mass_fraction = dict(mass_fraction)
+        self.pressures = np.asarray(pressures, dtype=float)
+        self.temperatures = np.asarray(temperatures, dtype=float)
+        self.tables = {name: np.asarray(table, dtype=float) for name, table in tables.items()}
+        self.constants = dict(constants)
+        self.pressure = None
+        self.temperature = None
+        self.clipping_logged = set()  # (component ID, property name) of the clipped states which have been logged
+
+    ###################################
+    # Creation Methods
+    ###################################
+    @classmethod
+    def build(cls, mass_fraction: dict, pressure_range: tuple = (1e5, 2.5e7),
+              temperature_range: tuple = (233.15, 473.15), number_pressures: int = 250, number_temperatures: int = 121):
+        """
+        Builds the tables of all properties from REFPROP
+
+        Args:
+            mass_fraction (dict):       Dictionary of the molecule types as keys and their mass_fractions as values
+            pressure_range (tuple):     Minimum and maximum pressure of the grid in Pa
+            temperature_range (tuple):  Minimum and maximum temperature of the grid in K
+            number_pressures (int):     Number of pressure grid points
+            number_temperatures (int):  Number of temperature grid points
+
+        Returns:
+            TabulatedFluid: Fluid with the tabulated properties
+        """
+        fluid = RefPropFluid.create_fluid(mass_fraction)
+        pressures = np.linspace(*pressure_range, number_pressures)
+        temperatures = np.linspace(*temperature_range, number_temperatures)
+        tables = {name: np.empty((number_pressures, number_temperatures)) for name in cls.PROPERTIES}
+
+        for i, pressure in enumerate(pressures):
+            for j, temperature in enumerate(temperatures):
+                RefPropFluid.update_fluid(fluid, temperature=temperature, pressure=pressure,
+                                          mass_fraction=mass_fraction)
+                cpmass = fluid.cpmass()
+                tables['rhomass'][i, j] = fluid.rhomass()
+                tables['compressibility_factor'][i, j] = fluid.compressibility_factor()
+                tables['cpmass'][i, j] = cpmass
+                tables['isentropic_exponent'][i, j] = cpmass / fluid.cvmass()
+                tables['viscosity'][i, j] = fluid.viscosity()
+                tables['conductivity'][i, j] = fluid.conductivity()
+
+        constants = {'molar_mass': fluid.molar_mass(),
+                     'gas_constant': fluid.gas_constant(),
+                     'T_critical': fluid.T_critical(),
+                     'p_critical': fluid.p_critical()}
+        return cls(mass_fraction, pressures, temperatures, tables, constants)
+
+    @classmethod
+    def load(cls, file_path: str, mass_fraction: dict):
+        """
+        Args:
+            file_path (str):        Path of the .npz file
+            mass_fraction (dict):   Dictionary of the molecule types as keys and their mass_fractions as values
+
+        Returns:
+            TabulatedFluid: Fluid with the tables of the file
+        """
+        with np.load(file_path) as data:
+            tables = {name: data[name] for name in cls.PROPERTIES}
+            constants = {name: float(data[name]) for name in ('molar_mass', 'gas_constant', 'T_critical',
+                                                               'p_critical')}
+            return cls(mass_fraction, data['pressures'], data['temperatures'], tables, constants)
+
+    def save(self, file_path: str):
+        """
+        Args:
+            file_path (str): Path of the .npz file
+
+        """
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        np.savez_compressed(file_path, pressures=self.pressures, temperatures=self.temperatures, **self.tables,
+                            **self.constants)
+
+    ###################################
+    # Vectorized Evaluation
+    ###################################
+    def evaluate(self, property_name: str, pressure, temperature, component_id: str = None):
+        """
+        Evaluates a property for scalars or arrays of pressures and temperatures by bilinear interpolation
+
+        Args:
+            property_name (str):            Name of the property, see PROPERTIES
+            pressure (float, np.ndarray):   Pressure in Pa
+            temperature (float, np.ndarray): Temperature in K
+            component_id (str):             ID of the evaluating component, clipped states are logged once per
+                                            component and property
+
+        Returns:
+            float or np.ndarray: Interpolated property
+        """
+        table = self.tables[property_name]
+        pressure = np.asarray(pressure, dtype=float)
+        temperature = np.asarray(temperature, dtype=float)
+        if (component_id, property_name) not in self.clipping_logged and (
+                np.any(pressure < self.pressures[0]) or np.any(pressure > self.pressures[-1]) or
+                np.any(temperature < self.temperatures[0]) or np.any(temperature > self.temperatures[-1])):
+            self.clipping_logged.add((component_id, property_name))
+            logging.warning(f'{property_name} of {self.mass_fraction} requested outside of the table (pressure '
+                            f'{self.pressures[0]}-{self.pressures[-1]} Pa, temperature {self.temperatures[0]}-'
+                            f'{self.temperatures[-1]} K) by component {component_id}, the states are clipped to the '
+                            f'border of the table')
+        pressure = np.clip(pressure, self.pressures[0], self.pressures[-1])
+        temperature = np.clip(temperature, self.temperatures[0], self.temperatures[-1])
+
+        i = np.clip(np.searchsorted(self.pressures, pressure, side='right') - 1, 0, len(self.pressures) - 2)
+        j = np.clip(np.searchsorted(self.temperatures, temperature, side='right') - 1, 0, len(self.temperatures) - 2)
+        weight_p = (pressure - self.pressures[i]) / (self.pressures[i + 1] - self.pressures[i])
+        weight_t = (temperature - self.temperatures[j]) / (self.temperatures[j + 1] - self.temperatures[j])
+
+        value = (table[i, j] * (1 - weight_p) * (1 - weight_t) + table[i + 1, j] * weight_p * (1 - weight_t) +
+                 table[i, j + 1] * (1 - weight_p) * weight_t + table[i + 1, j + 1] * weight_p * weight_t)
+        if np.ndim(value) == 0:
+            return float(value)
+        return value
+
+    ###################################
+    # AbstractState Interface
+    ###################################
+    def update(self, input_pair, pressure: float, temperature: float):
+        """
+        Sets the state of the fluid, only pressure-temperature inputs (CoolProp.PT_INPUTS) are supported
+
+        """
+        self.pressure = pressure
+        self.temperature = temperature
+
+    def set_mass_fractions(self, fractions: list):
+        if not np.allclose(fractions, list(self.mass_fraction.values())):
+            logging.warning(f'Tabulated fluid of {self.fluid_names()} was built for mass fractions '
+                            f'{list(self.mass_fraction.values())}, but {list(fractions)} were set')
+
+    def get_mass_fractions(self) -> list:
+        return list(self.mass_fraction.values())
+
+    def fluid_names(self) -> list:
+        return [species.name for species in self.mass_fraction.keys()]
+
+    def rhomass(self) -> float:
+        return self.evaluate('rhomass', self.pressure, self.temperature)
+
+    def rhomolar(self) -> float:
+        return self.rhomass() / self.molar_mass()
+
+    def compressibility_factor(self) -> float:
+        return self.evaluate('compressibility_factor', self.pressure, self.temperature)
+
+    def cpmass(self) -> float:
+        return self.evaluate('cpmass', self.pressure, self.temperature)
+
+    def cvmass(self) -> float:
+        return self.cpmass() / self.evaluate('isentropic_exponent', self.pressure, self.temperature)
+
+    def viscosity(self) -> float:
+        return self.evaluate('viscosity', self.pressure, self.temperature)
+
+    def conductivity(self) -> float:
+        return self.evaluate('conductivity', self.pressure, self.temperature)
+
+    def molar_mass(self) -> float:
+        return self.constants['molar_mass']
+
+    def gas_constant(self) -> float:
+        return self.constants['gas_constant']
+
+    def T_critical(self) -> float:
+        return self.constants['T_critical']
+
+    def p_critical(self) -> float:
+        return self.constants['p_critical']
+
+    def get_specific_gas_constant(self) -> float:
+        return Database.general_gas_constant / self.molar_mass()
+
+    ###################################
+    # Validation
+    ###################################
+    def compare_to_reference(self, number_samples: int = 500, seed: int = 0) -> dict:
+        """
+        Compares the interpolated properties at random states inside of the grid with REFPROP
+
+        Args:
+            number_samples (int): Number of random states
+            seed (int): Seed of the random number generator
+
+        Returns:
+            dict: Maximum and mean relative error per property and the time per call of REFPROP and the table
+        """
+        rng = np.random.default_rng(seed)
+        pressures = rng.uniform(self.pressures[0], self.pressures[-1], number_samples)
+        temperatures = rng.uniform(self.temperatures[0], self.temperatures[-1], number_samples)
+        fluid = RefPropFluid.create_fluid(self.mass_fraction)
+
+        reference = {name: np.empty(number_samples) for name in self.PROPERTIES}
+        start = time.perf_counter()
+        for k in range(number_samples):
+            RefPropFluid.update_fluid(fluid, temperature=temperatures[k], pressure=pressures[k],
+                                      mass_fraction=self.mass_fraction)
+            cpmass = fluid.cpmass()
+            reference['rhomass'][k] = fluid.rhomass()
+            reference['compressibility_factor'][k] = fluid.compressibility_factor()
+            reference['cpmass'][k] = cpmass
+            reference['isentropic_exponent'][k] = cpmass / fluid.cvmass()
+            reference['viscosity'][k] = fluid.viscosity()
+            reference['conductivity'][k] = fluid.conductivity()
+        time_reference = (time.perf_counter() - start) / number_samples
+
+        start = time.perf_counter()
+        for k in range(number_samples):
+            self.update(None, pressures[k], temperatures[k])
+            for name in self.PROPERTIES:
+                self.evaluate(name, self.pressure, self.temperature)
+        time_table = (time.perf_counter() - start) / number_samples
+
+        report = {'time_per_call_reference': time_reference,
+                  'time_per_call_table': time_table,
+                  'speedup': time_reference / time_table}
+        for name in self.PROPERTIES:
+            relative_error = np.abs(self.evaluate(name, pressures, temperatures) / reference[name] - 1)
+            report[f'max_relative_error_{name}'] = float(relative_error.max())
+            report[f'mean_relative_error_{name}'] = float(relative_error.mean())
+        return report
+
+
+"""Tables which have already been loaded or built in this process, keyed by the composition of the fluid"""
+_tabulated_fluids = {}
+TABLE_DIRECTORY = 'property_tables'  # sub folder of the folder data, see find_data_directory
+
+
+def get_table_directory() -> str:
+    """
+
+    Returns:
+        str: Absolute path of the default directory of the .npz files, which does not depend on the working directory
+             as long as it is inside the project
+    """
+    return os.path.join(find_data_directory(), TABLE_DIRECTORY)
+
+
+def get_table_name(mass_fraction: dict) -> str:
+    """
+
+    Args:
+        mass_fraction (dict): Dictionary of the molecule types as keys and their mass_fractions as values
+
+    Returns:
+        str: Name of the table file of the composition
+    """
+    return '_'.join(f'{species.name}-{fraction:.6f}' for species, fraction in mass_fraction.items())
+
+
+def get_tabulated_fluid(mass_fraction: dict, table_directory: str = None) -> TabulatedFluid:
+    """
+    Returns the tabulated fluid of a composition. The tables are loaded from disk or built and saved, if there is no
+    file of the composition yet
+
+    Args:
+        mass_fraction (dict): Dictionary of the molecule types as keys and their mass_fractions as values
+        table_directory (str): Directory of the .npz files, by default data/property_tables of the folder data
+                               which is found from the working directory
+
+    Returns:
+        TabulatedFluid: Tabulated fluid of the composition
+    """
+    table_name = get_table_name(mass_fraction)
+    tabulated_fluid = _tabulated_fluids.get(table_name)
+    if tabulated_fluid is None:
+        file_path = os.path.join(table_directory or get_table_directory(), f'{table_name}.npz')
+        if os.path.isfile(file_path):
+            tabulated_fluid = TabulatedFluid.load(file_path, mass_fraction)
+        else:
+            logging.info(f'Building property tables of {table_name}, which are saved to {file_path}')
+            tabulated_fluid = TabulatedFluid.build(mass_fraction)
+            tabulated_fluid.save(file_path)
+        _tabulated_fluids[table_name] = tabulated_fluid
+
+    """Every component gets a fluid of its own, since the state of the fluid is set by update(), but the tables are
+    shared"""
+    return TabulatedFluid(tabulated_fluid.mass_fraction, tabulated_fluid.pressures, tabulated_fluid.temperatures,
+                          tabulated_fluid.tables, tabulated_fluid.constants)
+
+
+def build_all_tables(stream_types: dict, table_directory: str = None) -> dict:
+    """
+    Builds and saves the tables of all stream types with a given composition, e.g. ModelSettings.stream_types
+
+    Args:
+        stream_types (dict): Stream types as keys and their properties including the mass fraction as values
+        table_directory (str): Directory of the .npz files, by default data/property_tables
+
+    Returns:
+        dict: Stream types as keys and the accuracy report against REFPROP as values
+    """
+    reports = {}
+    for stream_type, properties in stream_types.items():
+        mass_fraction = properties.get(PhysicalQuantity.mass_fraction)
+        if mass_fraction:
+            reports[stream_type] = get_tabulated_fluid(mass_fraction, table_directory).compare_to_reference()
+    return reports
@@ -17,3 +17,20 @@ def create_id(letter: str, number: int) -> str:
     if number > 99:
         logging.warning(f'create_id-Function got the number {number} which is greater than 99! ')
     return f'{letter}{str(number).rjust(2, str(0))}'
+
+
+def find_data_directory() -> str:
+    """Searches the folder data in the working directory and in all its parent directories, like the sqlite file of
+    a local database (see database_connection.Mixin._find_local_database)
+
+    Returns:
+        str: Absolute path of the folder data, the folder data of the working directory if there is none
+    """
+    import os
+    path = os.path.abspath('data')
+    while not os.path.isdir(path):
+        parent = os.path.dirname(os.path.dirname(path))
+        if os.path.join(parent, 'data') == path:
+            return os.path.abspath('data')
+        path = os.path.join(parent, 'data')
+    return path
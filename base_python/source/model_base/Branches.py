@@ -14,12 +14,12 @@ from base_python.source.basic.Streamtypes import StreamDirection
 # Component Import
 from base_python.source.modules.GenericUnit import GenericUnit
 from base_python.source.helper.range_limit import *
-from base_python.source.helper.misc import create_id
+from base_python.source.model_base.ModelRegistry import ModelRegistry, get_active_registry
 
 class Branch:
-    BRANCH_ID_COUNT = 0  # counter for branch IDs, nececcary to set unique branch IDs
 
-    def __init__(self, branch_type, branch_name, port_connections, basic_technical_settings: BasicTechnicalSettings):
+    def __init__(self, branch_type, branch_name, port_connections, basic_technical_settings: BasicTechnicalSettings,
+                 registry: ModelRegistry = None):
         """
         Initializes a Branch of a specific type with connected components. The branch can be solved by itself
         and interacts with the model.
@@ -27,13 +27,16 @@ class Branch:
         Args:
             branch_type (Enum):          The type of the branch which must match the types of the connected ports
             port_connections (list):    Dictionary of the linked ports and their components
+            registry (ModelRegistry):   Registry of the model the branch belongs to, by default the active registry of
+                                        the thread
         """
 
         self.connections = port_connections
         self.branch_type = branch_type
         self.branch_name = branch_name
         self.runcount = 0
-        self.branch_id = self.set_id()
+        self.registry = registry if registry is not None else get_active_registry()
+        self.branch_id = self.set_id(self.registry)
         self.basic_technical_settings = basic_technical_settings
         self.calculated = False
 
@@ -48,28 +51,30 @@ class Branch:
         self.ports_connected = {}
         self.balance = {}
 
+        # execution plan, compiled once by compile_execution_plan() after the branches have been built
+        self.connected_names = frozenset()
+        self.fixed_slots = ()  # ordered (name, component, port_ids) call slots of the fixed ports
+        self.adaptive_slots = ()  # ordered (name, component, port_ids) call slots of the adaptive ports
+        self.fixed_names = frozenset()  # index set of the components of the fixed slots
+        self.adaptive_names = frozenset()  # index set of the components of the adaptive slots
+        self.temp_ports_compiled = True  # False while the loop control has moved components into the fixed ports
+        self.required_port_value = {}  # scratch dictionary which is reset for each component run
+
     ###################################
     # SET Methods
     ###################################
-    @classmethod
-    def set_id(cls) -> str:
-        """Class-Method to create a Unique Branch_ID, based on the class-variable BRANCH_ID_COUNT which gets
-         incremented each time a new Branch is created.
-
-        Notes:
-            https://mail.python.org/pipermail/python-list/2003-April/237870.html
-            the Try Except is, in case a child of branch is ever used same as the set_id function for components.
+    @staticmethod
+    def set_id(registry: ModelRegistry) -> str:
+        """Creates a unique Branch_ID. The number is allocated by the registry of the model, so the IDs are unique
+        within one model.
+
+        Args:
+            registry (ModelRegistry): Registry of the model the branch belongs to
+
         Returns:
             Branch_ID: Unique String consisting of the letter "B" and two digits
         """
-
-        branch_id = create_id(letter='B', number=cls.BRANCH_ID_COUNT)
-        #
-        try:
-            cls.__mro__[-2].BRANCH_ID_COUNT += 1
-        except AttributeError:
-            cls.BRANCH_ID_COUNT += 1
-        return branch_id
+        return registry.create_id(letter='B')
 
     def set_fixed_ports(self, components_dict: dict):
         """
@@ -92,6 +97,35 @@ class Branch:
         """
         self.adaptive_ports = copy.deepcopy(components_dict)
 
+    def compile_execution_plan(self):
+        """
+        Compiles the static information of the branch which is needed in every timestep. The fixed and adaptive ports
+        are compiled into ordered call slots of the component objects and their port IDs, so run() neither looks up
+        the components nor iterates the port dictionaries. Has to be called after the fixed and adaptive ports have
+        been set. The temporary port dictionaries and the scratch dictionary of the required port values are reset in
+        every timestep instead of being reallocated.
+
+        """
+        self.connected_names = frozenset(self.connected_components.keys())
+        self.fixed_slots = self._get_call_slots(self.fixed_ports)
+        self.adaptive_slots = self._get_call_slots(self.adaptive_ports)
+        self.fixed_names = frozenset(self.fixed_ports.keys())
+        self.adaptive_names = frozenset(self.adaptive_ports.keys())
+        self.temp_fixed_ports = dict(self.fixed_ports)
+        self.temp_adaptive_ports = dict(self.adaptive_ports)
+        self.temp_ports_compiled = True
+        self.required_port_value = {}
+
+    def _get_call_slots(self, ports: dict) -> tuple:
+        """
+        Args:
+            ports (dict): Dictionary of components and their fixed or adaptive port IDs
+
+        Returns:
+            tuple: Ordered (name, component, port_ids) call slots of the ports
+        """
+        return tuple((name, self.connected_components[name], tuple(port_ids)) for name, port_ids in ports.items())
+
     def set_loop_control_rules(self, rules: list):
         """
         Saves the loop control rules of the branch (contain which component shall be loop controlled) in a dictionary
@@ -133,12 +167,12 @@ class Branch:
 
         """
 
-        self.balance[PhysicalQuantity.stream] = self.ports_connected[component_name][port_id].get_stream()
-        if type(self.ports_connected[component_name][port_id]) == Port_Mass:
-            self.balance[PhysicalQuantity.pressure] = self.ports_connected[component_name][port_id].get_pressure()
-            self.balance[PhysicalQuantity.temperature] = self.ports_connected[component_name][port_id].get_temperature()
-            self.balance[PhysicalQuantity.mass_fraction] = self.ports_connected[component_name][
-                port_id].get_mass_fraction()
+        port = self.ports_connected[component_name][port_id]
+        self.balance[PhysicalQuantity.stream] = port.get_stream()
+        if type(port) == Port_Mass:
+            self.balance[PhysicalQuantity.pressure] = port.get_pressure()
+            self.balance[PhysicalQuantity.temperature] = port.get_temperature()
+            self.balance[PhysicalQuantity.mass_fraction] = port.get_mass_fraction()
 
     ###################################
     # GET Methods
@@ -304,18 +338,29 @@ class Branch:
                 That is necessary for the status of the refprop calculation               
                 """
                 # TODO: find out what that has to do with refprop
-                if self.temp_adaptive_ports == {}:
-                    self.temp_adaptive_ports = self.adaptive_ports.copy() #Note: The ".copy()" is necessary. otherwise it would only be a "pointer"
-                    #from adaptive_ports to temp_adaptive_ports, but it has to be a copy, since in Line 470 there is a ".pop()"
-                if self.temp_fixed_ports == {}:
-                    self.temp_fixed_ports = self.fixed_ports.copy()
+                if not self.temp_adaptive_ports:
+                    self._reset_temp_ports(self.temp_adaptive_ports, self.adaptive_ports)
+                if not self.temp_fixed_ports:
+                    self._reset_temp_ports(self.temp_fixed_ports, self.fixed_ports)
                 self.balance = {}
                 for component in self.ports_connected.values():
                     for port in component.values():
                         port.set_status_calculated()
             else:
-                self.temp_adaptive_ports = self.adaptive_ports.copy()
-                self.temp_fixed_ports = self.fixed_ports.copy()
+                """The temporary ports are reset to the compiled plan instead of being reallocated. They have to be 
+                separate dictionaries, since the loop control pops components out of the temporary adaptive ports"""
+                self._reset_temp_ports(self.temp_adaptive_ports, self.adaptive_ports)
+                self._reset_temp_ports(self.temp_fixed_ports, self.fixed_ports)
+                self.temp_ports_compiled = True
+
+            """The compiled call slots are used unless the loop control has moved components into the fixed ports"""
+            if self.temp_ports_compiled:
+                fixed_slots, adaptive_slots = self.fixed_slots, self.adaptive_slots
+                fixed_names, adaptive_names = self.fixed_names, self.adaptive_names
+            else:
+                fixed_slots = self._get_call_slots(self.temp_fixed_ports)
+                adaptive_slots = self._get_call_slots(self.temp_adaptive_ports)
+                fixed_names, adaptive_names = self.temp_fixed_ports, self.temp_adaptive_ports
 
             """
             ----- ALREADY RUN COMPONENTS ----
@@ -324,14 +369,14 @@ class Branch:
             to its own balance."""
 
             for name in names_already_run:
-                if name in [*self.connected_components.keys()]:
-                    if name in self.temp_fixed_ports:
+                if name in self.connected_names:
+                    if name in fixed_names:
                         for port_id in self.temp_fixed_ports.get(name):
                             if self.balance == {}:
                                 self.set_balance(name, port_id)
                             else:
                                 self.balance = self.check_balance_validity(name, port_id)
-                    elif name in self.temp_adaptive_ports:
+                    elif name in adaptive_names:
                         for port_id in self.temp_adaptive_ports.get(name):
                             if self.balance == {}:
                                 self.set_balance(name, port_id)
@@ -343,18 +388,20 @@ class Branch:
             a desired profile value or their maximum port value (set by size) to set the flow/ input/output. 
             The branch must and will accept the stream values which are given or taken by an active component
             """
-            for name, ports in self.temp_fixed_ports.items():
+            required_port_value = self.required_port_value
+            for name, component, ports in fixed_slots:
                 if name not in names_already_run:
                     port_id = ports[0]
-                    required_port_value = self.balance.copy()
-                    if required_port_value != {}:
+                    required_port_value.clear()
+                    required_port_value.update(self.balance)
+                    if required_port_value:
                         required_port_value[PhysicalQuantity.stream] = -required_port_value[
                             PhysicalQuantity.stream]
                     else:
                         required_port_value[PhysicalQuantity.stream] = 0
 
                     "Running the component"
-                    self.connected_components[name].run(port_id, required_port_value, runcount)  # run component
+                    component.run(port_id, required_port_value, runcount)  # run component
                     names_already_run[name] = True
                     """Setting the balance based on the new results after component run"""
                     for port_id in ports:
@@ -371,10 +418,11 @@ class Branch:
             the branch tries to give the rest of the stream to the next component. 
             The order is defined by the "passive priority rules" of this branch. 
             """
-            for name, ports in self.temp_adaptive_ports.items():
+            for name, component, ports in adaptive_slots:
                 # usually only one port connected to branch, BUT: Storage can have two (into+out of component!!)
                 if name not in names_already_run:
-                    required_port_value = self.balance.copy()  # we try to dump the full balance onto this port
+                    required_port_value.clear()
+                    required_port_value.update(self.balance)  # we try to dump the full balance onto this port
                     component_ran_already = False
                     for port_id in ports:  # usually only one, but storage can have two, hence the loop
                         """Check whether port is able to equalize the balance regarding the sign (flow direction) of the port 
@@ -386,14 +434,14 @@ class Branch:
                                                 self.balance[PhysicalQuantity.stream]):  # check if current port has the right sign
                             required_port_value[PhysicalQuantity.stream] = -required_port_value[
                                 PhysicalQuantity.stream]
-                            self.connected_components[name].run(port_id, required_port_value, runcount)
+                            component.run(port_id, required_port_value, runcount)
                             component_ran_already = True  # if one port has been found with the right direction, the component is finished
                             break
                     """If component is not able to equalize balance theoretically (by its sign), 
                     the component is run with value of 0 to prevent errors"""
                     if not component_ran_already:
                         required_port_value[PhysicalQuantity.stream] = 0
-                        self.connected_components[name].run(ports[0], required_port_value, runcount)
+                        component.run(ports[0], required_port_value, runcount)
 
                     """Setting the balance based on the new results after component run (or skip if port signs did not match)"""
                     for port_id in ports:
@@ -421,6 +469,19 @@ class Branch:
 
         return rerun, names_already_run, reset
 
+    @staticmethod
+    def _reset_temp_ports(temp_ports: dict, ports: dict):
+        """
+        Resets a temporary port dictionary to the ports of the compiled plan without reallocating it
+
+        Args:
+            temp_ports (dict): Temporary dictionary of components and ports which is changed by the loop control
+            ports (dict): Fixed or adaptive ports of the branch
+
+        """
+        temp_ports.clear()
+        temp_ports.update(ports)
+
     def loop_control(self, balance_value: float, timeout: int) -> bool:
         """
         This method uses the balance value if the branch could not be solved and tries to actively
@@ -472,6 +533,8 @@ class Branch:
         rerun the model"""
         if balance_value <= self.basic_technical_settings.absolute_model_error or timeout > 1:
             rerun = True
+            if self.loop_controlled_components:
+                self.temp_ports_compiled = False
             for component_name in self.loop_controlled_components:
                 if component_name not in self.temp_fixed_ports:
                     self.temp_fixed_ports[component_name] = [port.get_id() for port in
@@ -123,4 +123,11 @@ class Mixin:
             branch.set_adaptive_ports(branches_split_sort[branch_name]['adaptive'])
             if branch_name in self.loop_control_rules:
                 branch.set_loop_control_rules(self.loop_control_rules[branch_name])
+            branch.compile_execution_plan()
         self.branch_calculation_order = branches_split_sort
+
+        """Compile the execution plan of the model once, so the solver does not look up branches and ports in every 
+        timestep"""
+        self.branch_execution_plan = [(branch_name, self.branches[branch_name])
+                                      for branch_name in branches_split_sort]
+        self.model_ports = [port for component in self.components.values() for port in component.ports.values()]
@@ -5,13 +5,13 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from dataclasses import dataclass, field, InitVar, asdict
-from typing import ClassVar
 from base_python.source.model_base import ModelBase
 from base_python.source.model_base.Dataclasses.EconomicalDataclasses import *
 from base_python.source.basic.Quantities import PhysicalQuantity
 from base_python.source.basic.Settings import *
 from base_python.source.helper.ExcelCoordinates import num2col
 from base_python.source.basic.CustomErrors import ExportDataClassError
+from base_python.source.model_base.ModelRegistry import ModelRegistry, get_active_registry
 from datetime import datetime
 
 
@@ -360,7 +360,6 @@ class SingleStreamEconResult:
 @dataclass(repr=False)
 class PortResult:
     from base_python.source.basic.Streamtypes import StreamDirection
-    instances: ClassVar[list] = field(init=False, default=list())
     port_id: str
     sign: StreamDirection
     stream_unit: Unit
@@ -370,9 +369,11 @@ class PortResult:
     max_stream_in: float or None = field(init=False)
     max_stream_out: float or None = field(init=False)
     port_history: dict = field(default_factory=lambda: {})
+    mass_fraction_species: list = field(default_factory=lambda: [])
 
     def __post_init__(self):
-        PortResult.instances.append(self)
+        self.registry = get_active_registry()  # registry of the model the port belongs to
+        self.registry.port_results.append(self)
         try:
             self.max_stream_in = min(self.port_history[PhysicalQuantity.stream])
         except (ValueError, KeyError):
@@ -382,9 +383,26 @@ class PortResult:
         except (ValueError, KeyError):
             self.max_stream_out = None
 
-    @classmethod
-    def get_instances(cls):
-        return cls.instances
+    def get_instances(self) -> list:
+        """
+
+        Returns:
+            list: Results of all ports of the model the port belongs to
+        """
+        return self.registry.port_results
+
+    def set_registry(self, registry: ModelRegistry):
+        """
+        Moves the result to the registry of the model the port belongs to
+
+        Args:
+            registry (ModelRegistry): Registry of the model
+
+        """
+        if registry is not self.registry:
+            self.registry.port_results[:] = [result for result in self.registry.port_results if result is not self]
+            self.registry = registry
+            self.registry.port_results.append(self)
 
     def create_technical_results_of_port(self) -> dict:
         """Returns the technical results of one specific port as dictionary
@@ -398,23 +416,25 @@ class PortResult:
                 branch_id = "None"
             else:
                 branch_id = self.branch_id
-            _dict[(branch_id, self.component_id, self.port_id, key)] = value
+            if np.ndim(value) == 2:  # mass fraction matrix: one column per species
+                for column, species in enumerate(self.mass_fraction_species):
+                    _dict[(branch_id, self.component_id, self.port_id, f'{key}_{species}')] = value[:, column]
+            else:
+                _dict[(branch_id, self.component_id, self.port_id, key)] = value
         return _dict
 
-    @classmethod
-    def create_technical_results_of_all_ports(cls) -> dict:
+    def create_technical_results_of_all_ports(self) -> dict:
         """
-        Returns ALL the technical results of every port as dictionary
+        Returns ALL the technical results of every port of the model as dictionary
         Returns:
 
         """
         _dict = dict()
-        for instance in cls.get_instances():
+        for instance in self.get_instances():
             _dict.update(instance.create_technical_results_of_port())
         return _dict
 
-    @classmethod
-    def to_dataframe(cls) -> pd.DataFrame:
+    def to_dataframe(self) -> pd.DataFrame:
         """Returns the technical results of every port as Dataframe with multiindex for columns and "timeseries" for rows
 
         Notes:
@@ -424,7 +444,7 @@ class PortResult:
         Returns:
 
         """
-        data = cls.create_technical_results_of_all_ports()
+        data = self.create_technical_results_of_all_ports()
         _df = pd.DataFrame.from_dict(data=data)
         _df.columns.names = ['branch_id', 'component_id', 'port_id', 'stream_type']
         _df.index.name = 'timeseries'
@@ -447,16 +467,19 @@ class PortResult:
         self.sign = sign
 
     def get_stream_history(self):
-        if None not in self.port_history[PhysicalQuantity.stream]:
-            return self.port_history[PhysicalQuantity.stream]
+        stream_history = np.asarray(self.port_history[PhysicalQuantity.stream], dtype=float)
+        if not np.isnan(stream_history).any():
+            return stream_history
         else:
-            return []
+            return np.zeros(0)
 
     def get_stream_history_out(self):
-        return list(filter(lambda x: x > 0, self.get_stream_history()))
+        stream_history = self.get_stream_history()
+        return stream_history[stream_history > 0]
 
     def get_stream_history_in(self):
-        return list(filter(lambda x: x < 0, self.get_stream_history()))
+        stream_history = self.get_stream_history()
+        return stream_history[stream_history < 0]
 
     def get_sum_stream_out_by_history(self):
         return sum(self.get_stream_history_out())
@@ -483,12 +506,28 @@ class PortResult:
 class ComponentTechnicalResults:
     size: float
     component_history: dict
-    instances: ClassVar[list] = field(init=False, default=list())
     branch_id: str or None = field(default=None)
     component_id: str or None = field(default=None)
+    statistics: dict = field(default_factory=lambda: {})  # solver and cache statistics which are not timeseries
 
     def __post_init__(self):
-        ComponentTechnicalResults.instances.append(self)
+        self.registry = get_active_registry()  # registry of the model the component belongs to
+        self.registry.component_technical_results.append(self)
+
+    def set_registry(self, registry: ModelRegistry):
+        """
+        Moves the result to the registry of the model the component belongs to
+
+        Args:
+            registry (ModelRegistry): Registry of the model
+
+        """
+        if registry is not self.registry:
+            self.registry.component_technical_results[:] = [result for result in
+                                                            self.registry.component_technical_results
+                                                            if result is not self]
+            self.registry = registry
+            self.registry.component_technical_results.append(self)
 
     def create_technical_result(self):
         _dict = dict()
@@ -497,16 +536,14 @@ class ComponentTechnicalResults:
             _dict[(self.branch_id, self.component_id, key)] = values
         return _dict
 
-    @classmethod
-    def create_technical_results(cls):
+    def create_technical_results(self):
         _dict = dict()
-        for instance in cls.instances:
+        for instance in self.registry.component_technical_results:
             _dict.update(instance.create_technical_result())
         return _dict
 
-    @classmethod
-    def to_dataframe(cls):
-        _df = pd.DataFrame.from_dict(cls.create_technical_results(), orient='index')
+    def to_dataframe(self):
+        _df = pd.DataFrame.from_dict(self.create_technical_results(), orient='index')
         _df.index = pd.MultiIndex.from_tuples(_df.index, names=['branch_id', 'component_id', 'info'])
         _df.columns.names = ['timeseries']
         return _df.T
@@ -579,7 +616,6 @@ class ComponentTechnicalResults:
 
 @dataclass
 class ComponentEconResults:
-    instances: ClassVar[list] = field(init=False, default=list())
     branch_id: str or None = field(default=None)
     component_id: str or None = field(default=None)
     component_CAPEX: List[ElementCAPEX] = field(default_factory=lambda: [])
@@ -593,7 +629,22 @@ class ComponentEconResults:
     component_Annuity: float = 0
 
     def __post_init__(self):
-        ComponentEconResults.instances.append(self)
+        self.registry = get_active_registry()  # registry of the model the component belongs to
+        self.registry.component_econ_results.append(self)
+
+    def set_registry(self, registry: ModelRegistry):
+        """
+        Moves the result to the registry of the model the component belongs to
+
+        Args:
+            registry (ModelRegistry): Registry of the model
+
+        """
+        if registry is not self.registry:
+            self.registry.component_econ_results[:] = [result for result in self.registry.component_econ_results
+                                                       if result is not self]
+            self.registry = registry
+            self.registry.component_econ_results.append(self)
 
     def set_branch_id(self, branch_id: str):
         self.branch_id = branch_id
@@ -692,16 +743,14 @@ class ComponentEconResults:
                     _dict[key] = values
         return _dict
 
-    @classmethod
-    def create_economic_results(cls):
+    def create_economic_results(self):
         _dict = dict()
-        for instance in cls.instances:
+        for instance in self.registry.component_econ_results:
             _dict[(instance.branch_id, instance.component_id)] = instance.create_economic_result()
         return _dict
 
-    @classmethod
-    def to_dataframe(cls):
-        _df = pd.DataFrame.from_dict(cls.create_economic_results())
+    def to_dataframe(self):
+        _df = pd.DataFrame.from_dict(self.create_economic_results())
         _df.columns.names = ['branch_id', 'component_id']
         _df.index.name = 'parameter'
         return _df
@@ -719,7 +768,7 @@ class ComponentEconResults:
 
     def create_component_CAPEX_results(self):
         _dict = dict()
-        for instance in self.instances:
+        for instance in self.registry.component_econ_results:
             for key, _item in instance.get_all_capex_elements().items():
                 if _item.element_name:
                     #_dict[(instance.branch_id, instance.component_id, _item.element_name)] = _item.create_dictionary()
@@ -728,7 +777,7 @@ class ComponentEconResults:
 
     def create_component_fixedOPEX_results(self):
         _dict = dict()
-        for instance in self.instances:
+        for instance in self.registry.component_econ_results:
             for key, _item in instance.get_all_fixed_OPEX_elements().items():
                 if _item.element_name:
                     _dict[(instance.branch_id, instance.component_id, _item.element_name)] = _item.create_dictionary()
@@ -746,7 +795,7 @@ class ComponentEconResults:
 
     def create_component_variable_OPEX_results(self):
         _dict = dict()
-        for instance in self.instances:
+        for instance in self.registry.component_econ_results:
             for key, _item in instance.get_all_variable_OPEX_elements().items():
                 _dict[(instance.branch_id, instance.component_id, _item.element_name)] = _item.create_dictionary()
         return _dict
@@ -1016,7 +1065,7 @@ class SystemResults:
 
             system_results.component_technical_results.append(component.component_technical_results)
             system_results.component_economic_results.append(component.component_economic_results)
-        system_results.port_results.extend(PortResult.instances)
+        system_results.port_results.extend(modelbase.registry.port_results)
         system_results.set_overall_annuity()
         return system_results
 
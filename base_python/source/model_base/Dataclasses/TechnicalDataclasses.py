@@ -115,6 +115,7 @@ class Efficiency:
     load_range: List[int]
     efficiencies_at_load: List[float]
     interpolation_function = None
+    shared = False  # True if the efficiency is shared by several components and must not be changed
 
     def get_medium_referenced(self):
         """
@@ -234,6 +235,16 @@ class Efficiencies:
         efficiency_object = self.get_efficiency_by_media(medium_referenced=medium_referenced,
                                                          medium_calculated=medium_calculated)
         if efficiency_object is not None:
+            if efficiency_object.shared:
+                """Shared efficiencies are replaced by a copy of the component, so other components keep their values"""
+                index = self.all_efficiencies.index(efficiency_object)
+                efficiency_object = Efficiency(medium_referenced=efficiency_object.medium_referenced,
+                                               unit_referenced=efficiency_object.unit_referenced,
+                                               medium_calculated=efficiency_object.medium_calculated,
+                                               unit_calculated=efficiency_object.unit_calculated,
+                                               load_range=list(efficiency_object.load_range),
+                                               efficiencies_at_load=list(efficiency_object.efficiencies_at_load))
+                self.all_efficiencies[index] = efficiency_object
             efficiency_object.set_efficiency(load_values=load_values, efficiency_values=efficiency_values)
         else:
             logging.critical(
@@ -22,6 +22,7 @@ from base_python.source.basic.CustomErrors import *
 # Helper function Imports
 
 from base_python.source.helper.initialize_logger import initialize_logger, LoggingLevels
+import base_python.source.helper.PropertyService as PropertyService
 
 # component imports
 from base_python.source.modules import *
@@ -34,11 +35,16 @@ from base_python.source.model_base.Dataclasses.EconomicalDataclasses import *
 from base_python.source.model_base.Dataclasses.TechnicalDataclasses import *
 from base_python.source.model_base.Dataclasses.ExportDataclasses import SystemResults, PortResult, ComponentTechnicalResults, ComponentEconResults
 import base_python.source.model_base.Connections2Branches as Connections2Branches
+import base_python.source.model_base.StepDeduplication as StepDeduplication
+import base_python.source.model_base.StorageDispatch as StorageDispatch
+import base_python.source.model_base.ModelTemplate as ModelTemplate
+from base_python.source.model_base.ModelRegistry import ModelRegistry, set_active_registry
 
 import base_python.source.model_base.database_connection as database_connection
 
 
-class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
+class ModelBase(database_connection.Mixin, Connections2Branches.Mixin, StepDeduplication.Mixin, StorageDispatch.Mixin,
+                ModelTemplate.Mixin):
 
     def __init__(self, database_name: str, db_location='server', logging_level: LoggingLevels = LoggingLevels.CRITICAL):
 
@@ -47,7 +53,7 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
 
         Args:
             database_name: Name of the database in HeidiSQL
-            db_location: either "server" or "local"
+            db_location: either "server", "local" or "memory" (in-process database, see DatabaseBackend.InMemoryBackend)
             logging_level: Logging Level as Enum of logging levels to describe the logging output
         """
         ## reset Branch and Component IDs
@@ -61,7 +67,9 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
         self.basic_economical_settings: BasicEconomicalSettings = None
         self._costs_calculated = False
         self.profile_len = None
-        self.database_cursor = None
+        self.database_handle = None
+        self.database_key = None
+        self.database_snapshot = None
 
         self.self_energy_components = []
         self.passive_priorityRules = []
@@ -76,6 +84,8 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
         self.electricity_costs = {}
         self.costs = {}
         self.branches = {}
+        self.branch_execution_plan = []  # compiled (name, branch) list in calculation order, see build_branches()
+        self.model_ports = []  # flat list of all ports of the model, see build_branches()
         self.settings = {}
 
         initialize_logger(level=logging_level)
@@ -83,7 +93,13 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
             self.connect_to_server_database(database_name)
             self.load_basic_database()
         elif db_location == 'local' and database_name is not None:
-            self.connect_to_local_database(database_name)
+            if self.USE_DATABASE_SNAPSHOT:
+                self.load_local_database_snapshot(database_name)
+            else:
+                self.connect_to_local_database(database_name)
+            self.load_basic_database()
+        elif db_location == 'memory' and database_name is not None:
+            self.connect_to_memory_database(database_name)
             self.load_basic_database()
         else:
             logging.warning('Missing Information, please provide a valid database name')
@@ -91,34 +107,15 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
     ###################################
     # Initialisation Methods
     ###################################
-    @staticmethod
-    def reset_IDs():
-        '''
-        tries to reset all possible Components ID's for
-        :return:
-        '''
-        Branch.BRANCH_ID_COUNT = 0
-        GenericUnit.GenericUnit.COMPONENT_ID_COUNT = 0
-        # clear all possible componentes here:
-        # TODO: find a much more elegant way to do that
-        PortResult.instances.clear()
-        ComponentTechnicalResults.instances.clear()
-        ComponentEconResults.instances.clear()
-
-        #Burner.COMPONENT_ID_COUNT = 0
-        #CHP_Plant.COMPONENT_ID_COUNT = 0
-        Compressor.COMPONENT_ID_COUNT = 0
-        Consumer.COMPONENT_ID_COUNT = 0
-        Converter.Converter.COMPONENT_ID_COUNT = 0
-        Electrolyser.COMPONENT_ID_COUNT = 0
-        Grid.COMPONENT_ID_COUNT = 0
-        Investment.COMPONENT_ID_COUNT = 0
-        Pipeline.COMPONENT_ID_COUNT = 0
-        Pipeline_Segment.COMPONENT_ID_COUNT = 0
-        Source.COMPONENT_ID_COUNT = 0
-        Storage.COMPONENT_ID_COUNT = 0
-        #Storage_Electrical.COMPONENT_ID_COUNT = 0
-        Storage_Gas.COMPONENT_ID_COUNT = 0
+    def reset_IDs(self):
+        """
+        Creates a new registry for the model, which allocates the IDs of all components and branches and holds their
+        results. The registry is passed explicitly to the branches of the model and to its components in
+        init_structure, it is also set as active registry of the thread for components which are created afterwards.
+
+        """
+        self.registry = ModelRegistry()
+        set_active_registry(self.registry)
 
     def init_structure(self):
         """
@@ -127,6 +124,8 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
         """
         self.set_time_resolution(self.basic_technical_settings.time_resolution)
         self.add_sub_components_to_list()
+        for component in self.components.values():
+            component.set_registry(self.registry)
         self.load_database()
         self.set_properties_of_components()
         for comp_name, component in self.components.items():
@@ -170,7 +169,8 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
                                             f'part of the system. Check spelling!')
 
         self.branches[branch_name] = Branch(branch_type=branch_type, port_connections=port_connections,
-                                            basic_technical_settings=self.basic_technical_settings, branch_name=branch_name)
+                                            basic_technical_settings=self.basic_technical_settings, branch_name=branch_name,
+                                            registry=self.registry)
 
     def add_sub_components_to_list(self):
         """
@@ -225,6 +225,18 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
             for sub_component in component.sub_components.values():
                 sub_component.set_time_resolution(time_resolution)
 
+    def set_solver_engine(self, solver_engine: SolverEngine):
+        """
+        Sets the engine which is used to solve the model in run()
+
+        Args:
+            solver_engine (SolverEngine): SolverEngine.STEPWISE solves every timestep by the branch solver,
+                                          SolverEngine.STEP_DEDUPLICATION solves only one timestep of every group of
+                                          timesteps with identical profile values if the model does not contain time
+                                          coupled components (e.g. Storage), see StepDeduplication
+        """
+        self.basic_technical_settings.solver_engine = solver_engine
+
     def add_profile_to_component_port(self, component_name: str, port_stream_type: StreamMass,
                                       port_stream_direction: StreamDirection, profile: pd.Series,
                                       profile_type: PhysicalQuantity,
@@ -526,7 +538,7 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
         Returns:
             dict: Dictionary of all system components with names as keys and component objects as values
         """
-        return copy.deepcopy(self.components)
+        return deepcopy(self.components)
 
 
     ###################################
@@ -540,14 +552,6 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
 
         """
 
-        """Reset the histories of components to prevent wrong results"""
-
-        for component in self.components.values():
-            component._reset_component_history()
-            component._reset_port_history()
-
-        self.overall_status = 0
-
         """Check whether profile length and time resolution are given. If not only one step will be calculated"""
 
         if self.profile_len is None:
@@ -558,9 +562,38 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
         else:
             iteration_count = self.profile_len
 
+        """Reset the histories of components to prevent wrong results and preallocate the port histories"""
+
+        for component in self.components.values():
+            component._reset_component_history()
+            component._reset_port_history(history_len=iteration_count)
+
+        self.overall_status = 0
+
         logging.debug('### Starting run of model "{}" with {} steps ###'.format(self.modelname, str(iteration_count)))
 
-        for runcount in range(iteration_count):
+        if self.basic_technical_settings.solver_engine == SolverEngine.STEP_DEDUPLICATION and \
+                self.check_steps_deduplicable():
+            self.run_deduplicated_steps(iteration_count)
+        else:
+            self._run_steps(range(iteration_count))
+
+        for component in self.components.values():
+            for port in component.ports.values():
+                port.trim_history()
+
+        PropertyService.log_statistics()
+        logging.debug('### run completed ###')
+
+    def _run_steps(self, runcounts):
+        """
+        Solves the model for the given timesteps one after another and saves the states of all components and ports
+
+        Args:
+            runcounts (iterable): Timesteps of the model which shall be solved
+
+        """
+        for runcount in runcounts:
             logging.debug('- New run {} -'.format(runcount))
 
             """Run the model for the runcount using the solve method"""
@@ -575,8 +608,6 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
                 for port in component.ports.values():
                     port.save_state()
 
-        logging.debug('### run completed ###')
-
     def solve(self, runcount) -> int:
         """
         Solves one single runcount of the model and calls the branches to solve itself
@@ -606,36 +637,36 @@ class ModelBase(database_connection.Mixin, Connections2Branches.Mixin):
             """ Run the code as long not all branches have the attribute calculated true and the timeout value 
             did not reach the maximum timeout value.
             """
-            while not all([branch.calculated is True for branch in self.branches.values()]) and (timeout < self.basic_technical_settings.timeout_max):
+            branch_execution_plan = self.branch_execution_plan
+            timeout_max = self.basic_technical_settings.timeout_max
+            while not all(branch.calculated is True for _, branch in branch_execution_plan) and (timeout < timeout_max):
                 timeout += 1
-                """ Loop over all branches in the model regarding the pre-defined branch_calculation_order"""
-                for branch_name in self.branch_calculation_order:
-                    if not self.branches[branch_name].calculated:
+                """ Loop over all branches in the model regarding the compiled branch execution plan"""
+                for branch_name, branch in branch_execution_plan:
+                    if not branch.calculated:
 
                         """Run method of the branch is started and the information whether the branch has been looped
                         (rerun) and the other branches has to be recalculated (reset)"""
-                        rerun, names_already_run, reset = self.branches[branch_name].run(names_already_run, runcount,
-                                                                                         rerun)
-                        loop_controlled_components.extend(self.branches[branch_name].get_loop_controlled_components())
+                        rerun, names_already_run, reset = branch.run(names_already_run, runcount, rerun)
+                        loop_controlled_components.extend(branch.get_loop_controlled_components())
                         if reset:
                             """ If Reset is true all branches except the one which raised the rerun True parameter
                             has to be recalcuated and get the attribute calculated = False"""
-                            for name, branch in self.branches.items():
+                            for name, other_branch in branch_execution_plan:
                                 if branch_name != name:
-                                    branch.calculated = False
+                                    other_branch.calculated = False
                             break
 
             """ Resets any loop control values to prepare the model for the next runcount"""
 
-            for branch in self.branches.values():
+            for _, branch in branch_execution_plan:
                 branch.calculated = False
                 branch.set_loop_controlled_components_empty()
             for name in loop_controlled_components:
                 self.components[name].clear_controlled_active_port()
             # reset port properties
-            for component in self.components.values():
-                for port in component.ports.values():
-                    port.set_status_calculated()
+            for port in self.model_ports:
+                port.set_status_calculated()
 
             """Check whether all branch could be solved or not. If not an error occures"""
             for branch_name, branch in self.branches.items():
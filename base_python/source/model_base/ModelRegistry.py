@@ -0,0 +1,74 @@
+import threading
+import weakref
+from base_python.source.helper.misc import create_id
+
+
+class ModelRegistry:
+    """
+    Registry of one model which allocates the IDs of components and branches and holds the result objects of ports and
+    components. Every model owns its own registry, so several models can be held in memory and run on threads without
+    sharing IDs or results. The registry is released together with the model and its results.
+    """
+
+    def __init__(self):
+        self.id_counts = {}
+        self.port_results = []
+        self.component_technical_results = []
+        self.component_econ_results = []
+
+    def create_id(self, letter: str, first_number: int = 0) -> str:
+        """
+        Creates an ID which is unique within the model
+
+        Args:
+            letter (str): Letter of the ID, e.g. "C" for components and "B" for branches
+            first_number (int): Number of the first ID with this letter
+
+        Returns:
+            str: ID consisting of the letter and two digits
+        """
+        number = self.id_counts.get(letter, first_number)
+        self.id_counts[letter] = number + 1
+        return create_id(letter=letter, number=number)
+
+    def clear(self):
+        """
+        Resets all ID counters and removes all registered results
+
+        """
+        self.id_counts.clear()
+        self.port_results.clear()
+        self.component_technical_results.clear()
+        self.component_econ_results.clear()
+
+
+"""Registry which is used by the components, ports and branches which are created on a thread. It is only held weakly,
+so it is released as soon as the model and its results are gone."""
+_active_registry = threading.local()
+
+
+def set_active_registry(registry: ModelRegistry):
+    """
+    Sets the registry for all components, ports and branches which are created on the current thread
+
+    Args:
+        registry (ModelRegistry): Registry of the model which is currently built
+
+    """
+    _active_registry.reference = weakref.ref(registry)
+
+
+def get_active_registry() -> ModelRegistry:
+    """
+    Returns the registry of the model which is currently built on this thread. If there is none, e.g. if a component is
+    created outside of a model, a new registry is created, which is kept alive by the results registered at it.
+
+    Returns:
+        ModelRegistry: Active registry of the current thread
+    """
+    reference = getattr(_active_registry, 'reference', None)
+    registry = reference() if reference is not None else None
+    if registry is None:
+        registry = ModelRegistry()
+        set_active_registry(registry)
+    return registry
@@ -0,0 +1,77 @@
+import copy
+import types
+import logging
+from enum import Enum
+from scipy.interpolate import interp1d, interp2d
+from CoolProp import AbstractState
+from base_python.source.model_base.Dataclasses.TechnicalDataclasses import Efficiency
+from base_python.source.helper.DatabaseSnapshot import DatabaseSnapshot
+from base_python.source.helper.TabulatedFluid import TabulatedFluid
+from base_python.source.helper.CompressorMap import CompressorMap
+from base_python.source.helper.PipelineCorrelations import FrictionFactorTable
+
+
+class Mixin:
+    """
+    Cloning of a fully built model (template), e.g. for the points of a parameter sweep. The template is built once with
+    __init__, the database, set_properties_of_components and build_branches, every clone is a copy of its components,
+    ports, branches and results. Data which is not changed during the simulation is shared by template and clones
+    instead of being copied: efficiencies and their interpolations, investment functions, fluid states and property
+    tables, compressor maps, the database snapshot and the topology of the branches.
+
+    Note:
+        Sizes, profiles and histories belong to the clone. Changes of the clone, e.g. set_size, only re-derive the
+        properties of the changed component. Functions which are created by set_properties (e.g. value_calculation of
+        converters) still refer to the template until the clone calls set_properties again, so the template must not
+        be changed after the first clone has been created.
+    """
+    SHARED_TYPES = (Efficiency, interp1d, interp2d, AbstractState, TabulatedFluid, CompressorMap, FrictionFactorTable,
+                    DatabaseSnapshot)
+
+    def clone(self):
+        """
+        Creates an independent copy of the model which shares the unchanging data with this model. The clone gets a
+        copy of the registry with the IDs and results of its components, the active registry of the thread is not
+        changed.
+
+        Returns:
+            ModelBase: Clone of the model
+        """
+        if self.database_handle is not None:
+            self.close_database_connection()
+        shared_objects = self._get_shared_objects()
+        clone = copy.deepcopy(self, {id(value): value for value in shared_objects})
+        logging.debug(f'Model "{self.modelname}" cloned, {len(shared_objects)} objects shared with the template')
+        return clone
+
+    def _get_shared_objects(self) -> list:
+        """
+        Searches all objects of the model which are shared by template and clones. Efficiencies are marked as shared,
+        so Efficiencies.update_efficiency replaces them by a copy before changing them.
+
+        Returns:
+            list: Objects which are not copied
+        """
+        shared_objects = [self.connections, self.branch_calculation_order, self.loop_control_rules]
+        shared_objects.extend(branch.connections for branch in self.branches.values())
+
+        visited = set()
+        stack = [self.components]
+        while stack:
+            value = stack.pop()
+            if id(value) in visited:
+                continue
+            visited.add(id(value))
+            if isinstance(value, self.SHARED_TYPES):
+                if isinstance(value, Efficiency):
+                    value.shared = True
+                shared_objects.append(value)
+            elif isinstance(value, dict):
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                stack.extend(value)
+            elif hasattr(value, '__dict__') and not isinstance(value, (type, Enum, types.FunctionType,
+                                                                       types.MethodType, types.ModuleType)):
+                stack.append(vars(value))
+        return [value for value in shared_objects if value is not None]
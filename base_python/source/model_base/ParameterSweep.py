@@ -0,0 +1,262 @@
+import os
+import pickle
+import logging
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from base_python.source.basic.Streamtypes import StreamMass
+from base_python.source.basic.CustomErrors import ModelError
+from base_python.source.modules.Consumer import Consumer
+
+"""
+Parameter sweep over value chain models, which is the python counterpart of Framework.ParameterSweep of the MATLAB
+front end. Every point of the sweep is a set of overrides which are applied to a freshly created model before it is
+run. The points are distributed over a process pool and the KPIs of all points are collected in one table. By default
+every process builds the model with the base configuration only once as template and every point runs on a clone of it
+(see ModelBase.clone).
+
+Overrides are given as dotted paths which start either with a component name or with an attribute of the model:
+    'Ely.set_size'                                          -> model.components['Ely'].set_size(value)
+    'Storage_H2.economical_parameters.set_all_interest_rates' -> model.components['Storage_H2'].economical_parameters...
+    'basic_economical_settings.basic_interest_rate'         -> model.basic_economical_settings.basic_interest_rate = value
+If the path ends with a method, the method is called with the value, otherwise the attribute is set to the value.
+"""
+
+
+def create_sweep_points(sweep_grid: dict) -> list:
+    """
+    Creates the full factorial grid of all overrides
+
+    Args:
+        sweep_grid (dict): Dotted override paths as keys and lists of values as values
+
+    Returns:
+        list: One dictionary of overrides for every point of the sweep
+    """
+    paths = list(sweep_grid.keys())
+    return [dict(zip(paths, values)) for values in itertools.product(*sweep_grid.values())]
+
+
+def apply_override(model, path: str, value):
+    """
+    Applies a single override to the model
+
+    Args:
+        model (ModelBase): Model the override is applied to
+        path (str): Dotted path of the override, starting with a component name or a model attribute
+        value: Value which is set or passed to the method at the end of the path
+
+    """
+    names = path.split('.')
+    if names[0] in model.components:
+        target = model.components[names[0]]
+    elif hasattr(model, names[0]):
+        target = getattr(model, names[0])
+    else:
+        raise ModelError(f'Override "{path}" does not start with a component or attribute of model '
+                         f'{type(model).__name__}')
+
+    if len(names) == 1:
+        if names[0] in model.components:
+            raise ModelError(f'Override "{path}" would replace component {names[0]}, give the path of an attribute or '
+                             f'method of the component instead')
+        attribute = getattr(model, names[0])
+        if callable(attribute):
+            attribute(value)
+        else:
+            setattr(model, names[0], value)
+        return
+
+    for name in names[1:-1]:
+        target = getattr(target, name)
+
+    attribute = getattr(target, names[-1], None)
+    if callable(attribute):
+        attribute(value)
+    elif hasattr(target, names[-1]):
+        setattr(target, names[-1], value)
+    else:
+        raise ModelError(f'Override "{path}" could not be resolved, {type(target).__name__} has no attribute '
+                         f'"{names[-1]}"')
+
+
+def get_full_load_hours(model, component_name: str, port_type: StreamMass) -> float:
+    """
+    Full load hours of a port of a component, calculated from the stream history of the last run. In contrast to
+    ModelBase.get_full_hours_of_use the model is not run again.
+
+    Args:
+        model (ModelBase): Model which has been run
+        component_name (str): Name of the component
+        port_type (StreamMass): Stream type of the port
+
+    Returns:
+        float: Full load hours of the port or 0 if there was no stream
+    """
+    ports = model.components[component_name].get_ports_by_type(port_type)
+    if len(ports) != 1:
+        raise ModelError(f'Component {component_name} has {len(ports)} ports of type {port_type}! '
+                         f'Calculation of full-load-hours not possible.')
+    stream = np.abs(ports[0].get_stream_history())
+    max_stream = stream.max(initial=0)
+    if max_stream == 0:
+        return 0
+    return float(stream.sum() * model.basic_technical_settings.time_resolution / 60 / max_stream)
+
+
+def get_h2_delivered(model) -> float:
+    """
+
+    Args:
+        model (ModelBase): Model which has been run
+
+    Returns:
+        float: Sum of the hydrogen streams into all consumers of the model
+    """
+    h2_delivered = 0
+    for component in model.components.values():
+        if isinstance(component, Consumer):
+            for port in component.get_ports_by_type(StreamMass.HYDROGEN):
+                h2_delivered += np.abs(port.get_stream_history()).sum()
+    return float(h2_delivered * model.basic_technical_settings.time_resolution / 60)
+
+
+def get_total_annuity(model) -> float:
+    """
+
+    Args:
+        model (ModelBase): Model for which the costs have been calculated
+
+    Returns:
+        float: Sum of the annuities of all components of the model
+    """
+    return float(sum(component.component_economic_results.get_annuity() for component in model.components.values()))
+
+
+"""Templates of the models of the sweep, built once per process"""
+_templates = {}
+
+
+def get_model_template(model_class, base_configuration: dict = None, model_arguments: dict = None):
+    """
+    Returns the template of the model with the base configuration, it is created if it does not exist in this process
+
+    Args:
+        model_class: Class of the value chain model, e.g. Model_A
+        base_configuration (dict): Overrides which are applied to the template
+        model_arguments (dict): Keyword arguments which are passed to the model class
+
+    Returns:
+        ModelBase: Template of the model, which must not be changed
+    """
+    key = (model_class.__module__, model_class.__qualname__,
+           pickle.dumps((model_arguments, base_configuration), protocol=pickle.HIGHEST_PROTOCOL))
+    template = _templates.get(key)
+    if template is None:
+        template = model_class(**(model_arguments or {}))
+        for path, value in (base_configuration or {}).items():
+            apply_override(template, path, value)
+        _templates[key] = template
+    return template
+
+
+def clear_model_templates():
+    """
+    Removes the templates of this process, e.g. after a sweep which ran in the current process
+
+    """
+    _templates.clear()
+
+
+def run_sweep_point(model_class, point: dict, base_configuration: dict = None, model_arguments: dict = None,
+                    full_load_hours: dict = None, use_template: bool = True) -> dict:
+    """
+    Creates, configures and runs a single model of the sweep and collects its KPIs. Errors of the model are written to
+    the result, so a single failing point does not stop the whole sweep.
+
+    Args:
+        model_class: Class of the value chain model, e.g. Model_A
+        point (dict): Overrides of this point of the sweep
+        base_configuration (dict): Overrides which are applied to every point before the overrides of the point
+        model_arguments (dict): Keyword arguments which are passed to the model class
+        full_load_hours (dict): Component names as keys and port types as values for which the full load hours are
+                                calculated
+        use_template (bool): Boolean whether the point runs on a clone of the template of the process instead of a
+                             new model
+
+    Returns:
+        dict: Overrides and KPIs of the point
+    """
+    result = dict(point)
+    try:
+        if use_template:
+            model = get_model_template(model_class, base_configuration, model_arguments).clone()
+            overrides = point
+        else:
+            model = model_class(**(model_arguments or {}))
+            overrides = {**(base_configuration or {}), **point}
+        for path, value in overrides.items():
+            apply_override(model, path, value)
+        model.run()
+        model.calculate_costs()
+
+        result['annuity'] = get_total_annuity(model)
+        result['h2_delivered'] = get_h2_delivered(model)
+        for component_name, port_type in (full_load_hours or {}).items():
+            result[f'full_load_hours_{component_name}'] = get_full_load_hours(model, component_name, port_type)
+        result['error'] = None
+    except Exception as error:
+        logging.error(f'Sweep point {point} of model {model_class.__name__} failed: {error}')
+        result['error'] = f'{type(error).__name__}: {error}'
+    return result
+
+
+def _run_sweep_point_packed(arguments: tuple) -> dict:
+    return run_sweep_point(*arguments)
+
+
+def run_parameter_sweep(model_class, sweep_grid: dict, base_configuration: dict = None, model_arguments: dict = None,
+                        full_load_hours: dict = None, max_workers: int = None, chunksize: int = None,
+                        use_template: bool = True) -> pd.DataFrame:
+    """
+    Runs a parameter sweep over the full factorial grid of overrides on a process pool
+
+    Args:
+        model_class: Class of the value chain model, e.g. Model_A. It has to be importable by the worker processes.
+        sweep_grid (dict): Dotted override paths as keys and lists of values as values
+        base_configuration (dict): Overrides which are applied to every point, e.g. profiles of ports
+        model_arguments (dict): Keyword arguments which are passed to the model class, e.g. the database name
+        full_load_hours (dict): Component names as keys and port types as values for which the full load hours are
+                                calculated
+        max_workers (int): Number of worker processes, defaults to the number of CPUs. With 1 the sweep runs in the
+                           current process.
+        chunksize (int): Number of points which are sent to a worker at once, defaults to about four chunks per worker
+        use_template (bool): Boolean whether every process builds the model once and runs the points on clones
+
+    Returns:
+        pd.DataFrame: One row per point with the overrides, the KPIs and a possible error message
+    """
+    points = create_sweep_points(sweep_grid)
+    arguments = [(model_class, point, base_configuration, model_arguments, full_load_hours, use_template)
+                 for point in points]
+    max_workers = max_workers or os.cpu_count() or 1
+    logging.info(f'Parameter sweep of {model_class.__name__}: {len(points)} points on {max_workers} workers')
+
+    if max_workers == 1:
+        try:
+            results = [_run_sweep_point_packed(argument) for argument in arguments]
+        finally:
+            """The templates of the worker processes are released with the processes, the templates of the current
+            process would otherwise be kept until the end of the program"""
+            clear_model_templates()
+    else:
+        """Points are sent to the workers in chunks, so that the inter process communication does not dominate for
+        sweeps with thousands of points"""
+        if chunksize is None:
+            chunksize = max(1, len(points) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_run_sweep_point_packed, arguments, chunksize=chunksize))
+
+    return pd.DataFrame(results)
@@ -0,0 +1,465 @@
+import logging
+import numpy as np
+import scipy.sparse as sparse
+from scipy.sparse.linalg import spsolve
+
+from base_python.source.basic.CustomErrors import ModelError
+from base_python.source.helper.Conversion import Unit_Conversion as uc, Time_Conversion as tc
+
+
+class PipelineNetwork:
+    """Steady state solver of a gas network which consists of Pipeline_Segment components.
+
+    Note:
+        In a model, a chain of pipeline segments is solved segment after segment by the branch loop. The network
+        solver instead takes a graph of segments (edges) between nodes with injections and offtakes and solves all
+        node pressures and segment massflows of a timestep at once by a sparse Newton-Raphson iteration:
+            node rows:      sum of the massflows into the node + injection = 0 for every node without fixed pressure
+            segment rows:   residual of the outlet pressure of the segment (Pipeline_Segment.calc_segment_residuals)
+        The segment rows use the same friction and heat transfer correlations as Pipeline_Segment. The jacobian of a
+        segment row only depends on the pressures of its two nodes and its own massflow, so the jacobian is sparse and
+        the network scales to hundreds of nodes.
+        The temperatures are solved in an outer loop: after the pressures converged, the nodes are processed in the
+        order of decreasing pressure, the node temperature is the mixing temperature of all inflows and the outlet
+        temperature of every outflowing segment is calculated at the solved pressures.
+
+    Example:
+        network = PipelineNetwork()
+        network.add_node('Supply', pressure_in_Pa=80e5, temperature_in_C=20)
+        network.add_node('City', injection=-10)
+        network.add_segment(model.components['Pipeline_1'], from_node='Supply', to_node='City')
+        network.run(iteration_count=8760)
+    """
+    MAX_NEWTON_ITERATIONS = 50
+    MAX_TEMPERATURE_ITERATIONS = 10
+    MAX_SEGMENT_TEMPERATURE_ITERATIONS = 20
+    PRESSURE_STEP = 1e-5  # relative perturbation of the pressures for the jacobian [-]
+    FLOW_STEP = 1e-4  # relative perturbation of the massflows for the jacobian [-]
+    MIN_FLOW = 1e-6  # [kg/s] massflows below this value are treated as this value in the correlations
+
+    def __init__(self, mass_tolerance: float = 1e-4, pressure_tolerance_in_Pa: float = 2.0,
+                 temperature_tolerance_in_K: float = 0.1, time_resolution: float = None):
+        """
+        Args:
+            mass_tolerance (float): Accepted residual of the mass balances of the nodes in [kg/s]
+            pressure_tolerance_in_Pa (float): Accepted residual of the outlet pressures of the segments in [Pa]
+            temperature_tolerance_in_K (float): Accepted change of the temperatures between two outer iterations in [K]
+            time_resolution (float): Time resolution of the port streams in [min], by default the time resolution of
+                                     the segments
+        """
+        self.mass_tolerance = mass_tolerance
+        self.pressure_tolerance = pressure_tolerance_in_Pa
+        self.temperature_tolerance = temperature_tolerance_in_K
+        self.time_resolution = time_resolution
+
+        self.node_names = []
+        self.node_index = {}
+        self.fixed_pressures = []  # [Pa] or None for nodes with unknown pressure
+        self.node_temperatures_in = []  # [°C] temperature of the injection or of the fixed pressure node
+        self.injections = []  # [kg/s] float or profile, positive values are injections, negative values offtakes
+
+        self.segments = []
+        self.from_nodes = []
+        self.to_nodes = []
+
+        # Solution of the last solved timestep, which is the initial guess of the next timestep
+        self.pressures = None
+        self.temperatures = None
+        self.flows = None
+        self.outlet_temperatures = None
+        self.compiled = False
+
+        self.statistics = {'solves': 0, 'newton_iterations': 0, 'temperature_iterations': 0, 'not_converged': 0}
+
+    def add_node(self, name: str, pressure_in_Pa: float = None, temperature_in_C: float = 20, injection=0):
+        """
+        Adds a node to the network
+
+        Args:
+            name (str): Unique name of the node
+            pressure_in_Pa (float): Fixed pressure of a supply node in [Pa]. The injection of a node with fixed pressure
+                                    is a result of the solver.
+            temperature_in_C (float): Temperature of the gas which is injected at the node in [°C]
+            injection (float or list): Massflow which is injected (positive) or taken off (negative) at the node in
+                                       [kg/s], constant or one value per timestep
+
+        """
+        if name in self.node_index:
+            raise ModelError(f'Node "{name}" already exists in the pipeline network')
+        self.node_index[name] = len(self.node_names)
+        self.node_names.append(name)
+        self.fixed_pressures.append(pressure_in_Pa)
+        self.node_temperatures_in.append(temperature_in_C)
+        self.injections.append(injection if np.isscalar(injection) else np.asarray(injection, dtype=float))
+        self.compiled = False
+
+    def add_segment(self, segment, from_node: str, to_node: str):
+        """
+        Adds a pipeline segment between two nodes. The geometry of the edge is the geometry of the segment, a positive
+        massflow flows from from_node to to_node.
+
+        Args:
+            segment (Pipeline_Segment): Pipeline segment of the edge
+            from_node (str): Name of the node at the inlet of the segment
+            to_node (str): Name of the node at the outlet of the segment
+
+        """
+        for node in (from_node, to_node):
+            if node not in self.node_index:
+                raise ModelError(f'Node "{node}" of segment {segment.component_id} does not exist in the network')
+        self.segments.append(segment)
+        self.from_nodes.append(self.node_index[from_node])
+        self.to_nodes.append(self.node_index[to_node])
+        self.compiled = False
+
+    def compile(self):
+        """
+        Creates the index arrays and the constant part of the jacobian (incidence of the nodes and segments)
+
+        """
+        if not any(pressure is not None for pressure in self.fixed_pressures):
+            raise ModelError('The pipeline network needs at least one node with fixed pressure')
+        self._set_time_resolution()
+        number_of_nodes = len(self.node_names)
+        number_of_segments = len(self.segments)
+        self.from_nodes_array = np.array(self.from_nodes, dtype=int)
+        self.to_nodes_array = np.array(self.to_nodes, dtype=int)
+        self.is_fixed = np.array([pressure is not None for pressure in self.fixed_pressures])
+        self.free_nodes = np.flatnonzero(~self.is_fixed)
+        """Column of every node pressure in the vector of unknowns, -1 for nodes with fixed pressure"""
+        self.pressure_column = np.full(number_of_nodes, -1)
+        self.pressure_column[self.free_nodes] = np.arange(self.free_nodes.size)
+
+        """Incidence matrix: +1 if the segment flows into the node, -1 if it flows out of the node"""
+        segments = np.arange(number_of_segments)
+        self.incidence = sparse.csr_matrix(
+            (np.concatenate([np.ones(number_of_segments), -np.ones(number_of_segments)]),
+             (np.concatenate([self.to_nodes_array, self.from_nodes_array]), np.concatenate([segments, segments]))),
+            shape=(number_of_nodes, number_of_segments))
+
+        fixed_pressures = np.array([pressure if pressure is not None else np.nan for pressure in self.fixed_pressures])
+        self.pressures = np.where(self.is_fixed, fixed_pressures, 0.98 * np.nanmax(fixed_pressures))
+        self.temperatures = np.array(self.node_temperatures_in, dtype=float)
+        self.flows = np.ones(number_of_segments)
+        self.outlet_temperatures = self.temperatures[self.from_nodes_array].copy()
+        self.compiled = True
+
+    def _set_time_resolution(self):
+        """
+        Takes the time resolution of the port streams from the segments, which must all have the same time resolution
+        as the network. Segments without time resolution, e.g. segments outside of a model, get the time resolution
+        of the network.
+
+        """
+        segment_resolutions = {segment.time_resolution for segment in self.segments
+                               if segment.time_resolution is not None}
+        if len(segment_resolutions) > 1:
+            raise ModelError(f'The segments of the pipeline network have different time resolutions '
+                             f'{sorted(segment_resolutions)}')
+        if segment_resolutions:
+            segment_resolution = segment_resolutions.pop()
+            if self.time_resolution is not None and self.time_resolution != segment_resolution:
+                raise ModelError(f'Time resolution {self.time_resolution} of the pipeline network does not match the '
+                                 f'time resolution {segment_resolution} of its segments')
+            self.time_resolution = segment_resolution
+        elif self.time_resolution is None:
+            raise ModelError('Neither the pipeline network nor its segments have a time resolution')
+        for segment in self.segments:
+            if segment.time_resolution is None:
+                segment.set_time_resolution(self.time_resolution)
+
+    def get_injections(self, runcount: int) -> np.ndarray:
+        """
+
+        Args:
+            runcount (int): Actual timestep
+
+        Returns:
+            np.ndarray: Injections of all nodes in the timestep in [kg/s]
+        """
+        return np.array([injection if np.isscalar(injection) else injection[runcount]
+                         for injection in self.injections], dtype=float)
+
+    def solve(self, runcount: int = 0):
+        """
+        Solves the pressures, massflows and temperatures of the network for one timestep. The solution of the previous
+        timestep is the initial guess.
+
+        Args:
+            runcount (int): Actual timestep
+
+        Returns:
+            bool: True if the network converged
+        """
+        if not self.compiled:
+            self.compile()
+        injections = self.get_injections(runcount)
+        if not self.statistics['solves']:
+            """Initial guess of the massflows: the mean offtake flows through every segment"""
+            self.flows = np.full(len(self.segments), max(np.abs(injections).sum() / 2, 1.0))
+
+        converged = False
+        for temperature_iteration in range(1, self.MAX_TEMPERATURE_ITERATIONS + 1):
+            converged = self._solve_pressures(injections)
+            temperature_change = self._solve_temperatures(injections)
+            if temperature_change < self.temperature_tolerance:
+                break
+        else:
+            converged = False
+            logging.warning(f'Temperatures of the pipeline network did not converge in timestep {runcount}')
+
+        self.statistics['solves'] += 1
+        self.statistics['temperature_iterations'] += temperature_iteration
+        self.statistics['not_converged'] += not converged
+        return converged
+
+    def _calc_segment_pressure_residual(self, segment_number: int, pressures: np.ndarray, flow: float) -> float:
+        """
+        Residual of the outlet pressure of a segment. If the massflow is negative, the segment is calculated from
+        to_node to from_node and the residual is negated, so the residual is continuous at zero massflow.
+
+        Args:
+            segment_number (int): Number of the segment
+            pressures (np.ndarray): Pressures of all nodes in [Pa]
+            flow (float): Massflow from from_node to to_node in [kg/s]
+
+        Returns:
+            float: Residual of the outlet pressure in [Pa]
+        """
+        inlet, outlet = self.from_nodes[segment_number], self.to_nodes[segment_number]
+        sign = 1
+        if flow < 0:
+            inlet, outlet = outlet, inlet
+            sign = -1
+        residuals = self.segments[segment_number].calc_segment_residuals(
+            p1=pressures[inlet], t1=self.temperatures[inlet], p2=pressures[outlet],
+            t2=self.outlet_temperatures[segment_number], m_dot=max(abs(flow), self.MIN_FLOW))
+        if residuals is None:
+            raise ModelError(f'Outlet velocity of segment {self.segments[segment_number].component_id} exceeds the '
+                             f'limit at a massflow of {flow} kg/s')
+        return sign * residuals[0]
+
+    def _calc_residuals(self, pressures: np.ndarray, flows: np.ndarray, injections: np.ndarray) -> tuple:
+        """
+
+        Returns:
+            tuple: Residuals of the mass balances of the free nodes [kg/s] and of the segment outlet pressures [Pa]
+        """
+        mass_residuals = (self.incidence @ flows + injections)[self.free_nodes]
+        pressure_residuals = np.array([self._calc_segment_pressure_residual(segment_number, pressures, flow)
+                                       for segment_number, flow in enumerate(flows)])
+        return mass_residuals, pressure_residuals
+
+    def _assemble_jacobian(self, pressures: np.ndarray, flows: np.ndarray, pressure_residuals: np.ndarray):
+        """
+        Assembles the sparse jacobian. The segment rows are calculated by finite differences, every segment row has at
+        most three entries: the pressures of its two nodes and its own massflow.
+
+        Returns:
+            sparse.csc_matrix: Jacobian of the residuals with the free node pressures and the massflows as columns
+        """
+        number_of_free_nodes = self.free_nodes.size
+        number_of_segments = len(self.segments)
+
+        """Node rows: derivatives of the mass balances by the massflows are the incidence of the free nodes"""
+        node_rows = self.incidence[self.free_nodes].tocoo()
+        rows = [node_rows.row]
+        columns = [node_rows.col + number_of_free_nodes]
+        values = [node_rows.data]
+
+        segment_rows = []
+        segment_columns = []
+        segment_values = []
+        for segment_number in range(number_of_segments):
+            row = number_of_free_nodes + segment_number
+            residual = pressure_residuals[segment_number]
+            for node in (self.from_nodes[segment_number], self.to_nodes[segment_number]):
+                column = self.pressure_column[node]
+                if column < 0:
+                    continue
+                step = max(self.PRESSURE_STEP * pressures[node], 10 * self.pressure_tolerance)
+                perturbed_pressures = pressures.copy()
+                perturbed_pressures[node] += step
+                perturbed_residual = self._calc_segment_pressure_residual(segment_number, perturbed_pressures,
+                                                                          flows[segment_number])
+                segment_rows.append(row)
+                segment_columns.append(column)
+                segment_values.append((perturbed_residual - residual) / step)
+
+            flow = flows[segment_number]
+            step = max(self.FLOW_STEP * abs(flow), self.MIN_FLOW) * (1 if flow >= 0 else -1)
+            perturbed_residual = self._calc_segment_pressure_residual(segment_number, pressures, flow + step)
+            segment_rows.append(row)
+            segment_columns.append(number_of_free_nodes + segment_number)
+            segment_values.append((perturbed_residual - residual) / step)
+
+        rows.append(np.array(segment_rows, dtype=int))
+        columns.append(np.array(segment_columns, dtype=int))
+        values.append(np.array(segment_values))
+        size = number_of_free_nodes + number_of_segments
+        return sparse.csc_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))),
+                                 shape=(size, size))
+
+    def _solve_pressures(self, injections: np.ndarray) -> bool:
+        """
+        Sparse Newton-Raphson iteration over the pressures of the free nodes and the massflows of the segments at fixed
+        temperatures
+
+        Args:
+            injections (np.ndarray): Injections of all nodes in [kg/s]
+
+        Returns:
+            bool: True if the iteration converged
+        """
+        pressures = self.pressures.copy()
+        flows = self.flows.copy()
+        number_of_free_nodes = self.free_nodes.size
+
+        mass_residuals, pressure_residuals = self._calc_residuals(pressures, flows, injections)
+        for iteration in range(self.MAX_NEWTON_ITERATIONS):
+            if np.all(np.abs(mass_residuals) < self.mass_tolerance) and \
+                    np.all(np.abs(pressure_residuals) < self.pressure_tolerance):
+                self.pressures, self.flows = pressures, flows
+                return True
+            self.statistics['newton_iterations'] += 1
+
+            jacobian = self._assemble_jacobian(pressures, flows, pressure_residuals)
+            step = spsolve(jacobian, -np.concatenate([mass_residuals, pressure_residuals]))
+            pressure_step = np.zeros_like(pressures)
+            pressure_step[self.free_nodes] = step[:number_of_free_nodes]
+            flow_step = step[number_of_free_nodes:]
+
+            """Damping: the pressures must not drop below half of their actual value within one step"""
+            damping = 1.0
+            while np.any(pressures + damping * pressure_step < 0.5 * pressures):
+                damping *= 0.5
+            pressures = pressures + damping * pressure_step
+            flows = flows + damping * flow_step
+            mass_residuals, pressure_residuals = self._calc_residuals(pressures, flows, injections)
+
+        logging.warning(f'Pressures of the pipeline network did not converge within {self.MAX_NEWTON_ITERATIONS} '
+                        f'Newton iterations! Max. residuals: {np.abs(mass_residuals).max(initial=0):.2e} kg/s, '
+                        f'{np.abs(pressure_residuals).max(initial=0):.1f} Pa')
+        self.pressures, self.flows = pressures, flows
+        return False
+
+    def _solve_temperatures(self, injections: np.ndarray) -> float:
+        """
+        Calculates the node temperatures by mixing the inflows and the outlet temperatures of the segments at the
+        solved pressures. The nodes are processed in the order of decreasing pressure, so all inflows of a node are
+        calculated before the node.
+
+        Args:
+            injections (np.ndarray): Injections of all nodes in [kg/s]
+
+        Returns:
+            float: Maximum change of a node or outlet temperature in [K]
+        """
+        old_temperatures = np.concatenate([self.temperatures, self.outlet_temperatures])
+        inlet_nodes = np.where(self.flows >= 0, self.from_nodes_array, self.to_nodes_array)
+        outlet_nodes = np.where(self.flows >= 0, self.to_nodes_array, self.from_nodes_array)
+        absolute_flows = np.abs(self.flows)
+
+        for node in np.argsort(-self.pressures, kind='stable'):
+            inflows = np.flatnonzero(outlet_nodes == node)
+            flow_sum = absolute_flows[inflows].sum()
+            enthalpy_sum = (absolute_flows[inflows] * self.outlet_temperatures[inflows]).sum()
+            if self.is_fixed[node]:  # the injection of a fixed pressure node closes its mass balance
+                injection = max(absolute_flows[inlet_nodes == node].sum() - flow_sum, 0)
+            else:
+                injection = max(injections[node], 0)
+            flow_sum += injection
+            enthalpy_sum += injection * self.node_temperatures_in[node]
+            if flow_sum > 0:
+                self.temperatures[node] = enthalpy_sum / flow_sum
+
+            for segment_number in np.flatnonzero(inlet_nodes == node):
+                self.outlet_temperatures[segment_number] = self._solve_segment_outlet_temperature(
+                    segment_number, node, outlet_nodes[segment_number], absolute_flows[segment_number])
+
+        return float(np.abs(np.concatenate([self.temperatures, self.outlet_temperatures]) - old_temperatures).max())
+
+    def _solve_segment_outlet_temperature(self, segment_number: int, inlet: int, outlet: int, flow: float) -> float:
+        """
+        Fixed point iteration of the outlet temperature of a segment at the solved pressures
+
+        Returns:
+            float: Outlet temperature of the segment in [°C]
+        """
+        segment = self.segments[segment_number]
+        t2 = self.outlet_temperatures[segment_number]
+        for _ in range(self.MAX_SEGMENT_TEMPERATURE_ITERATIONS):
+            residuals = segment.calc_segment_residuals(p1=self.pressures[inlet], t1=self.temperatures[inlet],
+                                                       p2=self.pressures[outlet], t2=t2,
+                                                       m_dot=max(flow, self.MIN_FLOW))
+            if residuals is None:
+                break
+            t2 = t2 + residuals[1]
+            if abs(residuals[1]) < self.temperature_tolerance:
+                break
+        return t2
+
+    def write_to_ports(self, runcount: int):
+        """
+        Writes the solution of the timestep into the in- and outlet ports of the segments. The inlet port gets the
+        state of from_node and the outlet port the state of to_node, a negative massflow is written as negative stream.
+
+        Args:
+            runcount (int): Actual timestep
+
+        """
+        for segment_number, segment in enumerate(self.segments):
+            flow = self.flows[segment_number]
+            from_node, to_node = self.from_nodes[segment_number], self.to_nodes[segment_number]
+            outlet_temperature = self.outlet_temperatures[segment_number] if flow >= 0 else self.temperatures[to_node]
+            inlet_temperature = self.temperatures[from_node] if flow >= 0 else self.outlet_temperatures[segment_number]
+
+            port_mass_in = segment.mass_ports['in']
+            port_mass_out = segment.mass_ports['out']
+            port_mass_in.set_pressure(self.pressures[from_node])
+            port_mass_in.set_temperature(uc.C2K(inlet_temperature))
+            port_mass_in.set_stream(runcount, flow * tc.resolution2second(self.time_resolution)
+                                    * port_mass_in.get_sign().value)
+            port_mass_out.set_pressure(self.pressures[to_node])
+            port_mass_out.set_temperature(uc.C2K(outlet_temperature))
+            port_mass_out.set_stream(runcount, flow / tc.second2resolution(self.time_resolution))
+
+    def run(self, iteration_count: int) -> bool:
+        """
+        Solves all timesteps and saves the states of the segments and their ports into their histories
+
+        Args:
+            iteration_count (int): Number of timesteps
+
+        Returns:
+            bool: True if all timesteps converged
+        """
+        for segment in self.segments:
+            segment._reset_port_history(history_len=iteration_count)
+
+        all_converged = True
+        for runcount in range(iteration_count):
+            all_converged &= self.solve(runcount)
+            self.write_to_ports(runcount)
+            for segment in self.segments:
+                segment.save_state()
+                for port in segment.ports.values():
+                    port.save_state()
+
+        for segment in self.segments:
+            for port in segment.ports.values():
+                port.trim_history()
+            segment.component_technical_results.statistics['pipeline_network'] = self.get_statistics()
+        logging.info(f'Pipeline network with {len(self.node_names)} nodes and {len(self.segments)} segments: '
+                     f'{self.get_statistics()}')
+        return all_converged
+
+    def get_statistics(self) -> dict:
+        """
+
+        Returns:
+            dict: Number of solves, Newton and temperature iterations and not converged timesteps
+        """
+        solves = self.statistics['solves']
+        return {**self.statistics,
+                'mean_newton_iterations': self.statistics['newton_iterations'] / solves if solves else 0}
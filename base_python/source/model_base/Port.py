@@ -33,8 +33,10 @@ class Port:
         self.external_identifier = external_identifier
         self.stream = None
         self.stream_type = None
-        self.stream_value_split_by_direction = {StreamDirection.stream_into_component: [],
-                                                StreamDirection.stream_out_of_component: []}
+        self.history_len = 0  # number of saved timesteps in the history buffers
+        self.history_capacity = 0  # number of allocated timesteps in the history buffers
+        self.stream_value_split_by_direction = {StreamDirection.stream_into_component: np.zeros(0),
+                                                StreamDirection.stream_out_of_component: np.zeros(0)}
         self.max_stream_value = {StreamDirection.stream_into_component: 0,
                                  StreamDirection.stream_out_of_component: 0}
         self.value_profiles = {}
@@ -46,30 +48,79 @@ class Port:
             PhysicalQuantity.mass_fraction: {}
         }
 
-    def reset_history(self):
-        self.port_results.port_history = {}
-        self.stream_value_split_by_direction = {StreamDirection.stream_into_component: [],
-                                                StreamDirection.stream_out_of_component: []}
+    def reset_history(self, history_len: int = 0):
+        """
+        Resets the history of the port and preallocates the history buffers, so save_state only writes by index
+
+        Args:
+            history_len (int): Number of timesteps which will be saved (e.g. profile_len of the model). If more
+                               timesteps are saved, the buffers grow automatically.
+        """
+        self.history_len = 0
+        self.history_capacity = history_len
+        self.port_results.port_history = {PhysicalQuantity.stream: np.full(history_len, np.nan)}
+        self.stream_value_split_by_direction = {StreamDirection.stream_into_component: np.zeros(history_len),
+                                                StreamDirection.stream_out_of_component: np.zeros(history_len)}
         self.max_stream_value = {StreamDirection.stream_into_component: 0,
                                  StreamDirection.stream_out_of_component: 0}
+
     def save_state(self):
         """
-        This function will be extended by the sub classes
+        Writes the actual stream value into the history buffers at the index of the next timestep. This function will
+        be extended by the sub classes, which write their values at index history_len - 1
         """
+        if self.history_len >= self.history_capacity:
+            self._grow_history()
+        index = self.history_len
+        self.history_len += 1
+
         if self.stream is not None:
+            self.port_results.port_history[PhysicalQuantity.stream][index] = self.stream
             if self.stream < 0:
-                self.stream_value_split_by_direction[StreamDirection.stream_into_component].append(self.stream)
-                self.stream_value_split_by_direction[StreamDirection.stream_out_of_component].append(0)
+                self.stream_value_split_by_direction[StreamDirection.stream_into_component][index] = self.stream
                 if self.stream < self.max_stream_value[StreamDirection.stream_into_component]:
                     self.max_stream_value[StreamDirection.stream_into_component] = self.stream
             elif self.stream > 0:
-                self.stream_value_split_by_direction[StreamDirection.stream_into_component].append(0)
-                self.stream_value_split_by_direction[StreamDirection.stream_out_of_component].append(self.stream)
+                self.stream_value_split_by_direction[StreamDirection.stream_out_of_component][index] = self.stream
                 if self.stream > self.max_stream_value[StreamDirection.stream_out_of_component]:
                     self.max_stream_value[StreamDirection.stream_out_of_component] = self.stream
-            else:
-                self.stream_value_split_by_direction[StreamDirection.stream_into_component].append(0)
-                self.stream_value_split_by_direction[StreamDirection.stream_out_of_component].append(0)
+
+    def trim_history(self):
+        """
+        Trims the history buffers to the number of saved timesteps, if less timesteps were saved than allocated
+
+        """
+        if self.history_len != self.history_capacity:
+            for history in [self.port_results.port_history, self.stream_value_split_by_direction]:
+                for key, values in history.items():
+                    history[key] = values[:self.history_len]
+            self.history_capacity = self.history_len
+
+    def expand_history(self, step_index: np.ndarray):
+        """
+        Expands the history of representative timesteps to the full horizon (used by the step deduplication)
+
+        Args:
+            step_index (np.ndarray): Index of the saved timestep which is used for every timestep of the horizon
+
+        """
+        for history in [self.port_results.port_history, self.stream_value_split_by_direction]:
+            for key, values in history.items():
+                history[key] = values[:self.history_len][step_index]
+        self.history_len = len(step_index)
+        self.history_capacity = self.history_len
+
+    def _grow_history(self):
+        """
+        Doubles the size of all history buffers, if more timesteps are saved than preallocated
+
+        """
+        grow_len = max(self.history_capacity, 1)
+        for history in [self.port_results.port_history, self.stream_value_split_by_direction]:
+            for key, values in history.items():
+                fill_value = 0 if history is self.stream_value_split_by_direction else np.nan
+                history[key] = np.concatenate([values, np.full((grow_len,) + values.shape[1:], fill_value)])
+        self.history_capacity += grow_len
 
     ###################################
     # SET Methods
@@ -341,28 +392,28 @@ class Port:
         """
         return self.stream_type
 
-    def get_stream_history(self) -> list:
+    def get_stream_history(self) -> np.ndarray:
         """
 
         Returns:
-            list: List of the history of the stream from start to actual runcount
+            np.ndarray: History of the stream from start to actual runcount
         """
         if PhysicalQuantity.stream in self.port_results.port_history.keys():
-            return self.port_results.port_history[PhysicalQuantity.stream]
+            return self.port_results.port_history[PhysicalQuantity.stream][:self.history_len]
         else:
             return None
 
-    def get_stream_history_by_sign(self, sign) -> list:
+    def get_stream_history_by_sign(self, sign) -> np.ndarray:
         """
 
         Args:
             sign (int): Sign for which the history of streams shall be returned
 
         Returns:
-            list: History of the port separated by the direction regarding given sign
+            np.ndarray: History of the port separated by the direction regarding given sign
         """
         if sign in self.stream_value_split_by_direction:
-            return self.stream_value_split_by_direction[sign]
+            return self.stream_value_split_by_direction[sign][:self.history_len]
         else:
             return None
 
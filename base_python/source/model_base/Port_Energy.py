@@ -22,11 +22,7 @@ class Port_Energy(Port):
                          external_identifier=external_identifier)
 
         self.set_type_and_unit(port_type, unit)
-        self.port_results.port_history.setdefault(PhysicalQuantity.stream, [])
-
-    def reset_history(self):
-        super().reset_history()
-        self.port_results.port_history.setdefault(PhysicalQuantity.stream, [])
+        self.reset_history()
 
     def set_type_and_unit(self, port_type: StreamEnergy, unit: Unit = None):
         """
@@ -50,14 +46,6 @@ class Port_Energy(Port):
         else:
             logging.warning(f'Trying to change Port Type of port {self.port_results.port_id}')
 
-    def save_state(self):
-        """
-        Safes the actual stream value in the value history so it is possible to read the history later
-
-        """
-        super().save_state()
-        self.port_results.port_history[PhysicalQuantity.stream].append(self.stream)
-
     def set_all_properties(self, runcount: int, port: Port):
         """
         This function sets all properties compared to another given port. For Energy ports this is for now only
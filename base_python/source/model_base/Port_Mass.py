@@ -5,9 +5,12 @@ from base_python.source.basic.Units import Unit
 from base_python.source.model_base.Port import Port
 from base_python.source.basic import ModelSettings
 from base_python.source.helper import RefPropFluid
+from base_python.source.helper.PropertyService import property_service
+from base_python.source.helper.FluidStatePool import fluid_state_pool
 import os.path
 import math
 import sys
+import numpy as np
 
 from base_python.source.basic.Streamtypes import StreamDirection
 from ctREFPROP.ctREFPROP import REFPROPFunctionLibrary
@@ -42,6 +45,7 @@ class Port_Mass(Port):
         self.temperature = None
         self.pressure = None
         self.updated_fluid = 1
+        self.density = None
         self.value_profiles = {}
         self.mass_fraction = {}
 
@@ -58,21 +62,27 @@ class Port_Mass(Port):
 
         self.set_pressure(pressure)
         self.set_temperature(temperature)
-        self.port_results.port_history.setdefault(PhysicalQuantity.mass_fraction, [])
-        self.port_results.port_history.setdefault(PhysicalQuantity.pressure, [])
-        self.port_results.port_history.setdefault(PhysicalQuantity.temperature, [])
-        self.port_results.port_history.setdefault(PhysicalQuantity.stream, [])
+        self.reset_history()
 
-    def reset_history(self):
+    def reset_history(self, history_len: int = 0):
+        """
+        Resets the history of the port and preallocates the buffers of pressure, temperature and the mass fraction
+        matrix (timesteps x species in the order of get_mass_fraction_species()). Species which are added to the mass
+        fraction later get a new column in save_state.
+
+        Args:
+            history_len (int): Number of timesteps which will be saved
 
-        super().reset_history()
+        """
+        super().reset_history(history_len)
         self.property_status = {PhysicalQuantity.pressure: 1, PhysicalQuantity.temperature: 1,
                                 PhysicalQuantity.mass_fraction: 1, PhysicalQuantity.mass_stream: 1}
 
-        self.port_results.port_history.setdefault(PhysicalQuantity.mass_fraction, [])
-        self.port_results.port_history.setdefault(PhysicalQuantity.pressure, [])
-        self.port_results.port_history.setdefault(PhysicalQuantity.temperature, [])
-        self.port_results.port_history.setdefault(PhysicalQuantity.stream, [])
+        self.port_results.mass_fraction_species = self.get_mass_fraction_species()
+        self.port_results.port_history[PhysicalQuantity.mass_fraction] = np.full(
+            (history_len, len(self.port_results.mass_fraction_species)), np.nan)
+        self.port_results.port_history[PhysicalQuantity.pressure] = np.full(history_len, np.nan)
+        self.port_results.port_history[PhysicalQuantity.temperature] = np.full(history_len, np.nan)
 
     def set_type_and_unit(self, port_type: StreamMass, unit: Unit):
         """
@@ -186,7 +196,7 @@ class Port_Mass(Port):
         """
         if self.updated_fluid != 0:
             self._update_fluid()
-        return self.port_properties.rhomass()
+        return self.density
 
     def get_pressure(self) -> float:
         """
@@ -231,6 +241,14 @@ class Port_Mass(Port):
         """
         return self.mass_fraction
 
+    def get_mass_fraction_species(self) -> list:
+        """
+
+        Returns:
+            list: Molecule types of the mass fraction, which define the columns of the mass fraction history
+        """
+        return list(self.mass_fraction.keys())
+
     def get_mass_fraction_status(self) -> int:
         """
 
@@ -258,10 +276,34 @@ class Port_Mass(Port):
 
         """
         super().save_state()
-        self.port_results.port_history[PhysicalQuantity.mass_fraction].append(self.mass_fraction)
-        self.port_results.port_history[PhysicalQuantity.pressure].append(self.pressure)
-        self.port_results.port_history[PhysicalQuantity.temperature].append(self.temperature)
-        self.port_results.port_history[PhysicalQuantity.stream].append(self.stream)
+        index = self.history_len - 1
+        port_history = self.port_results.port_history
+        new_species = [species for species in self.mass_fraction
+                       if species not in self.port_results.mass_fraction_species]
+        if new_species:
+            self._add_mass_fraction_species(new_species, index)
+        port_history[PhysicalQuantity.mass_fraction][index] = [self.mass_fraction.get(species, 0)
+                                                               for species in self.port_results.mass_fraction_species]
+        if self.pressure is not None:
+            port_history[PhysicalQuantity.pressure][index] = self.pressure
+        if self.temperature is not None:
+            port_history[PhysicalQuantity.temperature][index] = self.temperature
+
+    def _add_mass_fraction_species(self, new_species: list, index: int):
+        """
+        Adds a column to the mass fraction history for every species which was not part of the mass fraction when the
+        history was reset. The species had a mass fraction of 0 in the timesteps which were saved before.
+
+        Args:
+            new_species (list): Molecule types which are not part of the history yet
+            index (int): Index of the actual timestep in the history
+
+        """
+        history = self.port_results.port_history[PhysicalQuantity.mass_fraction]
+        new_columns = np.full((history.shape[0], len(new_species)), np.nan)
+        new_columns[:index] = 0
+        self.port_results.port_history[PhysicalQuantity.mass_fraction] = np.hstack((history, new_columns))
+        self.port_results.mass_fraction_species = self.port_results.mass_fraction_species + list(new_species)
 
     def _update_fluid(self):
         """
@@ -269,22 +311,16 @@ class Port_Mass(Port):
 
         """
         if (self.temperature is not None) and (self.pressure is not None) and (self.mass_fraction != {}):
-            self.port_properties.set_mass_fractions(list(self.mass_fraction.values()))
-            self.port_properties.update(CoolProp.PT_INPUTS, self.pressure, self.temperature)
+            self.port_properties = self._create_fluid()  # borrow the state of the actual composition from the pool
+            self.density = property_service.get_property(self.port_properties, self.pressure, self.temperature,
+                                                         'rhomass', self.mass_fraction)
             self.updated_fluid = 0
 
     def _create_fluid(self) -> RefPropFluid:
         """
-        Creates the Refprop fluid using the saved properties in the stream
+        Borrows the Refprop fluid of the ports mass fractions from the shared pool of fluid states
 
         """
-        components_string = ""
-        fractions = []
-        if self.mass_fraction != {}:
-            components_string = '&'.join([key.name for key in self.mass_fraction.keys()])
-            fractions = list(self.mass_fraction.values())
-        else:
+        if self.mass_fraction == {}:
             logging.warning(f'No mass fraction given for Port {self.port_results.port_id} of type {self.port_results.port_type}')
-        my_abstract_state = AbstractState("REFPROP", components_string)
-        my_abstract_state.set_mole_fractions(fractions)
-        return my_abstract_state
+        return fluid_state_pool.get_state(self.mass_fraction)
@@ -0,0 +1,147 @@
+import logging
+import numpy as np
+
+
+class Mixin:
+    """
+    Step deduplication for models without time coupled components (no Storage or Storage_Gas). Timesteps with
+    identical profile and binary profile values share one solution, so only one representative timestep per signature
+    is solved by the stepwise branch solver and the histories are scattered back to the full horizon afterwards.
+
+    Scope:
+        This is not a vectorized whole-horizon solve. The branches are still solved timestep by timestep, the speedup
+        only comes from timesteps which repeat. Measured profiles of wind and PV hardly repeat: with the synthetic
+        hourly profiles of benchmarks/run_storage_dispatch.py 8634 of 8760 timesteps of Model_A are unique, so at most
+        1.4 % of the solves are saved. Models with a time coupled component anywhere (e.g. Model_B) fall back to the
+        stepwise solver as a whole, storage-free branches of these models are not solved separately. The gain is
+        limited to models driven by constant, block or clustered (e.g. typical day) profiles.
+
+    Note:
+        The results are only identical to the stepwise solver if the following preconditions hold:
+        - No component is time coupled (is_time_coupled), i.e. no state is carried from one timestep to the next
+        - The result of a timestep only depends on the value profiles and binary profiles of the ports. Inputs which
+          are not part of the signature, e.g. sizes, pressures or efficiencies changed between timesteps by user code,
+          are not detected
+        - Component histories are lists with one value per solved timestep, other histories are not expanded
+    """
+
+    def get_time_coupled_branches(self) -> list:
+        """
+
+        Returns:
+            list: Names of all branches which are connected to a time coupled component
+        """
+        time_coupled_branches = []
+        for branch_name, branch in self.branches.items():
+            if any(component.is_time_coupled() for component in branch.connected_components.values()):
+                time_coupled_branches.append(branch_name)
+        return time_coupled_branches
+
+    def check_steps_deduplicable(self) -> bool:
+        """
+        Checks whether timesteps can be deduplicated, which requires that no component of the model is time coupled
+
+        Returns:
+            bool: True if the step deduplication can be used for the model
+        """
+        time_coupled_branches = self.get_time_coupled_branches()
+        time_coupled_components = [name for name, component in self.components.items()
+                                   if component.is_time_coupled()]
+        if time_coupled_branches or time_coupled_components:
+            logging.info(f'Model "{self.modelname}" contains time coupled components {time_coupled_components} at '
+                         f'branches {time_coupled_branches}. Falling back to stepwise solver.')
+            return False
+        return True
+
+    def get_unique_step_count(self, iteration_count: int) -> int:
+        """
+        Counts the timesteps which have to be solved by the step deduplication
+
+        Args:
+            iteration_count (int): Number of timesteps of the model
+
+        Returns:
+            int: Number of unique timesteps or iteration_count if the steps can not be deduplicated
+        """
+        if not self.check_steps_deduplicable():
+            return iteration_count
+        signatures = self._get_step_signatures(iteration_count)
+        if signatures is None:
+            return iteration_count
+        return len(signatures[0])
+
+    def run_deduplicated_steps(self, iteration_count: int):
+        """
+        Solves all timesteps of the model with step deduplication. Timesteps are grouped by their signature of profile
+        values, only the first timestep of each group is solved and the histories of ports and components are expanded
+        afterwards
+
+        Args:
+            iteration_count (int): Number of timesteps of the model
+
+        """
+        signatures = self._get_step_signatures(iteration_count)
+        if signatures is None:
+            self._run_steps(range(iteration_count))
+            return
+
+        representative_steps, step_index = signatures
+        logging.debug(f'Step deduplication: {len(representative_steps)} unique timesteps of {iteration_count}')
+
+        self._run_steps(representative_steps.tolist())
+        self._expand_histories(step_index)
+
+    def _get_step_signatures(self, iteration_count: int):
+        """
+        Creates the signature of every timestep, which consists of all stream, pressure and temperature profiles and
+        binary profiles of the ports. The first timestep always gets a signature of its own, because the port states
+        are initialised in this timestep.
+
+        Args:
+            iteration_count (int): Number of timesteps of the model
+
+        Returns:
+            tuple: Chronologically sorted representative timesteps and the index of the representative for every
+                   timestep or None if a profile is shorter than the horizon
+        """
+        columns = [np.arange(iteration_count) == 0]
+        for component_name, component in self.components.items():
+            for port in component.ports.values():
+                profiles = [profile for direction_profiles in port.value_profiles.values()
+                            for profile in direction_profiles.values()]
+                profiles.extend(port.binary_profile.values())
+                for profile in profiles:
+                    profile = np.asarray(profile, dtype=float)
+                    if len(profile) < iteration_count:
+                        logging.warning(f'Profile of port {port.get_id()} of component {component_name} is shorter '
+                                        f'than the horizon of {iteration_count} steps. Falling back to stepwise solver.')
+                        return None
+                    columns.append(profile[:iteration_count])
+
+        signature = np.column_stack(columns)
+        _, first_steps, step_index = np.unique(signature, axis=0, return_index=True, return_inverse=True)
+
+        """Sort the groups by their first occurrence so the representatives are solved in chronological order"""
+        order = np.argsort(first_steps)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        return first_steps[order], rank[step_index.reshape(-1)]
+
+    def _expand_histories(self, step_index: np.ndarray):
+        """
+        Expands all histories which were saved for the representative timesteps to the full horizon
+
+        Args:
+            step_index (np.ndarray): Index of the representative timestep for every timestep of the horizon
+
+        """
+        unique_steps = int(step_index.max()) + 1
+        step_list = step_index.tolist()
+
+        for component in self.components.values():
+            component_history = component.component_technical_results.component_history
+            for key, values in component_history.items():
+                if isinstance(values, list) and len(values) == unique_steps:
+                    component_history[key] = [values[i] for i in step_list]
+            for port in component.ports.values():
+                port.expand_history(step_index)
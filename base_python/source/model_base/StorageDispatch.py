@@ -0,0 +1,199 @@
+import time
+import logging
+import numpy as np
+import scipy.sparse as sparse
+from scipy.optimize import linprog
+from base_python.source.basic.Streamtypes import StreamEnergy, StreamMass, StreamDirection
+from base_python.source.basic.Quantities import PhysicalQuantity
+from base_python.source.basic.CustomErrors import ModelError
+
+
+class Mixin:
+    """
+    Perfect-foresight dispatch of value chains with renewable sources, electrolyser and gas storage (e.g. value chain
+    D). Instead of the greedy decision of the branch solver at every timestep, the whole horizon is formulated as one
+    linear program over electrolyser load, storage charge and discharge, hydrogen consumption and the exchange with
+    the electric and hydrogen grid. The program is assembled from sparse matrices and solved by HiGHS. The optimal
+    schedules are set as port profiles of electrolyser and storage, so the following run() follows them and calculates
+    the physical details (efficiency curve, pressures, pipeline).
+
+    Note:
+        The electrolyser is linearised with its efficiency at full load and its minimum load is not considered, since
+        both would require binary variables. Deviations of the simulation from the schedule are balanced by the grids.
+    """
+    DISPATCH_VARIABLES = ('electrolyser', 'feed_in', 'electricity_purchase', 'charge', 'discharge', 'storage_level',
+                          'consumption', 'hydrogen_purchase', 'hydrogen_sale')
+
+    def optimize_storage_dispatch(self, electrolyser: str, storage: str, consumer: str, sources: list,
+                                  electric_grid: str = None, hydrogen_grid: str = None,
+                                  electricity_price: float = 0.25, feed_in_price: float = 0.0,
+                                  hydrogen_price: float = 10.0, hydrogen_sale_price: float = 0.0,
+                                  hydrogen_value: float = 5.0, apply_schedules: bool = True) -> dict:
+        """
+        Optimizes the dispatch of electrolyser and storage for the whole horizon of the model
+
+        Args:
+            electrolyser (str): Name of the electrolyser
+            storage (str): Name of the gas storage
+            consumer (str): Name of the hydrogen consumer. With stream profile its demand has to be met, without profile
+                            it takes up to its size
+            sources (list): Names of the renewable sources of the electric branch, every source needs a stream profile
+            electric_grid (str): Name of the electric grid, None if the electric branch has no grid
+            hydrogen_grid (str): Name of the hydrogen grid, None if the hydrogen branch has no grid
+            electricity_price (float): Price of electricity from the grid in €/kWh
+            feed_in_price (float): Revenue of electricity fed into the grid in €/kWh
+            hydrogen_price (float): Price of hydrogen from the grid in €/kg
+            hydrogen_sale_price (float): Revenue of hydrogen fed into the grid in €/kg
+            hydrogen_value (float): Value of hydrogen delivered to a consumer without demand profile in €/kg
+            apply_schedules (bool): Boolean whether the schedules are set as profiles of electrolyser and storage
+
+        Returns:
+            dict: Schedules of all variables (see DISPATCH_VARIABLES) as arrays, the objective value in € and the
+                  duration of the solution in s
+        """
+        start = time.perf_counter()
+        step_count = self.profile_len
+        if step_count is None:
+            raise ModelError('The dispatch can only be optimized for models with profiles')
+        time_step = self.basic_technical_settings.time_resolution / 60  # [h]
+
+        renewable_power = np.zeros(step_count)
+        for source in sources:
+            renewable_power += self._get_dispatch_stream_profile(self.components[source], StreamEnergy.ELECTRIC,
+                                                                 StreamDirection.stream_out_of_component, step_count)
+
+        """Electrolyser at full load: electric power [kW] and hydrogen per electric power [kg/kW per timestep]"""
+        electrolyser_component = self.components[electrolyser]
+        electric_limits = electrolyser_component.get_ports_by_type_and_sign(
+            StreamEnergy.ELECTRIC, StreamDirection.stream_into_component).get_stream_limits()
+        hydrogen_limits = electrolyser_component.get_ports_by_type_and_sign(
+            StreamMass.HYDROGEN, StreamDirection.stream_out_of_component).get_stream_limits()
+        electrolyser_power = -electric_limits[0]
+        hydrogen_yield = hydrogen_limits[1] / electrolyser_power
+
+        storage_component = self.components[storage]
+        efficiency = storage_component.efficiency
+        stream_limit = storage_component.power_to_energy(storage_component.charge_power)
+        lower_limit, lower_level, upper_limit, upper_level = storage_component._get_horizon_level_limits()
+        level_bounds = (max(0, lower_level), upper_level if storage_component.size is None
+                        else min(storage_component.size, upper_level))
+        initial_level = 0 if storage_component.buffer_init is None else storage_component.buffer_init
+
+        consumer_component = self.components[consumer]
+        demand_given = self._has_dispatch_stream_profile(consumer_component, StreamMass.HYDROGEN,
+                                                         StreamDirection.stream_into_component)
+        if demand_given:
+            demand = -self._get_dispatch_stream_profile(consumer_component, StreamMass.HYDROGEN,
+                                                        StreamDirection.stream_into_component, step_count)
+            consumption_bounds = (demand, demand)
+        else:
+            consumption_bounds = (0, self._get_dispatch_size(consumer_component))
+
+        bounds = {'electrolyser': (0, electrolyser_power),
+                  'feed_in': (0, self._get_dispatch_size(self.components[electric_grid]) if electric_grid else np.inf),
+                  'electricity_purchase': (0, self._get_dispatch_size(self.components[electric_grid])
+                                           if electric_grid else 0),
+                  'charge': (0, stream_limit),
+                  'discharge': (0, stream_limit),
+                  'storage_level': level_bounds,
+                  'consumption': consumption_bounds,
+                  'hydrogen_purchase': (0, self._get_dispatch_size(self.components[hydrogen_grid])
+                                        if hydrogen_grid else 0),
+                  'hydrogen_sale': (0, self._get_dispatch_size(self.components[hydrogen_grid])
+                                    if hydrogen_grid else 0)}
+        costs = {'electrolyser': 0,
+                 'feed_in': -feed_in_price * time_step,
+                 'electricity_purchase': electricity_price * time_step,
+                 'charge': 0,
+                 'discharge': 0,
+                 'storage_level': 0,
+                 'consumption': 0 if demand_given else -hydrogen_value,
+                 'hydrogen_purchase': hydrogen_price,
+                 'hydrogen_sale': -hydrogen_sale_price}
+
+        """Equality constraints, every block column belongs to one variable of all timesteps:
+            electric branch:    electrolyser + feed_in - purchase = renewable power
+            hydrogen branch:    yield * electrolyser + discharge + purchase - charge - sale - consumption = 0
+            storage:            level[t] - level[t-1] - efficiency * charge + discharge / efficiency = 0"""
+        identity = sparse.identity(step_count, format='csr')
+        zero = sparse.csr_matrix((step_count, step_count))
+        level_difference = identity - sparse.eye(step_count, k=-1, format='csr')
+        blocks = [[identity, identity, -identity, zero, zero, zero, zero, zero, zero],
+                  [hydrogen_yield * identity, zero, zero, -identity, identity, zero, -identity, identity, -identity],
+                  [zero, zero, zero, -efficiency * identity, identity / efficiency, level_difference, zero, zero,
+                   zero]]
+        equality_matrix = sparse.bmat(blocks, format='csc')
+        equality_vector = np.concatenate([renewable_power, np.zeros(2 * step_count)])
+        equality_vector[2 * step_count] = initial_level
+
+        cost_vector = np.concatenate([np.full(step_count, float(costs[name])) for name in self.DISPATCH_VARIABLES])
+        lower_bounds = np.concatenate([np.broadcast_to(np.asarray(bounds[name][0], dtype=float), step_count)
+                                       for name in self.DISPATCH_VARIABLES])
+        upper_bounds = np.concatenate([np.broadcast_to(np.asarray(bounds[name][1], dtype=float), step_count)
+                                       for name in self.DISPATCH_VARIABLES])
+
+        result = linprog(cost_vector, A_eq=equality_matrix, b_eq=equality_vector,
+                         bounds=np.column_stack([lower_bounds, upper_bounds]), method='highs')
+        if not result.success:
+            raise ModelError(f'Storage dispatch of model "{self.modelname}" could not be optimized: {result.message}')
+
+        schedules = {name: np.maximum(result.x[i * step_count:(i + 1) * step_count], 0)
+                     for i, name in enumerate(self.DISPATCH_VARIABLES)}
+        schedules['objective'] = result.fun
+        schedules['duration'] = time.perf_counter() - start
+        logging.info(f'Storage dispatch of model "{self.modelname}" optimized for {step_count} timesteps in '
+                     f'{schedules["duration"]:.2f} s, objective {result.fun:.2f} €')
+
+        if apply_schedules:
+            self.apply_storage_dispatch(electrolyser, storage, schedules)
+        return schedules
+
+    def apply_storage_dispatch(self, electrolyser: str, storage: str, schedules: dict):
+        """
+        Sets the optimized schedules as stream profiles of the electrolyser and the storage, which become active
+        components
+
+        Args:
+            electrolyser (str): Name of the electrolyser
+            storage (str): Name of the gas storage
+            schedules (dict): Schedules of optimize_storage_dispatch
+
+        """
+        self.add_profile_to_component_port(electrolyser, StreamEnergy.ELECTRIC,
+                                           StreamDirection.stream_into_component,
+                                           (-schedules['electrolyser']).tolist(), PhysicalQuantity.stream)
+        self.components[electrolyser].set_properties()
+        self.add_profile_to_component_port(storage, StreamMass.HYDROGEN, StreamDirection.stream_into_component,
+                                           (-schedules['charge']).tolist(), PhysicalQuantity.stream)
+        self.add_profile_to_component_port(storage, StreamMass.HYDROGEN, StreamDirection.stream_out_of_component,
+                                           schedules['discharge'].tolist(), PhysicalQuantity.stream)
+
+    @staticmethod
+    def _has_dispatch_stream_profile(component, stream_type, sign: StreamDirection) -> bool:
+        """
+        Returns:
+            bool: True if the port of the component has a stream profile
+        """
+        port = component.get_ports_by_type_and_sign(stream_type, sign)
+        return PhysicalQuantity.stream in port.value_profiles.get(sign, {})
+
+    @staticmethod
+    def _get_dispatch_stream_profile(component, stream_type, sign: StreamDirection, step_count: int) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Stream profile of the port for the dispatch horizon
+        """
+        port = component.get_ports_by_type_and_sign(stream_type, sign)
+        profiles = port.value_profiles.get(sign, {})
+        if PhysicalQuantity.stream not in profiles:
+            raise ModelError(f'Port {port.get_id()} of component {component.component_id} has no stream profile, '
+                             f'which is required by the storage dispatch')
+        profile = np.asarray(profiles[PhysicalQuantity.stream][:step_count], dtype=float)
+        if profile.size < step_count:
+            raise ModelError(f'Stream profile of port {port.get_id()} of component {component.component_id} has '
+                             f'{profile.size} values instead of {step_count}')
+        return profile
+
+    @staticmethod
+    def _get_dispatch_size(component) -> float:
+        return np.inf if component.size is None else abs(component.size)
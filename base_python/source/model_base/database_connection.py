@@ -1,75 +1,120 @@
+import copy
 import logging
 import os
-import sqlite3
 
 from base_python.source.basic import ModelSettings
 from base_python.source.basic.Quantities import PhysicalQuantity, EconomicalQuantities, get_unit_of_quantity
 from base_python.source.basic.Streamtypes import StreamMass, StreamEnergy
-import sqlite3 as sql  # installed as pysqlite3
-import mysql.connector
+from base_python.source.helper.DatabaseBackend import SQLiteBackend, MySQLBackend, get_database_backend
+from base_python.source.helper.DatabaseSnapshot import DatabaseSnapshot, get_database_snapshot, \
+    get_cached_database_snapshot, set_database_snapshot
 
 
 class Mixin:
+    USE_DATABASE_SNAPSHOT = True  # True if the components load their values from the snapshot shared by all models
+
     def __init__(self):
-        self.database_connection = None
-        self.database_cursor = None
+        self.database_handle = None
+        self.database_key = None
+        self.database_snapshot = None
 
     @staticmethod
-    def _server_connection(database_name: str):
+    def _server_configuration(database_name: str) -> dict:
         """
         Contains the main information to connect the model to the database
-        returns connector object for alter access to content
+
+        Returns:
+            dict: Connection parameters of mysql.connector
         """
-        config = {
+        return {
             'host': '',
             'user': '',
             'password': '',
             'database': database_name
         }
-        try:
-            c = mysql.connector.connect(**config)
-            return c
-        except:
-            raise ConnectionError(f'No Connection to Database "{database_name}" possible. Check if VPN is enabled or'
-                                  f'if the name is correct.')
 
     @staticmethod
-    def _local_connection(database_name: str):
+    def _find_local_database(database_name: str) -> str:
+        """
+        Searches the sqlite file of the database in the folder data of the working directory and of all its parent
+        directories
+
+        Returns:
+            str: Absolute path of the sqlite file
+        """
         path_str = f'data/{database_name}.sqlite'
         path = os.path.abspath(path_str)
 
-        while True:
-            try:
-                c = sql.connect(path)
-                break
-            except sqlite3.OperationalError:
-                pass
-            finally:
-                path_str = '../' + path_str
-                path_old = path
-                path = os.path.abspath(path_str)
+        while not os.path.isfile(path):
+            path_str = '../' + path_str
+            path_old = path
+            path = os.path.abspath(path_str)
 
             if path == path_old:
                 raise ConnectionError(f'No Connection to local Database "{database_name}" possible. Check if '
                                       f'name or location (data\\{database_name}.sqlite) is correct.')
 
-        return c
+        return path
 
     def connect_to_server_database(self, database_name: str):
         """
-        Connects the model with the MySQL database and raises an error if the connection was not successfull
+        Acquires a handle of the connection pool of the MySQL database and raises an error if the connection was not
+        successfull
         Returns:
         """
-        self.database_connection = self._server_connection(database_name)
-        self.database_cursor = self.database_connection.cursor()
+        self.database_key = ('server', database_name)
+        backend = get_database_backend(self.database_key,
+                                       lambda: MySQLBackend(self._server_configuration(database_name)))
+        self.database_handle = backend.acquire()
 
     def connect_to_local_database(self, database_name: str):
         """
-        Connects the model to a local sqlite database file and raises an error if the connection was not successfull
+        Acquires a handle of the connection pool of a local sqlite database file and raises an error if the connection
+        was not successfull
         Returns:
         """
-        self.database_connection = self._local_connection(database_name)
-        self.database_cursor = self.database_connection.cursor()
+        self.database_key = ('local', database_name)
+        backend = get_database_backend(self.database_key,
+                                       lambda: SQLiteBackend(self._find_local_database(database_name), database_name))
+        self.database_handle = backend.acquire()
+
+    def connect_to_memory_database(self, database_name: str):
+        """
+        Acquires a handle of an in-process database, which has to be set before with
+        DatabaseBackend.set_database_backend(('memory', database_name), InMemoryBackend(...))
+        Returns:
+        """
+        self.database_key = ('memory', database_name)
+        backend = get_database_backend(self.database_key)
+        if backend is None:
+            raise ConnectionError(f'No in-process Database "{database_name}" set')
+        self.database_handle = backend.acquire()
+
+    def load_local_database_snapshot(self, database_name: str):
+        """
+        Loads the snapshot of a local database from its binary cache, which contains the parsed stream types and the
+        component tables, so the model does not connect to the sqlite file at all. If the cache is missing or does not
+        belong to the actual content of the sqlite file, the database is read once and the cache is rebuilt.
+
+        Args:
+            database_name (str): Name of the sqlite file in the folder data
+
+        """
+        database_path = self._find_local_database(database_name)
+        self.database_key = ('local', database_name)
+        self.database_snapshot = get_cached_database_snapshot(self.database_key, database_path)
+        if self.database_snapshot is None:
+            logging.info(f'Cache of database {database_name} is rebuilt')
+            self.connect_to_local_database(database_name)
+            self.load_basic_database()
+            self.database_snapshot = DatabaseSnapshot.from_database(
+                self.database_handle, stream_types=copy.deepcopy(ModelSettings.stream_types))
+            self.close_database_connection()
+            try:
+                self.database_snapshot.save(database_path)
+            except OSError as error:
+                logging.warning(f'Cache of database {database_name} could not be saved: {error}')
+            set_database_snapshot(self.database_key, self.database_snapshot)
 
     def load_basic_database(self):
         """
@@ -78,15 +123,12 @@ class Mixin:
         """
         # GET STREAMS FROM DATABASE
         # TODO: Wie gehen wir mit der Variable stream_types um, die übergreifend von allen Modulen erreichbar sein muss
-        if self.database_cursor is not None:
+        if self.database_snapshot is not None and self.database_snapshot.stream_types is not None:
+            ModelSettings.stream_types = copy.deepcopy(self.database_snapshot.stream_types)
+        elif self.database_handle is not None:
             ModelSettings.stream_types = {}
 
-            attributes = ['*']
-            table = 'STREAM_TYPES'
-            self.database_cursor.execute("SELECT " + ", ".join(attributes) +
-                                         " FROM " + table)
-            result = self.database_cursor.fetchall()
-            field_names = [i[0] for i in self.database_cursor.description]
+            field_names, result = self.database_handle.select('STREAM_TYPES')
             for single_result in result:
 
                 ModelSettings.stream_types[StreamMass[single_result[0]]] = {}
@@ -98,12 +140,7 @@ class Mixin:
                             mass_fraction][StreamMass[field_names[index]]] = mass_fraction
 
             # GET STREAM PROPERTIES
-            attributes = ['*']
-            table = 'STREAM_PROPERTIES'
-            self.database_cursor.execute("SELECT " + ", ".join(attributes) +
-                                         " FROM " + table)
-            result = self.database_cursor.fetchall()
-            field_names = [i[0] for i in self.database_cursor.description]
+            field_names, result = self.database_handle.select('STREAM_PROPERTIES')
             for single_result in result:
                 for index, value in enumerate(single_result):
                     if index > 0:
@@ -126,20 +163,27 @@ class Mixin:
 
     def load_database(self):
         """
-        Loads the values for the connected components from the database
+        Loads the values for the connected components from the database. With USE_DATABASE_SNAPSHOT the component
+        tables are read only once per process and all further models take the values from the shared snapshot.
 
         """
         # GET COMPONENT KPI
-        if self.database_cursor is not None:
-            for component in self.components.values():
-                component.load_database(self.database_cursor)
+        try:
+            if self.database_snapshot is None and self.database_handle is not None and self.USE_DATABASE_SNAPSHOT:
+                self.database_snapshot = get_database_snapshot(self.database_key, self.database_handle)
+            database = self.database_snapshot if self.database_snapshot is not None else self.database_handle
+            if database is not None:
+                for component in self.components.values():
+                    component.load_database(database)
+        finally:
+            """The connection goes back to the pool even if a component fails to load its values"""
             self.close_database_connection()
 
     def close_database_connection(self):
         """
-        Closes the database connection and disconnects database and model
+        Gives the database connection back to the connection pool and disconnects database and model
 
         """
-        if self.database_cursor is not None:
-            self.database_cursor.close()
-            self.database_connection.close()
+        if self.database_handle is not None:
+            self.database_handle.release()
+            self.database_handle = None
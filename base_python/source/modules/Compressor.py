@@ -4,8 +4,12 @@ import random
 from base_python.source.model_base.Port_Mass import Port_Mass
 from base_python.source.basic import ModelSettings
 from base_python.source.helper import RefPropFluid
+from base_python.source.helper.PropertyService import property_service
+from base_python.source.helper.TabulatedFluid import TabulatedFluid
+from base_python.source.helper.CompressorMap import CompressorMap
 from base_python.source.basic import Database
 import math
+import numpy as np
 from ctREFPROP.ctREFPROP import REFPROPFunctionLibrary
 import CoolProp.CoolProp as CoolProp
 from CoolProp.CoolProp import PropsSI
@@ -13,8 +17,10 @@ from CoolProp import AbstractState
 from enum import Enum, auto
 from base_python.source.basic.Streamtypes import StreamEnergy, StreamMass, StreamDirection
 from base_python.source.basic.Units import Unit
+from base_python.source.basic.Settings import PropertyBackend
 from base_python.source.basic.Quantities import PhysicalQuantity
 from base_python.source.model_base.Dataclasses.TechnicalDataclasses import GenericTechnicalInput
+from base_python.source.basic.CustomErrors import ComponentError
 
 import logging
 
@@ -28,7 +34,8 @@ class Compressor(GenericUnit):
                  new_investment=False,
                  compression_efficiencies={'mechanical': 0.9, 'isentropic': 0.72, 'electrical': 0.98},
                  economical_parameters=None, stages=1, cooling_temperature=3000, pressure_out=None,
-                 generic_technical_input: GenericTechnicalInput = None):
+                 generic_technical_input: GenericTechnicalInput = None,
+                 property_backend: PropertyBackend = PropertyBackend.REFPROP):
 
         """
 
@@ -45,6 +52,7 @@ class Compressor(GenericUnit):
         given values from database are taken in € stages (int): Number of compression stages for calculation
         cooling_temperature (float): Temperature which has to be reached by cooling after every step in K
         pressure_out (float): Pressure of the output stream can be set fix here if necessary in Pa
+        property_backend (PropertyBackend): Backend of the gas properties, REFPROP or precomputed tables
 
         """
         if size == None:
@@ -53,6 +61,7 @@ class Compressor(GenericUnit):
                          new_investment=new_investment, economical_parameters=economical_parameters,
                          stream_type=stream_type, generic_technical_input=generic_technical_input)
         self.pressure_out_init = pressure_out
+        self.property_backend = property_backend
         self.pressure_in = None
         self.temperature_in = None
         self.pressure_out = None
@@ -65,10 +74,12 @@ class Compressor(GenericUnit):
         self.temperature_critical = None
         self.isentropic_exponent = None
         self.stream_limit = max_stream  # TODO: Hier ist unter Umständen eine Umrechnung anhand der Time-resolution notwendig
-        self.temporary_fluids = {}
+        self.compression_fluid = None
+        self.compressibility_factor_norm = None
         self.cooling_temperature = cooling_temperature
         self.mass_fraction = {}
         self.mass_ports = {}
+        self.compression_map = None  # precomputed performance map, see use_compression_map
 
     def set_properties(self):
         """
@@ -107,7 +118,9 @@ class Compressor(GenericUnit):
         """
 
         self.mass_fraction.update(mass_fraction)
-        self.compression_fluid_norm = RefPropFluid.create_fluid(mass_fraction, temperature=273.15, pressure=101325)
+        self.compression_fluid_norm = RefPropFluid.create_fluid(mass_fraction, temperature=273.15, pressure=101325,
+                                                                backend=self.property_backend)
+        self.compression_fluid = RefPropFluid.create_fluid(mass_fraction, backend=self.property_backend)
         self._set_gas_parameters_for_calculation()
 
     def _set_gas_parameters_for_calculation(self):
@@ -119,6 +132,7 @@ class Compressor(GenericUnit):
         self.specific_gas_constant = self._get_specific_gas_constant()
         self.temperature_critical = self.compression_fluid_norm.T_critical()
         self.pressure_critical = self.compression_fluid_norm.p_critical()
+        self.compressibility_factor_norm = self.compression_fluid_norm.compressibility_factor()
 
     def _get_specific_gas_constant(self):
         """
@@ -143,8 +157,8 @@ class Compressor(GenericUnit):
             float: Real gas factor of the fluid
         """
 
-        fluid = self._get_compression_fluid(pressure, temperature)
-        z = fluid.compressibility_factor() / self.compression_fluid_norm.compressibility_factor()
+        z = self._get_compression_fluid_property(pressure, temperature, 'compressibility_factor') / \
+            self.compressibility_factor_norm
         return z
 
     def _get_isentropic_exponent(self, pressure, temperature):
@@ -158,8 +172,8 @@ class Compressor(GenericUnit):
         Returns:
             float: Isentropic exponent of the fluid
         """
-        fluid = self._get_compression_fluid(pressure, temperature)
-        return fluid.cpmass() / fluid.cvmass()
+        return self._get_compression_fluid_property(pressure, temperature, 'cpmass') / \
+            self._get_compression_fluid_property(pressure, temperature, 'cvmass')
 
     def _get_specific_heat_capacity(self, pressure, temperature):
         """
@@ -172,28 +186,83 @@ class Compressor(GenericUnit):
         Returns:
             float: Specific heat capacity of the fluid
         """
-        fluid = self._get_compression_fluid(pressure, temperature)
-        return fluid.cpmass()
+        return self._get_compression_fluid_property(pressure, temperature, 'cpmass')
 
-    def _get_compression_fluid(self, pressure, temperature):
+    def _get_compression_fluid_property(self, pressure, temperature, property_name):
         """
-        Necessary method to get all properties for the right thermodynamical state. If the state already has been calculated its returned by the hash
+        Necessary method to get a property of the fluid at the right thermodynamical state. The properties are cached by
+        the property service, so the same state is only calculated once by RefProp
 
         Args:
             pressure (float): Pressure of the fluid in Pa
             temperature (float): Temperature of the fluid in K
+            property_name (str): Name of the property of the RefProp fluid
 
         Returns:
-            object: The fluid state to get the necessary parameters
+            float: Value of the property
         """
+        return property_service.get_property(self.compression_fluid, pressure, temperature, property_name,
+                                             self.mass_fraction)
 
-        key = hash(
-            tuple(list(self.mass_fraction.keys()) + list(self.mass_fraction.values()) + [pressure] + [temperature]))
-        fluid = self.temporary_fluids.get(key)
-        if fluid is None:
-            fluid = RefPropFluid.create_fluid(self.mass_fraction, pressure=pressure, temperature=temperature)
-            self.temporary_fluids[key] = fluid
-        return fluid
+    def _get_compression_fluid_property_array(self, pressure, temperature, property_name):
+        """
+        Array version of _get_compression_fluid_property. Tabulated fluids are evaluated in one vectorized call, for
+        REFPROP every state is requested from the property service
+
+        Args:
+            pressure (np.ndarray): Pressures of the fluid in Pa
+            temperature (np.ndarray): Temperatures of the fluid in K
+            property_name (str): Name of the property of the RefProp fluid
+
+        Returns:
+            np.ndarray: Values of the property
+        """
+        pressure, temperature = np.broadcast_arrays(np.asarray(pressure, dtype=float),
+                                                    np.asarray(temperature, dtype=float))
+        if isinstance(self.compression_fluid, TabulatedFluid) and property_name in TabulatedFluid.PROPERTIES:
+            return np.asarray(self.compression_fluid.evaluate(property_name, pressure, temperature,
+                                                              component_id=self.component_id))
+        return np.array([self._get_compression_fluid_property(p, t, property_name)
+                         for p, t in zip(pressure.ravel().tolist(), temperature.ravel().tolist())]).reshape(pressure.shape)
+
+    def _get_isentropic_exponent_array(self, pressure, temperature):
+        if isinstance(self.compression_fluid, TabulatedFluid):
+            return self._get_compression_fluid_property_array(pressure, temperature, 'isentropic_exponent')
+        return self._get_compression_fluid_property_array(pressure, temperature, 'cpmass') / \
+            self._get_compression_fluid_property_array(pressure, temperature, 'cvmass')
+
+    def _get_real_gas_factor_array(self, pressure, temperature):
+        return self._get_compression_fluid_property_array(pressure, temperature, 'compressibility_factor') / \
+            self.compressibility_factor_norm
+
+    def use_compression_map(self, pressure_in_range: tuple, pressure_out_range: tuple, temperature_range: tuple,
+                            number_points: tuple = (40, 60, 20)):
+        """
+        Builds a performance map of the compressor for the actual composition, time resolution, stages, efficiencies
+        and cooling temperature, which replaces the stage calculation by an interpolation
+
+        Args:
+            pressure_in_range (tuple): Minimum and maximum inlet pressure in Pa
+            pressure_out_range (tuple): Minimum and maximum outlet pressure in Pa
+            temperature_range (tuple): Minimum and maximum inlet temperature in K
+            number_points (tuple): Number of grid points of inlet pressure, outlet pressure and temperature
+
+        """
+        if self.compression_fluid is None or self.time_resolution is None:
+            raise ComponentError(f'Mass fraction and time_resolution of compressor {self.component_id} have to be set '
+                                 f'before the compression map is built')
+        self.compression_map = CompressorMap.build(self, pressure_in_range=pressure_in_range,
+                                                   pressure_out_range=pressure_out_range,
+                                                   temperature_range=temperature_range, number_points=number_points)
+
+    def set_compression_map(self, compression_map: CompressorMap = None):
+        """
+        Args:
+            compression_map (CompressorMap): Performance map which has been built or loaded before, None to calculate
+                                             the stages again
+
+        """
+        self.compression_map = compression_map
 
     def check_kwargs(self, kwargs):
         """
@@ -298,42 +367,115 @@ class Compressor(GenericUnit):
         Returns:
             tuple: Tuple of (compression_power, cooling power)
         """
+        if self.compression_map is not None and not self.compression_map.is_valid_for(
+                self.mass_fraction, self.time_resolution, self.number_stages, self.compression_efficiencies,
+                self.cooling_temperature):
+            logging.warning(f'Compression map of compressor {self.component_id} does not match the actual mass '
+                            f'fraction, time_resolution, stages, efficiencies or cooling temperature and is not used '
+                            f'anymore')
+            self.compression_map = None
+        if self.compression_map is not None:
+            compression_power, cooling_power, self.temperature_out = self.compression_map.evaluate(
+                mass_flow, temperature_in, pressure_in, pressure_out, component_id=self.component_id)
+        elif all(isinstance(value, (int, float)) for value in (mass_flow, temperature_in, pressure_in, pressure_out)):
+            compression_power, cooling_power, self.temperature_out = self._calculate_compression_power_scalar(
+                mass_flow, temperature_in, pressure_in, pressure_out)
+        else:
+            compression_power, cooling_power, self.temperature_out = self.calculate_compression_power_array(
+                mass_flow, temperature_in, pressure_in, pressure_out)
+        return (compression_power, cooling_power)
+
+    def _calculate_compression_power_scalar(self, mass_flow: float, temperature_in: float, pressure_in: float,
+                                            pressure_out: float) -> tuple:
+        """
+        Scalar version of calculate_compression_power_array for the single state of one timestep, which does not
+        create arrays
+
+        Args:
+            mass_flow (float): Mass flow in kg/time_resolution
+            temperature_in (float): Inlet temperature of the compression in K
+            pressure_in (float): Inlet pressure of the compression in Pa
+            pressure_out (float): Outlet pressure of the compression in Pa
+
+        Returns:
+            tuple: Tuple of (compression_power in kW, cooling power in kW, outlet temperature in K)
+        """
+        stage_compression_ratio = (pressure_out / pressure_in) ** (1 / self.number_stages)
+        compression_power = 0.0
+        stage_pressure_out = pressure_in
+        stage_temperature_out = temperature_in
+        for stage in range(self.number_stages):
+            stage_pressure_in = stage_pressure_out
+            stage_temperature_in = stage_temperature_out
+            if isinstance(self.compression_fluid, TabulatedFluid):
+                isentropic_exponent_in = float(self.compression_fluid.evaluate(
+                    'isentropic_exponent', stage_pressure_in, stage_temperature_in, component_id=self.component_id))
+            else:
+                isentropic_exponent_in = self._get_isentropic_exponent(stage_pressure_in, stage_temperature_in)
+            real_gas_factor_in = float(self._get_real_gas_factor(pressure=stage_pressure_in,
+                                                                 temperature=stage_temperature_in))
+            compression_power += self._calculate_stage_compression_power(isentropic_exponent_in, temperature_in,
+                                                                         self.specific_gas_constant,
+                                                                         real_gas_factor_in, mass_flow,
+                                                                         stage_compression_ratio)
+            stage_pressure_out = pressure_in * stage_compression_ratio
+            stage_temperature_out = self._get_compression_temperature(temperature_in, isentropic_exponent_in,
+                                                                      stage_compression_ratio)
+        """Every stage is cooled from the inlet temperature at the pressure after the first stage"""
+        cooling_power = self.number_stages * self._calculate_stage_cooling_power(
+            temperature_in, pressure_in * stage_compression_ratio, mass_flow)
+        if self.compression_efficiencies != None:
+            for value in self.compression_efficiencies.values():
+                compression_power /= value
+        return float(compression_power), float(cooling_power), float(stage_temperature_out)
+
+    def calculate_compression_power_array(self, mass_flow, temperature_in, pressure_in, pressure_out) -> tuple:
+        """
+        Calculates compression power, cooling power and outlet temperature for scalars or arrays of mass flows and
+        states, e.g. all timesteps of a year in one call. The stages are calculated for all elements at once.
+
+        Args:
+            mass_flow (float, np.ndarray): Mass flow in kg/time_resolution
+            temperature_in (float, np.ndarray): Inlet temperature of the compression in K
+            pressure_in (float, np.ndarray): Inlet pressure of the compression in Pa
+            pressure_out (float, np.ndarray): Outlet pressure of the compression in Pa
+
+        Returns:
+            tuple: Tuple of (compression_power in kW, cooling power in kW, outlet temperature in K)
+        """
+        scalar = all(np.ndim(value) == 0 for value in (mass_flow, temperature_in, pressure_in, pressure_out))
+        mass_flow, temperature_in, pressure_in, pressure_out = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (mass_flow, temperature_in, pressure_in, pressure_out)))
 
         # mass_flow = mass_flow / (self.time_resolution * 60)  # Calculate mass flow per second
         total_compression_ratio = pressure_out / pressure_in
         stage_compression_ratio = total_compression_ratio ** (1 / self.number_stages)
-        stage_compression_power = []
-        stage_temperatures_out = []
-        stage_cooling_power = []
+        compression_power = np.zeros(mass_flow.shape)
         stage_pressure_out = pressure_in
         stage_temperature_out = temperature_in
         for stage in range(self.number_stages):
             stage_pressure_in = stage_pressure_out
             stage_temperature_in = stage_temperature_out
-            isentropic_exponent_in = self._get_isentropic_exponent(stage_pressure_in, stage_temperature_in)
-            real_gas_factor_in = self._get_real_gas_factor(pressure=stage_pressure_in,
-                                                           temperature=stage_temperature_in)  # Calculation with ideal gas
-
-            stage_compression_power.append(
-                self._calculate_stage_compression_power(isentropic_exponent_in, temperature_in,
-                                                        self.specific_gas_constant, real_gas_factor_in, mass_flow,
-                                                        stage_compression_ratio))
+            isentropic_exponent_in = self._get_isentropic_exponent_array(stage_pressure_in, stage_temperature_in)
+            real_gas_factor_in = self._get_real_gas_factor_array(pressure=stage_pressure_in,
+                                                                 temperature=stage_temperature_in)
+            compression_power += self._calculate_stage_compression_power(isentropic_exponent_in, temperature_in,
+                                                                         self.specific_gas_constant,
+                                                                         real_gas_factor_in, mass_flow,
+                                                                         stage_compression_ratio)
             stage_pressure_out = pressure_in * stage_compression_ratio
             stage_temperature_out = self._get_compression_temperature(temperature_in, isentropic_exponent_in,
                                                                       stage_compression_ratio)
-            stage_cooling_power.append(
-                self._calculate_stage_cooling_power(temperature_in, pressure_in * stage_compression_ratio, mass_flow))
-            stage_temperatures_out.append(stage_temperature_out)
-        compression_power = sum(stage_compression_power)
-        cooling_power = sum(stage_cooling_power)
+        """Every stage is cooled from the inlet temperature at the pressure after the first stage"""
+        cooling_power = self.number_stages * self._calculate_stage_cooling_power_array(
+            temperature_in, pressure_in * stage_compression_ratio, mass_flow)
         if self.compression_efficiencies != None:
             for value in self.compression_efficiencies.values():
-                if compression_power != 0:
-                    compression_power /= value
-                else:
-                    break
-        self.temperature_out = stage_temperatures_out[-1]
-        return (compression_power, cooling_power)
+                compression_power /= value
+
+        if scalar:
+            return float(compression_power), float(cooling_power), float(stage_temperature_out)
+        return compression_power, cooling_power, stage_temperature_out
 
     def _calculate_stage_compression_power(self, isentropic_exponent_mean, temperature_in, specific_gas_constant,
                                            real_gas_factor, mass_flow, compression_ratio):
@@ -393,6 +535,28 @@ class Compressor(GenericUnit):
         else:
             return 0
 
+    def _calculate_stage_cooling_power_array(self, temperature_in, pressure, mass_flow):
+        """
+        Array version of _calculate_stage_cooling_power, the heat capacity is only requested for cooled elements
+
+        Args:
+            temperature_in (np.ndarray): Inlet temperature of the calculated stage in K
+            pressure (np.ndarray): Pressure after compression in Pa
+            mass_flow (np.ndarray): Mass flow in kg/time_resolution
+
+        Returns:
+            np.ndarray: Neccessary cooling power in kW
+        """
+        cooling_power = np.zeros(mass_flow.shape)
+        cooled = self.cooling_temperature < temperature_in
+        if np.any(cooled):
+            temperature_mean = temperature_in[cooled] - (temperature_in[cooled] - self.cooling_temperature) / 2
+            specific_heat_capacity = self._get_compression_fluid_property_array(pressure[cooled], temperature_mean,
+                                                                                'cpmass')
+            cooling_power[cooled] = specific_heat_capacity * mass_flow[cooled] * \
+                (self.cooling_temperature - temperature_in[cooled]) / 3600 / 1000
+        return cooling_power
+
     # def _get_mean_temperature_pressure(self, compression_ratio, temperature_in, pressure_in):
     #     isentropic_exponent_in = self._get_isentropic_exponent(pressure=pressure_in, temperature=temperature_in)
     #     temperature_out_predicted = self._get_compression_temperature(temperature_in, isentropic_exponent_in,
@@ -8,13 +8,13 @@ from base_python.source.basic.Streamtypes import StreamEnergy, StreamMass, Strea
 from base_python.source.basic.Units import Unit
 from base_python.source.basic.Quantities import PhysicalQuantity
 from scipy import interpolate, optimize
-from functools import lru_cache
 from enum import Enum, auto
 from base_python.source.model_base.Dataclasses.TechnicalDataclasses import GenericTechnicalInput
 import numpy as np
 import math
 
 class Converter(GenericUnit):
+    SIZE_PROPORTIONAL_STREAMS = False  # True if all streams of the converter are proportional to its size
 
     class Technology(Enum):
         Methanation = auto()
@@ -38,7 +38,8 @@ class Converter(GenericUnit):
         self.possible_streams = {}
         self.value_calculation = {}
         self.interpolation_functions = {}
-        self.inverted_interp_function = {}
+        self.inverted_possible_streams = {}
+        self.possible_streams_active = None  # active state of the last calculation of the possible streams
 
     def run(self, port_id, branch_information, runcount=0):
 
@@ -101,23 +102,32 @@ class Converter(GenericUnit):
     # Module specific functions #
     ############################
 
-    @lru_cache(100)
     def _get_stream_by_load_interp(self, port_type=PhysicalQuantity, stream_type=StreamEnergy, load=0):
-        return self.possible_streams[(port_type, stream_type)](load).min()
+        loads, streams = self.possible_streams[(port_type, stream_type)]
+        if load < loads[0] or load > loads[-1]:
+            raise ValueError(f'Load {load} is outside of the load range of {self.__class__.__name__}')
+        return float(np.interp(load, loads, streams))
 
-    @lru_cache(100)
     def _get_load_by_inverted_interp(self, port_type=PhysicalQuantity, stream_type=StreamEnergy, stream_value=0):
-        return self.inverted_interp_function[(port_type, stream_type)](stream_value).min()
+        streams, loads = self.inverted_possible_streams[(port_type, stream_type)]
+        if stream_value < streams[0] or stream_value > streams[-1]:
+            raise ValueError(f'Stream {stream_value} of {port_type} is outside of the possible streams of '
+                             f'{self.__class__.__name__}')
+        return float(np.interp(stream_value, streams, loads))
 
     def _set_possible_streams(self, load_range=range(0, 101, 1)):
-        #todo: dokumentieren
+        """
+        Calculates the streams of all ports over the load range and stores them as sorted arrays, so the streams at a
+        load and the load at a stream are interpolated by np.interp
+
+        Args:
+            load_range (iterable): Loads of the converter in %
+
+        """
         #todo: kucken wo die überall vererbt wird und die loadrange jeweils auslesen. Bisher: CHP_Plant und Electrolyser
 
-        load = load_range
+        load = np.asarray(load_range, dtype=float)
         load_dependend_efficiencies = {}
-        stream_limits = {}
-        min_val = 0
-        max_val = 0
         for single_load in load:
             for key, value in self.value_calculation.items():
                 resulting_stream_value = value(single_load) * self.size
@@ -126,21 +136,90 @@ class Converter(GenericUnit):
                 else:
                     load_dependend_efficiencies[key].append(resulting_stream_value)
 
-        for key, value in load_dependend_efficiencies.items():
+        self._store_possible_streams(load, {key: np.asarray(value, dtype=float)
+                                            for key, value in load_dependend_efficiencies.items()})
+        self.possible_streams_active = self.active
+
+    def _store_possible_streams(self, load: np.ndarray, streams_by_key: dict):
+        """
+        Stores the streams of all ports over the load range as sorted arrays and updates the stream limits of the ports
+
+        Args:
+            load (np.ndarray): Loads of the converter in %
+            streams_by_key (dict): (port type, stream type) as keys and the streams at the loads as np.ndarray
+
+        """
+        self.possible_streams = {}
+        self.inverted_possible_streams = {}
+        load_order = np.argsort(load, kind='stable')
+        for key, streams in streams_by_key.items():
             affected_ports = self.get_ports_by_type(key[0])
-            filtered_list = list(filter(lambda x: x != 0, load_dependend_efficiencies[key]))
+            filtered_streams = streams[streams != 0]
             for single_port in affected_ports:
-                if len(filtered_list) > 0:
-                    single_port.update_stream_limit((min(filtered_list), max(filtered_list)))
+                if len(filtered_streams) > 0:
+                    single_port.update_stream_limit((filtered_streams.min(), filtered_streams.max()))
                 else:
                     single_port.update_stream_limit((0, 0))
-            self.inverted_interp_function[key] = interpolate.interp1d(value, load)
-            load_dependend_efficiencies[key] = interpolate.interp1d(load, value)
+            stream_order = np.argsort(streams, kind='stable')
+            self.possible_streams[key] = (load[load_order], streams[load_order])
+            self.inverted_possible_streams[key] = (streams[stream_order], load[stream_order])
+
+    def set_size(self, size: float):
+        """
+        Sets a new size of the converter. If the streams of the converter are proportional to its size
+        (SIZE_PROPORTIONAL_STREAMS) and have already been calculated, only the possible streams and the stream limits of
+        the ports are scaled instead of calculating all properties again. This requires that the new size belongs to
+        the same size bucket of the database efficiencies and that the active state has not changed since the
+        calculation of the possible streams, otherwise all properties are calculated again.
 
-        self.possible_streams = load_dependend_efficiencies
+        Args:
+            size (float): Size of the component ( in kW or kg depending on stream type)
+        """
+        same_size_bucket = self._get_efficiency_size_bucket(self.efficiency_sizes, size) == self.efficiency_size_bucket
+        if self.SIZE_PROPORTIONAL_STREAMS and self.possible_streams and self.size and size and same_size_bucket and \
+                self.possible_streams_active == self.active:
+            factor = size / self.size
+            self.size = size
+            loads = next(iter(self.possible_streams.values()))[0]
+            self._store_possible_streams(loads, {key: streams * factor
+                                                 for key, (_, streams) in self.possible_streams.items()})
+        else:
+            super().set_size(size)
+
+    def get_streams_by_load_profile(self, load_profile) -> dict:
+        """
+        Maps a whole load profile to the streams of all ports at once. Loads outside of the load range are clipped to
+        the range.
+
+        Args:
+            load_profile (np.ndarray): Load of every timestep in %
 
-        self._get_stream_by_load_interp.cache_clear()
-        self._get_load_by_inverted_interp.cache_clear()
+        Returns:
+            dict: (port type, stream type) as keys and the stream profiles as np.ndarray
+        """
+        load_profile = np.asarray(load_profile, dtype=float)
+        return {key: np.interp(load_profile, loads, streams) for key, (loads, streams) in self.possible_streams.items()}
+
+    def get_load_profile_by_stream_profile(self, port_type, stream_type, stream_profile) -> np.ndarray:
+        """
+        Maps a whole stream profile of one port to the loads of the converter, e.g. to calculate the other streams by
+        get_streams_by_load_profile. Streams outside of the possible streams are clipped with a warning.
+
+        Args:
+            port_type (Enum): Type of the port, e.g. StreamEnergy.ELECTRIC
+            stream_type (StreamTypes): Stream type of the port, e.g. StreamTypes.power
+            stream_profile (np.ndarray): Stream of every timestep
+
+        Returns:
+            np.ndarray: Load of every timestep in %
+        """
+        streams, loads = self.inverted_possible_streams[(port_type, stream_type)]
+        stream_profile = np.asarray(stream_profile, dtype=float)
+        outside = (stream_profile < streams[0]) | (stream_profile > streams[-1])
+        if np.any(outside):
+            logging.warning(f'{int(outside.sum())} streams of {port_type} are outside of the possible streams of '
+                            f'{self.__class__.__name__} and are clipped')
+        return np.interp(stream_profile, streams, loads)
 
     def get_efficiency_at_reference_load(self, stream_type, load):
         efficiencies = [i for i in self.efficiencies.all_efficiencies if i.get_medium_calculated() == stream_type]
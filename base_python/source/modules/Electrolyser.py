@@ -19,6 +19,8 @@ from base_python.source.helper.Conversion import Time_Conversion
 
 
 class Electrolyser(Converter):
+    SIZE_PROPORTIONAL_STREAMS = True  # streams are size times a function of the load within one efficiency size bucket
+
     class Technology(StrEnum):
         PEM = auto()
         ALKALY = auto()
@@ -59,6 +59,7 @@ class Electrolyser_Unit(GenericUnit):
         self.bop_port = None
         self.base_ely = base_electrolyser
         self.variable_ely = variable_electrolyser
+        self.workpoints = {}  # stream limits and optimal workpoints of the sub electrolysers by outer port
 
         if specify_balance_of_plant is not None:
             self.bop_specifications = specify_balance_of_plant
@@ -149,6 +150,125 @@ class Electrolyser_Unit(GenericUnit):
             self.efficiency_variable_with_BOP = efficiency_variable_wo_bop * pd.Series(data=self.variable_ely.get_size() * efficiency_variable_wo_bop.index / 100 / (
             abs(self.bop_specifications.get_power_consumption_operating()) + self.variable_ely.get_size() * efficiency_variable_wo_bop.index/100), index=efficiency_variable_wo_bop.index)
 
+        self._set_workpoints(efficiency_input_base, efficiency_input_variable)
+
+    def _set_workpoints(self, efficiency_input_base, efficiency_input_variable):
+        """
+        Calculates the minimum streams, the optimal workpoints and the maximum stream of the sub electrolysers for every
+        outer port once, so the dispatch does not evaluate the efficiencies at every timestep
+
+        Args:
+            efficiency_input_base: Efficiencies of the base electrolyser at load
+            efficiency_input_variable: Efficiencies of the variable electrolyser at load
+
+        """
+        self.workpoints = {}
+        for outter_port in self.port_link_dataframe.columns:
+            linked_base_ely_port = self.get_sub_component_port(self.base_ely, outter_port)
+            linked_variable_ely_port = self.get_sub_component_port(self.variable_ely, outter_port)
+            if linked_base_ely_port.get_stream_limits() is None or linked_variable_ely_port.get_stream_limits() is None:
+                continue
+            min_stream_base = linked_base_ely_port.get_stream_limits()[0]
+            min_stream_variable = linked_variable_ely_port.get_stream_limits()[0]
+
+            if isinstance(efficiency_input_variable, pd.Series):
+                opt_workpoint_stream_variable = self.variable_ely.get_size() * -0.33 #self.variable_ely.value_calculation[(StreamEnergy.ELECTRIC, StreamTypes.power)](self.efficiency_variable_with_BOP.idxmax())
+                if isinstance(efficiency_input_base, pd.Series):
+                    opt_workpoint_stream_base = self.base_ely.get_size() * self.base_ely.value_calculation[
+                        (StreamEnergy.ELECTRIC, StreamTypes.power)](self.efficiency_base_with_BOP.idxmax())
+                else:
+                    opt_workpoint_stream_base = min_stream_base
+            else:
+                opt_workpoint_stream_base = min_stream_base
+                opt_workpoint_stream_variable = min_stream_variable
+
+            self.workpoints[outter_port] = {'min_stream_base': min_stream_base,
+                                            'min_stream_variable': min_stream_variable,
+                                            'opt_workpoint_stream_base': opt_workpoint_stream_base,
+                                            'opt_workpoint_stream_variable': opt_workpoint_stream_variable,
+                                            'max_workpoint_variable': linked_variable_ely_port.get_stream_limits()[1]}
+
+    def dispatch_stream_profile(self, controlled_port, stream_profile) -> dict:
+        """
+        Splits a whole stream profile of the controlled port between base and variable electrolyser with the rules of
+        the run method, evaluated for all timesteps at once:
+            stream < minimum loads:                                 no electrolyser runs
+            stream < optimum variable + minimum base:               variable electrolyser takes the stream
+            stream <= optimum variable + optimum base:              variable at optimum, base takes the rest
+            stream <= maximum variable + optimum base:              base at optimum, variable takes the rest
+            stream > maximum variable + optimum base:               variable at maximum, base takes the rest
+
+        Args:
+            controlled_port (Port): Outer port which gets the stream profile
+            stream_profile (np.ndarray): Stream of the controlled port at every timestep, which has already been checked
+                                         against the limits of the port (see Port.check_port_value)
+
+        Returns:
+            dict: Streams of the base electrolyser ('base'), the variable electrolyser ('variable') and the resulting
+                  stream of the controlled port ('stream'). Timesteps which match no rule are NaN
+        """
+        workpoints = self.workpoints[controlled_port]
+        min_stream_base = workpoints['min_stream_base']
+        min_stream_variable = workpoints['min_stream_variable']
+        opt_base = workpoints['opt_workpoint_stream_base']
+        opt_variable = workpoints['opt_workpoint_stream_variable']
+        max_variable = workpoints['max_workpoint_variable']
+
+        streams = np.asarray(stream_profile, dtype=float)
+        absolute_streams = np.abs(streams)
+        below_minimum = (absolute_streams < abs(min_stream_base)) & (absolute_streams < abs(min_stream_variable))
+        variable_only = absolute_streams < abs(opt_variable + min_stream_base)
+        variable_at_optimum = (absolute_streams >= abs(min_stream_base + opt_variable)) & \
+                              (absolute_streams <= abs(opt_variable + opt_base))
+        base_at_optimum = (absolute_streams >= abs(opt_variable + opt_base)) & \
+                          (absolute_streams <= abs(max_variable + opt_base))
+        variable_at_maximum = absolute_streams > abs(max_variable + opt_base)
+
+        conditions = [below_minimum, variable_only, variable_at_optimum, base_at_optimum, variable_at_maximum]
+        base_streams = np.select(conditions, [0, 0, streams - opt_variable, opt_base, streams - max_variable],
+                                 default=np.nan)
+        variable_streams = np.select(conditions, [0, streams, opt_variable, streams - opt_base, max_variable],
+                                     default=np.nan)
+        return {'base': base_streams,
+                'variable': variable_streams,
+                'stream': np.where(below_minimum, 0, streams)}
+
+    def _dispatch_stream(self, controlled_port, stream: float) -> dict:
+        """
+        Splits a single stream of the controlled port between base and variable electrolyser with the same rules as
+        dispatch_stream_profile, but without creating arrays, e.g. for timesteps without stream profile
+
+        Args:
+            controlled_port (Port): Outer port which gets the stream
+            stream (float): Stream of the controlled port
+
+        Returns:
+            dict: Streams of the base electrolyser ('base'), the variable electrolyser ('variable') and the resulting
+                  stream of the controlled port ('stream'). The streams are NaN if the stream matches no rule
+        """
+        workpoints = self.workpoints[controlled_port]
+        min_stream_base = workpoints['min_stream_base']
+        min_stream_variable = workpoints['min_stream_variable']
+        opt_base = workpoints['opt_workpoint_stream_base']
+        opt_variable = workpoints['opt_workpoint_stream_variable']
+        max_variable = workpoints['max_workpoint_variable']
+
+        stream = float(stream)
+        absolute_stream = abs(stream)
+        if absolute_stream < abs(min_stream_base) and absolute_stream < abs(min_stream_variable):
+            return {'base': 0.0, 'variable': 0.0, 'stream': 0.0}
+        if absolute_stream < abs(opt_variable + min_stream_base):
+            base_stream, variable_stream = 0.0, stream
+        elif abs(min_stream_base + opt_variable) <= absolute_stream <= abs(opt_variable + opt_base):
+            base_stream, variable_stream = stream - opt_variable, opt_variable
+        elif abs(opt_variable + opt_base) <= absolute_stream <= abs(max_variable + opt_base):
+            base_stream, variable_stream = opt_base, stream - opt_base
+        elif absolute_stream > abs(max_variable + opt_base):
+            base_stream, variable_stream = stream - max_variable, max_variable
+        else:
+            base_stream, variable_stream = float('nan'), float('nan')
+        return {'base': base_stream, 'variable': variable_stream, 'stream': stream}
+
     def get_sub_component_port(self, sub_component_name, main_port):
         if main_port in self.port_link_dataframe.columns:
             resulting_port = self.port_link_dataframe[main_port].loc[sub_component_name]
@@ -214,56 +334,17 @@ class Electrolyser_Unit(GenericUnit):
             else:
                 controlled_port.set_stream(runcount, port_value)
 
-        port_value = controlled_port.get_stream()
+        """The stream of the controlled port has already been checked against its limits and binary profile by
+        set_stream or set_profile_stream"""
+        split = self._dispatch_stream(controlled_port, controlled_port.get_stream())
 
-        linked_base_ely_port = self.get_sub_component_port(self.base_ely, controlled_port)
-        linked_variable_ely_port = self.get_sub_component_port(self.variable_ely, controlled_port)
-        min_stream_base = linked_base_ely_port.get_stream_limits()[0]
-        min_stream_variable = linked_variable_ely_port.get_stream_limits()[0]
-
-        efficiency_input_base = self.base_ely.efficiencies.get_efficiencies_at_load()
-        if isinstance(efficiency_input_base, pd.Series):
-            opt_workpoint_stream_base = self.base_ely.get_size()* self.base_ely.value_calculation[(StreamEnergy.ELECTRIC, StreamTypes.power)](self.efficiency_base_with_BOP.idxmax())
-
-        efficiency_input_variable = self.variable_ely.efficiencies.get_efficiencies_at_load()
-        if isinstance(efficiency_input_variable, pd.Series):
-            opt_workpoint_stream_variable = self.variable_ely.get_size() * -0.33 #self.variable_ely.value_calculation[(StreamEnergy.ELECTRIC, StreamTypes.power)](self.efficiency_variable_with_BOP.idxmax())
-
-        else:
-            opt_workpoint_stream_base = min_stream_base
-            opt_workpoint_stream_variable = min_stream_variable
-        min_stream_variable = linked_variable_ely_port.get_stream_limits()[0]
-        max_workpoint_variable = linked_variable_ely_port.get_stream_limits()[1]
         resulting_streams = {}
-
-        # TODO: Funktion auslagern nach oben input darf nur port_value + controlled_port sein
-
-        # Input < Mindestlast -> kein Ely läuft
-        if abs(port_value) < abs(min_stream_base) and abs(port_value) < abs(min_stream_variable):
-            resulting_streams[self.base_ely] = 0
-            resulting_streams[self.variable_ely] = 0
-            controlled_port.set_stream(runcount, 0)
-            port_value = 0
-
-            # ML variabel < Input < (AP variable + ML Base) -> variabel nimmt Input
-        elif abs(port_value) < abs(opt_workpoint_stream_variable + min_stream_base):
-            resulting_streams[self.base_ely] = 0
-            resulting_streams[self.variable_ely] = port_value
-
-            # (AP var + ML Base) < Input < (Arbeitspunkt base + AP var) -> var auf optimum, base nimmt rest
-        elif abs(port_value) >= abs(min_stream_base + opt_workpoint_stream_variable) and abs(port_value) <= abs(opt_workpoint_stream_variable + opt_workpoint_stream_base):
-            resulting_streams[self.base_ely] = port_value - opt_workpoint_stream_variable
-            resulting_streams[self.variable_ely] = opt_workpoint_stream_variable
-
-            # (AP var + AP base) < Input < (max variabel + AP base) -> base auf AP, variabel nimmt Rest
-        elif abs(port_value) >= abs(opt_workpoint_stream_variable + opt_workpoint_stream_base) and abs(port_value) <= abs(max_workpoint_variable + opt_workpoint_stream_base):
-            resulting_streams[self.base_ely] = opt_workpoint_stream_base
-            resulting_streams[self.variable_ely] = port_value - opt_workpoint_stream_base
-
-            # Input > (AP base + max variabel) -> variabel nimmt max, base nimmt rest
-        elif abs(port_value) > abs(max_workpoint_variable + opt_workpoint_stream_base):
-            resulting_streams[self.variable_ely] = max_workpoint_variable
-            resulting_streams[self.base_ely] = port_value - max_workpoint_variable
+        if split['stream'] != controlled_port.get_stream():
+            controlled_port.set_stream(runcount, split['stream'])
+        port_value = split['stream']
+        if not np.isnan(split['base']):
+            resulting_streams[self.base_ely] = split['base']
+            resulting_streams[self.variable_ely] = split['variable']
         for electrolyser, value in resulting_streams.items():
             connected_sub_component_port = self.get_sub_component_port(electrolyser, controlled_port)
             electrolyser.run(connected_sub_component_port.get_id(),
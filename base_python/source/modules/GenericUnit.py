@@ -1,5 +1,6 @@
 import logging
 import math
+import collections
 from scipy.interpolate import interp2d
 from scipy import interpolate
 import numpy as np
@@ -20,10 +21,15 @@ from strenum import StrEnum
 from base_python.source.basic.Streamtypes import StreamDirection
 from base_python.source.basic.CustomErrors import ComponentError
 from base_python.source.helper.misc import create_id
+from base_python.source.helper.DatabaseSnapshot import DatabaseSnapshot
+from base_python.source.model_base.ModelRegistry import ModelRegistry, get_active_registry
 
 
 class GenericUnit:
-    COMPONENT_ID_COUNT = 0
+    TIME_COUPLED = False  # True if the state of the component depends on previous timesteps (e.g. storage level)
+    # True if only the efficiency rows of the size bucket of the component are loaded from the database instead of the
+    # rows of all sizes, see _get_efficiency_size_bucket. Changes the efficiencies of technologies with several sizes
+    USE_EFFICIENCY_SIZE_BUCKETS = False
 
     def __init__(self, size: float = None, technology: Enum = None, active: bool = False,
                  new_investment: bool = False, economical_parameters: EconomicalParameters = EconomicalParameters(),
@@ -54,7 +60,8 @@ class GenericUnit:
         self.is_sub_component = False
         self.name: str = None
         self.branch_id = None
-        self.component_id = self.set_id()
+        self.registry = get_active_registry()  # registry of the model the component belongs to
+        self.component_id = self.set_id(self.registry)
         self.lifecycle_database = None
         self.status = 0
         self.investment_function_database = None
@@ -72,6 +79,10 @@ class GenericUnit:
             class_name=self.__class__.__name__,
             technology=self.technology,
             all_efficiencies=[])
+        self.efficiency_sizes = ()  # sizes of the efficiency rows of the database, see _set_efficiencies_from_database
+        self.efficiency_size_bucket = None  # size of the efficiency rows which were loaded
+        self.efficiency_database = None  # DatabaseSnapshot the efficiencies were loaded from, to reload other sizes
+        self.database_efficiencies = ()  # efficiencies which were loaded from the database
 
         if generic_technical_input is not None:
             self.pressure = generic_technical_input.get_pressures()
@@ -95,6 +106,29 @@ class GenericUnit:
     ###################################
     # Initialisation Methods
     ###################################
+    def set_registry(self, registry: ModelRegistry):
+        """
+        Assigns the component, its ports and its results to the registry of the model it is added to. Components are
+        registered at the active registry of the thread when they are created, if this is not the registry of the model
+        (e.g. the component was created before the model or on another thread), the component gets a new ID of the
+        model.
+
+        Args:
+            registry (ModelRegistry): Registry of the model the component belongs to
+
+        """
+        if registry is self.registry:
+            return
+        self.registry = registry
+        self.component_id = self.set_id(registry)
+        self.component_technical_results.set_registry(registry)
+        self.component_technical_results.component_id = self.component_id
+        self.component_economic_results.set_registry(registry)
+        self.component_economic_results.set_component_id(self.component_id)
+        for port in self.ports.values():
+            port.port_results.set_registry(registry)
+            port.port_results.component_id = self.component_id
+
     def set_branch_id(self, branch_id: str):
         self.branch_id = branch_id
         self.component_technical_results.set_branch_id(branch_id=branch_id)
@@ -104,9 +138,9 @@ class GenericUnit:
         self.efficiencies.update_efficiency(medium_referenced, medium_calculated, load_values, efficiency_values)
         self.set_properties()
 
-    def _reset_port_history(self):
+    def _reset_port_history(self, history_len: int = 0):
         for port in self.ports.values():
-            port.reset_history()
+            port.reset_history(history_len)
 
     def _reset_component_history(self):
         for key, value in self.component_technical_results.component_history.items():
@@ -265,6 +299,14 @@ class GenericUnit:
         """
         return self.size
 
+    def is_time_coupled(self) -> bool:
+        """
+
+        Returns:
+            bool: True if the results of a timestep depend on the results of previous timesteps
+        """
+        return self.TIME_COUPLED
+
     def get_status(self):
         """
 
@@ -290,8 +332,10 @@ class GenericUnit:
         """
         efficiency = self.efficiencies.get_efficiency_by_media(medium_referenced, medium_calculated)
         if efficiency is not None:
-            interp_funct = interpolate.interp1d(efficiency.load_range, efficiency.efficiencies_at_load)
-            return interp_funct
+            """The interpolation of the efficiency is created once and shared by all components using the efficiency"""
+            if efficiency.get_interpolation_function() is None:
+                efficiency.set_interpolation_function()
+            return efficiency.get_interpolation_function()
         else:
             logging.critical(
                 f'No efficiency given for component {self.__class__.__name__} for '
@@ -367,32 +411,18 @@ class GenericUnit:
         self.name = name
         self.component_result.component_name = name
 
-    @classmethod
-    def set_id(cls) -> str:
-        """Class-Method to create a Unique Component_ID, based on the class-variable COMPONENT_ID_COUNT which gets
-         incremented each time a new Component is created.
+    @staticmethod
+    def set_id(registry: ModelRegistry) -> str:
+        """Creates a unique Component_ID. The number is allocated by the registry of the model, so the IDs are unique
+        within one model and the first component of every model gets the same ID.
 
-        Notes:
-            https://mail.python.org/pipermail/python-list/2003-April/237870.html
-            The Try|Except expression is needed in case the ID has to be set from the main class (Generic Unit)
-            The main class is the base, so it cant orginate from a base
-            The reason why it is "complicated" is, due to how inhertance works.
-            https://stackoverflow.com/questions/19719767/override-class-variable-in-python#19719856
-            So, in order to fix the issue with the unique IDs for components i "point" at the GenericUnit
+        Args:
+            registry (ModelRegistry): Registry of the model the component belongs to
 
         Returns:
             component_id: Unique String consisting of the letter "C" and two digits
         """
-
-        try:  # if function is called from Child of GenericUnit
-            cls.__mro__[-2].COMPONENT_ID_COUNT += 1 # https://mail.python.org/pipermail/python-list/2003-April/237870.html
-            _ = cls.__mro__[-2].COMPONENT_ID_COUNT
-        except AttributeError:  # in case of function is called from GenericUnit (It is the base, so it cant orginate from a base...)
-            cls.COMPONENT_ID_COUNT += 1
-            _ = cls.COMPONENT_ID_COUNT
-        finally:
-            component_id = create_id(letter='C', number=_)
-        return component_id
+        return registry.create_id(letter='C', first_number=1)
 
     def save_state(self):
         """
@@ -538,13 +568,33 @@ class GenericUnit:
 
     def set_size(self, size: float):
         """
-        Necessary of the size of the component changes after initialization of the model
+        Necessary of the size of the component changes after initialization of the model. If the component uses size
+        buckets and the new size belongs to another size bucket of the database efficiencies, the efficiencies of this
+        bucket are loaded from the database snapshot.
         Args:
             size (float): Size of the component ( in kW or kg depending on stream type)
         """
         self.size = size
+        if self._get_efficiency_size_bucket(self.efficiency_sizes) != self.efficiency_size_bucket:
+            self._reload_efficiencies_from_database()
         self.set_properties()
 
+    def _reload_efficiencies_from_database(self):
+        """
+        Replaces the efficiencies which were loaded from the database by the efficiencies of the size bucket of the
+        actual size. Efficiencies of the generic technical input are kept.
+
+        """
+        if self.efficiency_database is None:
+            logging.warning(f'Efficiencies of {self.__class__.__name__} {self.component_id} for size {self.size} can '
+                            f'not be loaded without database snapshot, the efficiencies of size '
+                            f'{self.efficiency_size_bucket} are kept')
+            return
+        self.efficiencies.all_efficiencies = [efficiency for efficiency in self.efficiencies.all_efficiencies
+                                              if not any(efficiency is loaded
+                                                         for loaded in self.database_efficiencies)]
+        self._set_efficiencies_from_database(self.efficiency_database)
+
     def set_controlled_active_port(self, port, value: float):
         """
 
@@ -565,165 +615,236 @@ class GenericUnit:
         """
         self.loop_control = None
 
-    def _set_opex_fix_invest_from_database(self, database_cursor):
+    def _select_from_database(self, database: object, table: str) -> tuple:
+        """
+        Selects all rows of the table which belong to the class and the technology of the component
+
+        Args:
+            database (object): Pooled DatabaseHandle of the database connection or DatabaseSnapshot
+            table (str): Name of the table
+
+        Returns:
+            tuple: Column names and rows of the class and technology
+        """
+        class_name = str(self.__class__.__name__).upper()
+        if isinstance(database, DatabaseSnapshot):
+            return database.select(table, class_name, self.technology.name)
+        return database.select(table, conditions={'CLASS': class_name, 'TECHNOLOGY': self.technology.name})
+
+    @staticmethod
+    def _decode_database_series(value) -> list:
+        """
+        Returns:
+            list: Series of loads or efficiencies, which are stored as JSON in the database
+        """
+        if isinstance(value, str):
+            return json.loads(value)
+        return list(value)
+
+    def _set_opex_fix_invest_from_database(self, database):
         """
         Sets the investment costs of the component from database
 
         Args:
-            database_cursor (): Database cursor given by database connection
+            database (): Pooled DatabaseHandle of the database connection or DatabaseSnapshot
         """
 
         table = 'TECHNOLOGY'
         if self.technology is not None:
-            attributes = ['OPEX_SIZE_SPECIFIC']
-            conditions = ["CLASS='" + str(self.__class__.__name__).upper() + "'",
-                          "TECHNOLOGY='" + self.technology.name + "'"]
-            database_cursor.execute("SELECT " + ", ".join(attributes) +
-                                    " FROM " + table +
-                                    " WHERE " + ' AND '.join(conditions))
-            result = database_cursor.fetchall()
+            field_names, result = self._select_from_database(database, table)
+            opex_index = field_names.index('OPEX_SIZE_SPECIFIC')
 
             if len(result) > 1:
                 logging.warning(f'Key for opex not unique! ({str(self.__class__.__name__)} {self.technology})')
             if result:
                 self.component_economical_parameters.operational_opex.set_overall_opex_in_percentage_per_year(
-                    result[0][0] / 100)
+                    result[0][opex_index] / 100)
             else:
                 logging.warning(f'Could not get opex for: ({str(self.__class__.__name__)} {self.technology})')
                 self.database_status = 1
                 return None
 
-    def _set_life_cycle_from_database(self, database_cursor):
+    def _set_life_cycle_from_database(self, database):
         """
         Sets the life_cycle of the component from database
 
         Args:
-            database_cursor (): Database cursor given by database connection
+            database (): Pooled DatabaseHandle of the database connection or DatabaseSnapshot
         """
 
         table = 'TECHNOLOGY'
-        attributes = ['LIFE_CYCLE']
         if self.technology is not None:
-            database_cursor.execute("SELECT " + ", ".join(attributes) +
-                                    " FROM " + table +
-                                    f" WHERE CLASS ='{str(self.__class__.__name__).upper()}" +
-                                    f"' AND TECHNOLOGY='{self.technology.name}'")
-            result = database_cursor.fetchall()
+            field_names, result = self._select_from_database(database, table)
+            life_cycle_index = field_names.index('LIFE_CYCLE')
             if len(result) > 1:
                 logging.warning(f'Key for life cycle not unique! ({str(self.__class__.__name__)} {self.technology})')
             if result:
                 capex_elements = [i.get_name() for i in self.component_economical_parameters.component_capex]
                 if not 'DATABASE' in capex_elements:
                     self.component_economical_parameters.component_capex.append(
-                        CAPEXParameters(name='DATABASE', life_cycle=result[0][0]))
+                        CAPEXParameters(name='DATABASE', life_cycle=result[0][life_cycle_index]))
                 else:
                     element = self.component_economical_parameters.component_capex[capex_elements.index('DATABASE')]
-                    element.set_life_cycle(result[0][0])
+                    element.set_life_cycle(result[0][life_cycle_index])
             else:
                 logging.warning(f'Could not get life cycle for: ({str(self.__class__.__name__)} {self.technology})')
                 self.database_status = 1
 
-    def _set_efficiencies_from_database(self, database_cursor):
+    def _set_efficiencies_from_database(self, database):
         """
         Sets the efficiencies of the component from database. Here are all efficiencies for the
-        specified class type and technology saved to the objects attribute 'efficiencies'.
+        specified class type and technology saved to the objects attribute 'efficiencies'. If the component uses size
+        buckets (USE_EFFICIENCY_SIZE_BUCKETS), only the rows of the size bucket of the component are used, otherwise
+        the rows of all sizes as before. The efficiencies of a DatabaseSnapshot are created and checked only once per class, technology and size bucket and are shared by
+        all components of the process.
 
         Args:
-            database_cursor (): Database cursor given by database connection
+            database (): Pooled DatabaseHandle of the database connection or DatabaseSnapshot
         """
 
         if self.technology is not None:
             table = 'EFFICIENCY'
-            attributes = ['*']
-            conditions = [f"CLASS='{str(self.__class__.__name__).upper()}'",
-                          f"TECHNOLOGY='{self.technology.name}'"]
-            database_cursor.execute("SELECT " + ", ".join(attributes) +
-                                    " FROM " + table +
-                                    " WHERE " + ' AND '.join(conditions))
             """ Result saves all rows which contain the specified class type and technology"""
+            field_names, result = self._select_from_database(database, table)
+            size_index = field_names.index('SIZE')
+            self.efficiency_sizes = tuple(single_result[size_index] for single_result in result)
+            size_bucket = self._get_efficiency_size_bucket(self.efficiency_sizes)
+            self.efficiency_size_bucket = size_bucket
+            if size_bucket is not None:
+                result = [single_result for single_result in result if single_result[size_index] == size_bucket]
+
+            if isinstance(database, DatabaseSnapshot):
+                key = (str(self.__class__.__name__).upper(), self.technology.name, size_bucket)
+                efficiencies = database.efficiency_curves.get(key)
+                if efficiencies is None:
+                    efficiencies = self._create_efficiencies(field_names, result, shared=True)
+                    database.efficiency_curves[key] = efficiencies
+            else:
+                efficiencies = self._create_efficiencies(field_names, result)
 
-            result = database_cursor.fetchall()
-            field_names = [i[0] for i in database_cursor.description]
+            for single_efficiency in efficiencies:
+                self.efficiencies.add_new_efficiency(single_efficiency)
+            self.database_efficiencies = tuple(efficiency for efficiency in efficiencies
+                                               if any(efficiency is added for added in
+                                                      self.efficiencies.all_efficiencies))
+            self.efficiency_database = database if isinstance(database, DatabaseSnapshot) else None
 
-            """ Saving indices of the columns which contain the necessary informations"""
-            ref_index = field_names.index('MEDIUM_REFERENCED')
-            calc_index = field_names.index('MEDIUM_CALCULATED')
-            unit_calc_index = field_names.index('UNIT_CALCULATED')
-            unit_ref_index = field_names.index('UNIT_REFERENCED')
-            size_index = field_names.index('SIZE')
-            load_index = field_names.index('LOAD')
-            efficiency_index = field_names.index('EFFICIENCY')
-
-            """ Looping over all found efficiency rows """
-            for single_result in result:
-                """ Key should contain the StreamTypes which stream_type is converted in another"""
-                key = [None, None]
-                """ Check weather length of loads equals lengths of efficiency values"""
-                if len(json.loads(single_result[load_index])) == len(json.loads(single_result[efficiency_index])):
-                    load_series = json.loads(single_result[load_index])
-                    efficiency_series = json.loads(single_result[efficiency_index])
-                    "Creating the key"
-                    for key_index, key_part in enumerate([single_result[ref_index], single_result[calc_index]]):
-                        key_part = key_part.upper()
-                        "Transforming the StreamTypes which are given as strings in database to the desired Enums for Model"
-                        if key_part in [stream_type.name for stream_type in StreamEnergy]:
-                            key[key_index] = StreamEnergy[key_part]
-                        elif key_part in [stream_type.name for stream_type in StreamMass]:
-                            key[key_index] = StreamMass[key_part]
-                    "Transform the given units(str) from database into the internal used Enums"
-                    if single_result[unit_ref_index] in [single_unit.value for single_unit in Unit]:
-                        unit_referenced = Unit[single_result[unit_ref_index]]
-                    else:
-                        unit_referenced = None
-                    if single_result[unit_calc_index] in [single_unit.value for single_unit in Unit]:
-                        unit_calculated = Unit[single_result[unit_calc_index]]
-                    else:
-                        unit_calculated = None
-
-                    "Creating a new efficiency dataclass and store it in efficiencies of the component"
-                    new_efficiency = Efficiency(
-                        medium_referenced=key[0],
-                        medium_calculated=key[1],
-                        unit_referenced=unit_referenced,
-                        unit_calculated=unit_calculated,
-                        load_range=load_series,
-                        efficiencies_at_load=efficiency_series
-                    )
-                    self.efficiencies.add_new_efficiency(new_efficiency)
+    def _get_efficiency_size_bucket(self, sizes: list, size: float = None):
+        """
+        Args:
+            sizes (list): Sizes of the efficiency rows of the database
+            size (float): Size which is mapped to a bucket, by default the size of the component
+
+        Returns:
+            float: Smallest size of the database which covers the size of the component, the largest size if the
+                   component is larger than all sizes. None if all rows are used, because size buckets are not used
+                   (USE_EFFICIENCY_SIZE_BUCKETS), the database contains no sizes or the size of the component is not
+                   set.
+        """
+        if not self.USE_EFFICIENCY_SIZE_BUCKETS:
+            return None
+        sizes = sorted(set(size for size in sizes if size is not None))
+        if not sizes:
+            return None
+        if len(sizes) == 1:
+            return sizes[0]
+        size = self.size if size is None else size
+        if size is None:
+            return None
+        for bucket in sizes:
+            if bucket >= abs(size):
+                return bucket
+        return sizes[-1]
+
+    def _create_efficiencies(self, field_names: list, result: list, shared: bool = False) -> tuple:
+        """
+        Creates the efficiencies of the rows of the database and checks whether all efficiencies have their
+        discontinuity at the same load level
+
+        Args:
+            field_names (list): Column names of the table EFFICIENCY
+            result (list): Rows of the class, technology and size of the component
+            shared (bool): Boolean whether the efficiencies are shared by several components
+
+        Returns:
+            tuple: Efficiencies of the rows
+        """
+        """ Saving indices of the columns which contain the necessary informations"""
+        ref_index = field_names.index('MEDIUM_REFERENCED')
+        calc_index = field_names.index('MEDIUM_CALCULATED')
+        unit_calc_index = field_names.index('UNIT_CALCULATED')
+        unit_ref_index = field_names.index('UNIT_REFERENCED')
+        size_index = field_names.index('SIZE')
+        load_index = field_names.index('LOAD')
+        efficiency_index = field_names.index('EFFICIENCY')
+
+        efficiencies = []
+        """ Looping over all found efficiency rows """
+        for single_result in result:
+            """ Key should contain the StreamTypes which stream_type is converted in another"""
+            key = [None, None]
+            """ Series of a DatabaseSnapshot are already decoded"""
+            load_series = self._decode_database_series(single_result[load_index])
+            efficiency_series = self._decode_database_series(single_result[efficiency_index])
+            """ Check weather length of loads equals lengths of efficiency values"""
+            if len(load_series) == len(efficiency_series):
+                "Creating the key"
+                for key_index, key_part in enumerate([single_result[ref_index], single_result[calc_index]]):
+                    key_part = key_part.upper()
+                    "Transforming the StreamTypes which are given as strings in database to the desired Enums for Model"
+                    if key_part in [stream_type.name for stream_type in StreamEnergy]:
+                        key[key_index] = StreamEnergy[key_part]
+                    elif key_part in [stream_type.name for stream_type in StreamMass]:
+                        key[key_index] = StreamMass[key_part]
+                "Transform the given units(str) from database into the internal used Enums"
+                if single_result[unit_ref_index] in [single_unit.value for single_unit in Unit]:
+                    unit_referenced = Unit[single_result[unit_ref_index]]
+                else:
+                    unit_referenced = None
+                if single_result[unit_calc_index] in [single_unit.value for single_unit in Unit]:
+                    unit_calculated = Unit[single_result[unit_calc_index]]
                 else:
-                    logging.warning(f'Could not load efficiency of {str(self.__class__.__name__).upper()} '
-                                    f'{self.technology} at size {single_result[size_index]} because of not '
-                                    f'usable data quality.')
-
-            "Check whether all set efficiencies have their discontinuity at the same load level"
-            for single_efficiency in self.efficiencies.all_efficiencies:
-                for element in single_efficiency.load_range:
-                    if list(single_efficiency.load_range).count(element) > 1:
-                        for sub_efficiency in self.efficiencies.all_efficiencies:
-                            if not list(single_efficiency.load_range).count(element) > 1:
-                                logging.critical(
-                                    f'Efficiency of {str(self.__class__.__name__).upper()}{self.technology}'
-                                    f'for transformation {sub_efficiency.medium_referenced, sub_efficiency.medium_calculated} does not include required discontinuity '
-                                    f'of efficiency {single_efficiency.medium_referenced, single_efficiency.medium_calculated}'
-                                )
-
-    def _set_capex_funct_from_database(self, database_cursor):
+                    unit_calculated = None
+
+                "Creating a new efficiency dataclass and store it in efficiencies of the component"
+                new_efficiency = Efficiency(
+                    medium_referenced=key[0],
+                    medium_calculated=key[1],
+                    unit_referenced=unit_referenced,
+                    unit_calculated=unit_calculated,
+                    load_range=load_series,
+                    efficiencies_at_load=efficiency_series
+                )
+                new_efficiency.shared = shared
+                efficiencies.append(new_efficiency)
+            else:
+                logging.warning(f'Could not load efficiency of {str(self.__class__.__name__).upper()} '
+                                f'{self.technology} at size {single_result[size_index]} because of not '
+                                f'usable data quality.')
+
+        "Check whether all set efficiencies have their discontinuity at the same load level"
+        discontinuities = [{load for load, count in collections.Counter(single_efficiency.load_range).items()
+                            if count > 1} for single_efficiency in efficiencies]
+        for single_efficiency, required_loads in zip(efficiencies, discontinuities):
+            for sub_efficiency, sub_loads in zip(efficiencies, discontinuities):
+                if not required_loads <= sub_loads:
+                    logging.critical(
+                        f'Efficiency of {str(self.__class__.__name__).upper()}{self.technology}'
+                        f'for transformation {sub_efficiency.medium_referenced, sub_efficiency.medium_calculated} does not include required discontinuity '
+                        f'of efficiency {single_efficiency.medium_referenced, single_efficiency.medium_calculated}'
+                    )
+        return tuple(efficiencies)
+
+    def _set_capex_funct_from_database(self, database):
         """
         Sets the capex function of the component from database
 
         Args:
-            database_cursor (): Database cursor given by database connection
+            database (): Pooled DatabaseHandle of the database connection or DatabaseSnapshot
         """
         table = 'INVESTMENT'
         if self.technology is not None:
-            attributes = ['*']
-            conditions = ["CLASS='" + str(self.__class__.__name__).upper() + "'",
-                          "TECHNOLOGY='" + self.technology.name + "'"]
-            database_cursor.execute("SELECT " + ", ".join(attributes) +
-                                    " FROM " + table +
-                                    " WHERE " + ' AND '.join(conditions))
-            result = database_cursor.fetchall()
-            field_names = [i[0] for i in database_cursor.description]
+            field_names, result = self._select_from_database(database, table)
             invest_index = field_names.index('YEAR_INVEST_1')
             scales = [val[field_names.index('SIZE')] for val in result]
             years = []
@@ -769,30 +890,31 @@ class GenericUnit:
     # calculation Methods
     ###################################
 
-    def load_database(self, database_cursor: object):
+    def load_database(self, database: object):
         """
         Method to load all necessary values from the database
 
         Args:
-            database_cursor (object): Database cursor given by database connection
+            database (object): Pooled DatabaseHandle of the database connection or a DatabaseSnapshot, which is shared
+                               by several models
         """
 
         if self.component_economical_parameters is not None:
             if self.component_economical_parameters.get_database_bool() is True:
                 if self.component_economical_parameters.get_all_capex_elements() is None:
                     self.component_economical_parameters.component_capex = []
-                self._set_capex_funct_from_database(database_cursor)
-                self._set_life_cycle_from_database(database_cursor)
+                self._set_capex_funct_from_database(database)
+                self._set_life_cycle_from_database(database)
 
                 if self.component_economical_parameters.get_operational_opex() is not None:
                     if self.component_economical_parameters.operational_opex.get_database_bool() is True:
-                        self._set_opex_fix_invest_from_database(database_cursor)
+                        self._set_opex_fix_invest_from_database(database)
                 else:
                     self.component_economical_parameters.operational_opex = OPEXOperationalParameters(
                         use_database_values=True)
-                    self._set_opex_fix_invest_from_database(database_cursor)
+                    self._set_opex_fix_invest_from_database(database)
         # print(self.__class__.__name__)
-        self._set_efficiencies_from_database(database_cursor)
+        self._set_efficiencies_from_database(database)
 
     def _calc_control_var(self, port: Port, port_value: float):
 
@@ -15,6 +15,13 @@ import CoolProp.CoolProp as CoolProp
 from CoolProp import AbstractState
 from enum import Enum, auto
 from base_python.source.basic.Streamtypes import StreamDirection
+from base_python.source.helper.PropertyService import property_service
+from base_python.source.helper.FluidStatePool import fluid_state_pool
+from base_python.source.helper.ResultCache import ResultCache, get_geometry_hash
+from base_python.source.helper.misc import find_data_directory
+from base_python.source.helper.LinepackSolver import LinepackSolver
+from base_python.source.helper import PipelineCorrelations as pc
+from base_python.source.basic.Settings import CacheEviction
 from base_python.source.model_base.Dataclasses.TechnicalDataclasses import GenericTechnicalInput
 
 root = os.environ['RPPREFIX']
@@ -26,13 +33,16 @@ class Pipeline(GenericUnit):
     class Technology(Enum):
         ONSHORE_UNDERGROUND = auto()
 
+    RESULT_CACHE_TOLERANCES = (1.0, 1e-3, 1e-6)  # tolerances of inlet pressure [Pa], temperature [°C], massflow [kg/s]
+
     """Pipelinemodule to calculate the pressure drop and temperature in- or decrease of a pipeline which consists of
     one or more pipeline-segments.
 
     """
 
     def __init__(self, technology=None, stream_type='HYDROGEN', new_investment=None, economical_parameters=None,
-                 fixed_opex=0, save_file=False, generic_technical_input: GenericTechnicalInput = None):
+                 fixed_opex=0, save_file=False, generic_technical_input: GenericTechnicalInput = None,
+                 transient=False, initial_pressure_in_Pa=None):
         """
 
         Args:
@@ -42,6 +52,10 @@ class Pipeline(GenericUnit):
             investment_costs(float):
             fixed_opex(float):
             save_file(bool): Bool value. If True the results are saved as xlsx-file.
+            transient(bool): If True the pipeline acts as storage and its linepack is tracked across timesteps. Every
+            segment of the geo data is one cell of the transient calculation.
+            initial_pressure_in_Pa(float): Pressure of the whole pipeline before the first timestep in [Pa], by default
+            the inlet pressure of the first timestep
         """
 
         super().__init__(technology=technology,
@@ -59,11 +73,13 @@ class Pipeline(GenericUnit):
                                                     fixed_status=True,
                                                     sign=StreamDirection.stream_out_of_component)  # Outlet of the Pipelinesegment
             self.fluid = self.mass_ports['in'].port_properties
+        self.fluid_string = None  # REFPROP fluid of a blank pipeline, see init_blank
 
         # empty variables
         self.dimensional_data = None
         self.material_data = None
         self.geo_data = None
+        self.segment_data = None  # NumPy arrays of the geo_data, see set_geo_data
         # Basic values. good enough for buried pipelines.
         self.lambda_pipeline = 40
         self.lambda_insulation = 0.036
@@ -79,6 +95,19 @@ class Pipeline(GenericUnit):
         # Initializing the Pipelineparameters
         self.save_path = 'Pipeline_output.xlsx'
 
+        # Stores unique results: P_in [Pa] | T_in [°C] | Massflow [kg/s] -> P_out [Pa] | T_out [°C] | Massflow [kg/s]
+        self.result_cache = ResultCache(tolerances=self.RESULT_CACHE_TOLERANCES)
+        self.friction_factor_table = None  # precomputed friction factors, see use_friction_factor_table
+
+        # Transient mode: the pipeline acts as storage, the outlet stream is given by the outlet profile
+        self.transient = transient
+        self.initial_pressure = initial_pressure_in_Pa
+        self.outlet_profile = None
+        self.linepack = 0  # [kg]
+        self.linepack_solver = None  # created at the first timestep, when the geo data is known
+        if self.transient:
+            self.component_technical_results.component_history['linepack'] = []
+
     @classmethod
     def init_blank(cls, m_dot: float = 100, fluid: str = 'CO2', inlet_pressure_in_Pa: float = 500000,
                    inlet_temperature_in_C: float = 20, save_file=False):
@@ -113,7 +142,8 @@ class Pipeline(GenericUnit):
         """
 
         if fluid_string is not None:
-            self.fluid = AbstractState("REFPROP", fluid_string)
+            self.fluid = fluid_state_pool.get_state_by_string(fluid_string)
+            self.fluid_string = fluid_string
 
     def load_dimensional_data(self, inner_diameter_in_m, roughness_in_mm):
         """Initialize the very basic parameters to simulate a pipeline without heat-losses
@@ -128,6 +158,7 @@ class Pipeline(GenericUnit):
         self.inner_diameter = inner_diameter_in_m  # Inner Diameter of the Pipeline in [m]
         self.roughness = roughness_in_mm  # Roughness of the inner pipeline surface in [mm]
         self.area = bc.diameter2area(self.inner_diameter)  # Area of the inner Diameter in [m²]
+        self.result_cache.clear()  # the cached results belong to the old geometry
 
     def load_geo_data(self,
                       excel_filename: str = r'T:\Mitarbeiter\Fischer_Frank\Literatur\Pipelines\Pipelines.xlsx',
@@ -143,7 +174,40 @@ class Pipeline(GenericUnit):
 
         """
         df = pd.read_excel(excel_filename, sheet_name=sheet_name)
-        self.geo_data = df
+        self.set_geo_data(df)
+
+    def set_geo_data(self, geo_data: pd.DataFrame):
+        """Sets the geo data and converts the columns once into NumPy arrays, so the segments are calculated without
+        pandas lookups. For missing heat conductivities the standard values of the pipeline are used.
+
+        Args:
+            geo_data(pd.DataFrame): One row per point of the pipeline with the columns 'Strecke [km]', 'Höhe [m]' and
+                                    optional 'Umgebungstemperatur [°C]', 'Wärmeleitfähigkeit_Boden [W/(mK)]',
+                                    'Wärmeleitfähigkeit_Pipeline [W/(mK)]' and 'Wärmeleitfähigkeit_Isolierung [W/(mK)]'
+
+        """
+        self.geo_data = geo_data
+        self.result_cache.clear()  # the cached results belong to the old geo data
+        positions = geo_data['Strecke [km]'].to_numpy(dtype=float)
+
+        self.segment_data = {'geo_data': geo_data,
+                             'index': geo_data.index.to_numpy(),
+                             'position': positions,
+                             'length': np.abs(np.diff(positions)) * 1000,  # km->m
+                             'altitude': geo_data['Höhe [m]'].to_numpy(dtype=float),
+                             't_environment': None}
+        if 'Umgebungstemperatur [°C]' in geo_data.columns:
+            self.segment_data['t_environment'] = geo_data['Umgebungstemperatur [°C]'].to_numpy(dtype=float)
+
+        for key, column, name in (('lambda_soil', 'Wärmeleitfähigkeit_Boden [W/(mK)]', 'Soil'),
+                                  ('lambda_pipeline', 'Wärmeleitfähigkeit_Pipeline [W/(mK)]', 'Pipeline'),
+                                  ('lambda_insulation', 'Wärmeleitfähigkeit_Isolierung [W/(mK)]', 'Insulation')):
+            if column in geo_data.columns:
+                self.segment_data[key] = geo_data[column].to_numpy(dtype=float)
+            else:
+                logging.warning(f'No HeatConductionValue for {name} available => Using standard value of '
+                                f'{getattr(self, key)} [W/(mK)]')
+                self.segment_data[key] = None
 
     def init_parameters_buried_pipeline(self, outer_diameter: float, insulation_thickness: float = 0, depht: float = 1):
         """An Optional Method to initialize the temperature correction
@@ -164,6 +228,7 @@ class Pipeline(GenericUnit):
         # The Inner Diameter of the Insulation equals the Outer Diameter of the Pipeline.
         self.imaginary_diameter = 4 * depht  # the thought diameter of the soil surrounding the pipeline. [m]
         # e.g. if the pipeline is buried 1m deep, the thoguht diameter is 4 times the depht.
+        self.result_cache.clear()  # the cached results were calculated without these heat losses
 
     def run(self, port_id, branch_information, runcount=0):
         """Method to integrate the pipelinemodule in the simulation.
@@ -202,90 +267,237 @@ class Pipeline(GenericUnit):
         self.massflow = abs(
             port_mass_in.get_stream() / tc.resolution2second(self.time_resolution))  # [kg/timeresolution] -> [kg/s]
 
+        if self.transient:
+            self._run_transient(runcount)
+            return
+
         # In the case, if the massflow is 0, input equals output and the function is stopped. (After Loopcontrol etc.
         # and before the iteration
         if self.massflow == 0:
-            # todo: the pipeline does not function as storage yet. which means, that a consumer wont get a massflow from the pipeline if the massflow is 0 which is not true
+            # In steady state the pipeline does not function as storage, which means that a consumer wont get a
+            # massflow from the pipeline if the massflow is 0. The transient mode tracks the linepack instead.
             port_mass_out.set_pressure(self.p_input)
             port_mass_out.set_temperature(uc.C2K(self.t_input))
             port_mass_out.set_stream(runcount, self.massflow / tc.second2resolution(self.time_resolution))
             return
 
-        # ___STATIC_SIMULATION_OF_THE_PIPELINE_HAPPENS_HERE!___
-        p2, t2, m_dot = self.pipeline()
+        """The cache is keyed on the inlet state only, its entries are removed if the mass fraction changes"""
+        self.result_cache.set_metadata(self.get_result_cache_metadata())
+        cached_result = self.result_cache.get(self.p_input, self.t_input, self.massflow)
+        if cached_result is not None:  # the results were calculated before
+            p2, t2, m_dot = cached_result
+        else:
+            # ___STATIC_SIMULATION_OF_THE_PIPELINE_HAPPENS_HERE!___
+            p2, t2, m_dot = self.pipeline()
+            self.result_cache.put((self.p_input, self.t_input, self.massflow), (p2, t2, m_dot))
+        self.component_technical_results.statistics['result_cache'] = self.result_cache.get_statistics()
 
         port_mass_out.set_pressure(p2)
         port_mass_out.set_temperature(uc.C2K(t2))
         port_mass_out.set_stream(runcount, m_dot / tc.second2resolution(self.time_resolution))
 
+    def _run_transient(self, runcount):
+        """Transient calculation of the pipeline as storage. The inlet stream is given by the branch, the outlet stream
+        by the outlet profile (or equal to the inlet stream if there is no profile) and the difference changes the
+        linepack.
+
+        Args:
+            runcount: Actual timestep
+
+        """
+        port_mass_out = self.mass_ports['out']
+        time_step = tc.resolution2second(self.time_resolution)  # [s]
+        if self.outlet_profile is not None:
+            outlet_flow = abs(self.outlet_profile[runcount]) / time_step  # [kg/timeresolution] -> [kg/s]
+        else:
+            outlet_flow = self.massflow
+
+        if runcount == 0:
+            if self.segment_data is None or self.segment_data['geo_data'] is not self.geo_data:
+                self.set_geo_data(self.geo_data)
+            altitudes = self.segment_data['altitude']
+            self.linepack_solver = LinepackSolver(self, lengths=self.segment_data['length'],
+                                                  altitudes=0.5 * (altitudes[:-1] + altitudes[1:]))
+            self.linepack_solver.initialize(pressure=self.initial_pressure or self.p_input, temperature=self.t_input)
+        self.linepack = self.linepack_solver.solve_timestep(runcount, inlet_flow=self.massflow,
+                                                            outlet_flow=outlet_flow, time_step=time_step)
+
+        port_mass_out.set_pressure(self.linepack_solver.pressures[-1])
+        port_mass_out.set_temperature(uc.C2K(self.linepack_solver.temperature))
+        port_mass_out.set_stream(runcount, outlet_flow / tc.second2resolution(self.time_resolution))
+
+    def set_outlet_profile(self, profile: list):
+        """Sets the stream out of the pipeline for the transient mode
+
+        Args:
+            profile (list): Stream out of the pipeline in every timestep in [kg/timeresolution]
+
+        """
+        self.outlet_profile = profile
+
+    def is_time_coupled(self) -> bool:
+        """
+
+        Returns:
+            bool: True in transient mode, since the linepack depends on the previous timesteps
+        """
+        return self.transient
+
+    def save_state(self):
+        """
+        Saves the status and in transient mode the linepack of the pipeline
+
+        """
+        super().save_state()
+        if self.transient:
+            self.component_technical_results.component_history['linepack'].append(self.linepack)
+
+    def use_friction_factor_table(self, enabled: bool = True):
+        """Replaces the iterative friction correlation by the interpolation in the shared precomputed friction factor
+        table
+
+        Args:
+            enabled (bool): True to use the table, False to use the iterative correlation
+
+        """
+        self.friction_factor_table = pc.get_friction_factor_table() if enabled else None
+        self.result_cache.clear()
+
+    def set_result_cache(self, tolerances: tuple = None, max_size: int = None, eviction: CacheEviction = None):
+        """
+        Configures the cache of the results of pipeline()
+
+        Args:
+            tolerances (tuple): Tolerances of inlet pressure [Pa], inlet temperature [°C] and massflow [kg/s]
+            max_size (int): Maximum number of cached results
+            eviction (CacheEviction): Rule which result is removed if the cache is full
+
+        """
+        self.result_cache.set_configuration(tolerances=tolerances, max_size=max_size, eviction=eviction)
+
+    def get_result_cache_metadata(self) -> dict:
+        """
+
+        Returns:
+            dict: Mass fraction of the fluid (or the fluid of a blank pipeline), which is saved with the result cache
+                  and checked when it is loaded
+        """
+        mass_fraction = self.mass_ports['in'].get_mass_fraction() if hasattr(self, 'mass_ports') else {}
+        return {'mass_fraction': {species: float(fraction) for species, fraction in sorted(mass_fraction.items())},
+                'fluid': self.fluid_string}
+
+    def get_result_cache_file(self, directory: str = None) -> str:
+        """
+        Note:
+            pipeline() overwrites t_environment and the heat conductivities with the values of the geo data of every
+            segment, so the scalar values are only part of the hash if they are used, i.e. if the geo data has no such
+            column. Columns of the geo data are part of the hash as content of the geo data.
+
+        Args:
+            directory (str): Directory of the persisted result caches, by default data/pipeline_cache of the folder
+                             data which is found from the working directory
+
+        Returns:
+            str: File of the result cache of this pipeline, which depends on the geometry, the fluid and every setting
+                 of the calculation which changes the results (property backend, friction table)
+        """
+        if self.segment_data is None or self.segment_data['geo_data'] is not self.geo_data:
+            self.set_geo_data(self.geo_data)
+        segment_data = self.segment_data
+        t_environment = self.t_environment if self.heat_flux_iteration and segment_data['t_environment'] is None \
+            else None
+        lambdas = [getattr(self, key) if segment_data[key] is None else None
+                   for key in ('lambda_pipeline', 'lambda_insulation', 'lambda_soil')]
+        geometry_hash = get_geometry_hash(self.stream_type, self.roughness, self.inner_diameter,
+                                          self.heat_flux_iteration, t_environment,
+                                          getattr(self, 'outer_diameter', None),
+                                          getattr(self, 'insulation_diameter', None),
+                                          getattr(self, 'imaginary_diameter', None),
+                                          *lambdas, self.geo_data.to_csv(), type(self.fluid).__name__,
+                                          self.friction_factor_table is not None, self.get_result_cache_metadata())
+        return os.path.join(directory or os.path.join(find_data_directory(), 'pipeline_cache'),
+                            f'Pipeline_{geometry_hash}.npz')
+
+    def load_result_cache(self, file_path: str = None) -> bool:
+        """
+        Loads the results of previous runs of a pipeline with the same geometry, settings and mass fraction
+
+        Args:
+            file_path (str): Path of the .npz file, by default the file of the geometry of this pipeline
+
+        Returns:
+            bool: True if results have been loaded
+        """
+        return self.result_cache.load(file_path or self.get_result_cache_file(),
+                                      metadata=self.get_result_cache_metadata())
+
+    def save_result_cache(self, file_path: str = None):
+        """
+        Saves the results so they can be reused by later runs of a pipeline with the same geometry
+
+        Args:
+            file_path (str): Path of the .npz file, by default the file of the geometry of this pipeline
+
+        """
+        self.result_cache.save(file_path or self.get_result_cache_file(), metadata=self.get_result_cache_metadata())
+
     def pipeline(self):
         """Function to calculate one pipeline segment one after another.
 
         Note:
-            The input values are from the init-function and/or an excel-file
+            The input values are from the init-function and/or an excel-file. The segments are marched over the NumPy
+            arrays of set_geo_data.
 
         Returns: the outlet pressure, massflow and outlet temperature as information for the branch.
 
         """
-        first = True
+        if self.segment_data is None or self.segment_data['geo_data'] is not self.geo_data:
+            self.set_geo_data(self.geo_data)  # geo_data was assigned directly
+        segment_data = self.segment_data
+        index = segment_data['index']
+        positions = segment_data['position']
+        lengths = segment_data['length']
+        altitudes = segment_data['altitude']
+        t_environments = segment_data['t_environment']
+        lambdas_soil = segment_data['lambda_soil']
+        lambdas_pipeline = segment_data['lambda_pipeline']
+        lambdas_insulation = segment_data['lambda_insulation']
+
         data_dict = dict()
         m_dot = self.massflow
-
-        for segment in self.geo_data[1:].iterrows():  # loop starting at the 2nd Element of the List
-            if first:  # first loop has to be different from the others.
-                inlet_segment = self.geo_data.iloc[0]
-                outlet_segment = segment[1]
-                p1 = self.p_input
-                t1 = self.t_input
-                first = False
-
-            else:
-                inlet_segment = outlet_segment
-                outlet_segment = segment[1]
-                p1 = p2
-                t1 = t2
-
-            z1 = inlet_segment['Höhe [m]']
-            z2 = outlet_segment['Höhe [m]']
-            l = abs(inlet_segment['Strecke [km]'] - outlet_segment['Strecke [km]']) * 1000  # km->m
-            try:
-                self.t_environment = inlet_segment[
-                    'Umgebungstemperatur [°C]']  # Environmental Temperature in [°C] | can
-                # be air temperature or
-            except KeyError:
-                if self.heat_flux_iteration != True:
-                    self.t_environment = t1
-                else:
-                    pass
-
-            try:
-                self.lambda_soil = inlet_segment['Wärmeleitfähigkeit_Boden [W/(mK)]']
-            except KeyError:
-                logging.warning(
-                    f'No HeatConductionValue for Soil available => Using standard value of {self.lambda_soil} [W/(mK)]')
-            try:
-                self.lambda_pipeline = inlet_segment['Wärmeleitfähigkeit_Pipeline [W/(mK)]']
-            except KeyError:
-                logging.warning(
-                    f'No HeatConductionValue for Pipeline available => Using standard value of {self.lambda_pipeline} [W/(mK)]')
-            try:
-                self.lambda_insulation = inlet_segment['Wärmeleitfähigkeit_Isolierung [W/(mK)]']
-            except KeyError:
-                logging.warning(
-                    f'No HeatConductionValue for Insulation available => Using standard value of {self.lambda_insulation} [W/(mK)]')
-
-            # temperature of the soil. Depends on pipeline
-            p2, t2, m_dot, l, v1, v2, w1, w2 = self.pipeline_segment(p1=p1, t1=t1, m_dot=m_dot, l=l, z1=z1,
+        p2 = self.p_input
+        t2 = self.t_input
+
+        for i in range(lengths.size):  # segment i is between point i and point i+1
+            p1 = p2
+            t1 = t2
+            z1 = altitudes[i]
+            z2 = altitudes[i + 1]
+
+            # Environmental Temperature in [°C] | can be air temperature or temperature of the soil. Depends on pipeline
+            if t_environments is not None:
+                self.t_environment = t_environments[i]
+            elif self.heat_flux_iteration != True:
+                self.t_environment = t1
+
+            if lambdas_soil is not None:
+                self.lambda_soil = lambdas_soil[i]
+            if lambdas_pipeline is not None:
+                self.lambda_pipeline = lambdas_pipeline[i]
+            if lambdas_insulation is not None:
+                self.lambda_insulation = lambdas_insulation[i]
+
+            p2, t2, m_dot, l, v1, v2, w1, w2 = self.pipeline_segment(p1=p1, t1=t1, m_dot=m_dot, l=lengths[i], z1=z1,
                                                                      z2=z2)
             if self.save_file:
-                data_dict[segment[0]] = {'S0 [km]': inlet_segment['Strecke [km]'],
-                                         'Z1 [m ü. NN.]': z1,
-                                         'm_dot [kg/s]': m_dot,
-                                         'v1 [m/s]': w1,
-                                         'P1 [Pa]': p1 / 100000,
-                                         'T1 [°C]': t1,
-                                         'rho1 [t/m³]': 0.001 / v1,
-                                         }
+                data_dict[index[i + 1]] = {'S0 [km]': positions[i],
+                                           'Z1 [m ü. NN.]': z1,
+                                           'm_dot [kg/s]': m_dot,
+                                           'v1 [m/s]': w1,
+                                           'P1 [Pa]': p1 / 100000,
+                                           'T1 [°C]': t1,
+                                           'rho1 [t/m³]': 0.001 / v1,
+                                           }
         if self.save_file:
             pd.DataFrame(data_dict).T.to_excel(self.save_path)
 
@@ -500,8 +712,7 @@ class Pipeline(GenericUnit):
         Returns(float):
             specific heat capacity [J/kgK]
         """
-        self.fluid.update(CoolProp.PT_INPUTS, pressure_in_Pa, uc.C2K(temperature_in_C))
-        return self.fluid.cpmass()
+        return property_service.get_property(self.fluid, pressure_in_Pa, uc.C2K(temperature_in_C), 'cpmass')
 
     def _REFPROP_calc_viscosity(self, mean_pressure: float, mean_temperature: float):
         """ Updates the Fluid plus Calculates and returns the viscosity of the fluid at set pressure and temperature.
@@ -515,8 +726,7 @@ class Pipeline(GenericUnit):
         Note:
             it does not have to be the mean temperature and pressure. It s a hint to clarify where the function is used.
         """
-        self.fluid.update(CoolProp.PT_INPUTS, mean_pressure, uc.C2K(mean_temperature))
-        viscosity = self.fluid.viscosity()
+        viscosity = property_service.get_property(self.fluid, mean_pressure, uc.C2K(mean_temperature), 'viscosity')
         return viscosity  # kg/(m*s)
 
     def _REFPROP_calc_specific_volume(self, temperature: float, pressure: float):
@@ -531,9 +741,7 @@ class Pipeline(GenericUnit):
 
         """
 
-        self.fluid.update(CoolProp.PT_INPUTS, pressure, uc.C2K(temperature))
-
-        return 1 / self.fluid.rhomass()
+        return 1 / property_service.get_property(self.fluid, pressure, uc.C2K(temperature), 'rhomass')
 
     def _REFPROP_calc_conductivity(self, pressure_in_Pa, temperature_in_C):
         """
@@ -546,8 +754,7 @@ class Pipeline(GenericUnit):
         Returns:
 
         """
-        self.fluid.update(CoolProp.PT_INPUTS, pressure_in_Pa, uc.C2K(temperature_in_C))
-        return self.fluid.conductivity()
+        return property_service.get_property(self.fluid, pressure_in_Pa, uc.C2K(temperature_in_C), 'conductivity')
 
     def _calc_specific_heat_flux_buried(self, length, nusselt_number, fluid_conductivity):
         """
@@ -564,31 +771,15 @@ class Pipeline(GenericUnit):
 
         """
         if self.heat_flux_iteration:
-            numerator = length * np.pi
-
-            _alpha_fluid = self._calc_heat_transfer_coefficient(nusselt_number=nusselt_number,
-                                                                thermal_conductivity=fluid_conductivity
-                                                                )
-            ht_fluid2inner_surface = 1 / _alpha_fluid
-
-            hc_pipeline = (1 / 2 * self.lambda_pipeline) * np.log10(self.outer_diameter / self.inner_diameter)
-
-            if self.insulation_diameter != self.outer_diameter:  # Pipeline has an insulation
-                hc_insulation = (1 / 2 * self.lambda_insulation) * np.log10(
-                    self.insulation_diameter / self.outer_diameter)
-            else:  # Non-insulated Pipeline
-                hc_insulation = 0
-
-            if self.imaginary_diameter != self.insulation_diameter:  # Pipeline is buried
-                hc_soil = (1 / 2 * self.lambda_soil) * np.log10(self.imaginary_diameter / self.insulation_diameter)
-                _alpha_air = 1000  # different alpha for buried pipeline (air on ground is "cooling" the soil)
-            else:  # Pipline is above the ground
-                hc_soil = 0
-                _alpha_air = 1000  # air on insulation is "cooling" the pipeline)
-            ht_soil2air = 1 / _alpha_air  # not implemented. just a guess so far. probably very wrong
-
-            denominator = ht_fluid2inner_surface + 0.6 * hc_pipeline + hc_insulation + hc_soil
-            return numerator / denominator
+            return pc.calc_specific_heat_flux_buried(length=length, nusselt_number=nusselt_number,
+                                                     fluid_conductivity=fluid_conductivity,
+                                                     inner_diameter=self.inner_diameter,
+                                                     outer_diameter=self.outer_diameter,
+                                                     insulation_diameter=self.insulation_diameter,
+                                                     imaginary_diameter=self.imaginary_diameter,
+                                                     lambda_pipeline=self.lambda_pipeline,
+                                                     lambda_insulation=self.lambda_insulation,
+                                                     lambda_soil=self.lambda_soil)
         else:
             return 0
 
@@ -603,7 +794,7 @@ class Pipeline(GenericUnit):
         Returns: Heat transfer coefficient alpha [W/(m²*K)]
 
         """
-        return nusselt_number * thermal_conductivity / self.inner_diameter
+        return pc.calc_heat_transfer_coefficient(nusselt_number, thermal_conductivity, self.inner_diameter)
 
     def _calc_heat_flux(self, mean_temperature, specific_heat_flux, heat_flux_iteration: bool):
         """Calculates the heatflux between fluid within the pipeline segmant and pipeline segment.
@@ -647,46 +838,9 @@ class Pipeline(GenericUnit):
         Returns: the friction loss coefficient [-] and its squared and inversed value
 
         """
-        laminar_boundary = 2320
-        transition_boundary = 10 ** 5
-        turbulent_boundary = 10 ** 6
-        if reynolds_number * self.roughness / (1000 * self.inner_diameter) < 65:  # Hydraulically smooth pipe
-            if reynolds_number <= laminar_boundary:  # laminar flow in Hydraulic smooth pipe
-                friction_loss_coefficient = 64 / reynolds_number
-
-            elif reynolds_number > laminar_boundary and reynolds_number <= transition_boundary:
-                # Hydraulic Smooth pipe with flow with neither laminar nor turbulent flow (transition)
-                friction_loss_coefficient = 0.3164 * reynolds_number ** -0.25
-
-            elif reynolds_number > transition_boundary and reynolds_number <= turbulent_boundary:
-                # Hydraulic Smooth pipe with flow with neither laminar nor turbulent flow(transition)
-                friction_loss_coefficient = 0.0032 + 0.221 * reynolds_number ** -0.237
-            else:
-                # Turbulent flow in hydraulic smooth pipe
-                friction_loss_coefficient = 10
-                _flc = 11
-                while abs(friction_loss_coefficient - _flc) > 0.0001:
-                    _flc = friction_loss_coefficient
-                    friction_loss_coefficient = (1 / (2 * np.log10(reynolds_number * np.sqrt(_flc)) - 0.8)) ** 2
-
-        elif reynolds_number * self.roughness / (1000 * self.inner_diameter) > 1300:  # Hydraulic rough pipe
-            friction_loss_coefficient = 10
-            _flc = 11
-            while abs(friction_loss_coefficient - _flc) > 0.0001:
-                _flc = friction_loss_coefficient
-                friction_loss_coefficient = (1 / (
-                        -2 * np.log10(self.roughness / (3.7065 * 1000 * self.inner_diameter)))) ** 2
-
-        else:  # r*k/d >65 and r*k/d < 1300 == Transition between smooth and rough
-            friction_loss_coefficient = 1
-            _flc = 1.1
-            while abs(friction_loss_coefficient - _flc) > 0.0001:
-                _flc = friction_loss_coefficient
-                friction_loss_coefficient = (1 / (-2 * np.log10((2.5226 / (reynolds_number * np.sqrt(_flc))) + (
-                        self.roughness / (3.7065 * self.inner_diameter * 1000))))) ** 2
-
-        flc = (friction_loss_coefficient ** 2) ** -1
-        return flc, friction_loss_coefficient
+        if self.friction_factor_table is not None:
+            return self.friction_factor_table.evaluate(reynolds_number, self.roughness / (1000 * self.inner_diameter))
+        return pc.calc_friction_loss_coefficient(reynolds_number, self.roughness, self.inner_diameter)
 
     def _calc_KE(self, flc):
         """Calculates the K_E value which is a dimensionless factor to correct the average flow speed of a fluid
@@ -700,8 +854,7 @@ class Pipeline(GenericUnit):
         Returns:
 
         """
-        KE = 0.25 * ((((1 / flc) + 2) ** 3) * (((1 / flc) + 1) ** 3)) / (((3 / flc) + 1) * ((3 / flc) + 2))
-        return KE
+        return pc.calc_KE(flc)
 
     def _calc_mean_pressure(self, inlet_pressure_in_Pa, outlet_pressure_in_Pa):
         """Calculates the mean pressure of a pipeflow based on its pressures at the in- and outlet.
@@ -838,21 +991,7 @@ class Pipeline(GenericUnit):
         Returns:
 
         """
-        _beta = reynolds_number * prandtl_number * segment_length * self.inner_diameter
-        if reynolds_number <= 2320:  # laminare Strömung
-            _nu = 49.371 + (1.615 * _beta ** (1 / 3) - 0.7) ** 3
-            if self.inner_diameter * 100 <= segment_length:  # nicht ausgebildete laminare Strömung bei konstanter Wandtemperatur
-                # todo: Faktor nochmal überprüfen
-                return (_nu + (2 / (1 + 22 * prandtl_number)) * _beta ** 3) ** (1 / 3)
-            else:  # voll ausgebildete laminare Strömung bei konstanter Wandtemperatur
-                return _nu ** (1 / 3)
-        else:  # turbulente Strömung unabh. von konst. Wandtemperatur oder konstanter Wärmestromdichte.
-            # Keine unterscheidung zwischen vollständig und nicht vollst. ausgebildeten Strömungsprofil
-            _zeta = (1.82 * np.log10(reynolds_number) - 1.62) ** -2
-            numerator = (_zeta / 8) * (reynolds_number - 1000) * prandtl_number
-            denumerator = 1 + 12.7 * (_zeta / 8) ** 0.5 * (prandtl_number ** (2 / 3) - 1)
-            term = (1 + (self.inner_diameter / segment_length) ** (2 / 3))
-            return term * (numerator / denumerator)
+        return pc.calc_nusselt_number(reynolds_number, prandtl_number, segment_length, self.inner_diameter)
 
     def _calc_prandtlnumber(self, dynamic_viscosity: float, specific_heatcapacity: float, thermal_conductivity: float):
         """The Prandtl-Number describes the relationship betwen the viscosity and thermal conductivity of a fluid.
@@ -883,10 +1022,7 @@ class Pipeline(GenericUnit):
         Returns:
 
         """
-        if reynolds_number <= 2320:  # otherwise it is
-            return 2  # the distribution of fluid velocities in the pipeline has a "perfect" parabolic curve. therefore KE = 2
-        else:
-            return self._calc_KE(flc)
+        return pc.calc_kinetic_energy_correction(reynolds_number, flc)
 
     def _calc_pressure_drop(self, friction_loss_coefficient, segment_length, zeta, stagnation_pressure):
         """Calculates the pressure loss within a pipeline segment.
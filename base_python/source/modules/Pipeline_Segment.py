@@ -15,6 +15,14 @@ import CoolProp.CoolProp as CoolProp
 from CoolProp import AbstractState
 from enum import Enum, auto
 from base_python.source.basic.Streamtypes import StreamDirection
+from base_python.source.helper.PropertyService import property_service
+from base_python.source.helper.FluidStatePool import fluid_state_pool
+from base_python.source.helper import RefPropFluid
+from base_python.source.basic.Settings import PropertyBackend, CacheEviction, SegmentSolver
+from base_python.source.helper.ResultCache import ResultCache, get_geometry_hash
+from base_python.source.helper.misc import find_data_directory
+from base_python.source.helper.LinepackSolver import LinepackSolver
+from base_python.source.helper import PipelineCorrelations as pc
 from base_python.source.model_base.Dataclasses.TechnicalDataclasses import GenericTechnicalInput
 
 root = os.environ['RPPREFIX']
@@ -33,6 +41,10 @@ class Pipeline_Segment(GenericUnit):
     """
     p = -1  # values going to be overwritten by _REFPROP_update_fluid function
     t = -274  # values going to be overwritten by _REFPROP_update_fluid function
+    RESULT_CACHE_TOLERANCES = (1.0, 1e-3, 1e-6)  # tolerances of inlet pressure [Pa], temperature [°C], massflow [kg/s]
+    NEWTON_MAX_ITERATIONS = 50
+    NEWTON_PRESSURE_STEP = 1e-3  # relative perturbation of the outlet pressure for the initial jacobian [-]
+    NEWTON_TEMPERATURE_STEP = 0.1  # perturbation of the outlet temperature for the initial jacobian [K]
 
     def __init__(self, stream_type=None, technology=None, new_investment=None, economical_parameters=None,
                  length=1, roughness_in_mm=0.1, inner_diameter_in_m=1,
@@ -40,7 +52,11 @@ class Pipeline_Segment(GenericUnit):
                  iterate_heat_flux=False, temperature_environment_in_C=20,
                  outer_diameter_in_m=1.1, insulation_thickness_in_m=0.1, burial_depth_in_m=1,
                  lambda_pipeline=40, lambda_insulation=0.036, lambda_soil=1.2,
-                 generic_technical_input: GenericTechnicalInput = None
+                 generic_technical_input: GenericTechnicalInput = None,
+                 property_backend: PropertyBackend = PropertyBackend.REFPROP,
+                 segment_solver: SegmentSolver = SegmentSolver.FIXED_POINT,
+                 pressure_tolerance_in_Pa=2.0, temperature_tolerance_in_K=0.1,
+                 transient=False, linepack_cells=10, initial_pressure_in_Pa=None
                  ):
         """
 
@@ -64,11 +80,19 @@ class Pipeline_Segment(GenericUnit):
             lambda_pipeline (): HeatFlow of the pipelinematerial in [W/(m*K]
             lambda_insulation (): HeatFlow of the insulation material in [W/(m*K)]
             lambda_soil (): HeatFlow of soil in [W/(m*K)]
+            property_backend (PropertyBackend): Backend of the fluid properties, REFPROP or precomputed tables
+            segment_solver (SegmentSolver): Iteration scheme of pipeline_segment()
+            pressure_tolerance_in_Pa (): Accepted residual of the outlet pressure in [Pa]
+            temperature_tolerance_in_K (): Accepted residual of the outlet temperature in [K]
+            transient (): If True the segment acts as storage and its linepack is tracked across timesteps
+            linepack_cells (): Number of cells of the transient calculation
+            initial_pressure_in_Pa (): Pressure of the whole segment before the first timestep in [Pa], by default the
+        inlet pressure of the first timestep
 
         Notes:
-            value_storage (): Structure of value_storage: P_in | T_in | Massflow | P_out | T_out. It stores each
-        unique result of pipeline_segment() and checks before each execution of pipeline_segment() if the unique
-        parameters were calculated before
+            result_cache (): Bounded cache of the results of pipeline_segment() keyed by the quantized inlet
+        pressure, inlet temperature and massflow. Before each execution of pipeline_segment() it is checked whether the
+        parameters were calculated before, see set_result_cache()
             if the burial depth is set to 0 the pipeline is surrounded by air,
         otherwise it is surrounded by soil
             if the insulation thickness is set to 0 the pipeline has no insulation.
@@ -80,6 +104,7 @@ class Pipeline_Segment(GenericUnit):
                          economical_parameters=economical_parameters,
                          generic_technical_input=generic_technical_input
                          )  # Initializing the Generic Unit
+        self.property_backend = property_backend
         if self.stream_type is not None:
             self.mass_ports = {}
             self.mass_ports['in'] = self._add_port(port_type=self.stream_type,
@@ -90,7 +115,11 @@ class Pipeline_Segment(GenericUnit):
                                                     component_ID=self.component_id,
                                                     fixed_status=True,
                                                     sign=StreamDirection.stream_out_of_component)  # Outlet of the Pipelinesegment
-            self.fluid = self.mass_ports['in'].port_properties
+            if property_backend == PropertyBackend.TABULATED:
+                self.fluid = RefPropFluid.create_fluid(self.mass_ports['in'].get_mass_fraction(),
+                                                       backend=property_backend)
+            else:
+                self.fluid = self.mass_ports['in'].port_properties
 
         # Important
         self.length = length
@@ -113,8 +142,33 @@ class Pipeline_Segment(GenericUnit):
         self.lambda_insulation = lambda_insulation
         self.lambda_soil = lambda_soil
 
-        # Stores unique results.
-        self.value_storage = np.array([[np.NaN, np.NaN, np.NaN, np.NaN, np.NaN]])
+        # Stores unique results: P_in [Pa] | T_in [°C] | Massflow [kg/s] -> P_out [Pa] | T_out [°C]
+        self.result_cache = ResultCache(tolerances=self.RESULT_CACHE_TOLERANCES)
+        self.friction_factor_table = None  # precomputed friction factors, see use_friction_factor_table
+
+        # Solver of pipeline_segment() and its telemetry
+        self.segment_solver = segment_solver
+        self.pressure_tolerance = pressure_tolerance_in_Pa
+        self.temperature_tolerance = temperature_tolerance_in_K
+        self.property_calls = 0  # number of property requests, counted by the _REFPROP_* methods
+        self.last_solve = None
+        self.solver_statistics = {'solves': 0, 'iterations': 0, 'property_calls': 0, 'max_iterations': 0,
+                                  'not_converged': 0}
+
+        # Transient mode: the segment acts as storage, the outlet stream is given by the outlet profile
+        self.transient = transient
+        self.initial_pressure = initial_pressure_in_Pa
+        self.outlet_profile = None
+        self.linepack = 0  # [kg]
+        self.linepack_solver = None
+        if self.transient:
+            cell_centres = (np.arange(linepack_cells) + 0.5) / linepack_cells
+            self.linepack_solver = LinepackSolver(self,
+                                                  lengths=np.full(linepack_cells, self.length / linepack_cells),
+                                                  altitudes=self.inlet_altitude + cell_centres * (
+                                                          self.outlet_altitude - self.inlet_altitude),
+                                                  pressure_tolerance_in_Pa=pressure_tolerance_in_Pa)
+            self.component_technical_results.component_history['linepack'] = []
 
     def run(self, port_id, branch_information, runcount=0):
         """Method to integrate the pipelinemodule in the simulation.
@@ -150,30 +204,25 @@ class Pipeline_Segment(GenericUnit):
         self.massflow = abs(
             port_mass_in.get_stream() / tc.resolution2second(self.time_resolution))  # [kg/timeresolution] -> [kg/s]
 
+        if self.transient:
+            self._run_transient(runcount)
+            return
+
         # In the case, if the massflow is 0, input equals output and the function is stopped. (After Loopcontrol etc.
         # and before the iteration
         if self.massflow == 0:
-            # todo: the pipeline does not function as storage yet. which means, that a consumer wont get a massflow from the pipeline if the massflow is 0 which is not true
+            # In steady state the pipeline does not function as storage, which means that a consumer wont get a
+            # massflow from the pipeline if the massflow is 0. The transient mode tracks the linepack instead.
             port_mass_out.set_pressure(self.p_input)
             port_mass_out.set_temperature(uc.C2K(self.t_input))
             port_mass_out.set_stream(runcount, self.massflow / tc.second2resolution(self.time_resolution))
             return
 
-        arr = self.value_storage  # easier to write
-        if self.value_storage.size == 5:  # The initial array has the size of 5
-            arr = np.vstack(
-                [self.value_storage, self.value_storage])  # increases the size of the array initially to 10.
-            # otherwise the 2nd if-condition won't work properly afterwards.
-        else:
-            filter_p_in = arr[np.where(arr[:, 0] == self.p_input)]  # Is the inlet pressure unique or not?
-            filter_t_in = filter_p_in[np.where(filter_p_in[:, 1] == self.t_input)]  # Is the inlet temp unique or not?
-            arr = filter_t_in[np.where(filter_t_in[:, 2] == self.massflow)]  # is the massflow unique or not?
-
-        if arr.size == 5:  # after filtering in the first if-condition the array has either the size of 0,
-            # or 5 if the results (outlet temperature and pressure) were calculated before.
-            m_dot = arr[0, 2]  # First row, 3rd column
-            p2 = arr[0, 3]  # First row, 4th column
-            t2 = arr[0, 4]  # First row, 5th column
+        """The cache is keyed on the inlet state only, its entries are removed if the mass fraction changes"""
+        self.result_cache.set_metadata(self.get_result_cache_metadata())
+        cached_result = self.result_cache.get(self.p_input, self.t_input, self.massflow)
+        if cached_result is not None:  # the results (outlet temperature and pressure) were calculated before
+            p2, t2 = cached_result
         else:
             # ___STATIC_SIMULATION_OF_THE_PIPELINE_HAPPENS_HERE!___
             p2, t2 = self.pipeline_segment(p1=self.p_input,
@@ -181,18 +230,198 @@ class Pipeline_Segment(GenericUnit):
                                            m_dot=self.massflow,
                                            length=self.length,
                                            z1=self.inlet_altitude,
-                                           z2=self.outlet_altitude)
-            # ___STORE_NEW_UNIQUE_RESULT_IN_ARRAY___
-            arr2append = np.array([self.p_input, self.t_input, self.massflow, p2, t2])
-            self.value_storage = np.vstack([self.value_storage, arr2append])
+                                           z2=self.outlet_altitude,
+                                           zeta=self.zeta)
+            # ___STORE_NEW_UNIQUE_RESULT_IN_CACHE___
+            self.result_cache.put((self.p_input, self.t_input, self.massflow), (p2, t2))
+        self.component_technical_results.statistics['result_cache'] = self.result_cache.get_statistics()
+        self.component_technical_results.statistics['segment_solver'] = self.get_solver_statistics()
 
         port_mass_out.set_pressure(p2)
         port_mass_out.set_temperature(uc.C2K(t2))
         port_mass_out.set_stream(runcount, self.massflow / tc.second2resolution(self.time_resolution))
         self.mass_ports['out'] = port_mass_out
 
+    def _run_transient(self, runcount):
+        """Transient calculation of the segment as storage. The inlet stream is given by the branch, the outlet stream
+        by the outlet profile (or equal to the inlet stream if there is no profile) and the difference changes the
+        linepack.
+
+        Args:
+            runcount: Actual timestep
+
+        """
+        port_mass_out = self.mass_ports['out']
+        time_step = tc.resolution2second(self.time_resolution)  # [s]
+        if self.outlet_profile is not None:
+            outlet_flow = abs(self.outlet_profile[runcount]) / time_step  # [kg/timeresolution] -> [kg/s]
+        else:
+            outlet_flow = self.massflow
+
+        if runcount == 0:
+            self.linepack_solver.initialize(pressure=self.initial_pressure or self.p_input, temperature=self.t_input)
+        self.linepack = self.linepack_solver.solve_timestep(runcount, inlet_flow=self.massflow,
+                                                            outlet_flow=outlet_flow, time_step=time_step)
+
+        port_mass_out.set_pressure(self.linepack_solver.pressures[-1])
+        port_mass_out.set_temperature(uc.C2K(self.linepack_solver.temperature))
+        port_mass_out.set_stream(runcount, outlet_flow / tc.second2resolution(self.time_resolution))
+
+    def set_outlet_profile(self, profile: list):
+        """Sets the stream out of the segment for the transient mode
+
+        Args:
+            profile (list): Stream out of the segment in every timestep in [kg/timeresolution]
+
+        """
+        self.outlet_profile = profile
+
+    def is_time_coupled(self) -> bool:
+        """
+
+        Returns:
+            bool: True in transient mode, since the linepack depends on the previous timesteps
+        """
+        return self.transient
+
+    def save_state(self):
+        """
+        Saves the status and in transient mode the linepack of the segment
+
+        """
+        super().save_state()
+        if self.transient:
+            self.component_technical_results.component_history['linepack'].append(self.linepack)
+
+    def use_friction_factor_table(self, enabled: bool = True):
+        """Replaces the iterative friction correlation by the interpolation in the shared precomputed friction factor
+        table
+
+        Args:
+            enabled (bool): True to use the table, False to use the iterative correlation
+
+        """
+        self.friction_factor_table = pc.get_friction_factor_table() if enabled else None
+        self.result_cache.clear()
+
+    def set_result_cache(self, tolerances: tuple = None, max_size: int = None, eviction: CacheEviction = None):
+        """
+        Configures the cache of the results of pipeline_segment()
+
+        Args:
+            tolerances (tuple): Tolerances of inlet pressure [Pa], inlet temperature [°C] and massflow [kg/s]
+            max_size (int): Maximum number of cached results
+            eviction (CacheEviction): Rule which result is removed if the cache is full
+
+        """
+        self.result_cache.set_configuration(tolerances=tolerances, max_size=max_size, eviction=eviction)
+
+    def get_result_cache_metadata(self) -> dict:
+        """
+
+        Returns:
+            dict: Mass fraction of the fluid, which is saved with the result cache and checked when it is loaded
+        """
+        mass_fraction = self.mass_ports['in'].get_mass_fraction() if hasattr(self, 'mass_ports') else {}
+        return {'mass_fraction': {species: float(fraction) for species, fraction in sorted(mass_fraction.items())}}
+
+    def get_result_cache_file(self, directory: str = None) -> str:
+        """
+
+        Args:
+            directory (str): Directory of the persisted result caches, by default data/pipeline_cache of the folder
+                             data which is found from the working directory
+
+        Returns:
+            str: File of the result cache of this segment, which depends on the geometry, the fluid and every setting
+                 of the calculation which changes the results (solver, tolerances, property backend, friction table)
+        """
+        geometry_hash = get_geometry_hash(self.stream_type, self.length, self.roughness, self.inner_diameter,
+                                          self.inlet_altitude, self.outlet_altitude, self.zeta,
+                                          self.heat_flux_iteration, self.t_environment, self.outer_diameter,
+                                          self.insulation_diameter, self.imaginary_diameter, self.lambda_pipeline,
+                                          self.lambda_insulation, self.lambda_soil, self.segment_solver.name,
+                                          self.pressure_tolerance, self.temperature_tolerance,
+                                          self.property_backend.name, self.friction_factor_table is not None,
+                                          self.get_result_cache_metadata())
+        return os.path.join(directory or os.path.join(find_data_directory(), 'pipeline_cache'),
+                            f'Pipeline_Segment_{geometry_hash}.npz')
+
+    def load_result_cache(self, file_path: str = None) -> bool:
+        """
+        Loads the results of previous runs of a pipeline segment with the same geometry, settings and mass fraction
+
+        Args:
+            file_path (str): Path of the .npz file, by default the file of the geometry of this segment
+
+        Returns:
+            bool: True if results have been loaded
+        """
+        return self.result_cache.load(file_path or self.get_result_cache_file(),
+                                      metadata=self.get_result_cache_metadata())
+
+    def save_result_cache(self, file_path: str = None):
+        """
+        Saves the results so they can be reused by later runs of a pipeline segment with the same geometry
+
+        Args:
+            file_path (str): Path of the .npz file, by default the file of the geometry of this segment
+
+        """
+        self.result_cache.save(file_path or self.get_result_cache_file(), metadata=self.get_result_cache_metadata())
+
+    def set_segment_solver(self, segment_solver: SegmentSolver, pressure_tolerance_in_Pa: float = None,
+                           temperature_tolerance_in_K: float = None):
+        """Changes the iteration scheme of pipeline_segment(). The result cache is cleared, since its results were
+        calculated with the old scheme.
+
+        Args:
+            segment_solver (SegmentSolver): Iteration scheme of pipeline_segment()
+            pressure_tolerance_in_Pa (float): Accepted residual of the outlet pressure in [Pa]
+            temperature_tolerance_in_K (float): Accepted residual of the outlet temperature in [K]
+
+        """
+        self.segment_solver = segment_solver
+        if pressure_tolerance_in_Pa is not None:
+            self.pressure_tolerance = pressure_tolerance_in_Pa
+        if temperature_tolerance_in_K is not None:
+            self.temperature_tolerance = temperature_tolerance_in_K
+        self.result_cache.clear()
+
+    def get_solver_statistics(self) -> dict:
+        """
+
+        Returns:
+            dict: Number of solves, iterations, property calls and not converged solves of pipeline_segment()
+        """
+        statistics = self.solver_statistics
+        solves = statistics['solves']
+        return {'solver': self.segment_solver.name,
+                **statistics,
+                'mean_iterations': statistics['iterations'] / solves if solves else 0,
+                'mean_property_calls': statistics['property_calls'] / solves if solves else 0}
+
+    def _record_solve(self, iterations: int, property_calls: int, converged: bool):
+        """Adds the telemetry of one solve of pipeline_segment() to the solver statistics
+
+        Args:
+            iterations (int): Number of iterations of the solve
+            property_calls (int): Number of property requests of the solve
+            converged (bool): False if the solve was stopped before reaching the tolerances
+
+        """
+        self.last_solve = {'iterations': iterations, 'property_calls': property_calls, 'converged': converged}
+        statistics = self.solver_statistics
+        statistics['solves'] += 1
+        statistics['iterations'] += iterations
+        statistics['property_calls'] += property_calls
+        statistics['max_iterations'] = max(statistics['max_iterations'], iterations)
+        statistics['not_converged'] += not converged
+        logging.debug(f'{self.segment_solver.name} solve of pipeline segment {self.component_id}: {iterations} '
+                      f'iterations, {property_calls} property calls, converged: {converged}')
+
     def pipeline_segment(self, p1, t1, m_dot, length, z1, z2, zeta=0):
-        """Function to calculate one pipeline segment
+        """Function to calculate one pipeline segment with the iteration scheme of self.segment_solver
 
         Args:
             p1(float): pressure at the inlet of the pipeline segment in [Pa]
@@ -205,6 +434,32 @@ class Pipeline_Segment(GenericUnit):
 
         Returns: The Values at the outlet for the next pipeline segment
 
+        """
+        property_calls = self.property_calls
+        if self.segment_solver == SegmentSolver.NEWTON:
+            p2, t2, iterations, converged = self._solve_segment_newton(p1=p1, t1=t1, m_dot=m_dot, length=length,
+                                                                       z1=z1, z2=z2, zeta=zeta)
+        else:
+            p2, t2, iterations, converged = self._solve_segment_fixed_point(p1=p1, t1=t1, m_dot=m_dot, length=length,
+                                                                            z1=z1, z2=z2, zeta=zeta)
+        self._record_solve(iterations, self.property_calls - property_calls, converged)
+        return p2, t2
+
+    def _solve_segment_fixed_point(self, p1, t1, m_dot, length, z1, z2, zeta=0):
+        """Calculates one pipeline segment with two nested fixed point loops over the outlet pressure (outer loop) and
+        the outlet temperature (inner loop). This is the reference scheme.
+
+        Args:
+            p1(float): pressure at the inlet of the pipeline segment in [Pa]
+            t1(float): temperature at the inlet of the pipeline segment in [°C]
+            m_dot(float): Massflow through the pipeline segment in [kg/s]
+            length(float): length of the pipeline segment in [m]
+            z1(float): Altitude at the inlet of the pipeline segment in [m. ü.NN.]
+            z2(float): Altitude at the outlet of the pipelnine segment in [m. ü.NN.]
+            zeta(float): additional flow resistance of the pipeline segment in [-]
+
+        Returns: outlet pressure [Pa], outlet temperature [°C], number of iterations and whether the loops converged
+
         """
         cp = self._REFPROP_set_cp(pressure_in_Pa=p1,
                                   temperature_in_C=t1
@@ -226,6 +481,8 @@ class Pipeline_Segment(GenericUnit):
                                  )  # [m/s] Velocity of the Fluid @ Inlet
 
         ### Start with calculations
+        iterations = 0
+        converged = False
         go_on_1 = True
         while go_on_1:
             v2 = self._REFPROP_calc_specific_volume(temperature=t2,
@@ -296,6 +553,7 @@ class Pipeline_Segment(GenericUnit):
             # ___
             go_on_2 = True  # if broken out of innerloop, has to be reset again...
             while go_on_2:
+                iterations += 1
                 # todo: inside _calc_specific_heat_flux_buried replace a function
                 fluid_conductivity = self._REFPROP_calc_conductivity(pressure_in_Pa=pm,
                                                                      temperature_in_C=tm)
@@ -334,8 +592,10 @@ class Pipeline_Segment(GenericUnit):
                         # --- RERUN_OUTER_LOOP---
 
                 # ---- SET_NEW_OUTLET_TEMPERATURE ----
-                if abs(delta_tI) < 0.1:  # criteria how accurate temperature has to be, the lower, the more iterations!
-                    if abs(delta_pI) < 2.0:  # criteria how accurate pressure has to be, the lower, the more iterations!
+                # criteria how accurate temperature and pressure have to be, the lower, the more iterations!
+                if abs(delta_tI) < self.temperature_tolerance:
+                    if abs(delta_pI) < self.pressure_tolerance:
+                        converged = True
                         go_on_1 = False
                         go_on_2 = False
                         continue
@@ -379,7 +639,218 @@ class Pipeline_Segment(GenericUnit):
                 continue
                 # ---RERUN_INNER_LOOP ---
 
-        return p2, t2
+        return p2, t2, iterations, converged
+
+    def _solve_segment_newton(self, p1, t1, m_dot, length, z1, z2, zeta=0):
+        """Calculates one pipeline segment by a coupled Newton iteration over outlet pressure and outlet temperature.
+        The jacobian is calculated once by finite differences and then updated by Broyden's secant method, so every
+        iteration needs only one evaluation of the residuals and therefore only one set of property calls.
+
+        Args:
+            p1(float): pressure at the inlet of the pipeline segment in [Pa]
+            t1(float): temperature at the inlet of the pipeline segment in [°C]
+            m_dot(float): Massflow through the pipeline segment in [kg/s]
+            length(float): length of the pipeline segment in [m]
+            z1(float): Altitude at the inlet of the pipeline segment in [m. ü.NN.]
+            z2(float): Altitude at the outlet of the pipelnine segment in [m. ü.NN.]
+            zeta(float): additional flow resistance of the pipeline segment in [-]
+
+        Returns: outlet pressure [Pa], outlet temperature [°C], number of iterations and whether the iteration converged
+
+        """
+        segment = (p1, t1, m_dot, length, z1, z2, zeta, *self._calc_inlet_state(p1=p1, t1=t1, m_dot=m_dot))
+
+        outlet = np.array([0.95 * p1, t1])  # Initial guess, same as the fixed point scheme
+        residuals = self._calc_segment_residuals(outlet, *segment)
+        if residuals is None:
+            return float(outlet[0]), float(outlet[1]), 0, False
+
+        """Initial jacobian by finite differences, the steps are far above the tolerances of the property service"""
+        scale = np.array([self.NEWTON_PRESSURE_STEP * p1, self.NEWTON_TEMPERATURE_STEP])
+        jacobian = np.empty((2, 2))
+        for j in range(2):
+            perturbed_outlet = outlet.copy()
+            perturbed_outlet[j] -= scale[j]
+            perturbed_residuals = self._calc_segment_residuals(perturbed_outlet, *segment)
+            if perturbed_residuals is None:
+                return float(outlet[0]), float(outlet[1]), 0, False
+            jacobian[:, j] = (residuals - perturbed_residuals) / scale[j]
+
+        iterations = 0
+        while abs(residuals[0]) >= self.pressure_tolerance or abs(residuals[1]) >= self.temperature_tolerance:
+            if iterations >= self.NEWTON_MAX_ITERATIONS:
+                logging.warning(f'Pipeline segment {self.component_id} did not converge within '
+                                f'{self.NEWTON_MAX_ITERATIONS} Newton iterations! Residuals: {residuals[0]:.1f} Pa, '
+                                f'{residuals[1]:.3f} K')
+                return float(outlet[0]), float(outlet[1]), iterations, False
+            iterations += 1
+
+            try:
+                step = -np.linalg.solve(jacobian, residuals)
+            except np.linalg.LinAlgError:
+                logging.warning(f'Singular jacobian in pipeline segment {self.component_id}!')
+                return float(outlet[0]), float(outlet[1]), iterations, False
+            new_outlet = outlet + step
+            if new_outlet[0] < 5 * 10 ** 5:  # practical limit: shouldn't ever be the case in Pipelines
+                logging.warning(
+                    'Diameter too small! outlet_pressure reached {p2} bar(a)!'.format(p2=new_outlet[0] / 10 ** 5))
+                return float(new_outlet[0]), float(new_outlet[1]), iterations, False
+
+            new_residuals = self._calc_segment_residuals(new_outlet, *segment)
+            if new_residuals is None:
+                return float(new_outlet[0]), float(new_outlet[1]), iterations, False
+
+            """Broyden update of the jacobian in scaled variables, because pressure and temperature differ by orders of
+            magnitude"""
+            scaled_step = step / scale
+            jacobian += np.outer(new_residuals - residuals - jacobian @ step, scaled_step / scale) / (
+                    scaled_step @ scaled_step)
+            outlet = new_outlet
+            residuals = new_residuals
+
+        return float(outlet[0]), float(outlet[1]), iterations, True
+
+    def calc_segment_residuals(self, p1, t1, p2, t2, m_dot):
+        """Residuals of the outlet pressure and temperature of this segment for a given inlet and outlet state. Used by
+        the pipeline network solver, which solves the pressures of all segments of a network at once.
+
+        Args:
+            p1(float): pressure at the inlet of the pipeline segment in [Pa]
+            t1(float): temperature at the inlet of the pipeline segment in [°C]
+            p2(float): estimated pressure at the outlet of the pipeline segment in [Pa]
+            t2(float): estimated temperature at the outlet of the pipeline segment in [°C]
+            m_dot(float): Massflow through the pipeline segment in [kg/s]
+
+        Returns: Residuals of the outlet pressure in [Pa] and the outlet temperature in [K], None if the outlet velocity
+        exceeds the limit
+
+        """
+        return self._calc_segment_residuals(np.array([p2, t2]), p1, t1, m_dot, self.length, self.inlet_altitude,
+                                            self.outlet_altitude, self.zeta,
+                                            *self._calc_inlet_state(p1=p1, t1=t1, m_dot=m_dot))
+
+    def _calc_inlet_state(self, p1, t1, m_dot):
+        """
+        Args:
+            p1(float): pressure at the inlet of the pipeline segment in [Pa]
+            t1(float): temperature at the inlet of the pipeline segment in [°C]
+            m_dot(float): Massflow through the pipeline segment in [kg/s]
+
+        Returns: heat capacity [J/kgK], specific volume [m³/kg] and velocity [m/s] at the inlet
+
+        """
+        cp = self._REFPROP_set_cp(pressure_in_Pa=p1,
+                                  temperature_in_C=t1
+                                  )  # [J/kgK] Heat Capcity of the Fluid
+        v1 = self._REFPROP_calc_specific_volume(temperature=t1,
+                                                pressure=p1
+                                                )  # [m³/kg] Specific Volume @ Inlet
+        w1 = self._calc_velocity(massflow=m_dot,
+                                 specific_volume=v1
+                                 )  # [m/s] Velocity of the Fluid @ Inlet
+        return cp, v1, w1
+
+    def _calc_segment_residuals(self, outlet, p1, t1, m_dot, length, z1, z2, zeta, cp, v1, w1):
+        """Residuals of the pressure (energy equation) and of the temperature (heat balance) for an estimated outlet
+        state. Uses the same correlations as the fixed point scheme.
+
+        Args:
+            outlet(np.ndarray): estimated outlet pressure in [Pa] and outlet temperature in [°C]
+            p1(float): pressure at the inlet of the pipeline segment in [Pa]
+            t1(float): temperature at the inlet of the pipeline segment in [°C]
+            m_dot(float): Massflow through the pipeline segment in [kg/s]
+            length(float): length of the pipeline segment in [m]
+            z1(float): Altitude at the inlet of the pipeline segment in [m. ü.NN.]
+            z2(float): Altitude at the outlet of the pipelnine segment in [m. ü.NN.]
+            zeta(float): additional flow resistance of the pipeline segment in [-]
+            cp(float): Heat capacity of the fluid at the inlet in [J/kgK]
+            v1(float): Specific volume at the inlet in [m³/kg]
+            w1(float): Velocity of the fluid at the inlet in [m/s]
+
+        Returns: Residuals of the outlet pressure in [Pa] and the outlet temperature in [K], None if the outlet velocity
+        exceeds the limit
+
+        """
+        p2, t2 = float(outlet[0]), float(outlet[1])
+        v2 = self._REFPROP_calc_specific_volume(temperature=t2,
+                                                pressure=p2
+                                                )  # [m³/kg] Specific Volume @ Outlet
+        w2 = self._calc_velocity(massflow=m_dot,
+                                 specific_volume=v2
+                                 )  # [m/s] Velocity of the Fluid @ Outlet
+        if w2 > 150:  # [m/s] see _solve_segment_fixed_point
+            logging.critical(f'The outlet-velocity of {w2} m/s exceeds the limit of 150 m/s! Increase the diameter by 2 Inches(50.8 mm)!')
+            return None
+
+        pm = self._calc_mean_pressure(inlet_pressure_in_Pa=p1,
+                                      outlet_pressure_in_Pa=p2
+                                      )  # [Pa] mean Pressure
+        tm = self._calc_mean_temperature(inlet_temperature_in_C=t1,
+                                         outlet_temperature_in_C=t2
+                                         )  # [°C] mean Temperature
+        vm = self._calc_mean_specific_volume(inlet_pressure_in_Pa=p1,
+                                             outlet_pressure_in_Pa=p2,
+                                             inlet_specific_volume=v1,
+                                             outlet_specific_volume=v2
+                                             )  # [m³/kg]
+        Sm = self._calc_mean_stagnation_pressure(inlet_velocity_in_ms=w1,
+                                                 outlet_velocity_in_ms=w2,
+                                                 inlet_specific_volume=v1,
+                                                 outlet_specific_volume=v2
+                                                 )  # [Pa] mean stagnation Pressure (mittlerer Staudruck)
+        viscosity = self._REFPROP_calc_viscosity(mean_pressure=pm,
+                                                 mean_temperature=tm
+                                                 )  # [ms/kg] mean dynamic Viscosity
+        reynolds_number = self._calc_reynolds_number(m_dot=m_dot,
+                                                     viscosity=viscosity
+                                                     )  # [-]
+        flc, friction_loss_coefficient = self._calc_friction_loss_coefficient(reynolds_number=reynolds_number)
+        KE = self._calc_kinetic_energy_correction(reynolds_number=reynolds_number, flc=flc)
+
+        delta_pV = self._calc_pressure_drop(friction_loss_coefficient=friction_loss_coefficient,
+                                            segment_length=length,
+                                            zeta=zeta,
+                                            stagnation_pressure=Sm
+                                            )
+        delta_w_square = self._calc_velocity_adjustment(KE=KE,
+                                                        inlet_velocity=w1,
+                                                        outlet_velocity=w2
+                                                        )
+        delta_p = self._calc_pressure_drop_from_energy_equation(delta_w_square=delta_w_square,
+                                                                inlet_pressure=p1,
+                                                                outlet_pressure=p2,
+                                                                pressure_difference=delta_pV,
+                                                                mean_specific_volume=vm,
+                                                                inlet_altitude=z1,
+                                                                outlet_altitude=z2,
+                                                                )
+
+        heat_flux = 0
+        if self.heat_flux_iteration:  # the conductivity is only needed for the heat flux
+            fluid_conductivity = self._REFPROP_calc_conductivity(pressure_in_Pa=pm,
+                                                                 temperature_in_C=tm)
+            prandtl_number = self._calc_prandtlnumber(dynamic_viscosity=viscosity,
+                                                      specific_heatcapacity=cp,
+                                                      thermal_conductivity=fluid_conductivity)
+            nusselt_number = self._calc_nusselt_number(reynolds_number=reynolds_number,
+                                                       prandtl_number=prandtl_number,
+                                                       segment_length=length,
+                                                       )
+            specific_heat_flux = self._calc_specific_heat_flux_buried(length=length,
+                                                                      nusselt_number=nusselt_number,
+                                                                      fluid_conductivity=fluid_conductivity)
+            heat_flux = self._calc_heat_flux(mean_temperature=tm,
+                                             specific_heat_flux=specific_heat_flux,
+                                             heat_flux_iteration=self.heat_flux_iteration
+                                             )
+            max_heat_flux = m_dot * cp * (t1 - self.t_environment)
+            if abs(heat_flux) > abs(max_heat_flux):  # the fluid can not be cooled or heated beyond the environment
+                heat_flux = -max_heat_flux
+
+        delta_t = self._calc_temperature_loss(inlet_temperature=t1, outlet_temperature=t2,
+                                              heat_flux=heat_flux, inlet_altitude=z1, outlet_altitude=z2,
+                                              delta_w_square=delta_w_square, massflow=m_dot, cp=cp)
+        return np.array([delta_p, delta_t])
 
     def _REFPROP_set_gas_const(self):
         """ Calculates and returns the specific gas constant of the fluid
@@ -398,8 +869,8 @@ class Pipeline_Segment(GenericUnit):
         Returns(float):
             specific heat capacity [J/kgK]
         """
-        self.fluid.update(CoolProp.PT_INPUTS, pressure_in_Pa, uc.C2K(temperature_in_C))
-        return self.fluid.cpmass()
+        self.property_calls += 1
+        return property_service.get_property(self.fluid, pressure_in_Pa, uc.C2K(temperature_in_C), 'cpmass')
 
     def _REFPROP_calc_viscosity(self, mean_pressure: float, mean_temperature: float):
         """ Updates the Fluid plus Calculates and returns the viscosity of the fluid at set pressure and temperature.
@@ -413,8 +884,8 @@ class Pipeline_Segment(GenericUnit):
         Note:
             it does not have to be the mean temperature and pressure. It s a hint to clarify where the function is used.
         """
-        self.fluid.update(CoolProp.PT_INPUTS, mean_pressure, uc.C2K(mean_temperature))
-        viscosity = self.fluid.viscosity()
+        self.property_calls += 1
+        viscosity = property_service.get_property(self.fluid, mean_pressure, uc.C2K(mean_temperature), 'viscosity')
         return viscosity  # kg/(m*s)
 
     def _REFPROP_calc_specific_volume(self, temperature: float, pressure: float):
@@ -429,9 +900,8 @@ class Pipeline_Segment(GenericUnit):
 
         """
 
-        self.fluid.update(CoolProp.PT_INPUTS, pressure, uc.C2K(temperature))
-
-        return 1 / self.fluid.rhomass()
+        self.property_calls += 1
+        return 1 / property_service.get_property(self.fluid, pressure, uc.C2K(temperature), 'rhomass')
 
     def _REFPROP_calc_conductivity(self, pressure_in_Pa, temperature_in_C):
         """
@@ -444,8 +914,8 @@ class Pipeline_Segment(GenericUnit):
         Returns:
 
         """
-        self.fluid.update(CoolProp.PT_INPUTS, pressure_in_Pa, uc.C2K(temperature_in_C))
-        return self.fluid.conductivity()
+        self.property_calls += 1
+        return property_service.get_property(self.fluid, pressure_in_Pa, uc.C2K(temperature_in_C), 'conductivity')
 
     def _calc_specific_heat_flux_buried(self, length, nusselt_number, fluid_conductivity):
         """
@@ -462,31 +932,15 @@ class Pipeline_Segment(GenericUnit):
 
         """
         if self.heat_flux_iteration:
-            numerator = length * np.pi
-
-            _alpha_fluid = self._calc_heat_transfer_coefficient(nusselt_number=nusselt_number,
-                                                                thermal_conductivity=fluid_conductivity
-                                                                )
-            ht_fluid2inner_surface = 1 / _alpha_fluid
-
-            hc_pipeline = (1 / 2 * self.lambda_pipeline) * np.log10(self.outer_diameter / self.inner_diameter)
-
-            if self.insulation_diameter != self.outer_diameter:  # Pipeline has an insulation
-                hc_insulation = (1 / 2 * self.lambda_insulation) * np.log10(
-                    self.insulation_diameter / self.outer_diameter)
-            else:  # Non-insulated Pipeline
-                hc_insulation = 0
-
-            if self.imaginary_diameter != self.insulation_diameter:  # Pipeline is buried
-                hc_soil = (1 / 2 * self.lambda_soil) * np.log10(self.imaginary_diameter / self.insulation_diameter)
-                _alpha_air = 1000  # different alpha for buried pipeline (air on ground is "cooling" the soil)
-            else:  # Pipline is above the ground
-                hc_soil = 0
-                _alpha_air = 1000  # air on insulation is "cooling" the pipeline)
-            ht_soil2air = 1 / _alpha_air  # not implemented. just a guess so far. probably very wrong
-
-            denominator = ht_fluid2inner_surface + 0.6 * hc_pipeline + hc_insulation + hc_soil
-            return numerator / denominator
+            return pc.calc_specific_heat_flux_buried(length=length, nusselt_number=nusselt_number,
+                                                     fluid_conductivity=fluid_conductivity,
+                                                     inner_diameter=self.inner_diameter,
+                                                     outer_diameter=self.outer_diameter,
+                                                     insulation_diameter=self.insulation_diameter,
+                                                     imaginary_diameter=self.imaginary_diameter,
+                                                     lambda_pipeline=self.lambda_pipeline,
+                                                     lambda_insulation=self.lambda_insulation,
+                                                     lambda_soil=self.lambda_soil)
         else:
             return 0
 
@@ -501,7 +955,7 @@ class Pipeline_Segment(GenericUnit):
         Returns: Heat transfer coefficient alpha [W/(m²*K)]
 
         """
-        return nusselt_number * thermal_conductivity / self.inner_diameter
+        return pc.calc_heat_transfer_coefficient(nusselt_number, thermal_conductivity, self.inner_diameter)
 
     def _calc_heat_flux(self, mean_temperature, specific_heat_flux, heat_flux_iteration: bool):
         """Calculates the heatflux between fluid within the pipeline segmant and pipeline segment.
@@ -545,46 +999,9 @@ class Pipeline_Segment(GenericUnit):
         Returns: the friction loss coefficient [-] and its squared and inversed value
 
         """
-        laminar_boundary = 2320
-        transition_boundary = 10 ** 5
-        turbulent_boundary = 10 ** 6
-        if reynolds_number * self.roughness / (1000 * self.inner_diameter) < 65:  # Hydraulically smooth pipe
-            if reynolds_number <= laminar_boundary:  # laminar flow in Hydraulic smooth pipe
-                friction_loss_coefficient = 64 / reynolds_number
-
-            elif reynolds_number > laminar_boundary and reynolds_number <= transition_boundary:
-                # Hydraulic Smooth pipe with flow with neither laminar nor turbulent flow (transition)
-                friction_loss_coefficient = 0.3164 * reynolds_number ** -0.25
-
-            elif reynolds_number > transition_boundary and reynolds_number <= turbulent_boundary:
-                # Hydraulic Smooth pipe with flow with neither laminar nor turbulent flow(transition)
-                friction_loss_coefficient = 0.0032 + 0.221 * reynolds_number ** -0.237
-            else:
-                # Turbulent flow in hydraulic smooth pipe
-                friction_loss_coefficient = 10
-                _flc = 11
-                while abs(friction_loss_coefficient - _flc) > 0.0001:
-                    _flc = friction_loss_coefficient
-                    friction_loss_coefficient = (1 / (2 * np.log10(reynolds_number * np.sqrt(_flc)) - 0.8)) ** 2
-
-        elif reynolds_number * self.roughness / (1000 * self.inner_diameter) > 1300:  # Hydraulic rough pipe
-            friction_loss_coefficient = 10
-            _flc = 11
-            while abs(friction_loss_coefficient - _flc) > 0.0001:
-                _flc = friction_loss_coefficient
-                friction_loss_coefficient = (1 / (
-                        -2 * np.log10(self.roughness / (3.7065 * 1000 * self.inner_diameter)))) ** 2
-
-        else:  # r*k/d >65 and r*k/d < 1300 == Transition between smooth and rough
-            friction_loss_coefficient = 1
-            _flc = 1.1
-            while abs(friction_loss_coefficient - _flc) > 0.0001:
-                _flc = friction_loss_coefficient
-                friction_loss_coefficient = (1 / (-2 * np.log10((2.5226 / (reynolds_number * np.sqrt(_flc))) + (
-                        self.roughness / (3.7065 * self.inner_diameter * 1000))))) ** 2
-
-        flc = (friction_loss_coefficient ** 2) ** -1
-        return flc, friction_loss_coefficient
+        if self.friction_factor_table is not None:
+            return self.friction_factor_table.evaluate(reynolds_number, self.roughness / (1000 * self.inner_diameter))
+        return pc.calc_friction_loss_coefficient(reynolds_number, self.roughness, self.inner_diameter)
 
     def _calc_KE(self, flc):
         """Calculates the K_E value which is a dimensionless factor to correct the average flow speed of a fluid
@@ -598,8 +1015,7 @@ class Pipeline_Segment(GenericUnit):
         Returns:
 
         """
-        KE = 0.25 * ((((1 / flc) + 2) ** 3) * (((1 / flc) + 1) ** 3)) / (((3 / flc) + 1) * ((3 / flc) + 2))
-        return KE
+        return pc.calc_KE(flc)
 
     def _calc_mean_pressure(self, inlet_pressure_in_Pa, outlet_pressure_in_Pa):
         """Calculates the mean pressure of a pipeflow based on its pressures at the in- and outlet.
@@ -736,21 +1152,7 @@ class Pipeline_Segment(GenericUnit):
         Returns:
 
         """
-        _beta = reynolds_number * prandtl_number * segment_length * self.inner_diameter
-        if reynolds_number <= 2320:  # laminare Strömung
-            _nu = 49.371 + (1.615 * _beta ** (1 / 3) - 0.7) ** 3
-            if self.inner_diameter * 100 <= segment_length:  # nicht ausgebildete laminare Strömung bei konstanter Wandtemperatur
-                # todo: Faktor nochmal überprüfen
-                return (_nu + (2 / (1 + 22 * prandtl_number)) * _beta ** 3) ** (1 / 3)
-            else:  # voll ausgebildete laminare Strömung bei konstanter Wandtemperatur
-                return _nu ** (1 / 3)
-        else:  # turbulente Strömung unabh. von konst. Wandtemperatur oder konstanter Wärmestromdichte.
-            # Keine unterscheidung zwischen vollständig und nicht vollst. ausgebildeten Strömungsprofil
-            _zeta = (1.82 * np.log10(reynolds_number) - 1.62) ** -2
-            numerator = (_zeta / 8) * (reynolds_number - 1000) * prandtl_number
-            denumerator = 1 + 12.7 * (_zeta / 8) ** 0.5 * (prandtl_number ** (2 / 3) - 1)
-            term = (1 + (self.inner_diameter / segment_length) ** (2 / 3))
-            return term * (numerator / denumerator)
+        return pc.calc_nusselt_number(reynolds_number, prandtl_number, segment_length, self.inner_diameter)
 
     def _calc_prandtlnumber(self, dynamic_viscosity: float, specific_heatcapacity: float, thermal_conductivity: float):
         """The Prandtl-Number describes the relationship betwen the viscosity and thermal conductivity of a fluid.
@@ -781,10 +1183,7 @@ class Pipeline_Segment(GenericUnit):
         Returns:
 
         """
-        if reynolds_number <= 2320:  # otherwise it is
-            return 2  # the distribution of fluid velocities in the pipeline has a "perfect" parabolic curve. therefore KE = 2
-        else:
-            return self._calc_KE(flc)
+        return pc.calc_kinetic_energy_correction(reynolds_number, flc)
 
     def _calc_pressure_drop(self, friction_loss_coefficient, segment_length, zeta, stagnation_pressure):
         """Calculates the pressure loss within a pipeline segment.
@@ -935,7 +1334,7 @@ class Pipeline_Segment(GenericUnit):
         """
 
         if fluid_string is not None:
-            self.fluid = AbstractState("REFPROP", fluid_string)
+            self.fluid = fluid_state_pool.get_state_by_string(fluid_string)
 
 
 if __name__ == '__main__':
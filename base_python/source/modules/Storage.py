@@ -6,12 +6,14 @@ from base_python.source.helper._FunctionDef import range_limit
 from base_python.source.helper._FunctionDef import in_range
 from base_python.source.model_base.Dataclasses.TechnicalDataclasses import GenericTechnicalInput
 from numpy import array
+import numpy as np
 import logging
 
 
 class Storage(GenericUnit):
     """Create a Storage object with output=electric
     use Set_ControlledByConsumption() to use it as controlled node"""
+    TIME_COUPLED = True
 
     def __init__(self, size=None, charge_power=math.inf, technology=None, active=False, initial_value=None,
                  efficiency: float = 1.0, new_investment=False, economical_parameters=None, stream_type=None,
@@ -51,6 +53,82 @@ class Storage(GenericUnit):
         self.buffer_init = buffer
         self.set_properties()
 
+    def calculate_horizon(self, requested_streams) -> dict:
+        """
+        Calculates buffer level and clipped streams of the storage for the whole horizon at once without the branch
+        solver. The requests are the streams the branch would pass to the storage at every timestep (positive:
+        discharge, negative: charge). The timesteps are calculated in a single loop over preallocated arrays with the
+        same rules as the run method.
+
+        Note:
+            The kernel is not called by the solvers of ModelBase. In a model the requests of a storage branch depend on
+            the buffer level of the previous timestep (loop control, passive components), so they are not known before
+            the branch is solved and models with storages are always solved stepwise (see StepDeduplication). The
+            kernel is meant for a given request profile, e.g. the schedule of the storage dispatch or sizing studies.
+
+        Args:
+            requested_streams (np.ndarray): Requested stream of every timestep in kg/time_resolution or kWh/time_resolution
+
+        Returns:
+            dict: Arrays of the streams after clipping ('stream'), the buffer levels ('storage_level') and the charge and
+                  discharge losses ('losses') of every timestep
+        """
+        if self.active:
+            logging.warning(f'Storage {self.component_id} is active, its profile is not considered by '
+                            f'calculate_horizon')
+        requested_streams = np.asarray(requested_streams, dtype=float)
+        stream_limit = self.power_to_energy(self.charge_power)
+        lower_limit, lower_level, upper_limit, upper_level = self._get_horizon_level_limits()
+        streams = np.clip(requested_streams, -stream_limit, stream_limit).tolist()
+        levels = [0.0] * len(streams)
+        clipped = [False] * len(streams)
+        efficiency = self.efficiency
+        size = self.size
+        buffer = 0.0 if self.buffer_init is None else float(self.buffer_init)
+
+        """Same order of limits as in run: first the flows are limited by the size, afterwards by the level limits of
+        the subclass (e.g. pressure limits of a gas storage)"""
+        for i, stream in enumerate(streams):
+            if stream < 0:
+                buffer = buffer - stream * efficiency
+            else:
+                buffer = buffer - stream / efficiency
+            if size is not None:
+                if buffer > size:
+                    stream += buffer - size / efficiency
+                    buffer = size
+                elif buffer < 0:
+                    stream += buffer * efficiency
+                    buffer = 0
+            if buffer < lower_limit:
+                stream += buffer - lower_level
+                buffer = lower_level
+                clipped[i] = True
+            if buffer > upper_limit:
+                stream += buffer - upper_level
+                buffer = upper_level
+                clipped[i] = True
+            streams[i] = stream
+            levels[i] = buffer
+
+        streams = np.array(streams)
+        levels = np.array(levels)
+        initial_level = 0.0 if self.buffer_init is None else float(self.buffer_init)
+        return {'stream': streams,
+                'storage_level': levels,
+                'losses': -streams - np.diff(levels, prepend=initial_level),
+                'level_limited': np.array(clipped)}
+
+    def _get_horizon_level_limits(self) -> tuple:
+        """
+        Additional limits of the buffer level which are applied after the size limits by calculate_horizon
+
+        Returns:
+            tuple: Level below which the lower limit is applied, level which is set then, level above which the upper
+                   limit is applied and level which is set then
+        """
+        return -np.inf, -np.inf, np.inf, np.inf
+
     #############################
     # Module specific functions #
     #############################
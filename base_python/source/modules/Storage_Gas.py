@@ -4,15 +4,19 @@ from base_python.source.helper._FunctionDef import range_limit
 from base_python.source.helper._FunctionDef import in_range
 from base_python.source.basic.Streamtypes import StreamEnergy, StreamMass
 from base_python.source.basic.Units import Unit
+from base_python.source.basic.Settings import PropertyBackend, GasStorageModel
 from base_python.source.basic.Quantities import PhysicalQuantity
 import base_python.source.basic.Database as Constants
 from scipy.optimize import newton
 from base_python.source.helper import RefPropFluid
+from base_python.source.helper.PropertyService import property_service
+from base_python.source.helper.TabulatedFluid import TabulatedFluid
 from base_python.source.basic.Streamtypes import StreamDirection
 import base_python.source.basic.ModelSettings as Settings
 from base_python.source.model_base.Port_Energy import Port_Energy
 import logging
 import math
+import numpy as np
 from enum import Enum, auto
 from base_python.source.model_base.Dataclasses.TechnicalDataclasses import GenericTechnicalInput
 
@@ -22,12 +26,17 @@ class Storage_Gas(Storage):
         CAVERN = auto()
         TANK_U100BAR = auto()
 
+    PRESSURE_TABLE_POINTS = 1000  # number of points of the mass content - pressure table
+    PRESSURE_TABLE_RANGE = 2.0  # the table covers pressures up to this factor times the maximum pressure
+
     def __init__(self, stream_type: StreamMass, size: float = None, technology=None, pressure_min=None,
                  pressure_max=None,
                  storage_temperature=283.15, cushion_gas_volume=0, storage_volume=0,
                  active=False, initial_value=None, efficiency: float = 1.0,
                  new_investment=False, economical_parameters=None, include_compression=False,
-                 generic_technical_input: GenericTechnicalInput = None
+                 generic_technical_input: GenericTechnicalInput = None,
+                 property_backend: PropertyBackend = PropertyBackend.REFPROP, pressure_table: bool = True,
+                 gas_storage_model: GasStorageModel = GasStorageModel.VAN_DER_WAALS
                  ):
 
         """
@@ -48,6 +57,11 @@ class Storage_Gas(Storage):
             new_investment (bool): Boolean whether the storage is a new investment
             investment_costs (float): Absolute investment costs for the storage in €
             include_compression (bool): Boolean whether the compression of the storage is included in calculation
+            property_backend (PropertyBackend): Backend of the gas properties, REFPROP or precomputed tables
+            pressure_table (bool): Boolean whether pressure and mass content are converted by a precomputed table
+                                   instead of solving the equation of state at every timestep
+            gas_storage_model (GasStorageModel): Equation of state of the pressure table, the real gas model is only
+                                                 available with pressure table
         """
 
         super().__init__(size=size, technology=technology, active=active, initial_value=initial_value,
@@ -56,6 +70,7 @@ class Storage_Gas(Storage):
                          generic_technical_input=generic_technical_input)
 
         self.include_compression = include_compression
+        self.property_backend = property_backend
         self.pressure_min = pressure_min
         self.pressure_max = pressure_max
         self.storage_temperature = storage_temperature
@@ -64,6 +79,11 @@ class Storage_Gas(Storage):
         self.van_der_waals_a = None
         self.van_der_waals_b = None
         self.buffer_min = None
+        self.pressure_table = pressure_table
+        self.gas_storage_model = gas_storage_model
+        self.cushion_gas_mass = None
+        self.table_mass_contents = None  # [kg] total mass content including the cushion gas, ascending
+        self.table_pressures = None  # [Pa] storage pressure at the mass contents of the table
         self.mass_fraction = {}
         self.mass_ports = {}
         self.component_technical_results.component_history[PhysicalQuantity.pressure] = []
@@ -75,6 +95,9 @@ class Storage_Gas(Storage):
 
         if self.stream_type == None:
             logging.critical('Storage medium must be defined!')
+        if self.gas_storage_model == GasStorageModel.REAL_GAS and not self.pressure_table:
+            logging.warning('Real gas model of Storage_Gas is only available with pressure table, the van der Waals '
+                            'equation is used instead')
 
         self.buffer_profile = []
         self.pressure_profile = []
@@ -94,8 +117,10 @@ class Storage_Gas(Storage):
         self.mass_ports['out'] = self.get_ports_by_type_and_sign(self.stream_type,
                                                                  StreamDirection.stream_out_of_component)
 
+        self.table_mass_contents = None
+        self.table_pressures = None
         self.gas_properties_norm = RefPropFluid.create_fluid(self.mass_ports['in'].get_mass_fraction(), pressure=101325,
-                                                             temperature=273.15)
+                                                             temperature=273.15, backend=self.property_backend)
         self._set_van_der_waals()
         if self.size is not None and self.pressure_min is not None and self.pressure_max is not None:
             self._set_gas_volumes_from_size()
@@ -105,6 +130,10 @@ class Storage_Gas(Storage):
         elif self.storage_volume != 0:
             self._set_cushion_gas_volume_from_storage_volume()
 
+        if self.pressure_table and self.pressure_max is not None and self.pressure_min is not None and \
+                self.storage_volume != 0:
+            self._set_pressure_table()
+
         if self.pressure_min is not None:
             self.buffer_min = self._get_mass_content_from_pressure(self.pressure_min)
 
@@ -190,6 +219,74 @@ class Storage_Gas(Storage):
         function = lambda volume: self._get_van_der_waals_pressure(molar_content, volume) - self.pressure_min
         self.storage_volume = newton(function, self.cushion_gas_volume / (self.pressure_min / 101300))
 
+    def _set_pressure_table(self):
+        """
+        Builds the monotone table of the total mass content (buffer level and cushion gas) and the storage pressure
+        for the storage volume and temperature. The van der Waals table is calculated on a grid of mass contents, the
+        real gas table on a grid of pressures with m = p * V * M / (Z * R * T). Both directions are interpolated by
+        np.interp, so the equation of state is not solved at every timestep anymore.
+
+        Note:
+            The storage volume and the cushion gas of the real gas table are taken from the table itself instead of
+            the van der Waals equation: if the size is given, the volume is chosen so that the mass content between
+            pressure_min and pressure_max equals the size (the mass content is proportional to the volume), and the
+            cushion gas is the mass content at pressure_min. So buffer level 0 is at pressure_min and buffer level size
+            at pressure_max.
+
+        """
+        pressure_limit = self.PRESSURE_TABLE_RANGE * self.pressure_max
+        if self.gas_storage_model == GasStorageModel.REAL_GAS:
+            pressures = np.linspace(0, pressure_limit, self.PRESSURE_TABLE_POINTS)
+            compressibility_factors = np.ones(pressures.size)
+            compressibility_factors[1:] = self._get_compressibility_factors(pressures[1:])
+            specific_mass_contents = pressures * self.gas_properties_norm.molar_mass() / (
+                    compressibility_factors * Constants.gas_constant * self.storage_temperature)  # [kg/m³]
+            storage_volume = self.storage_volume
+            if self.size is not None:
+                storage_volume = self.size / (np.interp(self.pressure_max, pressures, specific_mass_contents) -
+                                              np.interp(self.pressure_min, pressures, specific_mass_contents))
+            mass_contents = specific_mass_contents * storage_volume
+        else:
+            mass_content_limit = self._get_mass_content_from_pressure(pressure_limit)
+            mass_contents = np.linspace(0, mass_content_limit, self.PRESSURE_TABLE_POINTS)
+            pressures = self._get_van_der_waals_pressure(self._get_molar_content_from_mass(mass_contents),
+                                                         self.storage_volume)
+
+        if not (np.all(np.diff(mass_contents) > 0) and np.all(np.diff(pressures) > 0)):
+            logging.warning(f'Pressure table of storage {self.component_id} is not monotone, the equation of state is '
+                            f'solved at every timestep instead')
+            self.cushion_gas_mass = self._get_mass_content_from_molar(
+                self._get_molar_content_from_norm_volume(self.cushion_gas_volume))
+            return
+        self.table_mass_contents = mass_contents
+        self.table_pressures = pressures
+        if self.gas_storage_model == GasStorageModel.REAL_GAS:
+            self.storage_volume = storage_volume
+            self.cushion_gas_mass = float(np.interp(self.pressure_min, pressures, mass_contents))
+            self.cushion_gas_volume = self._get_norm_volume(self.cushion_gas_mass)
+        else:
+            self.cushion_gas_mass = self._get_mass_content_from_molar(
+                self._get_molar_content_from_norm_volume(self.cushion_gas_volume))
+
+    def _get_compressibility_factors(self, pressures: np.ndarray) -> np.ndarray:
+        """
+        Returns the compressibility factors of the stored gas at storage temperature from the property backend
+
+        Args:
+            pressures (np.ndarray): Pressures of the gas in Pa
+
+        Returns:
+            np.ndarray: Compressibility factors of the gas
+        """
+        mass_fraction = self.mass_ports['in'].get_mass_fraction()
+        fluid = RefPropFluid.create_fluid(mass_fraction, backend=self.property_backend)
+        temperatures = np.full(pressures.size, self.storage_temperature)
+        if isinstance(fluid, TabulatedFluid):
+            return fluid.evaluate('compressibility_factor', pressures, temperatures, component_id=self.component_id)
+        return np.array([property_service.get_property(fluid, pressure, self.storage_temperature,
+                                                       'compressibility_factor', mass_fraction)
+                         for pressure in pressures.tolist()])
+
     def _set_van_der_waals(self):
         """
         Calculates the van der waals coefficients to calculate the real gas
@@ -229,6 +326,8 @@ class Storage_Gas(Storage):
         return mass_content / (self.gas_properties_norm.molar_mass())
 
     def _get_mass_content_from_pressure(self, pressure):
+        if self.table_pressures is not None:
+            return float(np.interp(pressure, self.table_pressures, self.table_mass_contents))
         volume = self.storage_volume
         function = lambda molar_content: self._get_van_der_waals_pressure(molar_content, volume) - pressure
         if self.size is not None:
@@ -282,6 +381,9 @@ class Storage_Gas(Storage):
         # Under pressure the gas has the partial volume calculated by _calculate_gas_volume
         # When amount is reduced it has the whole max_gas_volume
         # https://www.chemie.de/lexikon/Van-der-Waals-Gleichung.html
+        if self.table_pressures is not None:
+            return float(np.interp(buffer_level + self.cushion_gas_mass, self.table_mass_contents,
+                                   self.table_pressures))
 
         molar_content = self._get_molar_content_from_mass(buffer_level) + self._get_molar_content_from_norm_volume(
             self.cushion_gas_volume)
@@ -311,6 +413,53 @@ class Storage_Gas(Storage):
 
         return pressure
 
+    def _has_pressure_limits(self) -> bool:
+        return self.pressure_max is not None and self.pressure_min is not None and self.storage_volume != 0
+
+    def _get_horizon_level_limits(self) -> tuple:
+        """
+        Buffer levels of the pressure limits, which are applied by calculate_horizon with the same tolerance as in run
+
+        Returns:
+            tuple: Level below which the lower limit is applied, level which is set then, level above which the upper
+                   limit is applied and level which is set then
+        """
+        if not self._has_pressure_limits():
+            return super()._get_horizon_level_limits()
+        min_mass_content = self._get_mass_content_from_pressure(self.pressure_min) - self.buffer_min
+        max_mass_content = self._get_mass_content_from_pressure(self.pressure_max) - self.buffer_min
+        lower_limit = self._get_mass_content_from_pressure(self.pressure_min - 1e-2) - self.buffer_min
+        return lower_limit, min_mass_content, max_mass_content, max_mass_content
+
+    def calculate_horizon(self, requested_streams) -> dict:
+        """
+        Calculates buffer level, clipped streams and storage pressure for the whole horizon at once, see
+        Storage.calculate_horizon. The pressures are calculated for all timesteps after the loop. The power of a
+        compressor sub component is not included.
+
+        Args:
+            requested_streams (np.ndarray): Requested stream of every timestep in kg/time_resolution
+
+        Returns:
+            dict: Arrays of the streams after clipping ('stream'), the buffer levels ('storage_level'), the losses
+                  ('losses') and the pressures (PhysicalQuantity.pressure) of every timestep
+        """
+        results = super().calculate_horizon(requested_streams)
+        if not self._has_pressure_limits():
+            return results
+
+        levels = results['storage_level']
+        if self.table_pressures is not None:
+            pressures = np.interp(levels + self.cushion_gas_mass, self.table_mass_contents, self.table_pressures)
+        else:
+            pressures = np.array([self._calculate_gas_pressure(level) for level in levels.tolist()])
+        lower_limit, min_mass_content, upper_limit, max_mass_content = self._get_horizon_level_limits()
+        limited = results['level_limited']
+        pressures[limited & (levels == min_mass_content)] = self.pressure_min
+        pressures[limited & (levels == max_mass_content)] = self.pressure_max
+        results[PhysicalQuantity.pressure] = pressures
+        return results
+
     def run(self, port_id, branch_information, runcount=0):
 
         """
@@ -352,7 +501,16 @@ class Storage_Gas(Storage):
         [controlled_port, energy_stream, loop_control] = self._calc_control_var(port_id, branch_information[
             PhysicalQuantity.stream])
         # set flow by profile no matter if active or not
-        if self.active & (not loop_control):
+        charge_profile = self.mass_ports['in'].get_profile_values(runcount)
+        discharge_profile = self.mass_ports['out'].get_profile_values(runcount)
+        charge_profile = charge_profile or {}
+        discharge_profile = discharge_profile or {}
+        if self.active & (not loop_control) and (PhysicalQuantity.stream in charge_profile or
+                                                 PhysicalQuantity.stream in discharge_profile):
+            # schedule of charge (in port) and discharge (out port), e.g. of the storage dispatch optimization
+            energy_stream = charge_profile.get(PhysicalQuantity.stream, 0) + \
+                            discharge_profile.get(PhysicalQuantity.stream, 0)
+        elif self.active & (not loop_control):
             if self.charge_power > self.energy_to_power(self.size):
                 energy_stream = self.size
             else:
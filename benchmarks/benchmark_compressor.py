@@ -0,0 +1,51 @@
+##############################################################################
+# Benchmark - one year of cavern injection: stage loop, array API and map    #
+##############################################################################
+
+import time
+import numpy as np
+from base_python.source.basic.Streamtypes import StreamMass
+from base_python.source.helper.PropertyService import property_service
+from base_python.source.modules.Compressor import Compressor
+
+
+def create_compressor() -> Compressor:
+    compressor = Compressor(size=20000, stream_type=StreamMass.HYDROGEN, stages=3, cooling_temperature=313.15)
+    compressor.set_time_resolution(60)
+    compressor._update_mass_fraction({StreamMass.HYDROGEN: 1.0})
+    return compressor
+
+
+if __name__ == '__main__':
+    random = np.random.default_rng(0)
+    hours = 8760
+    mass_flows = random.uniform(1000, 20000, hours)  # [kg/h]
+    temperatures_in = random.uniform(283.15, 308.15, hours)  # [K]
+    pressures_in = np.full(hours, 30e5)  # [Pa]
+    pressures_out = 60e5 + 120e5 * (0.5 + 0.5 * np.sin(np.arange(hours) * 2 * np.pi / hours))  # [Pa] cavern pressure
+
+    compressor = create_compressor()
+    property_service.clear()
+    start = time.perf_counter()
+    reference = np.array([compressor._calculate_compression_power(mass_flow, temperature_in, pressure_in,
+                                                                  pressure_out)[0]
+                          for mass_flow, temperature_in, pressure_in, pressure_out
+                          in zip(mass_flows, temperatures_in, pressures_in, pressures_out)])
+    print(f'stage loop per timestep: {(time.perf_counter() - start) * 1e3:9.1f} ms')
+
+    property_service.clear()
+    start = time.perf_counter()
+    compression_power, cooling_power, temperature_out = compressor.calculate_compression_power_array(
+        mass_flows, temperatures_in, pressures_in, pressures_out)
+    print(f'array API:               {(time.perf_counter() - start) * 1e3:9.1f} ms, '
+          f'max. relative deviation {np.max(np.abs(compression_power / reference - 1)):.2e}')
+
+    start = time.perf_counter()
+    compressor.use_compression_map(pressure_in_range=(20e5, 40e5), pressure_out_range=(50e5, 190e5),
+                                   temperature_range=(273.15, 323.15))
+    print(f'building the map:        {(time.perf_counter() - start) * 1e3:9.1f} ms')
+    start = time.perf_counter()
+    compression_power, cooling_power, temperature_out = compressor.compression_map.evaluate(
+        mass_flows, temperatures_in, pressures_in, pressures_out)
+    print(f'compression map:         {(time.perf_counter() - start) * 1e3:9.1f} ms, '
+          f'max. relative deviation {np.max(np.abs(compression_power / reference - 1)):.2e}')
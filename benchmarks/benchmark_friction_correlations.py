@@ -0,0 +1,42 @@
+###########################################################################
+# Benchmark - scalar, vectorized and tabulated pipeline friction factors  #
+###########################################################################
+
+import time
+import numpy as np
+from base_python.source.helper import PipelineCorrelations as pc
+
+
+def run_scalar(reynolds_numbers: np.ndarray, roughnesses: np.ndarray, inner_diameter: float) -> np.ndarray:
+    return np.array([pc.calc_friction_loss_coefficient(reynolds_number, roughness, inner_diameter)[1]
+                     for reynolds_number, roughness in zip(reynolds_numbers, roughnesses)])
+
+
+def run_vectorized(reynolds_numbers: np.ndarray, roughnesses: np.ndarray, inner_diameter: float) -> np.ndarray:
+    return pc.calc_friction_loss_coefficient(reynolds_numbers, roughnesses, inner_diameter)[1]
+
+
+def run_table(reynolds_numbers: np.ndarray, roughnesses: np.ndarray, inner_diameter: float) -> np.ndarray:
+    return pc.get_friction_factor_table().evaluate(reynolds_numbers, roughnesses / (1000 * inner_diameter))[1]
+
+
+if __name__ == '__main__':
+    random = np.random.default_rng(0)
+    inner_diameter = 0.9
+    for size in (10 ** 3, 10 ** 4, 10 ** 5):
+        reynolds_numbers = 10 ** random.uniform(3, 8, size)
+        roughnesses = 10 ** random.uniform(-3, 0, size)  # [mm]
+        reference = None
+        for name, function in (('scalar', run_scalar), ('vectorized', run_vectorized), ('table', run_table)):
+            if name == 'scalar' and size > 10 ** 4:
+                continue
+            if name == 'table':
+                pc.get_friction_factor_table()  # the table is built once and not part of the measurement
+            start = time.perf_counter()
+            friction_loss_coefficients = function(reynolds_numbers, roughnesses, inner_diameter)
+            duration = time.perf_counter() - start
+            if reference is None:
+                reference = friction_loss_coefficients
+            deviation = np.max(np.abs(friction_loss_coefficients / reference - 1))
+            print(f'{size:>7} points {name:<11}: {duration * 1e3:9.2f} ms, '
+                  f'max. relative deviation {deviation:.2e}')
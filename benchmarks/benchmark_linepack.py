@@ -0,0 +1,37 @@
+##########################################################################
+# Benchmark - implicit linepack calculation of a long hydrogen pipeline  #
+##########################################################################
+
+import time
+import numpy as np
+from base_python.source.helper.LinepackSolver import LinepackSolver
+from base_python.source.modules.Pipeline_Segment import Pipeline_Segment
+
+
+def run_benchmark(length: float = 200000, cells: int = 100, steps: int = 8760, time_step: float = 3600):
+    """Constant supply of a pipeline with a daily fluctuating offtake, which is balanced by the linepack"""
+    segment = Pipeline_Segment(length=length, inner_diameter_in_m=0.9, roughness_in_mm=0.012)
+    segment._blank_fluid(fluid_string='HYDROGEN')
+    solver = LinepackSolver(segment, lengths=np.full(cells, length / cells), altitudes=np.zeros(cells))
+    solver.initialize(pressure=60 * 10 ** 5, temperature=15)
+
+    hours = np.arange(steps)
+    inlet_flow = 20.0  # [kg/s]
+    outlet_flows = inlet_flow * (1 + 0.5 * np.sin(2 * np.pi * hours / 24))
+
+    linepack = np.empty(steps)
+    iterations = 0
+    start = time.perf_counter()
+    for runcount in range(steps):
+        linepack[runcount] = solver.solve_timestep(runcount, inlet_flow=inlet_flow, outlet_flow=outlet_flows[runcount],
+                                                   time_step=time_step)
+        iterations += solver.iterations
+    duration = time.perf_counter() - start
+    return duration, linepack, iterations / steps
+
+
+if __name__ == '__main__':
+    duration, linepack, mean_iterations = run_benchmark()
+    print(f'8760 hourly steps: {duration:.2f} s ({duration / 8760 * 1e3:.2f} ms per step, '
+          f'{mean_iterations:.1f} iterations per step), linepack between {linepack.min() / 1e3:.1f} t and '
+          f'{linepack.max() / 1e3:.1f} t')
@@ -0,0 +1,41 @@
+################################################
+# Model template - build vs. clone             #
+################################################
+
+import time
+import numpy as np
+from base_python.source.helper.initialize_logger import LoggingLevels
+from base_python.source.model_base.ParameterSweep import get_total_annuity
+
+from base_python.base_value_chains.B_Grid_Based_Production_H2 import Model_B
+
+MODEL_ARGUMENTS = dict(database_name='dbi_mat', db_location='local', logging_level=LoggingLevels.CRITICAL)
+SIZES = [50, 100, 150, 200]
+
+
+def run_point(model, size: float) -> tuple:
+    model.components['Ely'].set_size(size)
+    model.run()
+    model.calculate_costs()
+    port = next(iter(model.components['Ely'].ports.values()))
+    return get_total_annuity(model), np.abs(port.get_stream_history()).sum()
+
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    results_new = [run_point(Model_B(**MODEL_ARGUMENTS), size) for size in SIZES]
+    duration_new = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = Model_B(**MODEL_ARGUMENTS)
+    duration_template = time.perf_counter() - start
+    start = time.perf_counter()
+    clones = [template.clone() for _ in SIZES]
+    duration_clone = (time.perf_counter() - start) / len(SIZES)
+    start = time.perf_counter()
+    results_clone = [run_point(clone, size) for clone, size in zip(clones, SIZES)]
+    duration_clones = time.perf_counter() - start
+
+    print(f'Model creation {duration_template * 1e3:.1f} ms, clone {duration_clone * 1e3:.1f} ms')
+    print(f'{len(SIZES)} points: {duration_new:.2f} s with new models, {duration_clones:.2f} s with clones, '
+          f'max. relative deviation {np.max(np.abs(np.array(results_clone) / np.array(results_new) - 1)):.2e}')
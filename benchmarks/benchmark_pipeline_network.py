@@ -0,0 +1,48 @@
+#################################################################
+# Benchmark - sparse Newton solver of a meshed hydrogen network #
+#################################################################
+
+import time
+from base_python.source.model_base.PipelineNetwork import PipelineNetwork
+from base_python.source.modules.Pipeline_Segment import Pipeline_Segment
+
+
+def create_segment(length: float) -> Pipeline_Segment:
+    segment = Pipeline_Segment(length=length, inner_diameter_in_m=0.6, roughness_in_mm=0.012)
+    segment._blank_fluid(fluid_string='HYDROGEN')
+    return segment
+
+
+def create_grid_network(rows: int, columns: int, offtake: float = 0.05, length: float = 5000) -> PipelineNetwork:
+    """Meshed grid of rows x columns nodes, which is supplied at one corner and has an offtake at every other node"""
+    network = PipelineNetwork(time_resolution=60)
+    for row in range(rows):
+        for column in range(columns):
+            if row == 0 and column == 0:
+                network.add_node('N_0_0', pressure_in_Pa=60 * 10 ** 5, temperature_in_C=20)
+            else:
+                network.add_node(f'N_{row}_{column}', injection=-offtake)
+    for row in range(rows):
+        for column in range(columns):
+            if column + 1 < columns:
+                network.add_segment(create_segment(length), f'N_{row}_{column}', f'N_{row}_{column + 1}')
+            if row + 1 < rows:
+                network.add_segment(create_segment(length), f'N_{row}_{column}', f'N_{row + 1}_{column}')
+    return network
+
+
+if __name__ == '__main__':
+    for size in (5, 10, 20):
+        network = create_grid_network(size, size)
+        start = time.perf_counter()
+        converged = network.solve(runcount=0)
+        cold_start = time.perf_counter() - start
+
+        start = time.perf_counter()
+        network.solve(runcount=1)  # warm start from the solution of the previous timestep
+        warm_start = time.perf_counter() - start
+
+        statistics = network.get_statistics()
+        print(f'{len(network.node_names)} nodes, {len(network.segments)} segments: converged {converged}, '
+              f'cold start {cold_start:.2f} s, warm start {warm_start:.2f} s, '
+              f'{statistics["newton_iterations"]} Newton iterations, min. pressure {network.pressures.min() / 1e5:.2f} bar')
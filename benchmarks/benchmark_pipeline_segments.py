@@ -0,0 +1,41 @@
+#########################################################################
+# Benchmark - steady state calculation of a long multi-segment pipeline #
+#########################################################################
+
+import time
+import numpy as np
+import pandas as pd
+from base_python.source.modules.Pipeline import Pipeline
+
+
+def create_geo_data(number_of_segments: int, length_in_km: float = 500) -> pd.DataFrame:
+    """Synthetic pipeline route with a slightly varying altitude and environmental temperature"""
+    positions = np.linspace(0, length_in_km, number_of_segments + 1)
+    return pd.DataFrame({'Strecke [km]': positions,
+                         'Höhe [m]': 50 + 20 * np.sin(positions / 25),
+                         'Umgebungstemperatur [°C]': 10 + 2 * np.cos(positions / 100),
+                         'Wärmeleitfähigkeit_Boden [W/(mK)]': np.full(positions.size, 1.2)})
+
+
+def run_benchmark(number_of_segments: int):
+    pipeline = Pipeline.init_blank(m_dot=50, fluid='HYDROGEN', inlet_pressure_in_Pa=80 * 10 ** 5,
+                                   inlet_temperature_in_C=20)
+    pipeline.load_dimensional_data(inner_diameter_in_m=0.9, roughness_in_mm=0.012)
+    pipeline.init_parameters_buried_pipeline(outer_diameter=0.95, depht=1.5)
+
+    start = time.perf_counter()
+    pipeline.set_geo_data(create_geo_data(number_of_segments))
+    duration_geo_data = time.perf_counter() - start
+
+    start = time.perf_counter()
+    p2, t2, m_dot = pipeline.pipeline()
+    duration_pipeline = time.perf_counter() - start
+    return duration_geo_data, duration_pipeline, p2, t2
+
+
+if __name__ == '__main__':
+    for number_of_segments in (100, 1000, 5000):
+        duration_geo_data, duration_pipeline, p2, t2 = run_benchmark(number_of_segments)
+        print(f'{number_of_segments} segments: geo data {duration_geo_data * 1e3:.1f} ms, '
+              f'pipeline {duration_pipeline:.2f} s ({duration_pipeline / number_of_segments * 1e3:.2f} ms per segment)'
+              f' -> p2 = {p2 / 1e5:.2f} bar, t2 = {t2:.2f} °C')
@@ -0,0 +1,40 @@
+##################################################################################
+# Benchmark - fixed point and Newton scheme of Pipeline_Segment.pipeline_segment #
+##################################################################################
+
+import time
+from base_python.source.basic.Settings import SegmentSolver
+from base_python.source.helper.PropertyService import property_service
+from base_python.source.modules.Pipeline_Segment import Pipeline_Segment
+
+
+def run_benchmark(segment_solver: SegmentSolver, iterate_heat_flux: bool, massflows: list):
+    segment = Pipeline_Segment(length=50000, inner_diameter_in_m=0.9, roughness_in_mm=0.012,
+                               inlet_altitude=20, outlet_altitude=80, iterate_heat_flux=iterate_heat_flux,
+                               temperature_environment_in_C=10, segment_solver=segment_solver)
+    segment._blank_fluid(fluid_string='HYDROGEN')
+    property_service.clear()  # every scheme starts without cached properties
+
+    results = []
+    start = time.perf_counter()
+    for m_dot in massflows:
+        results.append(segment.pipeline_segment(p1=80 * 10 ** 5, t1=40, m_dot=m_dot, length=segment.length,
+                                                z1=segment.inlet_altitude, z2=segment.outlet_altitude))
+    duration = time.perf_counter() - start
+    return duration, results, segment.get_solver_statistics()
+
+
+if __name__ == '__main__':
+    massflows = [5 + 0.5 * i for i in range(100)]
+    for iterate_heat_flux in (False, True):
+        reference = None
+        for segment_solver in (SegmentSolver.FIXED_POINT, SegmentSolver.NEWTON):
+            duration, results, statistics = run_benchmark(segment_solver, iterate_heat_flux, massflows)
+            if reference is None:
+                reference = results
+            deviation = max(max(abs(p2 - p2_ref), abs(t2 - t2_ref) * 1e3)
+                            for (p2, t2), (p2_ref, t2_ref) in zip(results, reference))
+            print(f'{segment_solver.name:<12} heat flux {iterate_heat_flux!s:<5}: {duration * 1e3:8.1f} ms, '
+                  f'{statistics["mean_iterations"]:5.1f} iterations and {statistics["mean_property_calls"]:5.1f} '
+                  f'property calls per solve, {statistics["not_converged"]} not converged, '
+                  f'max. deviation from fixed point {deviation:.1f} Pa / mK')
@@ -0,0 +1,122 @@
+################################################
+# Benchmark - mean duration of one solver step #
+################################################
+
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+"""
+Compares the mean duration of ModelBase.solve of the working tree with a git revision, e.g. the revision before the
+compiled branch execution plan (build_branches). The revision is checked out into a temporary git worktree and the
+same timing script runs in a separate process for both trees, so both measurements use identical models and settings:
+    python -m benchmarks.benchmark_solve_step --baseline <revision> --steps 8760 --repeats 3
+The timing script only uses the public model API (Model_A, Model_B, add_stream_profile_to_port, run and solve), which
+exists in all revisions. The compiled execution plan covers the loop of ModelBase.solve over branches and ports, the
+call slots of the fixed and adaptive ports of every branch and the reused dictionaries of the branches. The run methods
+of the components are unchanged, so the gain is limited to the share of the solver loop in the duration of a step.
+"""
+
+TIMING_SCRIPT = '''
+import sys
+import time
+from base_python.source.helper.initialize_logger import LoggingLevels
+from base_python.source.basic.Streamtypes import StreamMass, StreamEnergy, StreamDirection
+import base_python.base_value_chains.A_RE_Based_Production_H2 as Model_A
+import base_python.base_value_chains.B_Grid_Based_Production_H2 as Model_B
+
+
+def create_model_a():
+    model = Model_A.Model_A(database_name='dbi_mat', db_location='local', logging_level=LoggingLevels.CRITICAL)
+    model.add_stream_profile_to_port(component_name='Consumer_H2', port_stream_type=StreamMass.HYDROGEN,
+                                     port_stream_direction=StreamDirection.stream_into_component,
+                                     profile=[-1000] * 8760)
+    model.add_stream_profile_to_port(component_name='RE_Wind', port_stream_type=StreamEnergy.ELECTRIC,
+                                     port_stream_direction=StreamDirection.stream_out_of_component,
+                                     profile=[1] * 8760)
+    model.components['Ely'].set_size(size=20)
+    return model
+
+
+def create_model_b():
+    return Model_B.Model_B(database_name='dbi_mat', db_location='local', logging_level=LoggingLevels.CRITICAL)
+
+
+steps, repeats = int(sys.argv[1]), int(sys.argv[2])
+for name, create_model in (('Model_A', create_model_a), ('Model_B', create_model_b)):
+    model = create_model()
+    model.run()  # initialises port states and histories
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for runcount in range(steps):
+            model.solve(runcount)
+        durations.append((time.perf_counter() - start) / steps)
+    print(f'{name} {min(durations)}')
+'''
+
+
+def get_repository_root() -> str:
+    return subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                          check=True, capture_output=True, text=True).stdout.strip()
+
+
+def run_timing(tree: str, steps: int, repeats: int) -> dict:
+    """
+    Runs the timing script with the package base_python of the given tree
+
+    Args:
+        tree (str): Root of a checkout of the repository
+        steps (int): Number of solved timesteps per repetition
+        repeats (int): Number of repetitions, the fastest repetition is reported
+
+    Returns:
+        dict: Model names as keys and the mean duration of one solve step in s as values
+    """
+    environment = dict(os.environ, PYTHONPATH=tree)
+    output = subprocess.run([sys.executable, '-c', TIMING_SCRIPT, str(steps), str(repeats)], cwd=tree, env=environment,
+                            check=True, capture_output=True, text=True).stdout
+    return {name: float(duration) for name, duration in (line.split() for line in output.splitlines() if line)}
+
+
+def run_benchmark(baseline: str = None, steps: int = 8760, repeats: int = 3) -> dict:
+    """
+    Args:
+        baseline (str): Git revision which is compared with the working tree, None to time the working tree only
+        steps (int): Number of solved timesteps per repetition
+        repeats (int): Number of repetitions, the fastest repetition is reported
+
+    Returns:
+        dict: 'current' and 'baseline' as keys and the durations of run_timing as values
+    """
+    repository_root = get_repository_root()
+    durations = {'current': run_timing(repository_root, steps, repeats)}
+    if baseline is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            worktree = os.path.join(directory, 'baseline')
+            subprocess.run(['git', 'worktree', 'add', '--detach', worktree, baseline], cwd=repository_root,
+                           check=True, capture_output=True)
+            try:
+                durations['baseline'] = run_timing(worktree, steps, repeats)
+            finally:
+                subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=repository_root,
+                               check=True, capture_output=True)
+    return durations
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mean duration of one solver step of the working tree and a baseline')
+    parser.add_argument('--baseline', default=None, help='Git revision of the baseline, e.g. a commit hash')
+    parser.add_argument('--steps', type=int, default=8760)
+    parser.add_argument('--repeats', type=int, default=3)
+    arguments = parser.parse_args()
+
+    durations = run_benchmark(arguments.baseline, arguments.steps, arguments.repeats)
+    for name, duration in durations['current'].items():
+        message = f'{name}: {duration * 1e6:.1f} us per solve step'
+        if 'baseline' in durations:
+            baseline_duration = durations['baseline'][name]
+            message += f' (baseline {baseline_duration * 1e6:.1f} us, speedup {baseline_duration / duration:.2f}x)'
+        print(message)
@@ -0,0 +1,67 @@
+################################################
+# Benchmark - stepwise vs. step deduplication  #
+################################################
+
+import time
+import numpy as np
+from base_python.source.helper.initialize_logger import LoggingLevels
+from base_python.source.basic.Settings import SolverEngine
+from base_python.source.basic.Streamtypes import StreamMass, StreamEnergy, StreamDirection
+
+import base_python.base_value_chains.A_RE_Based_Production_H2 as Model_A
+import base_python.base_value_chains.B_Grid_Based_Production_H2 as Model_B
+from benchmarks.run_storage_dispatch import get_renewable_profiles
+
+
+def create_model_a(logging_level: LoggingLevels):
+    model = Model_A.Model_A(database_name='dbi_mat', db_location='local', logging_level=logging_level)
+    model.add_stream_profile_to_port(component_name='Consumer_H2',
+                                     port_stream_type=StreamMass.HYDROGEN,
+                                     port_stream_direction=StreamDirection.stream_into_component,
+                                     profile=[-1000] * 8760)
+    pv, wind = get_renewable_profiles(8760)
+    for component_name, profile in (('RE_PV', pv), ('RE_Wind', wind)):
+        model.add_stream_profile_to_port(component_name=component_name,
+                                         port_stream_type=StreamEnergy.ELECTRIC,
+                                         port_stream_direction=StreamDirection.stream_out_of_component,
+                                         profile=profile.tolist())
+    model.components['Ely'].set_size(size=20)
+    return model
+
+
+def create_model_b(logging_level: LoggingLevels):
+    return Model_B.Model_B(database_name='dbi_mat', db_location='local', logging_level=logging_level)
+
+
+def get_stream_histories(model) -> dict:
+    histories = {}
+    for component_name, component in model.components.items():
+        for port_id, port in component.ports.items():
+            histories[(component_name, port_id)] = np.array(port.get_stream_history(), dtype=float)
+    return histories
+
+
+def run_benchmark(create_model, logging_level: LoggingLevels):
+    model = create_model(logging_level)
+    durations = {}
+    histories = {}
+    for solver_engine in SolverEngine:
+        model.set_solver_engine(solver_engine)
+        start = time.perf_counter()
+        model.run()
+        durations[solver_engine] = time.perf_counter() - start
+        histories[solver_engine] = get_stream_histories(model)
+
+    identical = all(np.array_equal(histories[SolverEngine.STEPWISE][key], histories[SolverEngine.STEP_DEDUPLICATION][key])
+                    for key in histories[SolverEngine.STEPWISE])
+    return durations, identical, model.get_unique_step_count(model.profile_len)
+
+
+if __name__ == '__main__':
+    logging_level = LoggingLevels.CRITICAL
+    for name, create_model in {'Model_A': create_model_a, 'Model_B': create_model_b}.items():
+        durations, identical, unique_steps = run_benchmark(create_model, logging_level)
+        print(f'{name}: stepwise {durations[SolverEngine.STEPWISE]:.2f} s, '
+              f'deduplicated {durations[SolverEngine.STEP_DEDUPLICATION]:.2f} s, '
+              f'speedup {durations[SolverEngine.STEPWISE] / durations[SolverEngine.STEP_DEDUPLICATION]:.1f}x, '
+              f'unique timesteps: {unique_steps}, identical port histories: {identical}')
@@ -0,0 +1,34 @@
+################################################
+# Database cache - build & startup report      #
+################################################
+
+import os
+import time
+from base_python.source.helper.initialize_logger import LoggingLevels
+from base_python.source.helper.DatabaseSnapshot import DatabaseSnapshot, clear_database_snapshots
+from base_python.source.model_base.ModelBase import ModelBase
+
+import base_python.base_value_chains.B_Grid_Based_Production_H2 as Model_B
+
+
+def create_model() -> float:
+    start = time.perf_counter()
+    Model_B.Model_B(database_name='dbi_mat', db_location='local', logging_level=LoggingLevels.CRITICAL)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    database_path = ModelBase._find_local_database('dbi_mat')
+    cache_path = DatabaseSnapshot.get_cache_path(database_path)
+    if os.path.isfile(cache_path):
+        os.remove(cache_path)
+    clear_database_snapshots()
+
+    # the first model reads the sqlite file and builds the cache, the second one only loads the cache
+    duration_build = create_model()
+    clear_database_snapshots()
+    duration_cache = create_model()
+    duration_shared = create_model()
+    print(f'Cache {cache_path} ({os.path.getsize(cache_path) / 1024:.0f} kB) built')
+    print(f'Model creation: {duration_build * 1e3:.1f} ms with sqlite, {duration_cache * 1e3:.1f} ms with cache, '
+          f'{duration_shared * 1e3:.1f} ms with snapshot of the process')
@@ -0,0 +1,22 @@
+################################################
+# Tabulated property backend - build & report  #
+################################################
+
+from base_python.source.helper.initialize_logger import LoggingLevels
+from base_python.source.basic import ModelSettings
+from base_python.source.helper.TabulatedFluid import build_all_tables
+
+import base_python.base_value_chains.B_Grid_Based_Production_H2 as Model_B
+
+
+if __name__ == '__main__':
+    # the model is only created to load the stream types and their compositions from the database
+    Model_B.Model_B(database_name='dbi_mat', db_location='local', logging_level=LoggingLevels.CRITICAL)
+    reports = build_all_tables(ModelSettings.stream_types)
+    for stream_type, report in reports.items():
+        print(f'{stream_type.name}: speedup {report["speedup"]:.0f}x per call '
+              f'({report["time_per_call_reference"] * 1e6:.1f} us REFPROP, '
+              f'{report["time_per_call_table"] * 1e6:.1f} us table)')
+        for name, value in report.items():
+            if name.startswith('max_relative_error'):
+                print(f'    {name}: {value:.2e}')
@@ -0,0 +1,27 @@
+################################################
+# Parameter sweep - Model B                    #
+################################################
+
+import time
+import numpy as np
+from base_python.source.helper.initialize_logger import LoggingLevels
+from base_python.source.basic.Streamtypes import StreamMass
+from base_python.source.model_base.ParameterSweep import run_parameter_sweep
+
+from base_python.base_value_chains.B_Grid_Based_Production_H2 import Model_B
+
+
+if __name__ == '__main__':
+    sweep_grid = {'Ely.set_size': [50, 100, 150, 200],
+                  'Storage_H2.set_size': [100000, 550000, 1000000],
+                  'Ely.economical_parameters.set_all_interest_rates': list(np.linspace(0.02, 0.08, 4))}
+
+    start = time.perf_counter()
+    results = run_parameter_sweep(model_class=Model_B,
+                                  sweep_grid=sweep_grid,
+                                  model_arguments=dict(database_name='dbi_mat', db_location='local',
+                                                       logging_level=LoggingLevels.CRITICAL),
+                                  full_load_hours={'Ely': StreamMass.HYDROGEN})
+    print(results.to_string())
+    print(f'{len(results)} points in {time.perf_counter() - start:.1f} s, '
+          f'{results["error"].notna().sum()} failed')
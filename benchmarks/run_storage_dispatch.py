@@ -0,0 +1,41 @@
+################################################
+# Storage dispatch optimization - Model D      #
+################################################
+
+import time
+import numpy as np
+from base_python.source.helper.initialize_logger import LoggingLevels
+from base_python.source.basic.Streamtypes import StreamEnergy, StreamDirection
+from base_python.source.basic.Quantities import PhysicalQuantity
+
+from base_python.base_value_chains.D_Pipeline_Transport import Model_D
+
+
+def get_renewable_profiles(hours: int, seed: int = 0) -> tuple:
+    """Synthetic hourly profiles of PV (daily and seasonal cycle) and wind (weather fluctuations) in kW"""
+    random = np.random.default_rng(seed)
+    hour = np.arange(hours)
+    season = 0.6 + 0.4 * np.cos((hour / hours - 0.5) * 2 * np.pi)
+    pv = 10 * np.clip(np.sin((hour % 24 - 6) * np.pi / 12), 0, None) * season
+    wind = 10 * np.clip(np.convolve(random.normal(0.35, 0.5, hours + 47), np.ones(48) / 48, mode='valid') * 2, 0, 1)
+    return pv, wind
+
+
+if __name__ == '__main__':
+    model = Model_D(database_name='dbi_mat', db_location='local', logging_level=LoggingLevels.CRITICAL)
+    pv, wind = get_renewable_profiles(8760)
+    for name, profile in (('RE_PV', pv), ('RE_Wind', wind)):
+        model.add_profile_to_component_port(name, StreamEnergy.ELECTRIC, StreamDirection.stream_out_of_component,
+                                            profile.tolist(), PhysicalQuantity.stream)
+
+    schedules = model.optimize_storage_dispatch(electrolyser='Ely', storage='Storage_H2', consumer='Consumer_H2',
+                                                sources=['RE_PV', 'RE_Wind'], electric_grid='dump_electric',
+                                                hydrogen_grid='Grid_H2')
+    print(f'LP with {8760 * len(model.DISPATCH_VARIABLES)} variables solved in {schedules["duration"]:.2f} s, '
+          f'objective {schedules["objective"]:.0f} €')
+    print(f'max. storage level {schedules["storage_level"].max():.0f} kg, '
+          f'hydrogen purchase {schedules["hydrogen_purchase"].sum():.0f} kg')
+
+    start = time.perf_counter()
+    model.run()
+    print(f'simulation of the schedules in {time.perf_counter() - start:.1f} s')
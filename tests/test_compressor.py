@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+pytest.importorskip('CoolProp')
+pytest.importorskip('ctREFPROP')
+
+from base_python.source.basic.Streamtypes import StreamMass
+from base_python.source.modules.Compressor import Compressor
+
+
+@pytest.fixture(scope='module')
+def compressor():
+    compressor = Compressor(size=20000, stream_type=StreamMass.HYDROGEN, stages=3, cooling_temperature=313.15)
+    compressor.set_time_resolution(60)
+    compressor._update_mass_fraction({StreamMass.HYDROGEN: 1.0})
+    return compressor
+
+
+@pytest.fixture(scope='module')
+def states():
+    """Injection into a cavern with varying mass flow, inlet temperature and cavern pressure"""
+    random = np.random.default_rng(0)
+    steps = 50
+    return (random.uniform(1000, 20000, steps), random.uniform(283.15, 328.15, steps), np.full(steps, 30e5),
+            random.uniform(60e5, 180e5, steps))
+
+
+def test_scalar_path_matches_array_api(compressor, states):
+    array_results = compressor.calculate_compression_power_array(*states)
+    for step, state in enumerate(zip(*(values.tolist() for values in states))):
+        scalar_results = compressor._calculate_compression_power_scalar(*state)
+        assert all(isinstance(value, float) for value in scalar_results)
+        np.testing.assert_allclose(scalar_results, [values[step] for values in array_results], rtol=1e-12)
+
+
+def test_compression_map_matches_stage_calculation(compressor, states):
+    reference = compressor.calculate_compression_power_array(*states)[0]
+    compressor.use_compression_map(pressure_in_range=(20e5, 40e5), pressure_out_range=(50e5, 190e5),
+                                   temperature_range=(273.15, 333.15))
+    try:
+        compression_power = compressor.compression_map.evaluate(*states)[0]
+    finally:
+        compressor.set_compression_map(None)
+    np.testing.assert_allclose(compression_power, reference, rtol=1e-2)
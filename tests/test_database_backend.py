@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+from base_python.source.helper.DatabaseBackend import InMemoryBackend
+
+
+@pytest.fixture
+def in_memory_backend():
+    backend = InMemoryBackend({'EFFICIENCY': (('CLASS', 'TECHNOLOGY', 'SIZE'),
+                                              [('ELECTROLYSER', 'PEM', 1), ('ELECTROLYSER', 'AEL', 2)])},
+                              pool_size=2)
+    yield backend
+    backend.close()
+
+
+def test_select_with_conditions(in_memory_backend):
+    with in_memory_backend.acquire() as handle:
+        field_names, rows = handle.select('EFFICIENCY', {'TECHNOLOGY': 'PEM'})
+    assert field_names == ['CLASS', 'TECHNOLOGY', 'SIZE']
+    assert rows == [('ELECTROLYSER', 'PEM', 1)]
+
+
+def test_released_connections_are_reused(in_memory_backend):
+    for _ in range(5):
+        with in_memory_backend.acquire() as handle:
+            handle.select('EFFICIENCY')
+    assert in_memory_backend._connection_count == 1
+
+
+def test_invalid_identifiers_are_rejected(in_memory_backend):
+    with in_memory_backend.acquire() as handle:
+        with pytest.raises(ValueError):
+            handle.select('EFFICIENCY; DROP TABLE EFFICIENCY')
+
+
+def test_stand_in_matches_local_database():
+    """A model which loads the tables of the local database from the in-process stand-in gets the same efficiencies"""
+    pytest.importorskip('numpy')
+    pytest.importorskip('scipy')
+    pytest.importorskip('pandas')
+    pytest.importorskip('CoolProp')
+    pytest.importorskip('ctREFPROP')
+    from base_python.source.helper.initialize_logger import LoggingLevels
+    from base_python.source.helper.DatabaseBackend import SQLiteBackend, set_database_backend
+    from base_python.source.helper.DatabaseSnapshot import DatabaseSnapshot, clear_database_snapshots
+    from base_python.source.model_base.ModelBase import ModelBase
+    import base_python.base_value_chains.B_Grid_Based_Production_H2 as Model_B
+
+    def get_efficiencies(model) -> dict:
+        return {name: [(efficiency.medium_referenced, efficiency.medium_calculated, list(efficiency.load_range),
+                        list(efficiency.efficiencies_at_load))
+                       for efficiency in component.efficiencies.all_efficiencies]
+                for name, component in model.components.items()}
+
+    local_backend = SQLiteBackend(ModelBase._find_local_database('dbi_mat'), 'dbi_mat')
+    with local_backend.acquire() as handle:
+        tables = {table: handle.select(table)
+                  for table in ('STREAM_TYPES', 'STREAM_PROPERTIES') + DatabaseSnapshot.TABLES}
+    local_backend.close()
+    set_database_backend(('memory', 'dbi_mat'), InMemoryBackend(tables, 'dbi_mat'))
+
+    model_local = Model_B.Model_B(database_name='dbi_mat', db_location='local', logging_level=LoggingLevels.CRITICAL)
+    clear_database_snapshots()
+    model_memory = Model_B.Model_B(database_name='dbi_mat', db_location='memory', logging_level=LoggingLevels.CRITICAL)
+    assert get_efficiencies(model_local) == get_efficiencies(model_memory)
@@ -0,0 +1,51 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+pytest.importorskip('pandas')
+pytest.importorskip('CoolProp')
+pytest.importorskip('ctREFPROP')
+
+from base_python.source.basic.Streamtypes import StreamDirection
+from base_python.source.basic.Quantities import PhysicalQuantity
+from base_python.source.model_base.Port import Port
+from base_python.source.modules.Electrolyser_Unit import Electrolyser_Unit
+
+
+@pytest.fixture
+def controlled_port():
+    """Electric port into the unit, the stream limits are ordered by magnitude, i.e. (-0.5, -30)"""
+    port = Port(component_ID='U00', port_id='U00_P00', sign=StreamDirection.stream_into_component)
+    port.update_stream_limit((-30, -0.5))
+    return port
+
+
+@pytest.fixture
+def electrolyser_unit(controlled_port):
+    """Unit with precalculated workpoints of the sub electrolysers, see Electrolyser_Unit._set_workpoints"""
+    electrolyser_unit = Electrolyser_Unit.__new__(Electrolyser_Unit)
+    electrolyser_unit.workpoints = {controlled_port: {'min_stream_base': -2.0,
+                                                      'min_stream_variable': -0.5,
+                                                      'opt_workpoint_stream_base': -8.0,
+                                                      'opt_workpoint_stream_variable': -3.3,
+                                                      'max_workpoint_variable': -10.0}}
+    return electrolyser_unit
+
+
+def test_port_keeps_streams_within_limits(controlled_port):
+    assert controlled_port.check_port_value(PhysicalQuantity.stream, -5.0) == -5.0
+    assert controlled_port.check_port_value(PhysicalQuantity.stream, -40.0) == -30.0
+    assert controlled_port.check_port_value(PhysicalQuantity.stream, -0.2) == 0
+    assert controlled_port.check_port_value(PhysicalQuantity.stream, 3.0) == 0
+
+
+def test_profile_dispatch_matches_single_steps(electrolyser_unit, controlled_port):
+    requested_streams = np.linspace(5, -40, 451)
+    streams = np.array([controlled_port.check_port_value(PhysicalQuantity.stream, value)
+                        for value in requested_streams.tolist()], dtype=float)
+    profile_split = electrolyser_unit.dispatch_stream_profile(controlled_port, streams)
+    for step, stream in enumerate(streams.tolist()):
+        split = electrolyser_unit._dispatch_stream(controlled_port, stream)
+        for key in ('base', 'variable', 'stream'):
+            np.testing.assert_array_equal(profile_split[key][step], split[key], err_msg=f'{key} at {stream}')
+    assert np.all(profile_split['stream'] >= -30)
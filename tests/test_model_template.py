@@ -0,0 +1,28 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+pytest.importorskip('pandas')
+pytest.importorskip('CoolProp')
+pytest.importorskip('ctREFPROP')
+
+from base_python.base_value_chains.B_Grid_Based_Production_H2 import Model_B
+from benchmarks.benchmark_model_template import MODEL_ARGUMENTS, run_point
+
+SIZES = [50, 200]
+
+
+def test_clones_match_new_models():
+    results_new = [run_point(Model_B(**MODEL_ARGUMENTS), size) for size in SIZES]
+    template = Model_B(**MODEL_ARGUMENTS)
+    results_clone = [run_point(template.clone(), size) for size in SIZES]
+    np.testing.assert_allclose(results_clone, results_new)
+
+
+def test_template_is_not_changed_by_clones():
+    template = Model_B(**MODEL_ARGUMENTS)
+    size = template.components['Ely'].size
+    clone = template.clone()
+    run_point(clone, 2 * size)
+    assert template.components['Ely'].size == size
+    assert clone.components['Ely'] is not template.components['Ely']
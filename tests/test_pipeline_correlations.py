@@ -0,0 +1,43 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from base_python.source.helper import PipelineCorrelations as pc
+
+
+@pytest.fixture(scope='module')
+def friction_factor_table():
+    return pc.FrictionFactorTable.build(points_per_decade=20)
+
+
+def test_table_keeps_laminar_turbulent_jump(friction_factor_table):
+    """Directly below and above Re = 2320 the table has to return the laminar and the Blasius value, not a blend"""
+    reynolds_numbers = np.array([pc.LAMINAR_BOUNDARY * (1 - 1e-6), pc.LAMINAR_BOUNDARY * (1 + 1e-6)])
+    relative_roughness = 1e-6
+    flc, friction_loss_coefficient = friction_factor_table.evaluate(reynolds_numbers, relative_roughness)
+    exact_flc, exact_friction_loss_coefficient = pc.calc_friction_loss_coefficient(
+        reynolds_numbers, relative_roughness * 1000, 1.0)
+    np.testing.assert_allclose(friction_loss_coefficient, exact_friction_loss_coefficient, rtol=1e-9)
+    assert friction_loss_coefficient[0] == pytest.approx(64 / reynolds_numbers[0])
+    assert friction_loss_coefficient[1] == pytest.approx(0.3164 * reynolds_numbers[1] ** -0.25)
+
+
+def test_table_keeps_roughness_regime_boundaries(friction_factor_table):
+    """Points on both sides of the limits of the hydraulically smooth and rough pipe are not interpolated"""
+    relative_roughness = 1e-4
+    reynolds_numbers = np.array([pc.SMOOTH_BOUNDARY * (1 - 1e-6), pc.SMOOTH_BOUNDARY * (1 + 1e-6),
+                                 pc.ROUGH_BOUNDARY * (1 - 1e-6), pc.ROUGH_BOUNDARY * (1 + 1e-6)]) / relative_roughness
+    flc, friction_loss_coefficient = friction_factor_table.evaluate(reynolds_numbers, relative_roughness)
+    exact_flc, exact_friction_loss_coefficient = pc.calc_friction_loss_coefficient(
+        reynolds_numbers, relative_roughness * 1000, 1.0)
+    np.testing.assert_allclose(friction_loss_coefficient, exact_friction_loss_coefficient, rtol=1e-9)
+
+
+def test_table_interpolates_within_regime(friction_factor_table):
+    reynolds_numbers = np.logspace(4, 8, 200)
+    relative_roughnesses = np.full(reynolds_numbers.shape, 1e-5)
+    flc, friction_loss_coefficient = friction_factor_table.evaluate(reynolds_numbers, relative_roughnesses)
+    exact_flc, exact_friction_loss_coefficient = pc.calc_friction_loss_coefficient(
+        reynolds_numbers, relative_roughnesses * 1000, 1.0)
+    np.testing.assert_allclose(friction_loss_coefficient, exact_friction_loss_coefficient, rtol=1e-2)
+    assert isinstance(friction_factor_table.evaluate(1e5, 1e-5)[1], float)
@@ -0,0 +1,65 @@
+import types
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+
+from base_python.source.basic.CustomErrors import ModelError
+from base_python.source.model_base.PipelineNetwork import PipelineNetwork
+
+
+def create_time_resolution_segment(time_resolution):
+    segment = types.SimpleNamespace(component_id='Pipeline_Segment', time_resolution=time_resolution)
+    segment.set_time_resolution = lambda value: setattr(segment, 'time_resolution', value)
+    return segment
+
+
+def create_line_network(segments, time_resolution=None) -> PipelineNetwork:
+    network = PipelineNetwork(time_resolution=time_resolution)
+    network.add_node('Supply', pressure_in_Pa=60e5)
+    for number, segment in enumerate(segments):
+        network.add_node(f'N_{number}', injection=-1)
+        network.add_segment(segment, 'Supply' if number == 0 else f'N_{number - 1}', f'N_{number}')
+    return network
+
+
+def test_time_resolution_is_taken_from_the_segments():
+    segments = [create_time_resolution_segment(15), create_time_resolution_segment(None)]
+    network = create_line_network(segments)
+    network.compile()
+    assert network.time_resolution == 15
+    assert segments[1].time_resolution == 15
+
+
+@pytest.mark.parametrize('segment_resolutions, network_resolution', [((15, 60), None), ((15, 15), 60),
+                                                                     ((None, None), None)])
+def test_time_resolution_mismatch_is_rejected(segment_resolutions, network_resolution):
+    network = create_line_network([create_time_resolution_segment(value) for value in segment_resolutions],
+                                  network_resolution)
+    with pytest.raises(ModelError):
+        network.compile()
+
+
+def test_meshed_network_closes_the_mass_balances():
+    pytest.importorskip('pandas')
+    pytest.importorskip('CoolProp')
+    pytest.importorskip('ctREFPROP')
+    from base_python.source.modules.Pipeline_Segment import Pipeline_Segment
+
+    def create_segment() -> Pipeline_Segment:
+        segment = Pipeline_Segment(length=5000, inner_diameter_in_m=0.6, roughness_in_mm=0.012)
+        segment._blank_fluid(fluid_string='HYDROGEN')
+        return segment
+
+    network = PipelineNetwork(time_resolution=60)
+    network.add_node('Supply', pressure_in_Pa=60e5, temperature_in_C=20)
+    for name in ('A', 'B', 'C'):
+        network.add_node(name, injection=-0.5)
+    for from_node, to_node in (('Supply', 'A'), ('Supply', 'B'), ('A', 'C'), ('B', 'C'), ('A', 'B')):
+        network.add_segment(create_segment(), from_node, to_node)
+
+    assert network.solve(runcount=0)
+    injections = network.get_injections(0)
+    mass_residuals = (network.incidence @ network.flows + injections)[network.free_nodes]
+    np.testing.assert_allclose(mass_residuals, 0, atol=network.mass_tolerance)
+    assert np.all(network.pressures[network.free_nodes] < 60e5)
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from base_python.source.helper.ResultCache import ResultCache
+
+
+def test_changed_metadata_removes_entries():
+    """A result of another mass fraction must not be returned for the same inlet state"""
+    cache = ResultCache(tolerances=(1.0, 1e-3, 1e-6))
+    cache.set_metadata({'mass_fraction': {'HYDROGEN': 1.0}})
+    cache.put((5e6, 20.0, 10.0), (4.8e6, 18.0))
+    assert cache.get(5e6, 20.0, 10.0) == (4.8e6, 18.0)
+
+    cache.set_metadata({'mass_fraction': {'HYDROGEN': 1.0}})
+    assert cache.get(5e6, 20.0, 10.0) == (4.8e6, 18.0)
+
+    cache.set_metadata({'mass_fraction': {'HYDROGEN': 0.9, 'METHANE': 0.1}})
+    assert cache.get(5e6, 20.0, 10.0) is None
+
+
+def test_load_keeps_entries_of_loaded_metadata(tmp_path):
+    metadata = {'mass_fraction': {'HYDROGEN': 1.0}}
+    cache = ResultCache(tolerances=(1.0, 1e-3, 1e-6))
+    cache.set_metadata(metadata)
+    cache.put((5e6, 20.0, 10.0), (4.8e6, 18.0))
+    file_path = str(tmp_path / 'cache.npz')
+    cache.save(file_path, metadata=metadata)
+
+    loaded_cache = ResultCache(tolerances=(1.0, 1e-3, 1e-6))
+    assert loaded_cache.load(file_path, metadata=metadata)
+    loaded_cache.set_metadata(metadata)
+    assert loaded_cache.get(5e6, 20.0, 10.0) == (4.8e6, 18.0)
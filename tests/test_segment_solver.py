@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+pytest.importorskip('pandas')
+pytest.importorskip('CoolProp')
+pytest.importorskip('ctREFPROP')
+
+from base_python.source.basic.Settings import SegmentSolver
+from base_python.source.modules.Pipeline_Segment import Pipeline_Segment
+
+MASSFLOWS = [5 + 5 * i for i in range(10)]  # [kg/s]
+
+
+def solve_segments(segment_solver: SegmentSolver, iterate_heat_flux: bool, zeta: float = 0) -> list:
+    segment = Pipeline_Segment(length=50000, inner_diameter_in_m=0.9, roughness_in_mm=0.012, inlet_altitude=20,
+                               outlet_altitude=80, zeta=zeta, iterate_heat_flux=iterate_heat_flux,
+                               temperature_environment_in_C=10, segment_solver=segment_solver)
+    segment._blank_fluid(fluid_string='HYDROGEN')
+    return [segment.pipeline_segment(p1=80 * 10 ** 5, t1=40, m_dot=m_dot, length=segment.length,
+                                     z1=segment.inlet_altitude, z2=segment.outlet_altitude, zeta=segment.zeta)
+            for m_dot in MASSFLOWS]
+
+
+@pytest.mark.parametrize('iterate_heat_flux', [False, True])
+def test_newton_matches_fixed_point(iterate_heat_flux):
+    reference = solve_segments(SegmentSolver.FIXED_POINT, iterate_heat_flux)
+    results = solve_segments(SegmentSolver.NEWTON, iterate_heat_flux)
+    for (p2, t2), (p2_reference, t2_reference) in zip(results, reference):
+        assert p2 == pytest.approx(p2_reference, abs=10)
+        assert t2 == pytest.approx(t2_reference, abs=0.2)
+
+
+def test_additional_flow_resistance_increases_pressure_drop():
+    without_resistance = solve_segments(SegmentSolver.NEWTON, False)
+    with_resistance = solve_segments(SegmentSolver.NEWTON, False, zeta=5)
+    assert all(p2 < p2_reference for (p2, _), (p2_reference, _) in zip(with_resistance, without_resistance))
@@ -0,0 +1,25 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+pytest.importorskip('pandas')
+pytest.importorskip('CoolProp')
+pytest.importorskip('ctREFPROP')
+
+from base_python.source.helper.initialize_logger import LoggingLevels
+from base_python.source.basic.Settings import SolverEngine
+from benchmarks.benchmark_solver_engines import create_model_a, create_model_b, get_stream_histories
+
+
+@pytest.mark.parametrize('create_model', [create_model_a, create_model_b])
+def test_step_deduplication_matches_stepwise(create_model):
+    """Model_A is driven by varying wind and PV profiles, Model_B falls back to the stepwise solver because of its
+    time coupled components. Both engines have to agree in both cases"""
+    model = create_model(LoggingLevels.CRITICAL)
+    histories = {}
+    for solver_engine in (SolverEngine.STEPWISE, SolverEngine.STEP_DEDUPLICATION):
+        model.set_solver_engine(solver_engine)
+        model.run()
+        histories[solver_engine] = get_stream_histories(model)
+    for key, history in histories[SolverEngine.STEPWISE].items():
+        np.testing.assert_array_equal(histories[SolverEngine.STEP_DEDUPLICATION][key], history, err_msg=str(key))
@@ -0,0 +1,67 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+pytest.importorskip('CoolProp')
+pytest.importorskip('ctREFPROP')
+
+from base_python.source.basic.Streamtypes import StreamMass, StreamDirection
+from base_python.source.basic.Quantities import PhysicalQuantity
+from base_python.source.modules.Storage_Gas import Storage_Gas
+
+
+def create_storage() -> Storage_Gas:
+    storage = Storage_Gas(size=550000, technology=Storage_Gas.Technology.CAVERN, stream_type=StreamMass.HYDROGEN,
+                          pressure_min=60e5, pressure_max=180e5, initial_value=100000, efficiency=0.98)
+    storage.set_time_resolution(60)
+    for port in storage.ports.values():
+        port.set_mass_fraction({StreamMass.HYDROGEN: 1.0})
+    storage.set_properties()
+    return storage
+
+
+def run_steps(storage: Storage_Gas, requested_streams) -> dict:
+    storage._reset_port_history(history_len=len(requested_streams))
+    storage._reset_component_history()
+    port_id = storage.get_ports_by_type_and_sign(StreamMass.HYDROGEN, StreamDirection.stream_into_component).get_id()
+    streams = np.empty(len(requested_streams))
+    for runcount, requested_stream in enumerate(requested_streams.tolist()):
+        storage.run(port_id, {PhysicalQuantity.stream: requested_stream}, runcount)
+        streams[runcount] = storage.mass_ports['in'].get_stream() + storage.mass_ports['out'].get_stream()
+    history = storage.component_technical_results.component_history
+    return {'stream': streams,
+            'storage_level': np.array(history['storage_level']),
+            PhysicalQuantity.pressure: np.array(history[PhysicalQuantity.pressure])}
+
+
+@pytest.fixture(scope='module')
+def requested_streams():
+    """Charge in summer and discharge in winter with hourly noise, so both pressure limits are reached"""
+    random = np.random.default_rng(0)
+    hours = 8760
+    return -400 * np.sin(np.arange(hours) * 2 * np.pi / hours) + random.normal(0, 200, hours)
+
+
+@pytest.fixture(scope='module')
+def results(requested_streams):
+    storage = create_storage()
+    reference = run_steps(storage, requested_streams)
+    return reference, storage.calculate_horizon(requested_streams)
+
+
+def test_pressure_limits_are_reached(results):
+    reference, horizon = results
+    assert horizon['level_limited'].any()
+
+
+@pytest.mark.parametrize('name', ['stream', 'storage_level', PhysicalQuantity.pressure])
+def test_calculate_horizon_matches_run(results, name):
+    reference, horizon = results
+    np.testing.assert_allclose(horizon[name], reference[name], rtol=0, atol=1e-2)
+
+
+def test_losses_close_the_balance(results, requested_streams):
+    reference, horizon = results
+    initial_level = 100000
+    np.testing.assert_allclose(np.cumsum(-horizon['stream'] - horizon['losses']) + initial_level,
+                               horizon['storage_level'], atol=1e-6)